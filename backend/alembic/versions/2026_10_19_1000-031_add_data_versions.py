@@ -0,0 +1,49 @@
+"""Add data_versions table: per (tenant, user, year, month) change counters
+
+Revision ID: 031_add_data_versions
+Revises: 030_absence_times_cr
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '031_add_data_versions'
+down_revision = '030_absence_times_cr'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'data_versions',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('tenant_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('tenants.id'), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='1'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint('tenant_id', 'user_id', 'year', 'month', name='uq_data_version_scope'),
+    )
+    op.create_index('ix_data_versions_tenant_id', 'data_versions', ['tenant_id'])
+
+    op.execute("ALTER TABLE data_versions ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE data_versions FORCE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY tenant_isolation ON data_versions
+        USING (
+            current_setting('app.is_superadmin', true) = 'true'
+            OR tenant_id = NULLIF(current_setting('app.tenant_id', true), '')::uuid
+        )
+        WITH CHECK (
+            current_setting('app.is_superadmin', true) = 'true'
+            OR tenant_id = NULLIF(current_setting('app.tenant_id', true), '')::uuid
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS tenant_isolation ON data_versions")
+    op.drop_index('ix_data_versions_tenant_id', table_name='data_versions')
+    op.drop_table('data_versions')
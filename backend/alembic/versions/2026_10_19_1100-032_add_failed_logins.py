@@ -0,0 +1,32 @@
+"""Add failed_logins table: account lockout shared by all server workers
+
+Revision ID: 032_add_failed_logins
+Revises: 031_add_data_versions
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '032_add_failed_logins'
+down_revision = '031_add_data_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # No RLS: attempts are recorded before the user (and tenant) is known
+    op.create_table(
+        'failed_logins',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('username', sa.String(100), nullable=False),
+        sa.Column('attempted_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_failed_logins_username', 'failed_logins', ['username'])
+    op.create_index('ix_failed_logins_attempted_at', 'failed_logins', ['attempted_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_failed_logins_attempted_at', table_name='failed_logins')
+    op.drop_index('ix_failed_logins_username', table_name='failed_logins')
+    op.drop_table('failed_logins')
@@ -0,0 +1,22 @@
+"""Add (user_id, created_at, id) indexes for keyset pagination of request lists
+
+Revision ID: 033_request_list_indexes
+Revises: 032_add_failed_logins
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '033_request_list_indexes'
+down_revision = '032_add_failed_logins'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_change_requests_user_created', 'change_requests', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_vacation_requests_user_created', 'vacation_requests', ['user_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vacation_requests_user_created', table_name='vacation_requests')
+    op.drop_index('ix_change_requests_user_created', table_name='change_requests')
@@ -0,0 +1,47 @@
+"""Optional: partition time_entries and time_entry_audit_logs by year
+
+Opt-in, because it rebuilds both tables (copies every row) and replaces the
+foreign keys onto time_entries.id, see app/core/partitioning.py:
+
+    alembic -x time_partitioning=true upgrade head
+    # or DB_TIME_PARTITIONING=true alembic upgrade head
+
+Without the flag this revision changes nothing. To partition an existing
+installation later, downgrade to 033_request_list_indexes and upgrade again
+with the flag. Downgrading always converts partitioned tables back.
+
+Revision ID: 034_time_partitioning
+Revises: 033_request_list_indexes
+Create Date: 2026-10-19
+"""
+import os
+
+from alembic import context, op
+
+from app.core import partitioning
+
+revision = '034_time_partitioning'
+down_revision = '033_request_list_indexes'
+branch_labels = None
+depends_on = None
+
+
+def _opted_in() -> bool:
+    flag = context.get_x_argument(as_dictionary=True).get(
+        'time_partitioning', os.environ.get('DB_TIME_PARTITIONING', '')
+    )
+    return flag.lower() in ('1', 'true', 'yes')
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not _opted_in():
+        return
+    partitioning.enable(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    partitioning.disable(bind)
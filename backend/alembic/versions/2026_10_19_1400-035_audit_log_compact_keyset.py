@@ -0,0 +1,28 @@
+"""Add changed_fields (compact audit diff) and keyset indexes to time_entry_audit_logs
+
+Revision ID: 035_audit_log_compact_keyset
+Revises: 034_time_partitioning
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '035_audit_log_compact_keyset'
+down_revision = '034_time_partitioning'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('time_entry_audit_logs', sa.Column('changed_fields', sa.String(64), nullable=True))
+    # Already present when 034 partitioned the table (see app/core/partitioning.py)
+    op.create_index('ix_time_entry_audit_logs_created_keyset', 'time_entry_audit_logs',
+                    ['created_at', 'id'], if_not_exists=True)
+    op.create_index('ix_time_entry_audit_logs_user_keyset', 'time_entry_audit_logs',
+                    ['user_id', 'created_at', 'id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_time_entry_audit_logs_user_keyset', table_name='time_entry_audit_logs', if_exists=True)
+    op.drop_index('ix_time_entry_audit_logs_created_keyset', table_name='time_entry_audit_logs', if_exists=True)
+    op.drop_column('time_entry_audit_logs', 'changed_fields')
@@ -11,6 +11,29 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    # Opt-in asyncio request path for hot read endpoints (asyncpg); the URL is
+    # derived from DATABASE_URL unless ASYNC_DATABASE_URL is set explicitly
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: str = ""
+    # Optional read replica for reports, exports, journal and dashboard (see
+    # database_read.py); requests fall back to the primary while it lags behind
+    DATABASE_URL_READONLY: str = ""
+    READ_REPLICA_MAX_LAG_SECONDS: float = 30.0
+
+    # Connection pools per workload class (see database.py): "interactive" for
+    # requests and clock-ins, "reporting" for reports, exports and batch jobs
+    # (also used for the read replica). Timeouts in milliseconds, 0 = none.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    REPORTING_POOL_SIZE: int = 4
+    REPORTING_MAX_OVERFLOW: int = 4
+    REPORTING_STATEMENT_TIMEOUT_MS: int = 300000
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Connections are replaced after this age instead of being pinged on every
+    # checkout; enable DB_POOL_PRE_PING behind proxies that drop idle connections
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = False
 
     # Security
     SECRET_KEY: str
@@ -29,6 +52,19 @@ class Settings(BaseSettings):
 
     # Rate limiting (increase for E2E test environments)
     LOGIN_RATE_LIMIT: str = "5/minute"
+    # slowapi counter storage. memory:// counts per worker process; with
+    # WEB_CONCURRENCY > 1 use a shared backend (e.g. redis://redis:6379/0)
+    RATE_LIMIT_STORAGE_URI: str = "memory://"
+
+    # Raise instead of log when an endpoint exceeds its @query_budget (dev/test)
+    QUERY_BUDGET_ENFORCE: bool = False
+
+    # Store only the changed new_* fields of audit log updates (see audit_service)
+    AUDIT_COMPACT_DIFF: bool = False
+
+    # Worker processes (also read by gunicorn.conf.py). With more than one
+    # worker, clock status events are relayed between workers via LISTEN/NOTIFY
+    WEB_CONCURRENCY: int = 1
 
     @field_validator("SECRET_KEY")
     @classmethod
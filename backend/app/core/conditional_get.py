@@ -0,0 +1,96 @@
+"""
+HTTP conditional GET (ETag / If-None-Match) for expensive read endpoints.
+
+The ETag is derived from data_versions counters (see data_version_service), so
+it can be computed with one cheap query before any calculation runs. When the
+client's copy is current, the endpoint returns 304 without touching
+calculation_service.
+"""
+import hashlib
+from datetime import date, datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from prometheus_client import Counter
+from sqlalchemy.orm import Session
+
+from app.services import data_version_service
+from app.services.data_version_service import VersionStamp
+
+
+CONDITIONAL_GET_REQUESTS = Counter(
+    "conditional_get_requests_total",
+    "Conditional GET evaluations on cached read endpoints (hit = 304 Not Modified)",
+    ["endpoint", "result"],
+)
+
+# private: responses are per user; no-cache: always revalidate with If-None-Match
+_CACHE_HEADERS = {"Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+
+def user_stamp(db: Session, user, start: date, end: date) -> Optional[VersionStamp]:
+    """Version stamp of one user's data in [start, end]; None for users without tenant."""
+    if user.tenant_id is None:
+        return None
+    return data_version_service.get_range_stamp(db, user.tenant_id, user.id, start, end)
+
+
+def tenant_stamp(db: Session, tenant_id, start: date, end: date) -> Optional[VersionStamp]:
+    """Version stamp of all users of a tenant in [start, end]; None without tenant."""
+    if tenant_id is None:
+        return None
+    return data_version_service.get_tenant_range_stamp(db, tenant_id, start, end)
+
+
+def make_etag(stamp: VersionStamp, *parts) -> str:
+    """Build a weak ETag from a version stamp plus request-specific parts."""
+    raw = "|".join([str(stamp.version)] + [str(p) for p in parts])
+    return 'W/"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 §13.1.2): ignore the W/ prefix
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def not_modified_or_none(
+    request: Request,
+    response: Response,
+    endpoint: str,
+    stamp: Optional[VersionStamp],
+    *parts,
+) -> Optional[Response]:
+    """
+    Evaluate If-None-Match against the ETag for ``stamp`` and ``parts``.
+
+    Returns a 304 response if the client copy is current. Otherwise sets the
+    validator headers on ``response`` (merged into the 200 by FastAPI) and
+    returns None so the caller computes the full payload. A ``stamp`` of None
+    disables caching for this request.
+    """
+    if stamp is None:
+        return None
+    etag = make_etag(stamp, *parts)
+    headers = {"ETag": etag, **_CACHE_HEADERS}
+    if isinstance(stamp.updated_at, datetime):
+        headers["Last-Modified"] = _http_date(stamp.updated_at)
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        CONDITIONAL_GET_REQUESTS.labels(endpoint=endpoint, result="hit").inc()
+        return Response(status_code=304, headers=headers)
+
+    CONDITIONAL_GET_REQUESTS.labels(endpoint=endpoint, result="miss").inc()
+    response.headers.update(headers)
+    return None
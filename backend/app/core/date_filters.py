@@ -0,0 +1,20 @@
+"""
+Sargable year/month predicates for date and timestamp columns.
+
+``extract('year', col) == y`` hides the column inside a function, so neither
+the column's index nor partition pruning (see app.core.partitioning) can be
+used. These helpers express the same filter as a half-open range.
+"""
+from datetime import date
+
+from sqlalchemy import and_
+
+
+def year_filter(column, year: int):
+    """``column`` lies in calendar year ``year``."""
+    return and_(column >= date(year, 1, 1), column < date(year + 1, 1, 1))
+
+
+def month_filter(column, year: int, month: int):
+    """``column`` lies in month ``month`` of ``year``."""
+    return and_(column >= date(year, month, 1), column < date(year + month // 12, month % 12 + 1, 1))
@@ -0,0 +1,56 @@
+"""
+One-time startup duties with several server workers.
+
+Under gunicorn (production) the master runs the duties once in its
+``on_starting`` hook, before any worker is forked (see gunicorn.conf.py), and
+marks them done in the environment the workers inherit. Every worker – also
+one booted later, e.g. by ``max_requests`` recycling – therefore starts
+serving only after the default tenant and admin exist, and none of them runs
+the duties again.
+
+Without the gunicorn master (``uvicorn app.main:app``, tests) each process runs
+them in its lifespan under a Postgres session-level advisory lock: of the
+processes starting together the lock holder runs them and the others skip
+without waiting for it; a process starting later runs them again (they are
+idempotent). On non-Postgres databases every caller leads.
+"""
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+# Arbitrary application-wide lock id ("PZ" + "startup")
+STARTUP_LOCK_KEY = 0x505A_0001
+
+# Set by the gunicorn master once the duties ran; inherited by forked workers
+STARTUP_DUTIES_DONE_ENV = "PRAXISZEIT_STARTUP_DUTIES_DONE"
+
+
+def mark_startup_duties_done() -> None:
+    os.environ[STARTUP_DUTIES_DONE_ENV] = "1"
+
+
+def startup_duties_done() -> bool:
+    """True in a worker whose gunicorn master already ran the startup duties."""
+    return os.environ.get(STARTUP_DUTIES_DONE_ENV) == "1"
+
+
+@contextmanager
+def leader_lock(engine: Engine, key: int = STARTUP_LOCK_KEY) -> Iterator[bool]:
+    """Yield True if this process holds the advisory lock ``key`` for the block."""
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    with engine.connect() as conn:
+        acquired = bool(conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar())
+        conn.commit()  # session-level lock survives the transaction
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                conn.commit()
@@ -1,6 +1,8 @@
 from slowapi import Limiter
 from starlette.requests import Request
 
+from app.config import settings
+
 
 def _get_real_ip(request: Request) -> str:
     """
@@ -22,4 +24,5 @@ def _get_real_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-limiter = Limiter(key_func=_get_real_ip)
+# Counters live in RATE_LIMIT_STORAGE_URI; the default memory:// is per worker
+limiter = Limiter(key_func=_get_real_ip, storage_uri=settings.RATE_LIMIT_STORAGE_URI)
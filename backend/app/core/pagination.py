@@ -0,0 +1,62 @@
+"""
+Keyset pagination for listings ordered by ``created_at DESC, id DESC``.
+
+The cursor is an opaque URL-safe string encoding (created_at, id) of the last
+row of a page; the next page continues strictly after it. Unlike OFFSET the
+database seeks directly to the position, so late pages cost the same as the
+first one and concurrent inserts do not shift rows between pages.
+
+Routers return the page as before and announce the continuation in the
+``X-Next-Cursor`` response header (absent on the last page).
+"""
+import base64
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Ungültiger Cursor")
+
+
+def keyset_page(query, model, limit: Optional[int], cursor: Optional[str]) -> Tuple[List, Optional[str]]:
+    """
+    One page of ``query`` ordered newest first, plus the cursor of the next page.
+
+    Without ``limit`` all remaining rows are returned (no next cursor).
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id),
+        ))
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if limit is None:
+        return query.all(), None
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
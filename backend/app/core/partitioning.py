@@ -0,0 +1,264 @@
+"""
+Optional yearly range partitioning of time_entries and time_entry_audit_logs.
+
+Both tables grow without bound while reports, exports and the overtime
+account read one tenant and a date range at a time. With native PostgreSQL
+range partitioning by year, queries that filter the partition key with a
+range (``date >= … AND date < …``, not ``extract(year …)``) only touch the
+partitions of the requested years, and retention work on old years no longer
+competes with the current one for index pages.
+
+Layout (per table):
+- ``<table>_y<YYYY>`` one partition per calendar year, ``<table>_default``
+  catches rows outside the created years,
+- primary key ``(id, <key>)`` – PostgreSQL requires the partition key in every
+  unique constraint,
+- tenant-leading indexes, created on the parent and therefore on every partition,
+- the ``tenant_isolation`` RLS policy on the parent (queries go through it)
+  and on every partition (direct access to a partition stays isolated).
+
+Foreign keys pointing at ``time_entries.id`` (audit logs, change requests) are
+dropped while partitioned: a partitioned table can only be referenced through
+a unique key that includes the partition key. The columns stay; ON DELETE SET
+NULL is emulated by the application (``audit_service.detach_time_entries``,
+run after every flush that deletes entries). Disabling restores them.
+
+Used by migration 034 (opt-in) and by ``partition_maintenance.py``, which
+creates upcoming year partitions. All functions take a Connection and issue
+DDL; they need the owner/migration role, not the app role.
+"""
+from datetime import date
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Year partitions created ahead of the current year
+FUTURE_YEARS = 3
+
+_POLICY = """
+    CREATE POLICY tenant_isolation ON {table}
+    USING (
+        current_setting('app.is_superadmin', true) = 'true'
+        OR tenant_id = NULLIF(current_setting('app.tenant_id', true), '')::uuid
+    )
+    WITH CHECK (
+        current_setting('app.is_superadmin', true) = 'true'
+        OR tenant_id = NULLIF(current_setting('app.tenant_id', true), '')::uuid
+    )
+"""
+
+
+class PartitionedTable(NamedTuple):
+    name: str
+    key: str                 # partition column
+    timestamp: bool          # key is timestamptz: bounds are given in UTC
+    unique: Sequence[Tuple[str, Sequence[str]]]
+    foreign_keys: Sequence[Tuple[str, str, str, Optional[str]]]  # (name, column, referenced table, ON DELETE)
+    indexes: Sequence[Tuple[str, Sequence[str]]]        # partitioned layout
+    plain_indexes: Sequence[Tuple[str, Sequence[str]]]  # original layout (restored by disable)
+
+
+TIME_ENTRIES = PartitionedTable(
+    name="time_entries",
+    key="date",
+    timestamp=False,
+    unique=[("uq_tenant_user_date_start", ("tenant_id", "user_id", "date", "start_time"))],
+    foreign_keys=[
+        ("fk_time_entries_tenant_id", "tenant_id", "tenants", None),
+        ("time_entries_user_id_fkey", "user_id", "users", None),
+    ],
+    # uq_tenant_user_date_start already covers (tenant_id, user_id, date)
+    indexes=[
+        ("ix_time_entries_tenant_date", ("tenant_id", "date")),
+        ("ix_time_entries_user_date", ("user_id", "date")),
+    ],
+    plain_indexes=[
+        ("ix_time_entries_tenant_id", ("tenant_id",)),
+        ("ix_time_entries_user_id", ("user_id",)),
+        ("ix_time_entries_date", ("date",)),
+    ],
+)
+
+AUDIT_LOGS = PartitionedTable(
+    name="time_entry_audit_logs",
+    key="created_at",
+    timestamp=True,
+    unique=[],
+    foreign_keys=[
+        ("fk_time_entry_audit_logs_tenant_id", "tenant_id", "tenants", None),
+        ("time_entry_audit_logs_user_id_fkey", "user_id", "users", None),
+        ("time_entry_audit_logs_changed_by_fkey", "changed_by", "users", None),
+        ("time_entry_audit_logs_change_request_id_fkey", "change_request_id", "change_requests", "SET NULL"),
+    ],
+    indexes=[
+        ("ix_time_entry_audit_logs_tenant_created", ("tenant_id", "created_at")),
+        ("ix_time_entry_audit_logs_user_keyset", ("user_id", "created_at", "id")),
+        ("ix_time_entry_audit_logs_created_keyset", ("created_at", "id")),
+        ("ix_time_entry_audit_logs_changed_by", ("changed_by",)),
+        ("ix_time_entry_audit_logs_time_entry_id", ("time_entry_id",)),
+    ],
+    plain_indexes=[
+        ("ix_time_entry_audit_logs_tenant_id", ("tenant_id",)),
+        ("ix_time_entry_audit_logs_time_entry_id", ("time_entry_id",)),
+        ("ix_time_entry_audit_logs_user_id", ("user_id",)),
+        ("ix_time_entry_audit_logs_changed_by", ("changed_by",)),
+        ("ix_time_entry_audit_logs_user_keyset", ("user_id", "created_at", "id")),
+        ("ix_time_entry_audit_logs_created_keyset", ("created_at", "id")),
+    ],
+)
+
+TABLES = (TIME_ENTRIES, AUDIT_LOGS)
+
+# (table, constraint, column) of foreign keys referencing time_entries.id
+_TIME_ENTRY_REFERENCES = (
+    ("time_entry_audit_logs", "time_entry_audit_logs_time_entry_id_fkey", "time_entry_id"),
+    ("change_requests", "change_requests_time_entry_id_fkey", "time_entry_id"),
+)
+
+
+def partition_name(table: PartitionedTable, year: int) -> str:
+    return f"{table.name}_y{year}"
+
+
+def _bound(table: PartitionedTable, year: int) -> str:
+    return f"'{year}-01-01 00:00:00+00'" if table.timestamp else f"'{year}-01-01'"
+
+
+def enable_rls(conn: Connection, name: str) -> None:
+    conn.execute(text(f"ALTER TABLE {name} ENABLE ROW LEVEL SECURITY"))
+    conn.execute(text(f"ALTER TABLE {name} FORCE ROW LEVEL SECURITY"))
+    conn.execute(text(_POLICY.format(table=name)))
+
+
+def is_partitioned(conn: Connection, table: PartitionedTable) -> bool:
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :name AND c.relnamespace = 'public'::regnamespace"
+    ), {"name": table.name}).first() is not None
+
+
+def existing_years(conn: Connection, table: PartitionedTable) -> List[int]:
+    """Years that have their own partition."""
+    prefix = f"{table.name}_y"
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name"
+    ), {"name": table.name})
+    return sorted(int(name[len(prefix):]) for (name,) in rows if name.startswith(prefix))
+
+
+def _create_partition(conn: Connection, table: PartitionedTable, year: int, parent: Optional[str] = None) -> None:
+    name = partition_name(table, year)
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {parent or table.name} "
+        f"FOR VALUES FROM ({_bound(table, year)}) TO ({_bound(table, year + 1)})"
+    ))
+    enable_rls(conn, name)
+
+
+def _data_years(conn: Connection, table: PartitionedTable, source: str) -> range:
+    """First data year (or the current one) up to FUTURE_YEARS ahead."""
+    first = conn.execute(text(f"SELECT min({table.key}) FROM {source}")).scalar()
+    current = date.today().year
+    first_year = min(first.year, current) if first else current
+    return range(first_year, current + FUTURE_YEARS + 1)
+
+
+def _add_constraints(conn: Connection, table: PartitionedTable, primary_key: Sequence[str],
+                     indexes: Iterable[Tuple[str, Sequence[str]]]) -> None:
+    name = table.name
+    conn.execute(text(f"ALTER TABLE {name} ADD CONSTRAINT {name}_pkey PRIMARY KEY ({', '.join(primary_key)})"))
+    for constraint, columns in table.unique:
+        conn.execute(text(f"ALTER TABLE {name} ADD CONSTRAINT {constraint} UNIQUE ({', '.join(columns)})"))
+    for constraint, column, referenced, ondelete in table.foreign_keys:
+        conn.execute(text(
+            f"ALTER TABLE {name} ADD CONSTRAINT {constraint} FOREIGN KEY ({column}) REFERENCES {referenced} (id)"
+            + (f" ON DELETE {ondelete}" if ondelete else "")
+        ))
+    for index, columns in indexes:
+        conn.execute(text(f"CREATE INDEX {index} ON {name} ({', '.join(columns)})"))
+
+
+def _rebuild(conn: Connection, table: PartitionedTable, partitioned: bool) -> None:
+    """Copy ``table`` into a new (partitioned or plain) table that takes over its name."""
+    name, new = table.name, f"{table.name}_new"
+    clause = f" PARTITION BY RANGE ({table.key})" if partitioned else ""
+    conn.execute(text(f"CREATE TABLE {new} (LIKE {name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS){clause}"))
+    if partitioned:
+        for year in _data_years(conn, table, name):
+            _create_partition(conn, table, year, parent=new)
+        conn.execute(text(f"CREATE TABLE {name}_default PARTITION OF {new} DEFAULT"))
+        enable_rls(conn, f"{name}_default")
+    conn.execute(text(f"INSERT INTO {new} SELECT * FROM {name}"))
+    conn.execute(text(f"DROP TABLE {name} CASCADE"))
+    conn.execute(text(f"ALTER TABLE {new} RENAME TO {name}"))
+    if partitioned:
+        _add_constraints(conn, table, ("id", table.key), table.indexes)
+    else:
+        _add_constraints(conn, table, ("id",), table.plain_indexes)
+    enable_rls(conn, name)
+    conn.execute(text(f"ANALYZE {name}"))
+
+
+def enable(conn: Connection) -> None:
+    """Convert both tables to yearly partitions (no-op for tables already partitioned)."""
+    for referencing, constraint, _ in _TIME_ENTRY_REFERENCES:
+        conn.execute(text(f"ALTER TABLE {referencing} DROP CONSTRAINT IF EXISTS {constraint}"))
+    for table in TABLES:
+        if not is_partitioned(conn, table):
+            _rebuild(conn, table, partitioned=True)
+
+
+def disable(conn: Connection) -> None:
+    """Convert both tables back to plain tables and restore the time entry references."""
+    for table in TABLES:
+        if is_partitioned(conn, table):
+            _rebuild(conn, table, partitioned=False)
+    for referencing, constraint, column in _TIME_ENTRY_REFERENCES:
+        # Rows written by hand (psql, old releases) may point at deleted entries
+        conn.execute(text(
+            f"UPDATE {referencing} SET {column} = NULL WHERE {column} IS NOT NULL "
+            f"AND NOT EXISTS (SELECT 1 FROM time_entries t WHERE t.id = {referencing}.{column})"
+        ))
+        conn.execute(text(f"ALTER TABLE {referencing} DROP CONSTRAINT IF EXISTS {constraint}"))
+        conn.execute(text(
+            f"ALTER TABLE {referencing} ADD CONSTRAINT {constraint} FOREIGN KEY ({column}) "
+            f"REFERENCES time_entries (id) ON DELETE SET NULL"
+        ))
+
+
+def ensure_year_partitions(conn: Connection, table: PartitionedTable, years: Iterable[int]) -> List[int]:
+    """
+    Create missing year partitions; returns the years created.
+
+    Rows of such a year that already landed in the default partition are
+    moved: the default partition is detached while the new one is created and
+    filled, then attached again (one transaction).
+    """
+    existing = set(existing_years(conn, table))
+    created = []
+    for year in sorted(set(years) - existing):
+        default = f"{table.name}_default"
+        in_default = f"{table.key} >= {_bound(table, year)} AND {table.key} < {_bound(table, year + 1)}"
+        moved = conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_default})")).scalar()
+        if moved:
+            conn.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {default}"))
+        _create_partition(conn, table, year)
+        if moved:
+            conn.execute(text(f"INSERT INTO {table.name} SELECT * FROM {default} WHERE {in_default}"))
+            conn.execute(text(f"DELETE FROM {default} WHERE {in_default}"))
+            conn.execute(text(f"ALTER TABLE {table.name} ATTACH PARTITION {default} DEFAULT"))
+        created.append(year)
+    return created
+
+
+def ensure_upcoming_partitions(conn: Connection) -> dict:
+    """Partitions up to FUTURE_YEARS ahead for every partitioned table."""
+    current = date.today().year
+    years = range(current, current + FUTURE_YEARS + 1)
+    return {
+        table.name: ensure_year_partitions(conn, table, years)
+        for table in TABLES if is_partitioned(conn, table)
+    }
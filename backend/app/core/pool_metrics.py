@@ -0,0 +1,70 @@
+"""
+Prometheus metrics for the SQLAlchemy connection pools.
+
+Engines created with ``poolclass=InstrumentedQueuePool`` and
+``pool_logging_name=<workload>`` (see app.database.create_pooled_engine)
+report per workload class:
+
+- ``db_pool_checkout_wait_seconds``: time a checkout waited for a connection,
+- ``db_pool_checkout_timeouts_total``: checkouts that gave up after
+  ``pool_timeout`` (the pool was exhausted),
+- ``db_pool_connections{state}``: checked-out, idle and overflow connections,
+  read from the engine's current pool at scrape time.
+"""
+import time
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["workload"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that timed out because the pool was exhausted",
+    ["workload"],
+)
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Connections of a database pool by state",
+    ["workload", "state"],  # checked_out | idle | overflow
+)
+
+_engines: Dict[str, Engine] = {}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times and timeouts per workload (its logging name)."""
+
+    def _do_get(self):
+        workload = self._orig_logging_name or "default"
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(workload=workload).inc()
+            raise
+        POOL_CHECKOUT_WAIT.labels(workload=workload).observe(time.perf_counter() - started)
+        return connection
+
+
+def register_engine(workload: str, engine: Engine) -> None:
+    """Export the connection gauges of ``engine`` (the pool is looked up per scrape, so it survives dispose())."""
+    _engines[workload] = engine
+    POOL_CONNECTIONS.labels(workload=workload, state="checked_out").set_function(
+        lambda: _pool_stat(_engines[workload], "checkedout"))
+    POOL_CONNECTIONS.labels(workload=workload, state="idle").set_function(
+        lambda: _pool_stat(_engines[workload], "checkedin"))
+    POOL_CONNECTIONS.labels(workload=workload, state="overflow").set_function(
+        lambda: max(_pool_stat(_engines[workload], "overflow"), 0))
+
+
+def _pool_stat(engine: Engine, name: str) -> int:
+    stat = getattr(engine.pool, name, None)
+    return stat() if stat is not None else 0
@@ -0,0 +1,190 @@
+"""
+Per-request SQL statement instrumentation and N+1 detection.
+
+``instrument_engine`` hooks ``before_cursor_execute``/``after_cursor_execute``
+on an engine; ``QueryStatsMiddleware`` opens a per-request collector (a
+ContextVar holding a mutable object, so statements executed in the threadpool
+are counted as well) and records per route:
+
+- number of statements and total DB time,
+- executions of the most repeated statement fingerprint (N+1 indicator).
+
+Fingerprints are statements with whitespace collapsed and literals / expanded
+IN-lists reduced to placeholders, so they never contain data values.
+
+Endpoints can declare a budget with ``@query_budget(n)``. Exceeding it is
+logged; with ``enforce_budgets=True`` (tests, ``QUERY_BUDGET_ENFORCE``) the
+middleware raises ``QueryBudgetExceeded`` instead.
+"""
+import hashlib
+import logging
+import re
+import time as timer
+from collections import Counter as CounterDict
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# A fingerprint executed this often within one request is reported as N+1 suspect
+N_PLUS_ONE_THRESHOLD = 5
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling one request",
+    ["route"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Total time spent in SQL statements for one request",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_REPEATED_STATEMENTS = Histogram(
+    "db_repeated_statement_max_per_request",
+    "Executions of the most repeated statement fingerprint in one request (N+1 indicator)",
+    ["route"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+DB_N_PLUS_ONE = Counter(
+    "db_n_plus_one_suspects_total",
+    f"Requests in which one statement fingerprint ran at least {N_PLUS_ONE_THRESHOLD} times",
+    ["route", "fingerprint"],
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|\$\d+|:\w+|__\[POSTCOMPILE_\w+\])"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_PLACEHOLDER_ANY = re.compile(_PLACEHOLDER)
+
+
+def normalize_statement(statement: str) -> str:
+    """Statement text without data values (literals and parameter lists collapsed)."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(…)", sql)
+    return _PLACEHOLDER_ANY.sub("?", sql)
+
+
+def _digest(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def fingerprint(statement: str) -> str:
+    """Short stable id of a statement shape (Prometheus label, log correlation)."""
+    return _digest(normalize_statement(statement))
+
+
+class QueryStats:
+    """Statements of one request (mutated from request and threadpool threads)."""
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: CounterDict = CounterDict()
+
+    def most_repeated(self):
+        """(fingerprint, normalized statement, executions) of the most repeated statement."""
+        if not self.statements:
+            return None, None, 0
+        sql, times = self.statements.most_common(1)[0]
+        return _digest(sql), sql, times
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(timer.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start")
+    if starts:
+        stats.seconds += timer.perf_counter() - starts.pop()
+    stats.count += 1
+    stats.statements[normalize_statement(statement)] += 1
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the statement counters to an engine (idempotent)."""
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class collect_queries:
+    """Context manager collecting statements outside HTTP requests (tests, jobs)."""
+
+    def __enter__(self) -> QueryStats:
+        self.stats = QueryStats()
+        self._token = _current.set(self.stats)
+        return self.stats
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        return False
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare the maximum number of SQL statements an endpoint may execute."""
+    def decorator(func):
+        func.__query_budget__ = max_queries
+        return func
+    return decorator
+
+
+class QueryBudgetExceeded(AssertionError):
+    """An endpoint executed more statements than its declared query budget."""
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware recording the statement metrics per matched route."""
+
+    def __init__(self, app, enforce_budgets: bool = False):
+        self.app = app
+        self.enforce_budgets = enforce_budgets
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+        # The router stores the matched route/endpoint in the (shared) scope
+        route = getattr(scope.get("route"), "path", None)
+        self._record(route or "unmatched", scope.get("endpoint"), stats)
+
+    def _record(self, route: str, endpoint, stats: QueryStats) -> None:
+        DB_QUERIES_PER_REQUEST.labels(route=route).observe(stats.count)
+        DB_TIME_PER_REQUEST.labels(route=route).observe(stats.seconds)
+        fp, sql, times = stats.most_repeated()
+        DB_REPEATED_STATEMENTS.labels(route=route).observe(times)
+        if times >= N_PLUS_ONE_THRESHOLD:
+            DB_N_PLUS_ONE.labels(route=route, fingerprint=fp).inc()
+            logger.warning("Possible N+1 on %s: %dx [%s] %s", route, times, fp, sql[:200])
+
+        budget = getattr(endpoint, "__query_budget__", None)
+        if budget is not None and stats.count > budget:
+            msg = f"{route} executed {stats.count} SQL statements (budget {budget})"
+            if self.enforce_budgets:
+                raise QueryBudgetExceeded(msg)
+            logger.warning(msg)
@@ -1,52 +1,156 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from prometheus_client import Counter, Histogram
 from sqlalchemy import create_engine, text, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from app.config import settings
+from app.core.pool_metrics import InstrumentedQueuePool, register_engine
+
+# Workload classes with their own connection pool and statement timeout.
+# Interactive: API requests (clock-in/out, bookings). Reporting: reports,
+# exports and batch jobs, so a runaway export can only exhaust its own pool.
+INTERACTIVE = "interactive"
+REPORTING = "reporting"
+
+
+def pool_settings(workload: str) -> dict:
+    """create_engine() pool arguments of a workload class."""
+    if workload == INTERACTIVE:
+        size, overflow = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    else:
+        size, overflow = settings.REPORTING_POOL_SIZE, settings.REPORTING_MAX_OVERFLOW
+    return {
+        "pool_size": size,
+        "max_overflow": overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        # Age-based replacement instead of a ping round trip per checkout;
+        # connections broken by a server restart are invalidated on first use
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def statement_timeout_ms(workload: str) -> int:
+    return settings.DB_STATEMENT_TIMEOUT_MS if workload == INTERACTIVE else settings.REPORTING_STATEMENT_TIMEOUT_MS
+
+
+def create_pooled_engine(url: str, workload: str, metrics_name: Optional[str] = None) -> Engine:
+    """
+    Engine with the pool and statement timeout of a workload class; pool
+    metrics are exported as ``metrics_name`` (default: the workload).
+    """
+    kwargs = pool_settings(workload)
+    timeout = statement_timeout_ms(workload)
+    if timeout and url.startswith(("postgresql", "postgres://")):
+        # Set once per physical connection at connect time (no extra round trip)
+        kwargs["connect_args"] = {"options": f"-c statement_timeout={int(timeout)}"}
+    name = metrics_name or workload
+    engine = create_engine(url, poolclass=InstrumentedQueuePool, pool_logging_name=name, **kwargs)
+    register_engine(name, engine)
+    return engine
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create database engines (one pool per workload class)
+engine = create_pooled_engine(settings.DATABASE_URL, INTERACTIVE)
+reporting_engine = create_pooled_engine(settings.DATABASE_URL, REPORTING)
+
+# Create session factories; info["workload"] tells get_read_db which pool a session uses
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, info={"workload": INTERACTIVE})
+ReportingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=reporting_engine, info={"workload": REPORTING},
+)
 
 # Create declarative base for models
 Base = declarative_base()
 
 
-@event.listens_for(SessionLocal, "after_begin")
+# set_config(..., is_local => true) is the function form of SET LOCAL. Unlike
+# SET it accepts bind parameters, so it also works with server-side parameter
+# binding (asyncpg, see database_async.py). Both settings go in one statement,
+# i.e. one round trip per context switch.
+_SET_CONTEXT = text(
+    "SELECT set_config('app.tenant_id', :tid, true), set_config('app.is_superadmin', :flag, true)"
+)
+
+# Session.info key: (tenant_id, superadmin flag) already active in the current transaction
+_APPLIED_CONTEXT = "applied_tenant_context"
+
+TENANT_CONTEXT_STATEMENTS = Counter(
+    "tenant_context_statements_total",
+    "set_config statements issued for the RLS tenant context",
+    ["source"],  # after_begin (restore after commit) | switch (set_*_context)
+)
+TENANT_CONTEXT_STATEMENTS_PER_REQUEST = Histogram(
+    "tenant_context_statements_per_request",
+    "RLS tenant context statements issued while handling one HTTP request",
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 20),
+)
+
+# Mutable per-request counter (a list, so threadpool copies of the context share it)
+_request_statements: ContextVar[Optional[list]] = ContextVar("tenant_context_request_statements", default=None)
+
+
+def _apply_context(session, connection, tenant_id: str, flag: str, source: str) -> None:
+    """Issue the set_config statement unless the context is already active in this transaction."""
+    context = (tenant_id, flag)
+    if session.info.get(_APPLIED_CONTEXT) == context:
+        return
+    connection.execute(_SET_CONTEXT, {"tid": tenant_id, "flag": flag})
+    session.info[_APPLIED_CONTEXT] = context
+    TENANT_CONTEXT_STATEMENTS.labels(source=source).inc()
+    counter = _request_statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
 def _restore_tenant_context(session, transaction, connection):
     """Re-apply tenant context after every transaction begin (including after commit).
 
-    SET LOCAL is transaction-scoped, so it's lost after db.commit(). This listener
-    ensures the tenant_id (and superadmin flag) are re-set on every new transaction.
+    set_config(..., true) is transaction-scoped, so it's lost after db.commit(). This
+    listener ensures the tenant_id (and superadmin flag) are re-set on every new transaction.
     """
+    session.info.pop(_APPLIED_CONTEXT, None)  # new transaction: nothing applied yet
     tenant_id = getattr(session, "_tenant_id", None)
     is_superadmin = getattr(session, "_is_superadmin", False)
     if tenant_id:
-        connection.execute(text("SET LOCAL app.tenant_id = :tid"), {"tid": str(tenant_id)})
-    if is_superadmin:
-        connection.execute(text("SET LOCAL app.is_superadmin = 'true'"))
+        _apply_context(session, connection, str(tenant_id), "", "after_begin")
+    elif is_superadmin:
+        _apply_context(session, connection, "", "true", "after_begin")
+
+
+event.listen(SessionLocal, "after_begin", _restore_tenant_context)
+event.listen(ReportingSessionLocal, "after_begin", _restore_tenant_context)
 
 
 def set_tenant_context(db, tenant_id: str):
     """Set tenant context on a session. Persists across commits via event listener."""
     db._tenant_id = str(tenant_id)
     db._is_superadmin = False  # Clear superadmin — tenant context is mutually exclusive
-    # Also set immediately for the current transaction
-    db.execute(text("SET LOCAL app.tenant_id = :tid"), {"tid": str(tenant_id)})
-    db.execute(text("SET LOCAL app.is_superadmin = ''"))
+    # Also set immediately for the current transaction (no-op if a fresh
+    # transaction was just begun by connection() and restored it already)
+    _apply_context(db, db.connection(), str(tenant_id), "", "switch")
 
 
 def set_superadmin_context(db):
     """Grant superadmin access (bypasses RLS). Persists across commits via event listener."""
     db._is_superadmin = True
     db._tenant_id = None  # Clear tenant — superadmin context is mutually exclusive
-    db.execute(text("SET LOCAL app.is_superadmin = 'true'"))
-    db.execute(text("SET LOCAL app.tenant_id = ''"))
+    _apply_context(db, db.connection(), "", "true", "switch")
+
+
+@contextmanager
+def count_tenant_context_statements():
+    """Count context statements issued within the block (one HTTP request)."""
+    counter = [0]
+    token = _request_statements.set(counter)
+    try:
+        yield counter
+    finally:
+        _request_statements.reset(token)
+        TENANT_CONTEXT_STATEMENTS_PER_REQUEST.observe(counter[0])
 
 
 def get_db():
@@ -58,3 +162,27 @@ def get_db():
         db._tenant_id = None  # Clear tenant context
         db._is_superadmin = False  # Clear superadmin flag
         db.close()
+
+
+def stream_with_session(db, chunks: Iterator):
+    """
+    Keep the request session usable for a StreamingResponse body.
+
+    get_db's cleanup runs once the endpoint returns, i.e. before the body is
+    streamed: it clears the RLS context and closes the session. The context is
+    captured here and restored when streaming starts; the next query begins a
+    fresh transaction in which _restore_tenant_context applies it again. The
+    session is released when the body is exhausted or the client disconnects.
+    """
+    context = (getattr(db, "_tenant_id", None), getattr(db, "_is_superadmin", False))
+
+    def body():
+        db._tenant_id, db._is_superadmin = context
+        try:
+            yield from chunks
+        finally:
+            db._tenant_id = None
+            db._is_superadmin = False
+            db.close()
+
+    return body()
@@ -0,0 +1,88 @@
+"""
+Opt-in asyncio database stack (``ASYNC_DB_ENABLED=true``).
+
+Async engine (asyncpg) and ``get_async_db`` dependency for the async read
+endpoints in ``app.routers.async_reads``. Sessions use their own sync session
+class so the RLS ``after_begin`` listener from ``app.database`` can be attached
+without affecting the threaded ``SessionLocal``. Tenant context is set through
+``set_config`` (see ``app.database``), which asyncpg can bind.
+
+The engine is created lazily, so asyncpg is only required when the async path
+is actually enabled.
+"""
+from functools import lru_cache
+from typing import AsyncIterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.query_metrics import instrument_engine
+from app.database import INTERACTIVE, _restore_tenant_context, pool_settings, statement_timeout_ms
+
+
+_ASYNC_DRIVERS = {
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgres://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync DATABASE_URL to its async driver (asyncpg / aiosqlite)."""
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+class AsyncBackedSession(Session):
+    """Sync session class behind AsyncSession (carries the RLS listener)."""
+
+
+event.listen(AsyncBackedSession, "after_begin", _restore_tenant_context)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine():
+    url = settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+    kwargs = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if not url.startswith("sqlite"):
+        # Same pool sizing and statement timeout as the threaded interactive engine
+        kwargs.update(pool_settings(INTERACTIVE))
+        timeout = statement_timeout_ms(INTERACTIVE)
+        if timeout and url.startswith("postgresql+asyncpg"):
+            kwargs["connect_args"] = {"server_settings": {"statement_timeout": str(timeout)}}
+    engine = create_async_engine(url, **kwargs)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        class_=AsyncSession,
+        sync_session_class=AsyncBackedSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for async endpoints (counterpart of ``app.database.get_db``)."""
+    db = get_async_sessionmaker()()
+    try:
+        yield db
+    finally:
+        db.sync_session._tenant_id = None  # Clear tenant context
+        db.sync_session._is_superadmin = False  # Clear superadmin flag
+        await db.close()
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (application shutdown)."""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
@@ -0,0 +1,262 @@
+"""
+Optional read replica for reporting workloads (``DATABASE_URL_READONLY``).
+
+Reports, exports, compliance summaries, journal and dashboard only read. With
+a replica configured they take their session from ``get_report_db`` (reports,
+exports) or ``get_read_db`` (journal, dashboard) instead of ``get_db``, so
+month-end reporting runs on another server than clock-in and clock-out writes.
+Whenever the replica is not used, reports get a primary session from the
+reporting pool (see database.py), so they never hold connections of the
+interactive pool; journal and dashboard are interactive pages and keep the
+request's own session.
+
+Read sessions get the RLS tenant context of the request (copied from the
+authenticated primary session and applied by the same ``after_begin``
+listener). A request only goes to the replica while it is fresh enough:
+
+- replay lag (pg_last_xact_replay_timestamp) at most
+  ``READ_REPLICA_MAX_LAG_SECONDS``, and
+- for requests covering the current month, which still changes: the tenant's
+  data version of the month (see data_version_service) on the replica equals
+  the primary's, i.e. every committed write of the tenant has arrived.
+
+Otherwise, or if the replica is unreachable, the request is served from the
+primary as above. Routes that write (e.g. the health-data audit log of reports) keep
+``get_db`` for that. Long reads that must not go to the replica use
+``get_reporting_db``. The engine is created lazily like the async one.
+"""
+import logging
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+
+from fastapi import Depends, Request
+from prometheus_client import Counter
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.core.query_metrics import instrument_engine
+from app.database import (
+    INTERACTIVE, REPORTING, ReportingSessionLocal, _restore_tenant_context, create_pooled_engine, get_db,
+)
+from app.middleware.auth import get_current_user
+from app.models import User
+from app.services import data_version_service
+from app.services.timezone_service import today_local
+
+logger = logging.getLogger(__name__)
+
+READ_ROUTING = Counter(
+    "db_read_routing_total",
+    "Read-only requests by the database that served them",
+    ["target", "reason"],  # replica/fresh | primary/lag, stale_month, error
+)
+
+# The replay lag is shared by all requests of a process for this long
+_LAG_CACHE_SECONDS = 1.0
+
+_REPLICA_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+_lag_cache: list = [0.0, None]  # [checked at (monotonic), lag in seconds]
+_lag_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_read_engine():
+    """Engine of the read replica, None if ``DATABASE_URL_READONLY`` is not set."""
+    url = settings.DATABASE_URL_READONLY
+    if not url:
+        return None
+    engine = create_pooled_engine(url, REPORTING, metrics_name="replica")
+    instrument_engine(engine)
+    if engine.dialect.name == "postgresql":
+        engine = engine.execution_options(postgresql_readonly=True)
+    return engine
+
+
+@lru_cache(maxsize=1)
+def get_read_sessionmaker() -> Optional[sessionmaker]:
+    engine = get_read_engine()
+    if engine is None:
+        return None
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    event.listen(factory, "after_begin", _restore_tenant_context)
+    return factory
+
+
+def replica_lag_seconds(read_db: Session) -> float:
+    """Replay lag of the replica in seconds (0 for a server that is not a standby)."""
+    if read_db.get_bind().dialect.name != "postgresql":
+        return 0.0
+    with _lag_lock:
+        checked_at, lag = _lag_cache
+        if lag is not None and time.monotonic() - checked_at < _LAG_CACHE_SECONDS:
+            return lag
+    lag = float(read_db.execute(_REPLICA_LAG).scalar() or 0)
+    with _lag_lock:
+        _lag_cache[:] = [time.monotonic(), lag]
+    return lag
+
+
+def _month(value: str) -> Optional[Tuple[int, int]]:
+    try:
+        year, month = map(int, value.split("-"))
+    except ValueError:
+        return None
+    return year, month
+
+
+def latest_month(request: Request, today: date) -> Tuple[int, int]:
+    """
+    Last (year, month) a read request covers, from its ``year``/``month``
+    (int or YYYY-MM) and ``to`` query parameters; the current month if none.
+    """
+    params = request.query_params
+    current = (today.year, today.month)
+    if params.get("to"):
+        return _month(params["to"]) or current
+    month, year = params.get("month"), params.get("year")
+    if month and "-" in month:
+        return _month(month) or current
+    try:
+        if year and month:
+            return int(year), int(month)
+        if year:
+            return int(year), 12
+    except ValueError:
+        pass
+    return current
+
+
+def _route(db: Session, read_db: Session, request: Request, tenant_id) -> Tuple[str, str]:
+    """(target, reason) for one read request."""
+    if replica_lag_seconds(read_db) > settings.READ_REPLICA_MAX_LAG_SECONDS:
+        return "primary", "lag"
+    today = today_local()
+    if latest_month(request, today) < (today.year, today.month):
+        return "replica", "fresh"
+    # The current month still changes: the replica must have every write of the tenant
+    if tenant_id is None:
+        return "primary", "stale_month"
+    month_start = today.replace(day=1)
+    primary = data_version_service.get_month_versions(db, tenant_id, None, month_start, month_start)
+    replica = data_version_service.get_month_versions(read_db, tenant_id, None, month_start, month_start)
+    if primary != replica:
+        return "primary", "stale_month"
+    return "replica", "fresh"
+
+
+def get_read_db(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Iterator[Session]:
+    """
+    Dependency for interactive read-only routes (journal, dashboard): a
+    replica session while the replica is fresh enough for the request,
+    otherwise the request's own session.
+    """
+    yield from _read_session(request, db, current_user, reporting=False)
+
+
+def get_report_db(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Iterator[Session]:
+    """
+    Dependency for reports and exports: a replica session while the replica
+    is fresh enough for the request, otherwise a primary session from the
+    reporting pool.
+    """
+    yield from _read_session(request, db, current_user, reporting=True)
+
+
+def _read_session(request: Request, db: Session, current_user: User, reporting: bool) -> Iterator[Session]:
+    replica = get_read_sessionmaker()
+    read_db = None
+    if replica is not None:
+        read_db = replica()
+        _copy_context(db, read_db)
+        try:
+            target, reason = _route(db, read_db, request, current_user.tenant_id)
+        except SQLAlchemyError:
+            logger.warning("Read replica unavailable, using primary", exc_info=True)
+            target, reason = "primary", "error"
+        READ_ROUTING.labels(target=target, reason=reason).inc()
+        if target == "primary":
+            _close(read_db)
+            read_db = None
+
+    if read_db is None:
+        if reporting:
+            yield from _reporting_session(db)
+        else:
+            yield db
+        return
+
+    _release_connection(db)
+    try:
+        yield read_db
+    finally:
+        _close(read_db)
+
+
+def get_reporting_db(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Iterator[Session]:
+    """
+    Dependency for long-running reads that must see the primary (e.g. the
+    streamed DSGVO export): a primary session from the reporting pool, so a
+    slow download holds no interactive connection and runs under the
+    reporting statement timeout.
+    """
+    yield from _reporting_session(db)
+
+
+def _reporting_session(db: Session) -> Iterator[Session]:
+    if db.info.get("workload") != INTERACTIVE:
+        # Not a pooled request session (e.g. a dependency override in tests)
+        yield db
+        return
+    reporting_db = ReportingSessionLocal()
+    _copy_context(db, reporting_db)
+    _release_connection(db)
+    try:
+        yield reporting_db
+    finally:
+        _close(reporting_db)
+
+
+def _copy_context(db: Session, read_db: Session) -> None:
+    """Same RLS context as the authenticated request session."""
+    read_db._tenant_id = getattr(db, "_tenant_id", None)
+    read_db._is_superadmin = getattr(db, "_is_superadmin", False)
+
+
+def _release_connection(db: Session) -> None:
+    """
+    End the authentication transaction so its interactive connection goes back
+    to the pool while the report runs; loaded objects (the current user) stay
+    usable. The session reconnects if the route writes (audit log).
+    """
+    expire_on_commit, db.expire_on_commit = db.expire_on_commit, False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
+def _close(read_db: Session) -> None:
+    read_db._tenant_id = None  # Clear tenant context
+    read_db._is_superadmin = False  # Clear superadmin flag
+    read_db.close()
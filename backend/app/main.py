@@ -12,39 +12,32 @@ import uuid
 import traceback
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
-from app.database import engine, SessionLocal, set_tenant_context
+from app.database import engine, reporting_engine, SessionLocal, set_tenant_context, set_superadmin_context, count_tenant_context_statements
+from app.core.leader_lock import leader_lock, mark_startup_duties_done, startup_duties_done
+from app.core.query_metrics import QueryStatsMiddleware, instrument_engine
 from app.config import settings
-from app.models import User, UserRole
-from app.services import auth_service, holiday_service
+from app.models import User, UserRole, TimeEntry
+from app.services import auth_service, holiday_service, login_lockout_service, clock_status_service
 from app.services.error_log_service import DBErrorHandler, cleanup_old_errors
 from app.routers import auth, admin, time_entries, absences, dashboard, holidays, reports, change_requests, company_closures, error_logs, vacation_requests, journal, import_xls
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Startup and shutdown events for the application.
+def _run_startup_duties() -> None:
     """
-    # Startup
-    print("🚀 Starting PraxisZeit backend...")
-
-    # 1. Check database connection
-    try:
-        with engine.connect() as conn:
-            print("✅ Database connection established")
-    except OperationalError as e:
-        print(f"❌ Database connection failed: {e}")
-        print("⏳ Waiting for database to be ready...")
-        sys.exit(1)
+    Idempotent one-time startup work. Under gunicorn the master runs it once
+    before forking the workers; otherwise every process runs it at startup
+    unless another one holds the advisory lock (see app.core.leader_lock).
 
-    # 2. Migrations are handled by Dockerfile CMD (alembic upgrade head)
-
-    # 3. Ensure default tenant exists
+    Everything happens in one session and one transaction: one connection
+    checkout and one commit instead of a session per step. The RLS context is
+    switched within the transaction (superadmin for the cross-tenant steps,
+    then the default tenant).
+    """
     from app.models.tenant import Tenant
-    from app.database import set_tenant_context, set_superadmin_context
     import uuid as _uuid
     db = SessionLocal()
     try:
+        # 3. Ensure default tenant exists
         # Startup runs as non-superuser — need superadmin context to bypass RLS
         set_superadmin_context(db)
         default_tenant = db.query(Tenant).filter(Tenant.slug == "default").first()
@@ -58,19 +51,20 @@ async def lifespan(app: FastAPI):
                 mode="single",
             )
             db.add(default_tenant)
-            db.commit()
-            print("✅ Default tenant created")
+            db.flush()  # insert while the superadmin context is active
         default_tenant_id = default_tenant.id
-    finally:
-        db.close()
 
-    # 4. Create admin user if it doesn't exist
-    db = SessionLocal()
-    try:
+        # 4. DSGVO F-007: Clean up old error logs (>90 days resolved/ignored)
+        deleted = cleanup_old_errors(db, max_age_days=90, commit=False)
+
+        # 5. Drop expired failed-login records (account lockout window)
+        login_lockout_service.purge_expired(db, commit=False)
+
+        # 6. Create admin user if it doesn't exist
         set_tenant_context(db, str(default_tenant_id))
         admin = db.query(User).filter(User.username == settings.ADMIN_USERNAME).first()
-        if not admin:
-            print(f"👤 Creating admin user: {settings.ADMIN_USERNAME}")
+        admin_created = admin is None
+        if admin_created:
             admin = User(
                 username=settings.ADMIN_USERNAME,
                 email=settings.ADMIN_EMAIL,
@@ -84,45 +78,93 @@ async def lifespan(app: FastAPI):
                 tenant_id=default_tenant_id,
             )
             db.add(admin)
-            db.commit()
-            print(f"✅ Admin user created")
-        else:
-            print(f"✅ Admin user already exists: {settings.ADMIN_USERNAME}")
-
-        # Security warning: check if admin still uses default credentials
-        if settings.ADMIN_USERNAME == "admin" and auth_service.verify_password(
-            settings.ADMIN_PASSWORD, admin.password_hash
-        ):
-            weak_passwords = ["Admin2025!", "admin123", "password", "admin"]
-            if settings.ADMIN_PASSWORD in weak_passwords or len(settings.ADMIN_PASSWORD) < 12:
-                msg = "SECURITY: Admin account uses a weak/default password! Set a strong ADMIN_PASSWORD in .env."
-                if settings.ENVIRONMENT == "production":
-                    raise RuntimeError(msg)
-                print(f"⚠️  {msg}")
+        admin_password_hash = admin.password_hash
+
+        # 7. Sync public holidays for current and next year
+        state = holiday_service.get_holiday_state(db, tenant_id=default_tenant_id)
+        result = holiday_service.sync_current_and_next_year(
+            db, state=state, tenant_id=default_tenant_id, commit=False,
+        )
+
+        db.commit()
     finally:
         db.close()
 
-    # 5. DSGVO F-007: Clean up old error logs (>90 days resolved/ignored)
+    if deleted:
+        print(f"🗑️  Cleaned up {deleted} old error log entries (>90 days)")
+    if admin_created:
+        print(f"✅ Admin user created: {settings.ADMIN_USERNAME}")
+    else:
+        print(f"✅ Admin user already exists: {settings.ADMIN_USERNAME}")
+    print(f"✅ Holidays synced for {result['state']}: {result['current_year']}({result['current_count']}), "
+          f"{result['next_year']}({result['next_count']})")
+
+    # Security warning: check if admin still uses default credentials
+    if settings.ADMIN_USERNAME == "admin" and auth_service.verify_password(
+        settings.ADMIN_PASSWORD, admin_password_hash
+    ):
+        weak_passwords = ["Admin2025!", "admin123", "password", "admin"]
+        if settings.ADMIN_PASSWORD in weak_passwords or len(settings.ADMIN_PASSWORD) < 12:
+            msg = "SECURITY: Admin account uses a weak/default password! Set a strong ADMIN_PASSWORD in .env."
+            if settings.ENVIRONMENT == "production":
+                raise RuntimeError(msg)
+            print(f"⚠️  {msg}")
+
+
+def run_startup_duties_in_master() -> None:
+    """gunicorn ``on_starting`` hook: run the startup duties before any worker is forked."""
+    _run_startup_duties()
+    # Forked workers must not inherit the master's pooled connections
+    engine.dispose()
+    reporting_engine.dispose()
+    mark_startup_duties_done()
+
+
+def _load_open_entry(user_id):
+    """Open entry of a user for the clock status relay (runs outside any request)."""
     db = SessionLocal()
     try:
         set_superadmin_context(db)
-        deleted = cleanup_old_errors(db, max_age_days=90)
-        if deleted:
-            print(f"🗑️  Cleaned up {deleted} old error log entries (>90 days)")
+        return db.query(TimeEntry).filter(TimeEntry.user_id == user_id, TimeEntry.end_time.is_(None)).first()
     finally:
         db.close()
 
-    # 6. Sync public holidays for current and next year
-    print("📅 Syncing public holidays...")
-    db = SessionLocal()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup and shutdown events for the application.
+    """
+    # Startup
+    print("🚀 Starting PraxisZeit backend...")
+
+    # 1. Check database connection
     try:
-        set_tenant_context(db, '00000000-0000-0000-0000-000000000001')
-        state = holiday_service.get_holiday_state(db, tenant_id=default_tenant_id)
-        result = holiday_service.sync_current_and_next_year(db, state=state, tenant_id=default_tenant_id)
-        print(f"✅ Holidays synced for {result['state']}: {result['current_year']}({result['current_count']}), "
-              f"{result['next_year']}({result['next_count']})")
-    finally:
-        db.close()
+        with engine.connect() as conn:
+            print("✅ Database connection established")
+    except OperationalError as e:
+        print(f"❌ Database connection failed: {e}")
+        print("⏳ Waiting for database to be ready...")
+        sys.exit(1)
+
+    # 2. Migrations are handled by Dockerfile CMD (alembic upgrade head)
+
+    # 3.-7. One-time duties: done by the gunicorn master, else by the lock holder
+    if startup_duties_done():
+        print("⏭️  Startup duties already run by the gunicorn master")
+    else:
+        with leader_lock(engine) as is_leader:
+            if is_leader:
+                _run_startup_duties()
+            else:
+                print("⏭️  Startup duties handled by another worker")
+
+    if settings.WEB_CONCURRENCY > 1:
+        if engine.dialect.name == "postgresql":
+            clock_status_service.start_relay(engine, _load_open_entry)
+        if settings.RATE_LIMIT_STORAGE_URI.startswith("memory://"):
+            print(f"⚠️  {settings.WEB_CONCURRENCY} workers with in-memory rate limiting: limits apply per worker. "
+                  "Set RATE_LIMIT_STORAGE_URI to a shared backend (e.g. redis://).")
 
     # Configuration sanity checks
     if settings.COOKIE_SECURE and settings.ENVIRONMENT != "production":
@@ -135,6 +177,10 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("👋 Shutting down PraxisZeit backend...")
+    clock_status_service.stop_relay()
+    if settings.ASYNC_DB_ENABLED:
+        from app.database_async import dispose_async_engine
+        await dispose_async_engine()
 
 
 # Create FastAPI app (disable docs in production)
@@ -161,6 +207,11 @@ Instrumentator(
     should_group_untemplated=True,
 ).instrument(app).expose(app)
 
+# SQL statement count / DB time per route and N+1 detection (app.core.query_metrics)
+instrument_engine(engine)
+instrument_engine(reporting_engine)
+app.add_middleware(QueryStatsMiddleware, enforce_budgets=settings.QUERY_BUDGET_ENFORCE)
+
 # Configure CORS
 cors_origins = [origin.strip() for origin in settings.CORS_ORIGINS.split(",")]
 _cors_is_wildcard = cors_origins == ["*"]
@@ -170,6 +221,7 @@ app.add_middleware(
     allow_credentials=not _cors_is_wildcard,  # Disable credentials with wildcard origins
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "Cookie"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Attach DB error logging handler (captures WARNING+ logs to error_logs table)
@@ -180,6 +232,11 @@ logging.getLogger('uvicorn.error').addHandler(_db_error_handler)
 logging.getLogger('fastapi').addHandler(_db_error_handler)
 
 # Register routers
+if settings.ASYNC_DB_ENABLED:
+    # Async variants of the hot read endpoints; registered first so they win
+    # over the identical paths of the threaded routers below
+    from app.routers import async_reads
+    app.include_router(async_reads.router)
 app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(time_entries.router)
@@ -195,6 +252,13 @@ app.include_router(journal.router)
 app.include_router(import_xls.router)
 
 
+@app.middleware("http")
+async def tenant_context_metrics_middleware(request: Request, call_next):
+    """Record how many RLS context statements a request issued (Prometheus histogram)."""
+    with count_tenant_context_statements():
+        return await call_next(request)
+
+
 @app.middleware("http")
 async def capture_errors_middleware(request: Request, call_next):
     """Capture 5xx errors and log them to the error_logs table."""
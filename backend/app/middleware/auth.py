@@ -1,7 +1,9 @@
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.database import get_db, set_tenant_context, set_superadmin_context
+from app.database_async import get_async_db
 from app.models import User, UserRole
 from app.models.tenant import Tenant
 from app.services import auth_service
@@ -29,8 +31,20 @@ def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
+    return _authenticate(request, credentials.credentials, db)
 
+
+async def get_current_user_async(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Async counterpart of get_current_user for the async read endpoints."""
+    return await db.run_sync(lambda session: _authenticate(request, credentials.credentials, session))
+
+
+def _authenticate(request: Request, token: str, db: Session) -> User:
+    """Validate the access token, load the user and set the RLS tenant context."""
     # Decode token
     payload = auth_service.decode_token(token)
     if not payload or payload.get("type") != "access":
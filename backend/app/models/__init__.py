@@ -11,6 +11,8 @@ from app.models.error_log import ErrorLog
 from app.models.vacation_request import VacationRequest, VacationRequestStatus
 from app.models.system_setting import SystemSetting
 from app.models.year_carryover import YearCarryover
+from app.models.data_version import DataVersion
+from app.models.failed_login import FailedLogin
 
 __all__ = [
     "Tenant",
@@ -31,4 +33,9 @@ __all__ = [
     "VacationRequestStatus",
     "SystemSetting",
     "YearCarryover",
+    "DataVersion",
+    "FailedLogin",
 ]
+
+# Registers the after_flush hook that bumps data_versions on every write
+import app.services.data_version_service  # noqa: E402,F401
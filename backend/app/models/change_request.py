@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, Time, Integer, String, Text, DateTime, Numeric, Enum, ForeignKey
+from sqlalchemy import Column, Date, Time, Integer, String, Text, DateTime, Numeric, Enum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -22,6 +22,10 @@ class ChangeRequest(Base):
     """Change request for time entries that employees cannot edit directly."""
 
     __tablename__ = "change_requests"
+    __table_args__ = (
+        # Keyset pagination of the employee list (user_id, created_at DESC, id DESC)
+        Index("ix_change_requests_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False, index=True)
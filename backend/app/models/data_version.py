@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from app.database import Base
+
+
+# Sentinel user_id for tenant-wide changes (e.g. public holidays)
+TENANT_SCOPE = uuid.UUID(int=0)
+# Sentinel year/month for changes that affect every month (e.g. weekly hours)
+ALL_MONTHS = 0
+
+
+class DataVersion(Base):
+    """
+    Change counter per (tenant, user, year, month).
+
+    Bumped automatically on flush whenever data that feeds the hour/vacation
+    calculations changes (see data_version_service). Caches can compare the
+    counter instead of recomputing to know whether their result is still valid.
+    """
+
+    __tablename__ = "data_versions"
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'user_id', 'year', 'month', name='uq_data_version_scope'),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)  # no FK: TENANT_SCOPE sentinel, survives purge
+    year = Column(Integer, nullable=False)   # ALL_MONTHS = applies to every month
+    month = Column(Integer, nullable=False)  # ALL_MONTHS = applies to every month
+    version = Column(BigInteger, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<DataVersion(tenant_id={self.tenant_id}, user_id={self.user_id}, {self.year}-{self.month}, v={self.version})>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from app.database import Base
+
+
+class FailedLogin(Base):
+    """
+    One failed login attempt (account lockout, see login_lockout_service).
+
+    Stored in the database instead of process memory so the lockout holds
+    across all server workers. Not tenant-scoped: attempts are recorded before
+    a user (and thus a tenant) is known.
+    """
+
+    __tablename__ = "failed_logins"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    username = Column(String(100), nullable=False, index=True)  # lower-cased
+    attempted_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<FailedLogin(username={self.username}, attempted_at={self.attempted_at})>"
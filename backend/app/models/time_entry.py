@@ -7,6 +7,42 @@ import uuid
 from app.database import Base
 
 
+def compute_net_hours(start_time, end_time, break_minutes) -> Decimal:
+    """
+    Net hours of a time entry from its raw column values.
+
+    Shared by TimeEntry.net_hours and bulk readers that select columns
+    instead of loading entities.
+    """
+    if not start_time or not end_time:
+        return Decimal('0.00')
+
+    # Convert times to total seconds
+    start_seconds = start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+    end_seconds = end_time.hour * 3600 + end_time.minute * 60 + end_time.second
+
+    # Calculate duration in hours
+    duration_hours = (end_seconds - start_seconds) / 3600.0
+
+    # Subtract break time
+    break_hours = break_minutes / 60.0
+
+    net = duration_hours - break_hours
+
+    return Decimal(str(max(round(net, 2), 0)))
+
+
+def net_hundredths(start_time, end_time, break_minutes) -> int:
+    """compute_net_hours() as integer hundredths of an hour, without the Decimal round trip."""
+    if not start_time or not end_time:
+        return 0
+    start_seconds = start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+    end_seconds = end_time.hour * 3600 + end_time.minute * 60 + end_time.second
+    net = (end_seconds - start_seconds) / 3600.0 - break_minutes / 60.0
+    # round(net, 2) is what compute_net_hours stores; scaling it is exact up to float noise
+    return max(round(round(net, 2) * 100), 0)
+
+
 class TimeEntry(Base):
     """Time entry model for tracking work hours."""
 
@@ -34,22 +70,7 @@ class TimeEntry(Base):
         Calculate net hours worked (end - start - break).
         Returns hours as Decimal with 2 decimal places.
         """
-        if not self.start_time or not self.end_time:
-            return Decimal('0.00')
-
-        # Convert times to total seconds
-        start_seconds = self.start_time.hour * 3600 + self.start_time.minute * 60 + self.start_time.second
-        end_seconds = self.end_time.hour * 3600 + self.end_time.minute * 60 + self.end_time.second
-
-        # Calculate duration in hours
-        duration_hours = (end_seconds - start_seconds) / 3600.0
-
-        # Subtract break time
-        break_hours = self.break_minutes / 60.0
-
-        net = duration_hours - break_hours
-
-        return Decimal(str(max(round(net, 2), 0)))
+        return compute_net_hours(self.start_time, self.end_time, self.break_minutes)
 
     def __repr__(self):
         return f"<TimeEntry(id={self.id}, user_id={self.user_id}, date={self.date}, net_hours={self.net_hours})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, Time, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Date, Time, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -9,6 +9,11 @@ class TimeEntryAuditLog(Base):
     """Audit log for all changes to time entries."""
 
     __tablename__ = "time_entry_audit_logs"
+    __table_args__ = (
+        # Keyset pagination of the history (created_at DESC, id DESC), overall and per employee
+        Index("ix_time_entry_audit_logs_created_keyset", "created_at", "id"),
+        Index("ix_time_entry_audit_logs_user_keyset", "user_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False, index=True)
@@ -34,6 +39,8 @@ class TimeEntryAuditLog(Base):
 
     source = Column(String(20), nullable=False, default="manual")  # "manual", "change_request", or "import"
     change_request_id = Column(UUID(as_uuid=True), ForeignKey("change_requests.id", ondelete="SET NULL"), nullable=True)
+    # Compact diff: comma-separated fields whose new_* value is stored; the others equal old_*
+    changed_fields = Column(String(64), nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, Numeric, Text, DateTime, String, ForeignKey
+from sqlalchemy import Column, Date, Numeric, Text, DateTime, String, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -17,6 +17,10 @@ class VacationRequest(Base):
     """Vacation approval request created when vacation_approval_required=true."""
 
     __tablename__ = "vacation_requests"
+    __table_args__ = (
+        # Keyset pagination of the employee list (user_id, created_at DESC, id DESC)
+        Index("ix_vacation_requests_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False, index=True)
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import extract
 from typing import List, Optional
 from datetime import timedelta, date
 from app.services.timezone_service import today_local
 from app.database import get_db
-from app.models import User, Absence, AbsenceType, UserRole, PublicHoliday, TimeEntry, TimeEntryAuditLog
+from app.models import User, Absence, AbsenceType, UserRole, TimeEntry, TimeEntryAuditLog
 from app.middleware.auth import get_current_user
-from app.schemas.absence import AbsenceCreate, AbsenceResponse, AbsenceCalendarEntry, TeamAbsenceEntry, NextVacationResponse
-from app.services import calculation_service
-from app.routers.admin_helpers import _create_audit_log
+from app.core.conditional_get import not_modified_or_none, tenant_stamp
+from app.core.query_metrics import query_budget
+from app.schemas.absence import (
+    AbsenceCreate, AbsenceResponse, AbsenceCalendarEntry, AbsenceCalendarRange, TeamAbsenceEntry, NextVacationResponse,
+)
+from app.services import absence_calendar_service, absence_ranges, audit_service, calculation_service
+from app.services.data_version_service import VersionStamp
 
 router = APIRouter(prefix="/api/absences", tags=["absences"])
 
@@ -57,8 +61,35 @@ def list_absences(
     return absences
 
 
+def _parse_month(month: str):
+    """(year, month, first day) of a YYYY-MM query parameter."""
+    try:
+        year, month_num = map(int, month.split('-'))
+        return year, month_num, date(year, month_num, 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ungültiges Monatsformat (YYYY-MM erwartet)")
+
+
+def _calendar_entries(cal: absence_calendar_service.MonthCalendar, viewer: User) -> List[AbsenceCalendarEntry]:
+    """Response rows of a month calendar as seen by ``viewer``."""
+    # Sick leave of others is masked per viewer (DSGVO Art. 9), see display_type
+    return [
+        AbsenceCalendarEntry(
+            date=day.date,
+            user_first_name=day.user.first_name,
+            user_last_name=day.user.last_name,
+            type=absence_calendar_service.display_type(day.type, day.user.user_id, viewer),
+            hours=day.hours,
+        )
+        for day in absence_calendar_service.days(cal)
+    ]
+
+
 @router.get("/calendar", response_model=List[AbsenceCalendarEntry])
+@query_budget(4)
 def get_absence_calendar(
+    request: Request,
+    response: Response,
     month: str = Query(..., description="Month in YYYY-MM format"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -66,93 +97,105 @@ def get_absence_calendar(
     """
     Get absence calendar for all employees for a specific month.
     Visible to all authenticated users.
+    Supports If-None-Match (304 when no absence/user of the tenant changed).
     """
-    try:
-        year, month_num = map(int, month.split('-'))
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Ungültiges Monatsformat (YYYY-MM erwartet)")
+    year, month_num, month_start = _parse_month(month)
+
+    # Sick-leave masking depends on the viewer, so the viewer is part of the ETag
+    stamp = tenant_stamp(db, current_user.tenant_id, month_start, month_start)
+    not_modified = not_modified_or_none(
+        request, response, "absence_calendar", stamp, current_user.id, current_user.role.value, year, month_num,
+    )
+    if not_modified:
+        return not_modified
 
-    # Get all absences for the month, fetching User columns in the same query
-    rows = db.query(Absence, User.first_name, User.last_name).join(User).filter(
-        User.is_active == True,
-        User.is_hidden == False,
-        extract('year', Absence.date) == year,
-        extract('month', Absence.date) == month_num
-    ).order_by(Absence.date).all()
-
-    # Convert to calendar entries (no extra queries needed)
-    # DSGVO Art. 9: Krankheitsdaten sind besonders schützenswert.
-    # Nicht-Admins sehen fremde Krankmeldungen nur als "absent".
-    calendar_entries = []
-    for absence, first_name, last_name in rows:
-        display_type = absence.type.value
-        if (
-            absence.type == AbsenceType.SICK
-            and current_user.role != UserRole.ADMIN
-            and absence.user_id != current_user.id
-        ):
-            display_type = "absent"
-        calendar_entries.append(AbsenceCalendarEntry(
-            date=absence.date,
-            user_first_name=first_name,
-            user_last_name=last_name,
-            type=display_type,
-            hours=absence.hours
-        ))
-
-    return calendar_entries
+    cal = absence_calendar_service.month_calendar(
+        db, current_user.tenant_id, year, month_num, stamp.version if stamp else None,
+    )
+    return _calendar_entries(cal, current_user)
+
+
+@router.get("/calendar/ranges", response_model=List[AbsenceCalendarRange])
+@query_budget(4)
+def get_absence_calendar_ranges(
+    request: Request,
+    response: Response,
+    month: str = Query(..., description="Month in YYYY-MM format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Absence calendar of a month collapsed into ranges of consecutive days
+    (same employee, type and hours). Supports If-None-Match like /calendar.
+    """
+    year, month_num, month_start = _parse_month(month)
+
+    stamp = tenant_stamp(db, current_user.tenant_id, month_start, month_start)
+    not_modified = not_modified_or_none(
+        request, response, "absence_calendar_ranges", stamp, current_user.id, current_user.role.value, year, month_num,
+    )
+    if not_modified:
+        return not_modified
+
+    cal = absence_calendar_service.month_calendar(
+        db, current_user.tenant_id, year, month_num, stamp.version if stamp else None,
+    )
+    return [
+        AbsenceCalendarRange(
+            start_date=r.start,
+            end_date=r.end,
+            user_first_name=r.user.first_name,
+            user_last_name=r.user.last_name,
+            user_color=r.user.color,
+            type=absence_calendar_service.display_type(r.type, r.user.user_id, current_user),
+            hours=r.hours,
+        )
+        for r in absence_calendar_service.ranges(cal)
+    ]
 
 
 @router.get("/team/upcoming", response_model=List[TeamAbsenceEntry])
+@query_budget(4)
 def get_team_upcoming_absences(
+    request: Request,
+    response: Response,
+    months: int = Query(3, ge=1, le=12, description="Current month plus following months"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get upcoming absences for all active employees.
-    Visible to all authenticated users.
-    Shows unique absence periods (groups consecutive days with same end_date).
+    Get upcoming absences of all active employees, one entry per day from today
+    to the end of the ``months``-th month (end_date = end of the consecutive run).
+    Visible to all authenticated users. Supports If-None-Match.
     """
     today = today_local()
+    last_month = date(today.year + (today.month + months - 2) // 12, (today.month + months - 2) % 12 + 1, 1)
 
-    # Get all future absences from active users, fetching User columns in the same query
-    rows = db.query(
-        Absence, User.first_name, User.last_name, User.calendar_color
-    ).join(User).filter(
-        User.is_active == True,
-        User.is_hidden == False,
-        Absence.date >= today
-    ).order_by(Absence.date, User.last_name, User.first_name).all()
+    versions = absence_calendar_service.month_versions(db, current_user.tenant_id, today, last_month)
+    stamp = VersionStamp(sum(versions.values()), None) if versions else None
+    not_modified = not_modified_or_none(
+        request, response, "team_upcoming", stamp, current_user.id, current_user.role.value, today, months,
+    )
+    if not_modified:
+        return not_modified
 
-    # Group by user and end_date to avoid duplicates for date ranges
-    seen = set()
     team_absences = []
-
-    # DSGVO Art. 9: Krankheitsdaten sind besonders schützenswert.
-    # Nicht-Admins sehen fremde Krankmeldungen nur als "absent".
-    for absence, first_name, last_name, calendar_color in rows:
-        # Create a unique key for this absence period
-        key = (absence.user_id, absence.date, absence.end_date or absence.date, absence.type)
-
-        if key not in seen:
-            seen.add(key)
-            display_type = absence.type.value
-            if (
-                absence.type == AbsenceType.SICK
-                and current_user.role != UserRole.ADMIN
-                and absence.user_id != current_user.id
-            ):
-                display_type = "absent"
-            team_absences.append(TeamAbsenceEntry(
-                date=absence.date,
-                end_date=absence.end_date,
-                user_first_name=first_name,
-                user_last_name=last_name,
-                user_color=calendar_color,
-                type=display_type,
-                hours=absence.hours,
-            ))
-
+    for cal in absence_calendar_service.month_calendars(db, current_user.tenant_id, today, last_month, versions):
+        for r in absence_calendar_service.ranges(cal):
+            if r.end < today:
+                continue
+            display_type = absence_calendar_service.display_type(r.type, r.user.user_id, current_user)
+            for offset in range(max((today - r.start).days, 0), (r.end - r.start).days + 1):
+                team_absences.append(TeamAbsenceEntry(
+                    date=r.start + timedelta(days=offset),
+                    end_date=r.end,
+                    user_first_name=r.user.first_name,
+                    user_last_name=r.user.last_name,
+                    user_color=r.user.color,
+                    type=display_type,
+                    hours=r.hours,
+                ))
+    team_absences.sort(key=lambda a: (a.date, a.user_last_name, a.user_first_name))
     return team_absences
 
 
@@ -230,30 +273,9 @@ def create_absence(
             detail=f"Datum liegt nach dem letzten Arbeitstag ({target_user.last_work_day.strftime('%d.%m.%Y')})"
         )
 
-    # Generate list of weekdays (Mon-Fri, excluding weekends and holidays)
-    dates_to_create = []
-    current_date = start_date
-
-    # Get holidays for the affected years
-    years = set()
-    temp_date = start_date
-    while temp_date <= end_date:
-        years.add(temp_date.year)
-        temp_date += timedelta(days=1)
-
-    holidays = set()
-    for year in years:
-        year_holidays = db.query(PublicHoliday).filter(
-            PublicHoliday.year == year
-        ).all()
-        holidays.update([h.date for h in year_holidays])
-
-    # Collect all weekdays in range (excluding weekends and holidays)
-    while current_date <= end_date:
-        # Check if it's a weekday (0=Monday, 6=Sunday)
-        if current_date.weekday() < 5 and current_date not in holidays:
-            dates_to_create.append(current_date)
-        current_date += timedelta(days=1)
+    # Expand the range into workdays (Mon-Fri, excluding weekends and holidays)
+    holidays = calculation_service.load_holiday_dates(db, range(start_date.year, end_date.year + 1))
+    dates_to_create = absence_ranges.workdays(start_date, end_date, holidays)
 
     if not dates_to_create:
         raise HTTPException(
@@ -301,57 +323,57 @@ def create_absence(
                 )
 
     # If sick leave with vacation refund: remove overlapping vacation entries first
-    refunded_vacation_dates = []
+    refunded = []
+    audit_rows = []
     if absence_data.type == AbsenceType.SICK and absence_data.refund_vacation:
-        for date in dates_to_create:
-            vacation_entry = db.query(Absence).filter(
-                Absence.user_id == target_user.id,
-                Absence.date == date,
-                Absence.type == AbsenceType.VACATION
-            ).first()
-            if vacation_entry:
-                # Audit-Log: Urlaubsrückgabe dokumentieren
-                audit_log = TimeEntryAuditLog(
-                    time_entry_id=None,
-                    user_id=target_user.id,
-                    changed_by=current_user.id,
-                    action="delete",
-                    old_date=vacation_entry.date,
-                    old_start_time=vacation_entry.start_time,
-                    old_end_time=vacation_entry.end_time,
-                    old_note=f"absence:{vacation_entry.type.value}:{float(vacation_entry.hours)}h",
-                    source="vacation_refund",
-                    tenant_id=current_user.tenant_id,
-                )
-                db.add(audit_log)
-                db.delete(vacation_entry)
-                refunded_vacation_dates.append(date)
+        refunded = db.query(Absence).filter(
+            Absence.user_id == target_user.id,
+            Absence.date.in_(dates_to_create),
+            Absence.type == AbsenceType.VACATION
+        ).order_by(Absence.date).all()
+        for vacation_entry in refunded:
+            # Audit-Log: Urlaubsrückgabe dokumentieren
+            audit_rows.append(audit_service.entry_change(
+                None, target_user.id, current_user.id, "delete",
+                source="vacation_refund", tenant_id=current_user.tenant_id,
+                old_date=vacation_entry.date,
+                old_start_time=vacation_entry.start_time,
+                old_end_time=vacation_entry.end_time,
+                old_note=f"absence:{vacation_entry.type.value}:{float(vacation_entry.hours)}h",
+            ))
 
     # Delete existing time entries on affected dates (unless keep_time_entries for mixed days)
+    existing_entries = []
     if not absence_data.keep_time_entries:
         existing_entries = db.query(TimeEntry).filter(
             TimeEntry.user_id == target_user.id,
             TimeEntry.tenant_id == current_user.tenant_id,
             TimeEntry.date.in_(dates_to_create),
         ).all()
-        for entry in existing_entries:
-            _create_audit_log(
-                db, entry.id, target_user.id, current_user.id,
-                action="delete", old_entry=entry,
-                source="absence_creation",
-                tenant_id=current_user.tenant_id,
+        audit_rows.extend(
+            audit_service.entry_change(
+                entry.id, target_user.id, current_user.id, "delete", old_entry=entry,
+                source="absence_creation", tenant_id=current_user.tenant_id,
             )
-            db.delete(entry)
+            for entry in existing_entries
+        )
+
+    # Log first (one multi-row insert), then delete
+    audit_service.write(db, audit_rows)
+    for obj in refunded + existing_entries:
+        db.delete(obj)
 
     # Create absences for all dates
     created_absences = []
+    timeline = calculation_service.load_weekly_hours_timeline(db, target_user)
     for date in dates_to_create:
         # §3 EntgFG: for sick leave always credit the employee's scheduled daily hours,
         # not a caller-supplied value. For daily-schedule users, use their per-weekday
         # target; for standard users, derive from weekly_hours / work_days_per_week.
         if absence_data.type == AbsenceType.SICK or getattr(target_user, 'use_daily_schedule', False):
-            weekly = calculation_service.get_weekly_hours_for_date(db, target_user, date)
-            hours_for_day = float(calculation_service.get_daily_target_for_date(target_user, date, weekly_hours=weekly))
+            hours_for_day = float(calculation_service.get_daily_target_for_date(
+                target_user, date, weekly_hours=timeline.at(date),
+            ))
             if hours_for_day == 0:
                 continue  # Skip days with 0 scheduled hours
         else:
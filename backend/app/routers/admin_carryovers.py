@@ -1,13 +1,13 @@
 """Admin sub-router: Year Carryovers + Year Closing."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
 from app.models import User, YearCarryover
 from app.middleware.auth import require_admin
 from app.schemas.year_carryover import YearCarryoverCreate, YearCarryoverResponse
-from app.services import calculation_service
+from app.services import data_version_service, vacation_ledger_service, year_closing_service
 
 router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
 
@@ -72,12 +72,16 @@ def upsert_carryover(
 @router.post("/year-closing/{year}")
 def create_year_closing(
     year: int,
+    dry_run: bool = Query(False, description="Nur berechnen, keine Übernahmen speichern"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
     """
     Create year-end closing: calculates overtime balance and remaining vacation
     for all active users at Dec 31 and creates carryover records for year+1.
+
+    With ``dry_run=true`` the closing is only previewed: the response lists the
+    values that would be written (and the ones they would replace).
     """
     if year < 2000 or year > 2100:
         raise HTTPException(status_code=400, detail="Ungültiges Jahr")
@@ -87,13 +91,11 @@ def create_year_closing(
         User.track_hours == True,
     ).all()
 
-    results = calculation_service.create_year_closing(db, year, users)
+    report = year_closing_service.close_year(db, year, users, dry_run=dry_run)
+    if not dry_run:
+        db.commit()
 
-    return {
-        "year": year,
-        "next_year": year + 1,
-        "employees": results,
-    }
+    return report
 
 
 @router.delete("/year-closing/{year}")
@@ -118,6 +120,9 @@ def delete_year_closing(
     if deleted == 0:
         raise HTTPException(status_code=404, detail=f"Kein Jahresabschluss für {year} gefunden")
 
+    # Bulk delete bypasses the flush hook — invalidate cached balances explicitly
+    data_version_service.bump_tenant(db, current_user.tenant_id)
+    vacation_ledger_service.invalidate(db)
     db.commit()
 
     return {
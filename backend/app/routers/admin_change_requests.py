@@ -11,12 +11,12 @@ from app.schemas.change_request import ChangeRequestResponse, ChangeRequestRevie
 from app.schemas.time_entry import TimeEntryResponse
 from app.routers.admin_helpers import _create_audit_log, _enrich_cr_response, _enrich_cr_responses
 from app.routers.time_entries import (
-    _calculate_daily_net_hours, _calculate_weekly_net_hours,
+    _night_worker_warning,
     MAX_NIGHT_WORKER_DAILY_WARN, MAX_WEEKLY_HOURS_WARN,
 )
-from app.services.arbzg_utils import is_night_work
+from app.services.entry_validation_service import EntryValidationContext
 from app.services.calculation_service import get_weekly_hours_for_date, get_daily_target_for_date
-from app.models.time_entry_audit_log import TimeEntryAuditLog
+from app.services import audit_service, clock_status_service
 
 router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
 
@@ -162,6 +162,8 @@ def review_change_request(
 
     # Use the CR's tenant_id (from the requesting user), not the admin's
     cr_tenant_id = cr.tenant_id
+    # Ending or removing an open entry changes the user's clock status
+    was_open = entry is not None and entry.end_time is None
 
     # TimeEntry CR actions
     if cr.entry_kind != "absence":
@@ -247,36 +249,25 @@ def review_change_request(
             cr.absence_id = new_absence.id
 
             # Audit-Log für Absence-CR CREATE
-            audit = TimeEntryAuditLog(
-                time_entry_id=None,
-                user_id=cr.user_id,
-                changed_by=current_user.id,
-                action="create",
+            audit_service.write(db, [audit_service.entry_change(
+                None, cr.user_id, current_user.id, "create",
+                source="change_request", change_request_id=cr.id, tenant_id=cr_tenant_id,
                 new_date=cr.proposed_date,
                 new_start_time=cr.proposed_start_time,
                 new_end_time=cr.proposed_end_time,
                 new_note=f"absence:{cr.proposed_absence_type}:{hours}h",
-                source="change_request",
-                change_request_id=cr.id,
-                tenant_id=cr_tenant_id,
-            )
-            db.add(audit)
+            )])
 
         elif cr.request_type == ChangeRequestType.UPDATE:
             # absence already fetched in precondition check above
             # Audit-Log für Absence-CR UPDATE (alte Werte sichern)
-            audit = TimeEntryAuditLog(
-                time_entry_id=None,
-                user_id=cr.user_id,
-                changed_by=current_user.id,
-                action="update",
+            audit = audit_service.entry_change(
+                None, cr.user_id, current_user.id, "update",
+                source="change_request", change_request_id=cr.id, tenant_id=cr_tenant_id,
                 old_date=absence.date,
                 old_start_time=absence.start_time,
                 old_end_time=absence.end_time,
                 old_note=f"absence:{absence.type.value}:{float(absence.hours)}h",
-                source="change_request",
-                change_request_id=cr.id,
-                tenant_id=cr_tenant_id,
             )
 
             if cr.proposed_absence_type:
@@ -291,32 +282,31 @@ def review_change_request(
             absence.end_time = cr.proposed_end_time
 
             # Neue Werte im Audit nachtragen
-            audit.new_date = absence.date
-            audit.new_start_time = absence.start_time
-            audit.new_end_time = absence.end_time
-            audit.new_note = f"absence:{absence.type.value}:{float(absence.hours)}h"
-            db.add(audit)
+            audit.update(
+                new_date=absence.date,
+                new_start_time=absence.start_time,
+                new_end_time=absence.end_time,
+                new_note=f"absence:{absence.type.value}:{float(absence.hours)}h",
+            )
+            audit_service.write(db, [audit])
 
         elif cr.request_type == ChangeRequestType.DELETE:
             # Audit-Log für Absence-CR DELETE
-            audit = TimeEntryAuditLog(
-                time_entry_id=None,
-                user_id=cr.user_id,
-                changed_by=current_user.id,
-                action="delete",
+            audit_service.write(db, [audit_service.entry_change(
+                None, cr.user_id, current_user.id, "delete",
+                source="change_request", change_request_id=cr.id, tenant_id=cr_tenant_id,
                 old_date=absence.date,
                 old_start_time=absence.start_time,
                 old_end_time=absence.end_time,
                 old_note=f"absence:{absence.type.value}:{float(absence.hours)}h",
-                source="change_request",
-                change_request_id=cr.id,
-                tenant_id=cr_tenant_id,
-            )
-            db.add(audit)
+            )])
             db.delete(absence)
 
     db.commit()
     db.refresh(cr)
+    if was_open or (entry is not None and cr.request_type == ChangeRequestType.UPDATE and entry.end_time is None):
+        open_entry = db.query(TimeEntry).filter(TimeEntry.user_id == cr.user_id, TimeEntry.end_time.is_(None)).first()
+        clock_status_service.publish_entry(cr.user_id, open_entry)
 
     cr_response = _enrich_cr_response(cr, db)
 
@@ -331,38 +321,25 @@ def review_change_request(
     ):
         cr_user = db.query(User).filter(User.id == cr.user_id).first()
         if cr_user and not cr_user.exempt_from_arbzg:
-            daily_hours_cr = _calculate_daily_net_hours(
-                db=db,
-                user_id=cr.user_id,
-                entry_date=cr.proposed_date,
-                start_time=cr.proposed_start_time,
-                end_time=cr.proposed_end_time,
-                break_minutes=cr.proposed_break_minutes or 0,
+            # The approved entry is already stored – exclude it so it is not counted twice
+            check = EntryValidationContext.for_date(db, cr.user_id, cr.proposed_date).check(
+                cr.proposed_date, cr.proposed_start_time, cr.proposed_end_time,
+                cr.proposed_break_minutes or 0,
+                exclude_entry_id=cr.time_entry_id,
             )
 
             # SS6 Abs. 2: Nachtarbeitnehmer-Tageslimit
             if (
                 cr_user.is_night_worker
-                and is_night_work(cr.proposed_start_time, cr.proposed_end_time)
-                and daily_hours_cr > MAX_NIGHT_WORKER_DAILY_WARN
+                and check.night_work
+                and check.daily_hours > MAX_NIGHT_WORKER_DAILY_WARN
             ):
-                cr_response.warnings.append(
-                    f"§6 ArbZG: Nachtarbeitnehmer – Tageslimit 8h überschritten ({daily_hours_cr:.1f}h). "
-                    "Verlängerung auf 10h nur mit 1-Monats-Ausgleich zulässig."
-                )
+                cr_response.warnings.append(_night_worker_warning(check.daily_hours))
 
             # SS14 ArbZG: Wochenarbeitszeit-Warnung (48h)
-            weekly = _calculate_weekly_net_hours(
-                db=db,
-                user_id=cr.user_id,
-                entry_date=cr.proposed_date,
-                start_time=cr.proposed_start_time,
-                end_time=cr.proposed_end_time,
-                break_minutes=cr.proposed_break_minutes or 0,
-            )
-            if weekly > MAX_WEEKLY_HOURS_WARN:
+            if check.weekly_hours > MAX_WEEKLY_HOURS_WARN:
                 cr_response.warnings.append(
-                    f"§14 ArbZG: Wochenarbeitszeit {weekly:.1f}h überschreitet 48h-Grenze."
+                    f"§14 ArbZG: Wochenarbeitszeit {check.weekly_hours:.1f}h überschreitet 48h-Grenze."
                 )
 
     return cr_response
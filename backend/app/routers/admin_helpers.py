@@ -1,15 +1,13 @@
-"""Shared helpers used by admin sub-routers."""
+"""Shared helpers used by admin sub-routers (response enrichment also by the employee routers)."""
 
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from app.models import User, ChangeRequest, TimeEntryAuditLog
+from app.models import ChangeRequest, TimeEntryAuditLog
+from app.models.vacation_request import VacationRequest
 from app.schemas.change_request import ChangeRequestResponse
 from app.schemas.time_entry_audit_log import AuditLogResponse
-
-
-def _get_field(entry, field: str):
-    """Get a field from either an ORM object or a dict."""
-    return getattr(entry, field, None) if hasattr(entry, field) else entry.get(field)
+from app.schemas.vacation_request import VacationRequestResponse
+from app.services import audit_service, calculation_service, user_name_service
 
 
 def _create_audit_log(
@@ -24,30 +22,22 @@ def _create_audit_log(
     change_request_id=None,
     tenant_id=None,
 ):
-    """Create an audit log entry for a time entry change."""
-    log = TimeEntryAuditLog(
-        time_entry_id=time_entry_id,
-        user_id=user_id,
-        changed_by=changed_by,
-        action=action,
-        source=source,
-        change_request_id=change_request_id,
-        tenant_id=tenant_id,
-    )
-    if old_entry:
-        log.old_date = _get_field(old_entry, 'date')
-        log.old_start_time = _get_field(old_entry, 'start_time')
-        log.old_end_time = _get_field(old_entry, 'end_time')
-        log.old_break_minutes = _get_field(old_entry, 'break_minutes')
-        log.old_note = _get_field(old_entry, 'note')
-    if new_entry:
-        log.new_date = _get_field(new_entry, 'date')
-        log.new_start_time = _get_field(new_entry, 'start_time')
-        log.new_end_time = _get_field(new_entry, 'end_time')
-        log.new_break_minutes = _get_field(new_entry, 'break_minutes')
-        log.new_note = _get_field(new_entry, 'note')
-    db.add(log)
-    return log
+    """Write the audit log entry for one time entry change (batches: audit_service.write)."""
+    audit_service.write(db, [audit_service.entry_change(
+        time_entry_id, user_id, changed_by, action,
+        old_entry=old_entry, new_entry=new_entry, source=source,
+        change_request_id=change_request_id, tenant_id=tenant_id,
+    )])
+
+
+_CR_NAME_FIELDS = {
+    "user_id": ("user_first_name", "user_last_name"),
+    "reviewed_by": ("reviewer_first_name", "reviewer_last_name"),
+}
+_AUDIT_NAME_FIELDS = {
+    "user_id": ("user_first_name", "user_last_name"),
+    "changed_by": ("changed_by_first_name", "changed_by_last_name"),
+}
 
 
 def _enrich_cr_response(cr: ChangeRequest, db: Session) -> ChangeRequestResponse:
@@ -57,31 +47,25 @@ def _enrich_cr_response(cr: ChangeRequest, db: Session) -> ChangeRequestResponse
 
 def _enrich_cr_responses(crs: list, db: Session) -> list[ChangeRequestResponse]:
     """Add user names to change request responses (batch, single query)."""
-    if not crs:
-        return []
-    user_ids = set()
-    for cr in crs:
-        user_ids.add(cr.user_id)
-        if cr.reviewed_by:
-            user_ids.add(cr.reviewed_by)
-    user_ids.discard(None)
-    users = db.query(User).filter(User.id.in_(user_ids)).all() if user_ids else []
-    user_map = {u.id: u for u in users}
-
-    results = []
-    for cr in crs:
-        response = ChangeRequestResponse.model_validate(cr)
-        user = user_map.get(cr.user_id)
-        if user:
-            response.user_first_name = user.first_name
-            response.user_last_name = user.last_name
-        if cr.reviewed_by:
-            reviewer = user_map.get(cr.reviewed_by)
-            if reviewer:
-                response.reviewer_first_name = reviewer.first_name
-                response.reviewer_last_name = reviewer.last_name
-        results.append(response)
-    return results
+    pairs = [(cr, ChangeRequestResponse.model_validate(cr)) for cr in crs]
+    user_name_service.fill_names(db, pairs, _CR_NAME_FIELDS)
+    return [response for _, response in pairs]
+
+
+def _enrich_vr_response(vr: VacationRequest, db: Session) -> VacationRequestResponse:
+    """Add user names and workdays to the vacation request response (single item)."""
+    return _enrich_vr_responses([vr], db)[0]
+
+
+def _enrich_vr_responses(vrs: list, db: Session) -> list[VacationRequestResponse]:
+    """Add user names and workdays to vacation request responses (one name and one holiday query)."""
+    pairs = [(vr, VacationRequestResponse.model_validate(vr)) for vr in vrs]
+    user_name_service.fill_names(db, pairs, _CR_NAME_FIELDS)
+    years = {y for vr in vrs for y in range(vr.date.year, (vr.end_date or vr.date).year + 1)}
+    holidays = calculation_service.load_holiday_dates(db, years)
+    for vr, response in pairs:
+        response.days = calculation_service.count_workdays(db, vr.date, vr.end_date or vr.date, holidays)
+    return [response for _, response in pairs]
 
 
 def _enrich_audit_response(log: TimeEntryAuditLog, db: Session) -> AuditLogResponse:
@@ -91,30 +75,9 @@ def _enrich_audit_response(log: TimeEntryAuditLog, db: Session) -> AuditLogRespo
 
 def _enrich_audit_responses(logs: list, db: Session) -> list[AuditLogResponse]:
     """Add user names to audit log responses (batch, single query)."""
-    if not logs:
-        return []
-    user_ids = set()
-    for log in logs:
-        user_ids.add(log.user_id)
-        if log.changed_by:
-            user_ids.add(log.changed_by)
-    user_ids.discard(None)
-    users = db.query(User).filter(User.id.in_(user_ids)).all() if user_ids else []
-    user_map = {u.id: u for u in users}
-
-    results = []
-    for log in logs:
-        response = AuditLogResponse.model_validate(log)
-        user = user_map.get(log.user_id)
-        if user:
-            response.user_first_name = user.first_name
-            response.user_last_name = user.last_name
-        changer = user_map.get(log.changed_by)
-        if changer:
-            response.changed_by_first_name = changer.first_name
-            response.changed_by_last_name = changer.last_name
-        results.append(response)
-    return results
+    pairs = [(log, AuditLogResponse.model_validate(log)) for log in logs]
+    user_name_service.fill_names(db, pairs, _AUDIT_NAME_FIELDS)
+    return [response for _, response in pairs]
 
 
 class SettingUpdate(BaseModel):
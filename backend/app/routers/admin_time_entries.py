@@ -1,8 +1,8 @@
 """Admin sub-router: Admin Time Entry CRUD + Audit Log."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import extract
+from datetime import datetime
 from typing import List, Optional
 from app.database import get_db
 from app.models import User, TimeEntry, TimeEntryAuditLog
@@ -10,12 +10,14 @@ from app.middleware.auth import require_admin
 from app.schemas.time_entry import TimeEntryCreate, TimeEntryResponse, TimeEntryUpdate
 from app.schemas.time_entry_audit_log import AuditLogResponse
 from app.routers.admin_helpers import _create_audit_log, _enrich_audit_response, _enrich_audit_responses
-from app.services.break_validation_service import validate_daily_break
+from app.services.entry_validation_service import EntryValidationContext
+from app.core.pagination import set_next_cursor
+from app.services import audit_service, clock_status_service
+from app.services.timezone_service import LOCAL_TZ
 from app.routers.time_entries import (
-    _calculate_daily_net_hours, _calculate_weekly_net_hours,
-    MAX_DAILY_HOURS_HARD, MAX_DAILY_HOURS_WARN, MAX_NIGHT_WORKER_DAILY_WARN, MAX_WEEKLY_HOURS_WARN,
+    _raise_for_hard_limits, _night_worker_warning,
+    MAX_DAILY_HOURS_WARN, MAX_NIGHT_WORKER_DAILY_WARN,
 )
-from app.services.arbzg_utils import is_night_work
 
 router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
 
@@ -36,41 +38,20 @@ def admin_create_time_entry(
 
     admin_create_warnings: list[str] = []
     if not user.exempt_from_arbzg:
-        # Break validation (SS4 ArbZG)
-        break_error = validate_daily_break(
-            db=db, user_id=user.id, entry_date=entry_data.date,
-            start_time=entry_data.start_time, end_time=entry_data.end_time,
-            break_minutes=entry_data.break_minutes,
+        # SS4 breaks and SS3 daily hard limit against one snapshot of the user's week
+        check = EntryValidationContext.for_date(db, user.id, entry_data.date).check(
+            entry_data.date, entry_data.start_time, entry_data.end_time, entry_data.break_minutes,
         )
-        if break_error:
-            raise HTTPException(status_code=400, detail=break_error)
-
-        # SS3 ArbZG: daily hours hard limit
-        daily_hours = _calculate_daily_net_hours(
-            db=db, user_id=user.id, entry_date=entry_data.date,
-            start_time=entry_data.start_time, end_time=entry_data.end_time,
-            break_minutes=entry_data.break_minutes,
-        )
-        if daily_hours > MAX_DAILY_HOURS_HARD:
-            raise HTTPException(
-                status_code=422,
-                detail=f"Tagesarbeitszeit würde {daily_hours:.1f}h betragen und überschreitet die gesetzliche Höchstgrenze von {MAX_DAILY_HOURS_HARD:.0f}h (§3 ArbZG).",
-            )
+        _raise_for_hard_limits(check)
+        daily_hours = check.daily_hours
 
         # §3 ArbZG: Warnung bei Überschreitung der Regelgrenze (8h)
         if daily_hours > MAX_DAILY_HOURS_WARN:
             admin_create_warnings.append(f"DAILY_HOURS_WARNING: Tagesarbeitszeit beträgt {daily_hours:.1f}h (>{MAX_DAILY_HOURS_WARN}h)")
 
         # SS6 Abs. 2 ArbZG: Warnung für Nachtarbeitnehmer
-        if (
-            user.is_night_worker
-            and is_night_work(entry_data.start_time, entry_data.end_time)
-            and daily_hours > MAX_NIGHT_WORKER_DAILY_WARN
-        ):
-            admin_create_warnings.append(
-                f"§6 ArbZG: Nachtarbeitnehmer – Tageslimit 8h überschritten ({daily_hours:.1f}h). "
-                "Verlängerung auf 10h nur mit 1-Monats-Ausgleich zulässig."
-            )
+        if user.is_night_worker and check.night_work and daily_hours > MAX_NIGHT_WORKER_DAILY_WARN:
+            admin_create_warnings.append(_night_worker_warning(daily_hours))
 
     entry = TimeEntry(
         user_id=user.id,
@@ -119,27 +100,15 @@ def admin_update_time_entry(
     update_break_minutes = entry_data.break_minutes if entry_data.break_minutes is not None else entry.break_minutes
 
     admin_update_warnings: list[str] = []
-    if not affected_user or not affected_user.exempt_from_arbzg:
-        # Break validation (SS4 ArbZG)
-        break_error = validate_daily_break(
-            db=db, user_id=entry.user_id, entry_date=update_date,
-            start_time=update_start_time, end_time=update_end_time,
-            break_minutes=update_break_minutes, exclude_entry_id=entry.id,
-        )
-        if break_error:
-            raise HTTPException(status_code=400, detail=break_error)
-
-        # SS3 ArbZG: daily hours hard limit
-        daily_hours = _calculate_daily_net_hours(
-            db=db, user_id=entry.user_id, entry_date=update_date,
-            start_time=update_start_time, end_time=update_end_time,
-            break_minutes=update_break_minutes, exclude_entry_id=entry.id,
+    # Open (clocked-in) entries have no duration yet – nothing to check
+    if update_end_time is not None and (not affected_user or not affected_user.exempt_from_arbzg):
+        # SS4 breaks and SS3 daily hard limit against one snapshot of the user's week
+        check = EntryValidationContext.for_date(db, entry.user_id, update_date).check(
+            update_date, update_start_time, update_end_time, update_break_minutes,
+            exclude_entry_id=entry.id,
         )
-        if daily_hours > MAX_DAILY_HOURS_HARD:
-            raise HTTPException(
-                status_code=422,
-                detail=f"Tagesarbeitszeit würde {daily_hours:.1f}h betragen und überschreitet die gesetzliche Höchstgrenze von {MAX_DAILY_HOURS_HARD:.0f}h (§3 ArbZG).",
-            )
+        _raise_for_hard_limits(check)
+        daily_hours = check.daily_hours
 
         # §3 ArbZG: Warnung bei Überschreitung der Regelgrenze (8h)
         if daily_hours > MAX_DAILY_HOURS_WARN:
@@ -149,13 +118,10 @@ def admin_update_time_entry(
         if (
             affected_user
             and affected_user.is_night_worker
-            and is_night_work(update_start_time, update_end_time)
+            and check.night_work
             and daily_hours > MAX_NIGHT_WORKER_DAILY_WARN
         ):
-            admin_update_warnings.append(
-                f"§6 ArbZG: Nachtarbeitnehmer – Tageslimit 8h überschritten ({daily_hours:.1f}h). "
-                "Verlängerung auf 10h nur mit 1-Monats-Ausgleich zulässig."
-            )
+            admin_update_warnings.append(_night_worker_warning(daily_hours))
 
     # Create audit log before changing
     _create_audit_log(
@@ -172,6 +138,9 @@ def admin_update_time_entry(
         tenant_id=current_user.tenant_id,
     )
 
+    # Changes to a running clock-in must reach the employee's status stream
+    was_open = entry.end_time is None
+
     # Apply only provided updates
     if entry_data.date is not None:
         entry.date = entry_data.date
@@ -186,6 +155,8 @@ def admin_update_time_entry(
 
     db.commit()
     db.refresh(entry)
+    if was_open:
+        clock_status_service.publish_entry(entry.user_id, entry if entry.end_time is None else None)
 
     response = TimeEntryResponse.model_validate(entry)
     response.warnings = admin_update_warnings
@@ -209,8 +180,12 @@ def admin_delete_time_entry(
         tenant_id=current_user.tenant_id,
     )
 
+    was_open = entry.end_time is None
+    user_id = entry.user_id
     db.delete(entry)
     db.commit()
+    if was_open:
+        clock_status_service.publish_entry(user_id, None)
     return None
 
 
@@ -218,28 +193,40 @@ def admin_delete_time_entry(
 
 @router.get("/audit-log", response_model=List[AuditLogResponse])
 def list_audit_log(
+    response: Response,
     user_id: Optional[str] = Query(None, description="Filter by affected user"),
+    time_entry_id: Optional[str] = Query(None, description="History of one time entry"),
     month: Optional[str] = Query(None, description="Filter by month (YYYY-MM)"),
-    skip: int = 0,
-    limit: int = Query(default=100, le=500),
+    skip: int = Query(default=0, ge=0, description="Deprecated: OFFSET paging, use cursor"),
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
-    """List audit log entries."""
-    query = db.query(TimeEntryAuditLog)
-
-    if user_id:
-        query = query.filter(TimeEntryAuditLog.user_id == user_id)
-
+    """List audit log entries, newest first (keyset pagination via X-Next-Cursor)."""
+    since = until = None
     if month:
         try:
             year, month_num = map(int, month.split('-'))
-            query = query.filter(
-                extract('year', TimeEntryAuditLog.created_at) == year,
-                extract('month', TimeEntryAuditLog.created_at) == month_num,
-            )
+            since = datetime(year, month_num, 1, tzinfo=LOCAL_TZ)
+            until = datetime(year + month_num // 12, month_num % 12 + 1, 1, tzinfo=LOCAL_TZ)
         except ValueError:
             raise HTTPException(status_code=400, detail="Ungültiges Monatsformat (YYYY-MM erwartet)")
 
-    logs = query.order_by(TimeEntryAuditLog.created_at.desc()).offset(skip).limit(limit).all()
+    if skip:
+        # Legacy OFFSET paging (range on created_at, not extract(), so the index and year partitions apply)
+        query = db.query(TimeEntryAuditLog)
+        if user_id:
+            query = query.filter(TimeEntryAuditLog.user_id == user_id)
+        if time_entry_id:
+            query = query.filter(TimeEntryAuditLog.time_entry_id == time_entry_id)
+        if month:
+            query = query.filter(TimeEntryAuditLog.created_at >= since, TimeEntryAuditLog.created_at < until)
+        logs = query.order_by(TimeEntryAuditLog.created_at.desc(), TimeEntryAuditLog.id.desc()).offset(skip).limit(limit).all()
+    else:
+        logs, next_cursor = audit_service.history(
+            db, user_id=user_id, time_entry_id=time_entry_id, since=since, until=until,
+            limit=limit, cursor=cursor,
+        )
+        set_next_cursor(response, next_cursor)
     return _enrich_audit_responses(logs, db)
@@ -4,14 +4,14 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from app.services.timezone_service import today_local
 from app.database import get_db
-from app.models import User, TimeEntry, Absence, WorkingHoursChange, ChangeRequest, TimeEntryAuditLog, UserRole
+from app.models import User, WorkingHoursChange
 from app.middleware.auth import require_admin
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserCreateResponse, AdminSetPassword, UserListResponse
 from app.schemas.working_hours_change import WorkingHoursChangeCreate, WorkingHoursChangeResponse
-from app.services import auth_service
+from app.services import auth_service, retention_service
 
 router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
 
@@ -43,48 +43,18 @@ def get_deletion_candidates(
     current_user: User = Depends(require_admin),
 ):
     """DSGVO Art. 17: List inactive users with anonymization/purge eligibility."""
-    inactive_users = db.query(User).filter(User.is_active == False).order_by(User.last_name, User.first_name).all()
-
-    today = today_local()
-    result = []
-
-    for user in inactive_users:
-        last_entry = db.query(TimeEntry).filter(
-            TimeEntry.user_id == user.id
-        ).order_by(TimeEntry.date.desc()).first()
-
-        last_entry_date = last_entry.date if last_entry else None
-        days_since = (today - last_entry_date).days if last_entry_date else None
-        is_anonymized = user.username.startswith("deleted_")
-
-        # Grace-Period-Berechnung (14 Tage nach Deaktivierung)
-        grace_period_remaining = None
-        grace_period_ends = None
-        in_grace_period = False
-        if user.deactivated_at is not None:
-            days_deactivated = (today - user.deactivated_at.date()).days
-            if days_deactivated < 14:
-                grace_period_remaining = 14 - days_deactivated
-                grace_period_ends = (user.deactivated_at + timedelta(days=14)).date().isoformat()
-                in_grace_period = True
-
-        result.append({
-            "user_id": str(user.id),
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "username": user.username,
-            "is_anonymized": is_anonymized,
-            "deactivated_at": user.deactivated_at.isoformat() if user.deactivated_at else None,
-            "grace_period_ends": grace_period_ends,
-            "grace_period_remaining_days": grace_period_remaining,
-            "in_grace_period": in_grace_period,
-            "last_entry_date": last_entry_date.isoformat() if last_entry_date else None,
-            "days_since_last_entry": days_since,
-            "can_anonymize": not is_anonymized and not in_grace_period,
-            "can_purge": last_entry_date is None or (days_since is not None and days_since >= 730),
-        })
-
-    return result
+    return [c.as_dict() for c in retention_service.load_candidates(db)]
+
+
+def _get_candidate(db: Session, user_id: str) -> retention_service.Candidate:
+    """Retention state of one user; 404 if unknown, 400 if still active."""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="Benutzer nicht gefunden")
+    if user.is_active:
+        raise HTTPException(status_code=400, detail="Benutzer muss zuerst deaktiviert werden (Art. 17 DSGVO)")
+    (candidate,) = retention_service.load_candidates(db, user_ids=[user.id])
+    return candidate
 
 
 @router.post("/users/{user_id}/anonymize")
@@ -94,50 +64,20 @@ def anonymize_user(
     current_user: User = Depends(require_admin),
 ):
     """DSGVO Art. 17: Anonymize an inactive user in-place. Keeps time entries (ArbZG SS16 -- 2-year retention), deletes absences."""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Benutzer nicht gefunden")
-    if user.is_active:
-        raise HTTPException(status_code=400, detail="Benutzer muss zuerst deaktiviert werden (Art. 17 DSGVO)")
-    if user.username.startswith("deleted_"):
+    candidate = _get_candidate(db, user_id)
+    if candidate.is_anonymized:
         raise HTTPException(status_code=400, detail="Benutzer wurde bereits anonymisiert")
 
     # 14-Tage-Grace-Period: Anonymisierung erst nach Ablauf der Frist erlaubt
-    if user.deactivated_at is not None:
-        days_since_deactivation = (datetime.now(timezone.utc).date() - user.deactivated_at.date()).days
-        if days_since_deactivation < 14:
-            remaining = 14 - days_since_deactivation
-            grace_end = (user.deactivated_at + timedelta(days=14)).strftime('%d.%m.%Y')
-            raise HTTPException(
-                status_code=400,
-                detail=f"Sperrfrist läuft noch {remaining} Tag(e). Anonymisierung frühestens am {grace_end} möglich."
-            )
-    elif user.is_active:
+    # (inactive legacy users without deactivated_at have none)
+    if candidate.in_grace_period:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Benutzer muss zuerst deaktiviert werden"
+            status_code=400,
+            detail=f"Sperrfrist läuft noch {candidate.grace_period_remaining_days} Tag(e). "
+                   f"Anonymisierung frühestens am {candidate.grace_period_ends.strftime('%d.%m.%Y')} möglich."
         )
-    # If deactivated_at is None but user is inactive: allow anonymization (legacy user)
-
-    user.first_name = "Gelöschter"
-    user.last_name = "Benutzer"
-    user.username = f"deleted_{str(user.id)[:8]}"
-    user.email = None
-    user.calendar_color = "#9CA3AF"
-
-    # Delete absences (no statutory retention requirement)
-    db.query(Absence).filter(Absence.user_id == user.id).delete()
-
-    log = TimeEntryAuditLog(
-        time_entry_id=None,
-        user_id=user.id,
-        changed_by=current_user.id,
-        action="dsgvo_anonymize",
-        source="dsgvo",
-        new_note=f"DSGVO-Anonymisierung durch Admin {current_user.username}",
-        tenant_id=current_user.tenant_id,
-    )
-    db.add(log)
+
+    retention_service.anonymize(db, [candidate], current_user, by=f"Admin {current_user.username}")
     db.commit()
 
     return {"message": "Benutzer erfolgreich anonymisiert (Art. 17 DSGVO). Zeiteinträge bleiben für ArbZG §16 erhalten."}
@@ -150,56 +90,15 @@ def purge_user(
     current_user: User = Depends(require_admin),
 ):
     """DSGVO Art. 17: Permanently delete a user and all data. Only allowed after ArbZG SS16 retention period (730 days)."""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Benutzer nicht gefunden")
-    if user.is_active:
-        raise HTTPException(status_code=400, detail="Benutzer muss zuerst deaktiviert werden")
-
-    last_entry = db.query(TimeEntry).filter(
-        TimeEntry.user_id == user.id
-    ).order_by(TimeEntry.date.desc()).first()
-
-    if last_entry:
-        days_since = (today_local() - last_entry.date).days
-        if days_since < 730:
-            raise HTTPException(
-                status_code=409,
-                detail=f"Aufbewahrungsfrist noch nicht abgelaufen. Letzter Eintrag: {last_entry.date.strftime('%d.%m.%Y')} ({days_since} Tage, Pflicht: 730 Tage gem. ArbZG §16)."
-            )
-
-    # Remove FK dependencies before deleting user.
-    # For changed_by references: SET NULL to preserve other users' audit trails.
-    db.query(TimeEntryAuditLog).filter(
-        TimeEntryAuditLog.changed_by == user.id
-    ).update({TimeEntryAuditLog.changed_by: None}, synchronize_session=False)
-    # Delete the purged user's own audit log entries.
-    db.query(TimeEntryAuditLog).filter(TimeEntryAuditLog.user_id == user.id).delete()
-
-    # Audit after cleaning up the user's logs (use admin's own ID since target will be deleted)
-    log = TimeEntryAuditLog(
-        time_entry_id=None,
-        user_id=current_user.id,
-        changed_by=current_user.id,
-        action="dsgvo_purge",
-        source="dsgvo",
-        old_note=f"Endgültige Löschung von User-ID {user_id} ({user.first_name} {user.last_name}) durch Admin {current_user.username}",
-        tenant_id=current_user.tenant_id,
-    )
-    db.add(log)
-    db.flush()
-    # Clean up vacation requests
-    from app.models.vacation_request import VacationRequest
-    db.query(VacationRequest).filter(VacationRequest.user_id == user.id).delete(synchronize_session=False)
-    # Nullify reviewed_by references
-    db.query(VacationRequest).filter(VacationRequest.reviewed_by == user.id).update(
-        {"reviewed_by": None}, synchronize_session=False
-    )
-    db.query(WorkingHoursChange).filter(WorkingHoursChange.user_id == user.id).delete()
-    db.query(ChangeRequest).filter(ChangeRequest.user_id == user.id).delete()
-    db.query(TimeEntry).filter(TimeEntry.user_id == user.id).delete()
-    db.query(Absence).filter(Absence.user_id == user.id).delete()
-    db.delete(user)
+    candidate = _get_candidate(db, user_id)
+    if not candidate.can_purge:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Aufbewahrungsfrist noch nicht abgelaufen. Letzter Eintrag: {candidate.last_entry_date.strftime('%d.%m.%Y')} "
+                   f"({candidate.days_since_last_entry} Tage, Pflicht: {retention_service.RETENTION_DAYS} Tage gem. ArbZG §16)."
+        )
+
+    retention_service.purge(db, [candidate], current_user, by=f"Admin {current_user.username}")
     db.commit()
 
     return {"message": "Benutzer und alle zugehörigen Daten wurden endgültig gelöscht (Art. 17 DSGVO)."}
@@ -3,56 +3,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from app.database import get_db
-from app.models import User, Absence, PublicHoliday, AbsenceType, TimeEntry
+from app.models import User, Absence, AbsenceType, TimeEntry
 from app.models.vacation_request import VacationRequest, VacationRequestStatus
 from app.middleware.auth import require_admin
 from app.schemas.vacation_request import VacationRequestResponse, VacationRequestReview
-from app.services import calculation_service
-from app.services.calculation_service import count_workdays
-from app.routers.admin_helpers import _create_audit_log
+from app.services import absence_ranges, audit_service, calculation_service
+from app.routers.admin_helpers import _enrich_vr_response, _enrich_vr_responses
 
 router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
 
 
-def _enrich_vr_response(vr: VacationRequest, db: Session) -> VacationRequestResponse:
-    """Add user names to the vacation request response (single item)."""
-    return _enrich_vr_responses([vr], db)[0]
-
-
-def _enrich_vr_responses(vrs: list, db: Session) -> list[VacationRequestResponse]:
-    """Add user names to vacation request responses (batch, single query)."""
-    if not vrs:
-        return []
-    user_ids = set()
-    for vr in vrs:
-        user_ids.add(vr.user_id)
-        if vr.reviewed_by:
-            user_ids.add(vr.reviewed_by)
-    user_ids.discard(None)
-    users = db.query(User).filter(User.id.in_(user_ids)).all() if user_ids else []
-    user_map = {u.id: u for u in users}
-
-    results = []
-    for vr in vrs:
-        resp = VacationRequestResponse.model_validate(vr)
-        user = user_map.get(vr.user_id)
-        if user:
-            resp.user_first_name = user.first_name
-            resp.user_last_name = user.last_name
-        if vr.reviewed_by:
-            reviewer = user_map.get(vr.reviewed_by)
-            if reviewer:
-                resp.reviewer_first_name = reviewer.first_name
-                resp.reviewer_last_name = reviewer.last_name
-        # Compute workdays
-        end = vr.end_date if vr.end_date else vr.date
-        resp.days = count_workdays(db, vr.date, end)
-        results.append(resp)
-    return results
-
-
 @router.get("/vacation-requests", response_model=List[VacationRequestResponse])
 def list_all_vacation_requests(
     request_status: Optional[str] = Query(None, alias="status"),
@@ -130,43 +92,28 @@ def review_vacation_request(
             detail=f"Datum liegt nach dem letzten Arbeitstag ({target_user.last_work_day.strftime('%d.%m.%Y')})",
         )
 
-    # Collect affected years for holidays
-    years = set()
-    cur = start_date
-    while cur <= end_date:
-        years.add(cur.year)
-        cur += timedelta(days=1)
-
-    holidays = set()
-    for year in years:
-        for h in db.query(PublicHoliday).filter(PublicHoliday.year == year).all():
-            holidays.add(h.date)
+    holidays = calculation_service.load_holiday_dates(db, range(start_date.year, end_date.year + 1))
 
     # Determine working days
-    dates_to_create = []
-    cur = start_date
-    while cur <= end_date:
-        if cur.weekday() < 5 and cur not in holidays:
-            dates_to_create.append(cur)
-        cur += timedelta(days=1)
+    dates_to_create = absence_ranges.workdays(start_date, end_date, holidays)
 
     if not dates_to_create:
         raise HTTPException(status_code=400, detail="Keine gültigen Arbeitstage im Zeitraum")
 
-    # Check for existing absences of the same type on those days
-    for d in dates_to_create:
-        existing = db.query(Absence).filter(
-            Absence.user_id == target_user.id,
-            Absence.date == d,
-            Absence.type == absence_type,
-        ).first()
-        if existing:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Es existiert bereits ein {absence_type_str}-Eintrag am {d.strftime('%d.%m.%Y')}",
-            )
+    # Check for existing absences of the same type on those days (one query, earliest clash reported)
+    existing = db.query(Absence).filter(
+        Absence.user_id == target_user.id,
+        Absence.date.in_(dates_to_create),
+        Absence.type == absence_type,
+    ).order_by(Absence.date).first()
+    if existing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Es existiert bereits ein {absence_type_str}-Eintrag am {existing.date.strftime('%d.%m.%Y')}",
+        )
 
     # Check vacation budget only for VACATION type (per year for cross-year requests)
+    timeline = calculation_service.load_weekly_hours_timeline(db, target_user)
     if absence_type == AbsenceType.VACATION:
         dates_by_year = {}
         for d in dates_to_create:
@@ -175,8 +122,7 @@ def review_vacation_request(
             vacation_account = calculation_service.get_vacation_account(db, target_user, check_year)
             year_hours_needed = sum(
                 float(calculation_service.get_daily_target_for_date(
-                    target_user, d,
-                    weekly_hours=calculation_service.get_weekly_hours_for_date(db, target_user, d),
+                    target_user, d, weekly_hours=timeline.at(d),
                 ))
                 for d in year_dates
             )
@@ -193,20 +139,20 @@ def review_vacation_request(
         TimeEntry.tenant_id == current_user.tenant_id,
         TimeEntry.date.in_(dates_to_create),
     ).all()
-    for entry in existing_entries:
-        _create_audit_log(
-            db, entry.id, target_user.id, current_user.id,
-            action="delete", old_entry=entry,
-            source="absence_request_approval",
-            tenant_id=current_user.tenant_id,
+    audit_service.write(db, [
+        audit_service.entry_change(
+            entry.id, target_user.id, current_user.id, "delete", old_entry=entry,
+            source="absence_request_approval", tenant_id=current_user.tenant_id,
         )
+        for entry in existing_entries
+    ])
+    for entry in existing_entries:
         db.delete(entry)
 
     # Create absence entries
     for d in dates_to_create:
         if getattr(target_user, 'use_daily_schedule', False):
-            weekly = calculation_service.get_weekly_hours_for_date(db, target_user, d)
-            hours_for_day = float(calculation_service.get_daily_target_for_date(target_user, d, weekly_hours=weekly))
+            hours_for_day = float(calculation_service.get_daily_target_for_date(target_user, d, weekly_hours=timeline.at(d)))
             if hours_for_day == 0:
                 continue
         else:
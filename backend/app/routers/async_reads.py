@@ -0,0 +1,145 @@
+"""
+Async variants of the hot read endpoints (enabled with ``ASYNC_DB_ENABLED``).
+
+Registered before the threaded routers with identical paths, so they take
+precedence while the flag is on. All of them run against ``AsyncSession``, and
+none of them does calculation work on the event loop, which also serves the
+clock status SSE streams:
+
+- clock status: plain awaited queries plus a handful of attribute checks,
+- absence calendar: version stamp and month calendar are read through
+  ``AsyncSession.run_sync`` – the queries are awaited on the async driver, the
+  Python work is a cache lookup (or assembling one month's bitmaps) and the
+  expansion of one month,
+- own journal: the inputs (``journal_service.load_journal_inputs``, one query
+  per kind of data) are loaded the same way, the aggregation runs in the
+  threadpool (``build_journal_range``).
+
+They return exactly what the threaded handlers return, including ETags. The
+dashboard stays threaded: its endpoints run the calculation service, which
+queries as it goes.
+"""
+from datetime import date, datetime
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.conditional_get import not_modified_or_none, tenant_stamp, user_stamp
+from app.database_async import get_async_db
+from app.middleware.auth import get_current_user_async
+from app.models import PublicHoliday, TimeEntry, User
+from app.routers.absences import _calendar_entries, _parse_month
+from app.routers.journal import _parse_range
+from app.routers.time_entries import _compute_is_editable, _mark_auto_closed
+from app.schemas.absence import AbsenceCalendarEntry
+from app.schemas.journal import JournalRangeResponse, JournalResponse
+from app.schemas.time_entry import ClockStatusResponse, TimeEntryResponse
+from app.services import absence_calendar_service, clock_status_service, journal_service
+from app.services.timezone_service import LOCAL_TZ, now_local, today_local
+
+router = APIRouter(tags=["async-reads"])
+
+
+@router.get("/api/time-entries/clock-status", response_model=ClockStatusResponse)
+async def get_clock_status(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Get the current clock-in/out status for the authenticated user."""
+    open_entry = (await db.execute(
+        select(TimeEntry).where(TimeEntry.user_id == current_user.id, TimeEntry.end_time.is_(None)).limit(1)
+    )).scalars().first()
+
+    if not open_entry:
+        clock_status_service.publish_entry(current_user.id, None)
+        return ClockStatusResponse(is_clocked_in=False)
+
+    # If the open entry is from a previous day, auto-close it (see time_entries._close_stale_entry)
+    if open_entry.date != today_local():
+        _mark_auto_closed(open_entry)
+        await db.commit()
+        clock_status_service.publish_entry(open_entry.user_id, None)
+        return ClockStatusResponse(is_clocked_in=False)
+
+    clock_status_service.publish_entry(current_user.id, open_entry)
+
+    # Calculate elapsed minutes in local time
+    start_dt = datetime.combine(open_entry.date, open_entry.start_time, tzinfo=LOCAL_TZ)
+    elapsed = int((now_local() - start_dt).total_seconds() / 60)
+
+    holiday = (await db.execute(
+        select(PublicHoliday.id).where(PublicHoliday.date == open_entry.date).limit(1)
+    )).first()
+    response_entry = TimeEntryResponse.model_validate(open_entry)
+    response_entry.is_editable = _compute_is_editable(open_entry, current_user)
+    response_entry.is_sunday_or_holiday = open_entry.date.weekday() == 6 or holiday is not None
+    response_entry.is_night_work = False  # still open, see time_entries._enrich_response
+    response_entry.warnings = []
+
+    return ClockStatusResponse(
+        is_clocked_in=True,
+        current_entry=response_entry,
+        elapsed_minutes=elapsed,
+    )
+
+
+@router.get("/api/absences/calendar", response_model=List[AbsenceCalendarEntry])
+async def get_absence_calendar(
+    request: Request,
+    response: Response,
+    month: str = Query(..., description="Month in YYYY-MM format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Absence calendar of all employees for one month (see absences.get_absence_calendar)."""
+    year, month_num, month_start = _parse_month(month)
+
+    stamp = await db.run_sync(tenant_stamp, current_user.tenant_id, month_start, month_start)
+    not_modified = not_modified_or_none(
+        request, response, "absence_calendar", stamp, current_user.id, current_user.role.value, year, month_num,
+    )
+    if not_modified:
+        return not_modified
+
+    cal = await db.run_sync(
+        absence_calendar_service.month_calendar,
+        current_user.tenant_id, year, month_num, stamp.version if stamp else None,
+    )
+    return _calendar_entries(cal, current_user)
+
+
+@router.get("/api/journal/me", response_model=Union[JournalResponse, JournalRangeResponse])
+async def get_my_journal(
+    request: Request,
+    response: Response,
+    year: int = Query(default=None, ge=2000, le=2100, description="Jahr (Standard: aktuell)"),
+    month: int = Query(default=None, ge=1, le=12, description="Monat 1-12 (Standard: aktuell)"),
+    from_month: Optional[str] = Query(default=None, alias="from", description="Erster Monat (YYYY-MM)"),
+    to_month: Optional[str] = Query(default=None, alias="to", description="Letzter Monat (YYYY-MM)"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Monatsjournal des aktuell eingeloggten Mitarbeiters (siehe journal.get_my_journal)."""
+    months = _parse_range(from_month, to_month)
+    single = months is None
+    if single:
+        now = now_local()
+        year = year or now.year
+        month = month or now.month
+        months = (year, month, year, month)
+
+    # Same ETags as journal._journal: nothing changed up to the last month
+    stamp = await db.run_sync(user_stamp, current_user, date.min, date(months[2], months[3], 1))
+    if single:
+        not_modified = not_modified_or_none(request, response, "journal", stamp, current_user.id, year, month)
+    else:
+        not_modified = not_modified_or_none(request, response, "journal-range", stamp, current_user.id, *months)
+    if not_modified:
+        return not_modified
+
+    inputs = await db.run_sync(journal_service.load_journal_inputs, current_user, *months)
+    journal = await run_in_threadpool(journal_service.build_journal_range, current_user, inputs)
+    return journal_service.single_month(journal) if single else journal
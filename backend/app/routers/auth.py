@@ -1,31 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File, status
+from fastapi.responses import StreamingResponse
 from app.core.limiter import limiter
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional
-from datetime import datetime, timedelta, timezone
 import base64
-from collections import defaultdict
-from app.database import get_db, set_superadmin_context
-from app.models import User, TimeEntry, Absence
+from urllib.parse import quote
+from app.database import get_db, set_superadmin_context, stream_with_session
+from app.database_read import get_reporting_db
+from app.models import User
 from app.models.tenant import Tenant
-
-# In-memory failed login tracking (resets on restart, per-username).
-# NOTE: In-memory rate limiting — per-worker, not shared across gunicorn workers.
-# For single-worker deployments (current production) this is sufficient.
-# For multi-worker: consider Redis-based rate limiting via slowapi's Redis backend.
-_failed_logins: dict[str, list[datetime]] = defaultdict(list)
-_MAX_TRACKED_USERS = 10000
-_LOCKOUT_ATTEMPTS = 5
-_LOCKOUT_WINDOW = timedelta(minutes=15)
 from app.schemas.user import (
     LoginRequest, LoginResponse, RefreshResponse, UserResponse, UserListResponse,
     ChangePasswordRequest, UpdateCalendarColorRequest,
     TotpSetupResponse, TotpVerifyRequest, TotpDisableRequest,
 )
-from app.services import auth_service
+from app.services import auth_service, data_export_service, login_lockout_service
 from app.middleware.auth import get_current_user
 from app.config import settings
 
@@ -55,19 +46,6 @@ class UpdateProfileRequest(BaseModel):
             raise ValueError(f'Ungültiges E-Mail-Format: {e}')
         return v
 
-def _evict_failed_logins_if_needed():
-    """Evict the oldest half of tracked users when the dict exceeds the size cap."""
-    if len(_failed_logins) > _MAX_TRACKED_USERS:
-        # Sort by most recent attempt timestamp, keep the newer half
-        sorted_users = sorted(
-            _failed_logins.keys(),
-            key=lambda u: max(_failed_logins[u]) if _failed_logins[u] else datetime.min.replace(tzinfo=timezone.utc),
-        )
-        to_remove = sorted_users[: len(sorted_users) // 2]
-        for u in to_remove:
-            del _failed_logins[u]
-
-
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
@@ -98,12 +76,8 @@ def login(request: Request, response: Response, login_data: LoginRequest, db: Se
     F-019: If TOTP is enabled, requires totp_code in the request body.
     """
     # Account lockout: block after 5 failed attempts within 15 minutes
-    username_lower = login_data.username.lower()
-    now = datetime.now(timezone.utc)
-    attempts = _failed_logins[username_lower]
-    # Prune old attempts outside the window
-    _failed_logins[username_lower] = [t for t in attempts if now - t < _LOCKOUT_WINDOW]
-    if len(_failed_logins[username_lower]) >= _LOCKOUT_ATTEMPTS:
+    # (stored in the database so the counter is shared by all workers)
+    if login_lockout_service.is_locked(db, login_data.username):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Konto vorübergehend gesperrt. Bitte in 15 Minuten erneut versuchen."
@@ -114,16 +88,14 @@ def login(request: Request, response: Response, login_data: LoginRequest, db: Se
     user = db.query(User).filter(func.lower(User.username) == login_data.username.lower()).first()
 
     if not user or not user.is_active:
-        _failed_logins[username_lower].append(now)
-        _evict_failed_logins_if_needed()
+        login_lockout_service.record_failure(db, login_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Ungültiger Benutzername oder Passwort"
         )
 
     if not auth_service.verify_password(login_data.password, user.password_hash):
-        _failed_logins[username_lower].append(now)
-        _evict_failed_logins_if_needed()
+        login_lockout_service.record_failure(db, login_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Ungültiger Benutzername oder Passwort"
@@ -153,7 +125,7 @@ def login(request: Request, response: Response, login_data: LoginRequest, db: Se
             )
 
     # Clear failed login counter on success
-    _failed_logins.pop(username_lower, None)
+    login_lockout_service.clear(db, login_data.username)
 
     tenant_id_str = str(user.tenant_id) if user.tenant_id else None
     access_token = auth_service.create_access_token(str(user.id), user.role.value, user.token_version, tenant_id_str)
@@ -317,61 +289,25 @@ def update_profile(
 
 @router.get("/me/export")
 def export_my_data(
+    format: str = Query("json", pattern="^(json|ndjson|csv)$",
+                        description="json, ndjson oder csv (ZIP mit einer CSV-Datei je Bereich)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_reporting_db)
 ):
     """
-    DSGVO Art. 20 – Datenportabilität: export all personal data as JSON.
+    DSGVO Art. 20 – Datenportabilität: export all personal data.
+
+    Master data plus time entries, absences, vacation and change requests and
+    the audit log of the user's time entries, streamed in batches (see
+    data_export_service) instead of being built in memory. The download runs on
+    a reporting-pool session, at the client's pace.
     """
-    time_entries = db.query(TimeEntry).filter(TimeEntry.user_id == current_user.id).order_by(TimeEntry.date).all()
-    absences = db.query(Absence).filter(Absence.user_id == current_user.id).order_by(Absence.date).all()
-
-    data = {
-        "export_info": {
-            "basis": "Art. 20 DSGVO – Recht auf Datenübertragbarkeit",
-            "exported_at": datetime.now(timezone.utc).isoformat(),
-            "user_id": str(current_user.id),
-        },
-        "stammdaten": {
-            "username": current_user.username,
-            "first_name": current_user.first_name,
-            "last_name": current_user.last_name,
-            "email": current_user.email,
-            "role": current_user.role.value,
-            "weekly_hours": float(current_user.weekly_hours),
-            "vacation_days": current_user.vacation_days,
-            "is_active": current_user.is_active,
-            "created_at": current_user.created_at.isoformat() if current_user.created_at else None,
-        },
-        "zeiteintraege": [
-            {
-                "date": str(e.date),
-                "start_time": str(e.start_time),
-                "end_time": str(e.end_time),
-                "break_minutes": e.break_minutes,
-                "note": e.note,
-                "created_at": e.created_at.isoformat() if e.created_at else None,
-            }
-            for e in time_entries
-        ],
-        "abwesenheiten": [
-            {
-                "date": str(a.date),
-                "end_date": str(a.end_date) if a.end_date else None,
-                "type": a.type.value,
-                "note": a.note,
-                "created_at": a.created_at.isoformat() if a.created_at else None,
-            }
-            for a in absences
-        ],
-    }
-
-    return JSONResponse(
-        content=data,
-        headers={
-            "Content-Disposition": f'attachment; filename="PraxisZeit_Datenauszug_{current_user.username}.json"',
-            "Content-Type": "application/json; charset=utf-8",
-        }
+    filename = f"PraxisZeit_Datenauszug_{current_user.username}.{data_export_service.FILE_EXTENSIONS[format]}"
+    chunks = data_export_service.stream_export(db, current_user, format)
+    return StreamingResponse(
+        stream_with_session(db, chunks),
+        media_type=data_export_service.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"; filename*=UTF-8\'\'{quote(filename)}'},
     )
 
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
@@ -6,35 +6,19 @@ from app.services.timezone_service import today_local
 from app.database import get_db
 from app.models import User, TimeEntry, ChangeRequest, ChangeRequestType, ChangeRequestStatus, UserRole, Absence, AbsenceType
 from app.middleware.auth import get_current_user
+from app.core.pagination import keyset_page, set_next_cursor
+from app.core.query_metrics import query_budget
+from app.routers.admin_helpers import _enrich_cr_response, _enrich_cr_responses
 from app.schemas.change_request import ChangeRequestCreate, ChangeRequestResponse
-from app.services.break_validation_service import validate_daily_break
+from app.services.entry_validation_service import EntryValidationContext
 from app.routers.time_entries import (
-    _calculate_daily_net_hours,
-    MAX_DAILY_HOURS_HARD, MAX_NIGHT_WORKER_DAILY_WARN,
+    _raise_for_hard_limits, _night_worker_warning,
+    MAX_NIGHT_WORKER_DAILY_WARN,
 )
-from app.services.arbzg_utils import is_night_work
 
 router = APIRouter(prefix="/api/change-requests", tags=["change-requests"])
 
 
-def _enrich_response(cr: ChangeRequest, db: Session) -> ChangeRequestResponse:
-    """Add user names to the change request response."""
-    response = ChangeRequestResponse.model_validate(cr)
-
-    user = db.query(User).filter(User.id == cr.user_id).first()
-    if user:
-        response.user_first_name = user.first_name
-        response.user_last_name = user.last_name
-
-    if cr.reviewed_by:
-        reviewer = db.query(User).filter(User.id == cr.reviewed_by).first()
-        if reviewer:
-            response.reviewer_first_name = reviewer.first_name
-            response.reviewer_last_name = reviewer.last_name
-
-    return response
-
-
 @router.post("/", response_model=ChangeRequestResponse, status_code=status.HTTP_201_CREATED)
 def create_change_request(
     data: ChangeRequestCreate,
@@ -136,7 +120,7 @@ def create_change_request(
         db.add(cr)
         db.commit()
         db.refresh(cr)
-        return _enrich_response(cr, db)
+        return _enrich_cr_response(cr, db)
 
     # --- TimeEntry CR branch (existing logic) ---
 
@@ -187,35 +171,22 @@ def create_change_request(
         if entry.date >= today_local():
             raise HTTPException(status_code=400, detail="Heutige Einträge können direkt gelöscht werden")
 
-    # Break validation for CREATE and UPDATE (§18-Ausnahme: exempt_from_arbzg überspringt §3/§4)
-    if not current_user.exempt_from_arbzg and data.request_type in ("create", "update") and data.proposed_date:
-        break_error = validate_daily_break(
-            db=db,
-            user_id=current_user.id,
-            entry_date=data.proposed_date,
-            start_time=data.proposed_start_time,
-            end_time=data.proposed_end_time,
-            break_minutes=data.proposed_break_minutes or 0,
-            exclude_entry_id=entry.id if entry else None,
-        )
-        if break_error:
-            raise HTTPException(status_code=400, detail=break_error)
-
-        # §3 ArbZG: daily hours hard limit
-        daily_hours = _calculate_daily_net_hours(
-            db=db,
-            user_id=current_user.id,
-            entry_date=data.proposed_date,
-            start_time=data.proposed_start_time,
-            end_time=data.proposed_end_time,
-            break_minutes=data.proposed_break_minutes or 0,
+    # Break validation and §3 daily hard limit for CREATE and UPDATE
+    # (§18-Ausnahme: exempt_from_arbzg überspringt §3/§4)
+    check = None
+    if (
+        not current_user.exempt_from_arbzg
+        and data.request_type in ("create", "update")
+        and data.proposed_date
+        and data.proposed_start_time
+        and data.proposed_end_time
+    ):
+        check = EntryValidationContext.for_date(db, current_user.id, data.proposed_date).check(
+            data.proposed_date, data.proposed_start_time, data.proposed_end_time,
+            data.proposed_break_minutes or 0,
             exclude_entry_id=entry.id if entry else None,
         )
-        if daily_hours > MAX_DAILY_HOURS_HARD:
-            raise HTTPException(
-                status_code=422,
-                detail=f"Tagesarbeitszeit würde {daily_hours:.1f}h betragen und überschreitet die gesetzliche Höchstgrenze von {MAX_DAILY_HOURS_HARD:.0f}h (§3 ArbZG).",
-            )
+        _raise_for_hard_limits(check)
 
     # Check for duplicate pending requests
     existing_pending = db.query(ChangeRequest).filter(
@@ -261,44 +232,31 @@ def create_change_request(
     db.commit()
     db.refresh(cr)
 
-    response = _enrich_response(cr, db)
+    response = _enrich_cr_response(cr, db)
 
     # §6 Abs. 2 ArbZG: Warnung für Nachtarbeitnehmer (§18-Ausnahme beachten)
     if (
-        not current_user.exempt_from_arbzg
-        and data.request_type in ("create", "update")
-        and data.proposed_start_time
-        and data.proposed_end_time
+        check is not None
+        and current_user.is_night_worker
+        and check.night_work
+        and check.daily_hours > MAX_NIGHT_WORKER_DAILY_WARN
     ):
-        daily_hours_check = _calculate_daily_net_hours(
-            db=db,
-            user_id=current_user.id,
-            entry_date=data.proposed_date,
-            start_time=data.proposed_start_time,
-            end_time=data.proposed_end_time,
-            break_minutes=data.proposed_break_minutes or 0,
-            exclude_entry_id=entry.id if entry else None,
-        )
-        if (
-            current_user.is_night_worker
-            and is_night_work(data.proposed_start_time, data.proposed_end_time)
-            and daily_hours_check > MAX_NIGHT_WORKER_DAILY_WARN
-        ):
-            response.warnings.append(
-                f"§6 ArbZG: Nachtarbeitnehmer – Tageslimit 8h überschritten ({daily_hours_check:.1f}h). "
-                "Verlängerung auf 10h nur mit 1-Monats-Ausgleich zulässig."
-            )
+        response.warnings.append(_night_worker_warning(check.daily_hours))
 
     return response
 
 
 @router.get("/", response_model=List[ChangeRequestResponse])
+@query_budget(3)
 def list_change_requests(
+    response: Response,
     request_status: Optional[str] = Query(None, alias="status", description="Filter by status"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (keyset pagination)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """List own change requests (employee view)."""
+    """List own change requests (employee view), newest first."""
     query = db.query(ChangeRequest).filter(ChangeRequest.user_id == current_user.id)
 
     if request_status:
@@ -311,8 +269,9 @@ def list_change_requests(
                 detail=f"Ungültiger Status: {request_status}"
             )
 
-    requests = query.order_by(ChangeRequest.created_at.desc()).all()
-    return [_enrich_response(cr, db) for cr in requests]
+    requests, next_cursor = keyset_page(query, ChangeRequest, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return _enrich_cr_responses(requests, db)
 
 
 @router.get("/{request_id}", response_model=ChangeRequestResponse)
@@ -327,7 +286,7 @@ def get_change_request(
         raise HTTPException(status_code=404, detail="Antrag nicht gefunden")
     if cr.user_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Zugriff verweigert")
-    return _enrich_response(cr, db)
+    return _enrich_cr_response(cr, db)
 
 
 @router.delete("/{request_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from datetime import date, timedelta
+from datetime import date
 from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 
 from app.database import get_db
 from app.middleware.auth import get_current_user, require_admin
-from app.models import User, Absence, AbsenceType, PublicHoliday, CompanyClosure, UserRole, TimeEntry
+from app.models import User, Absence, AbsenceType, CompanyClosure, UserRole, TimeEntry
 from app.schemas.absence import AbsenceResponse
-from app.services import calculation_service
-from app.routers.admin_helpers import _create_audit_log
+from app.services import (
+    absence_ranges, audit_service, calculation_service, clock_status_service, data_version_service,
+    vacation_ledger_service,
+)
 
 router = APIRouter(prefix="/api/company-closures", tags=["company-closures"])
 
@@ -32,24 +34,10 @@ class CompanyClosureResponse(BaseModel):
     affected_employees: int = 0
 
 
-def _get_workdays(start: date, end: date, holidays: set) -> List[date]:
+def _get_workdays(db: Session, start: date, end: date) -> List[date]:
     """Return all workdays (Mon-Fri, excl. holidays) in range."""
-    days = []
-    current = start
-    while current <= end:
-        if current.weekday() < 5 and current not in holidays:
-            days.append(current)
-        current += timedelta(days=1)
-    return days
-
-
-def _get_holidays_for_range(db: Session, start: date, end: date) -> set:
-    years = set(range(start.year, end.year + 1))
-    holidays = set()
-    for year in years:
-        year_holidays = db.query(PublicHoliday).filter(PublicHoliday.year == year).all()
-        holidays.update([h.date for h in year_holidays])
-    return holidays
+    holidays = calculation_service.load_holiday_dates(db, range(start.year, end.year + 1))
+    return absence_ranges.workdays(start, end, holidays)
 
 
 @router.get("/", response_model=List[CompanyClosureResponse])
@@ -100,8 +88,7 @@ def create_closure(
     db.flush()  # Get ID without commit
 
     # Get all workdays in range
-    holidays = _get_holidays_for_range(db, data.start_date, data.end_date)
-    workdays = _get_workdays(data.start_date, data.end_date, holidays)
+    workdays = _get_workdays(db, data.start_date, data.end_date)
 
     if not workdays:
         raise HTTPException(status_code=400, detail="Keine Arbeitstage im angegebenen Zeitraum")
@@ -112,43 +99,53 @@ def create_closure(
         User.role != UserRole.ADMIN,
     ).all()
 
+    # One query each for already blocked days and the entries to replace, instead of two per employee and day
+    employee_ids = [employee.id for employee in employees]
+    blocked = set(db.query(Absence.user_id, Absence.date).filter(
+        Absence.user_id.in_(employee_ids),
+        Absence.date.in_(workdays),
+    ).all())
+    replaced = [
+        entry for entry in db.query(TimeEntry).filter(
+            TimeEntry.user_id.in_(employee_ids),
+            TimeEntry.tenant_id == current_user.tenant_id,
+            TimeEntry.date.in_(workdays),
+        ).all()
+        if (entry.user_id, entry.date) not in blocked
+    ]
+    # Delete existing time entries on these days, logged with one multi-row insert
+    audit_service.write(db, [
+        audit_service.entry_change(
+            entry.id, entry.user_id, current_user.id, "delete", old_entry=entry,
+            source="company_closure", tenant_id=current_user.tenant_id,
+        )
+        for entry in replaced
+    ])
+    clocked_out = {entry.user_id for entry in replaced if entry.end_time is None}
+    for entry in replaced:
+        db.delete(entry)
+
     affected = 0
     for employee in employees:
         for workday in workdays:
             # Skip if any absence already exists for this day (not just vacation)
-            existing = db.query(Absence).filter(
-                Absence.user_id == employee.id,
-                Absence.date == workday,
-            ).first()
-            if not existing:
-                # Delete existing time entries on this day with audit log
-                te_entries = db.query(TimeEntry).filter(
-                    TimeEntry.user_id == employee.id,
-                    TimeEntry.tenant_id == current_user.tenant_id,
-                    TimeEntry.date == workday,
-                ).all()
-                for entry in te_entries:
-                    _create_audit_log(
-                        db, entry.id, employee.id, current_user.id,
-                        action="delete", old_entry=entry,
-                        source="company_closure",
-                        tenant_id=current_user.tenant_id,
-                    )
-                    db.delete(entry)
-
-                absence = Absence(
-                    user_id=employee.id,
-                    tenant_id=current_user.tenant_id,
-                    date=workday,
-                    end_date=data.end_date,
-                    type=AbsenceType.VACATION,
-                    hours=float(calculation_service.get_daily_target_for_date(employee, workday)),
-                    note=f"Betriebsferien: {data.name}"
-                )
-                db.add(absence)
+            if (employee.id, workday) in blocked:
+                continue
+            absence = Absence(
+                user_id=employee.id,
+                tenant_id=current_user.tenant_id,
+                date=workday,
+                end_date=data.end_date,
+                type=AbsenceType.VACATION,
+                hours=float(calculation_service.get_daily_target_for_date(employee, workday)),
+                note=f"Betriebsferien: {data.name}"
+            )
+            db.add(absence)
         affected += 1
 
     db.commit()
+    for user_id in clocked_out:
+        clock_status_service.publish_entry(user_id, None)
     db.refresh(closure)
 
     return CompanyClosureResponse(
@@ -180,14 +177,16 @@ def delete_closure(
     # this deletion will miss those entries. A proper fix requires adding a
     # closure_id FK column on the Absence model (needs migration).
     note_pattern = f"Betriebsferien: {closure.name}"
-    holidays = _get_holidays_for_range(db, closure.start_date, closure.end_date)
-    workdays = _get_workdays(closure.start_date, closure.end_date, holidays)
+    workdays = _get_workdays(db, closure.start_date, closure.end_date)
 
     db.query(Absence).filter(
         Absence.date.in_(workdays),
         Absence.type == AbsenceType.VACATION,
         Absence.note == note_pattern
     ).delete(synchronize_session=False)
+    # Bulk delete bypasses the flush hook — invalidate the affected months explicitly
+    data_version_service.bump_tenant(db, current_user.tenant_id, workdays)
+    vacation_ledger_service.invalidate(db)
 
     db.delete(closure)
     db.commit()
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from datetime import datetime, date, timedelta
 from typing import List, Optional
-from app.database import get_db
+from app.database_read import get_read_db
 from app.models import User, TimeEntry, UserRole
 from app.models.absence import Absence
 from app.middleware.auth import get_current_user
+from app.core.conditional_get import not_modified_or_none, user_stamp
+from app.core.query_metrics import query_budget
 from app.schemas.reports import MonthlyDashboard, OvertimeAccount, OvertimeHistory, VacationAccount, YtdOvertime, MissingBookings, MissingBookingEntry
 from app.services import calculation_service
 from app.services.calculation_service import get_weekly_hours_for_date, get_daily_target_for_date
@@ -84,21 +86,31 @@ def _get_missing_bookings_for_user(db: Session, user: User) -> List[MissingBooki
 
 
 @router.get("/", response_model=MonthlyDashboard)
+@query_budget(16)
 def get_dashboard(
+    request: Request,
+    response: Response,
     year: Optional[int] = Query(None, description="Year (default: current year)"),
     month: Optional[int] = Query(None, description="Month (default: current month)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get dashboard data for current or specified month.
     Shows target, actual, and balance for the month.
+    Supports If-None-Match (304 when the month's data is unchanged).
     """
     # Use current month if not specified
     now = now_local()
     year = year or now.year
     month = month or now.month
 
+    month_start = date(year, month, 1)
+    stamp = user_stamp(db, current_user, month_start, month_start)
+    not_modified = not_modified_or_none(request, response, "dashboard", stamp, current_user.id, year, month)
+    if not_modified:
+        return not_modified
+
     target = calculation_service.get_monthly_target(db, current_user, year, month)
     actual = calculation_service.get_monthly_actual(db, current_user, year, month)
     balance = calculation_service.get_monthly_balance(db, current_user, year, month)
@@ -114,7 +126,7 @@ def get_dashboard(
 
 @router.get("/overtime", response_model=OvertimeAccount)
 def get_overtime_account(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -171,18 +183,28 @@ def get_overtime_account(
 
 
 @router.get("/ytd-overtime", response_model=YtdOvertime)
+@query_budget(10)
 def get_ytd_overtime(
+    request: Request,
+    response: Response,
     year: Optional[int] = Query(None, description="Year (default: current year)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get year-to-date overtime summary.
     Calculates target and actual hours from Jan 1 to today.
+    Supports If-None-Match (304 when the year's data is unchanged).
     """
     now = now_local()
     year = year or now.year
 
+    stamp = user_stamp(db, current_user, date(year, 1, 1), date(year, 12, 31))
+    # today is part of the ETag: the YTD range ends today
+    not_modified = not_modified_or_none(request, response, "ytd_overtime", stamp, current_user.id, year, now.date())
+    if not_modified:
+        return not_modified
+
     summary = calculation_service.get_ytd_summary(db, current_user, year)
 
     return YtdOvertime(
@@ -192,10 +214,13 @@ def get_ytd_overtime(
 
 
 @router.get("/vacation", response_model=VacationAccount)
+@query_budget(6)
 def get_vacation_account(
+    request: Request,
+    response: Response,
     year: Optional[int] = Query(None, description="Year (default: current year)"),
     user_id: Optional[str] = Query(None, description="User ID (admin only)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -204,6 +229,7 @@ def get_vacation_account(
 
     Regular users can only query their own data.
     Admins can query any user's data by providing user_id.
+    Supports If-None-Match (304 when the year's data is unchanged).
     """
     year = year or now_local().year
 
@@ -219,6 +245,12 @@ def get_vacation_account(
         if not target_user:
             raise HTTPException(status_code=404, detail="Benutzer nicht gefunden")
 
+    stamp = user_stamp(db, target_user, date(year, 1, 1), date(year, 12, 31))
+    # today is part of the ETag: the carryover warning depends on the current date
+    not_modified = not_modified_or_none(request, response, "vacation", stamp, target_user.id, year, today_local())
+    if not_modified:
+        return not_modified
+
     account = calculation_service.get_vacation_account(db, target_user, year)
 
     # Determine carryover deadline (individual or default: March 31 of next year)
@@ -244,8 +276,9 @@ def get_vacation_account(
 
 
 @router.get("/missing-bookings", response_model=MissingBookings)
+@query_budget(40)
 def get_missing_bookings(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get missing/open bookings for current user."""
@@ -267,7 +300,7 @@ def get_missing_bookings(
 
 @router.get("/missing-bookings/team", response_model=List[MissingBookings])
 def get_team_missing_bookings(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get missing/open bookings for all active employees (admin only)."""
@@ -2,6 +2,8 @@
 Admin-Endpoints für den XLS-Import von historischen Zeiterfassungsdaten.
 POST /api/admin/import/preview  — Datei parsen, Vorschau zurückgeben
 POST /api/admin/import/confirm  — Import ausführen
+POST /api/admin/import/batch/preview — mehrere Dateien/Benutzer parsen
+POST /api/admin/import/batch/confirm — Sammel-Import in einer Transaktion
 """
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from pydantic import BaseModel
@@ -15,8 +17,12 @@ from app.models import User
 from app.services.xls_import_service import (
     ImportedEntry,
     ImportResult,
+    ImportJobItem,
+    ImportJobResult,
+    MAX_FILE_SIZE_BYTES,
     parse_xls,
     execute_import,
+    execute_import_job,
 )
 
 router = APIRouter(
@@ -33,6 +39,23 @@ class PreviewResponse(BaseModel):
     arbzg_warnings: int
 
 
+class BatchPreviewItem(PreviewResponse):
+    user_id: uuid.UUID
+    filename: str
+
+
+class BatchPreviewResponse(BaseModel):
+    items: list[BatchPreviewItem]
+    total: int
+    conflicts: int
+    arbzg_warnings: int
+
+
+class BatchConfirmRequest(BaseModel):
+    overwrite: bool
+    items: list[ImportJobItem]
+
+
 class ConfirmRequest(BaseModel):
     user_id: uuid.UUID
     overwrite: bool
@@ -40,6 +63,35 @@ class ConfirmRequest(BaseModel):
     filename: Optional[str] = "import.xls"
 
 
+def _parse_upload(file: UploadFile, user_id: uuid.UUID, db: Session) -> list[ImportedEntry]:
+    # Size check before reading entire file into memory (5MB limit)
+    content = file.file.read(MAX_FILE_SIZE_BYTES + 1)
+    if len(content) > MAX_FILE_SIZE_BYTES:
+        raise HTTPException(status_code=400, detail="Datei zu groß (max. 5 MB)")
+
+    try:
+        return parse_xls(content, user_id, db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _preview(entries: list[ImportedEntry]) -> PreviewResponse:
+    return PreviewResponse(
+        entries=entries,
+        total=len(entries),
+        conflicts=sum(1 for e in entries if e.has_conflict),
+        arbzg_warnings=sum(len(e.arbzg_warnings) for e in entries),
+    )
+
+
+def _verify_users(db: Session, user_ids) -> None:
+    """Alle Zielbenutzer mit einer Abfrage prüfen."""
+    wanted = set(user_ids)
+    found = {row.id for row in db.query(User.id).filter(User.id.in_(wanted)).all()}
+    if found != wanted:
+        raise HTTPException(status_code=400, detail="Benutzer nicht gefunden")
+
+
 @router.post("/preview", response_model=PreviewResponse)
 def preview_import(
     file: UploadFile = File(...),
@@ -57,22 +109,8 @@ def preview_import(
     if not target_user:
         raise HTTPException(status_code=400, detail="Benutzer nicht gefunden")
 
-    # Size check before reading entire file into memory (5MB limit)
-    content = file.file.read(5 * 1024 * 1024 + 1)
-    if len(content) > 5 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="Datei zu groß (max. 5 MB)")
-
-    try:
-        entries = parse_xls(content, user_id, db)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    return PreviewResponse(
-        entries=entries,
-        total=len(entries),
-        conflicts=sum(1 for e in entries if e.has_conflict),
-        arbzg_warnings=sum(len(e.arbzg_warnings) for e in entries),
-    )
+    entries = _parse_upload(file, user_id, db)
+    return _preview(entries)
 
 
 @router.post("/confirm", response_model=ImportResult)
@@ -98,3 +136,61 @@ def confirm_import(
         filename=body.filename or "import.xls",
         tenant_id=current_admin.tenant_id,
     )
+
+
+@router.post("/batch/preview", response_model=BatchPreviewResponse)
+def preview_batch_import(
+    files: list[UploadFile] = File(...),
+    user_ids: list[uuid.UUID] = Form(...),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(require_admin),
+):
+    """
+    Vorschau für mehrere Dateien. ``user_ids`` enthält entweder einen Benutzer
+    für alle Dateien oder genau einen Benutzer pro Datei (gleiche Reihenfolge).
+    """
+    if len(user_ids) == 1:
+        user_ids = user_ids * len(files)
+    if len(user_ids) != len(files):
+        raise HTTPException(
+            status_code=400,
+            detail="Anzahl der Benutzer passt nicht zur Anzahl der Dateien",
+        )
+    _verify_users(db, user_ids)
+
+    items = []
+    for file, user_id in zip(files, user_ids):
+        try:
+            preview = _preview(_parse_upload(file, user_id, db))
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=f"{file.filename}: {e.detail}")
+        items.append(BatchPreviewItem(
+            **preview.model_dump(), user_id=user_id, filename=file.filename or "import.xls",
+        ))
+
+    return BatchPreviewResponse(
+        items=items,
+        total=sum(i.total for i in items),
+        conflicts=sum(i.conflicts for i in items),
+        arbzg_warnings=sum(i.arbzg_warnings for i in items),
+    )
+
+
+@router.post("/batch/confirm", response_model=ImportJobResult)
+def confirm_batch_import(
+    body: BatchConfirmRequest,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(require_admin),
+):
+    """Führt einen Sammel-Import (mehrere Dateien/Benutzer) in einer Transaktion aus."""
+    if not body.items:
+        raise HTTPException(status_code=400, detail="Keine Dateien zum Import übergeben")
+    _verify_users(db, [item.user_id for item in body.items])
+
+    return execute_import_job(
+        items=body.items,
+        overwrite=body.overwrite,
+        db=db,
+        changed_by_id=current_admin.id,
+        tenant_id=current_admin.tenant_id,
+    )
@@ -1,49 +1,103 @@
 # backend/app/routers/journal.py
 """Journal-Router: Monatsjournal für Admin und Mitarbeiter."""
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, date
+from typing import Optional, Tuple, Union
 
-from app.database import get_db
+from app.database_read import get_read_db
 from app.models import User
 from app.middleware.auth import get_current_user, require_admin
+from app.core.conditional_get import not_modified_or_none, user_stamp
+from app.core.query_metrics import query_budget
 from app.services import journal_service
 from app.services.timezone_service import now_local
-from app.schemas.journal import JournalResponse
+from app.schemas.journal import JournalRangeResponse, JournalResponse
 
 router = APIRouter(prefix="/api", tags=["journal"])
 
 
-@router.get("/admin/users/{user_id}/journal", response_model=JournalResponse)
+def _journal_not_modified(request: Request, response: Response, db: Session, user: User, year: int, month: int):
+    """304 if nothing changed up to the journal month (yearly_overtime covers all earlier months)."""
+    stamp = user_stamp(db, user, date.min, date(year, month, 1))
+    return not_modified_or_none(request, response, "journal", stamp, user.id, year, month)
+
+
+def _parse_range(from_month: Optional[str], to_month: Optional[str]) -> Optional[Tuple[int, int, int, int]]:
+    """(from_year, from_month, to_year, to_month) of ?from=&to=, None if no range was requested."""
+    if from_month is None and to_month is None:
+        return None
+    if from_month is None or to_month is None:
+        raise HTTPException(status_code=400, detail="from und to müssen gemeinsam angegeben werden")
+    try:
+        from_year, from_num = map(int, from_month.split('-'))
+        to_year, to_num = map(int, to_month.split('-'))
+        date(from_year, from_num, 1)
+        date(to_year, to_num, 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ungültiges Monatsformat (YYYY-MM erwartet)")
+    span = (to_year - from_year) * 12 + to_num - from_num + 1
+    if span < 1:
+        raise HTTPException(status_code=400, detail="Ende des Zeitraums liegt vor dem Anfang")
+    if span > journal_service.MAX_RANGE_MONTHS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Zeitraum darf höchstens {journal_service.MAX_RANGE_MONTHS} Monate umfassen",
+        )
+    return from_year, from_num, to_year, to_num
+
+
+def _journal(request: Request, response: Response, db: Session, user: User,
+             year: Optional[int], month: Optional[int], from_month: Optional[str], to_month: Optional[str]):
+    months = _parse_range(from_month, to_month)
+    if months is None:
+        now = now_local()
+        year = year or now.year
+        month = month or now.month
+        not_modified = _journal_not_modified(request, response, db, user, year, month)
+        if not_modified:
+            return not_modified
+        return journal_service.get_journal(db, user, year, month)
+
+    from_year, from_num, to_year, to_num = months
+    stamp = user_stamp(db, user, date.min, date(to_year, to_num, 1))
+    not_modified = not_modified_or_none(request, response, "journal-range", stamp, user.id, *months)
+    if not_modified:
+        return not_modified
+    return journal_service.get_journal_range(db, user, from_year, from_num, to_year, to_num)
+
+
+@router.get("/admin/users/{user_id}/journal", response_model=Union[JournalResponse, JournalRangeResponse])
 def get_user_journal(
+    request: Request,
+    response: Response,
     user_id: str,
     year: int = Query(default=None, ge=2000, le=2100, description="Jahr (Standard: aktuell)"),
     month: int = Query(default=None, ge=1, le=12, description="Monat 1-12 (Standard: aktuell)"),
-    db: Session = Depends(get_db),
+    from_month: Optional[str] = Query(default=None, alias="from", description="Erster Monat (YYYY-MM)"),
+    to_month: Optional[str] = Query(default=None, alias="to", description="Letzter Monat (YYYY-MM)"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin),
 ):
-    """Monatsjournal eines Mitarbeiters (Admin-Zugriff)."""
-    now = now_local()
-    year = year or now.year
-    month = month or now.month
-
+    """Monatsjournal eines Mitarbeiters (Admin-Zugriff); mit from/to für mehrere Monate."""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="Benutzer nicht gefunden")
 
-    return journal_service.get_journal(db, user, year, month)
+    return _journal(request, response, db, user, year, month, from_month, to_month)
 
 
-@router.get("/journal/me", response_model=JournalResponse)
+@router.get("/journal/me", response_model=Union[JournalResponse, JournalRangeResponse])
+@query_budget(16)
 def get_my_journal(
+    request: Request,
+    response: Response,
     year: int = Query(default=None, ge=2000, le=2100, description="Jahr (Standard: aktuell)"),
     month: int = Query(default=None, ge=1, le=12, description="Monat 1-12 (Standard: aktuell)"),
-    db: Session = Depends(get_db),
+    from_month: Optional[str] = Query(default=None, alias="from", description="Erster Monat (YYYY-MM)"),
+    to_month: Optional[str] = Query(default=None, alias="to", description="Letzter Monat (YYYY-MM)"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Monatsjournal des aktuell eingeloggten Mitarbeiters."""
-    now = now_local()
-    year = year or now.year
-    month = month or now.month
-
-    return journal_service.get_journal(db, current_user, year, month)
+    """Monatsjournal des aktuell eingeloggten Mitarbeiters; mit from/to für mehrere Monate (max. 12)."""
+    return _journal(request, response, db, current_user, year, month, from_month, to_month)
@@ -10,12 +10,16 @@ from io import BytesIO
 from datetime import date
 from urllib.parse import quote
 from app.database import get_db
+from app.database_read import get_report_db
 from app.models import User, Absence, AbsenceType, TimeEntry, TimeEntryAuditLog
 from app.middleware.auth import require_admin
 from app.schemas.reports import EmployeeMonthlyReport, EmployeeYearlyAbsences
-from app.services import calculation_service, export_service, ods_export_service, rest_time_service
+from app.services import calculation_service, rest_time_service
+# export_service and ods_export_service (openpyxl, odfpy, reportlab) are imported
+# inside the export routes: they load on the first export, not at startup
 from app.services.arbzg_utils import is_night_work
 from app.core.limiter import limiter
+from app.core.date_filters import year_filter
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +38,8 @@ def _get_active_visible_users(db: Session) -> list:
 def get_monthly_report(
     month: str = Query(..., description="Month in YYYY-MM format"),
     include_health_data: bool = Query(False, description="Krankheitsdaten einschließen (Art. 9 DSGVO)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
+    write_db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -61,8 +66,8 @@ def get_monthly_report(
             new_note=f"Monatsreport {year}-{month_num:02d} (inkl. Krankheitsstunden) gelesen von Admin: {current_user.username}",
             tenant_id=current_user.tenant_id,
         )
-        db.add(audit)
-        db.commit()
+        write_db.add(audit)
+        write_db.commit()
 
     users = _get_active_visible_users(db)
 
@@ -115,7 +120,8 @@ def get_monthly_report(
 def get_yearly_absences(
     year: int = Query(..., description="Year (e.g., 2025)"),
     include_health_data: bool = Query(False, description="Krankheitsdaten einschließen (Art. 9 DSGVO)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
+    write_db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -137,10 +143,11 @@ def get_yearly_absences(
             new_note=f"Jahres-Abwesenheitsübersicht {year} (inkl. Krankheitstage) gelesen von Admin: {current_user.username}",
             tenant_id=current_user.tenant_id,
         )
-        db.add(audit)
-        db.commit()
+        write_db.add(audit)
+        write_db.commit()
 
     users = _get_active_visible_users(db)
+    vacation_accounts = calculation_service.get_vacation_accounts(db, users, year)
 
     results = []
 
@@ -199,7 +206,7 @@ def get_yearly_absences(
         total_days = vacation_days + effective_sick_days + training_days + overtime_comp_days + other_days
 
         # Calculate remaining vacation
-        vacation_account = calculation_service.get_vacation_account(db, user, year)
+        vacation_account = vacation_accounts[user.id]
         remaining_vacation_days = vacation_account['remaining_days']
 
         # Calculate overtime for the year (up to today for current year, full year otherwise)
@@ -229,7 +236,8 @@ def export_monthly_report(
     request: Request,
     month: str = Query(..., description="Month in YYYY-MM format"),
     include_health_data: bool = Query(False, description="Include sick/health data (Art. 9 DSGVO – logged in audit trail)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
+    write_db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -252,10 +260,11 @@ def export_monthly_report(
             new_note=f"Gesundheitsdaten (Art. 9 DSGVO) im Monatsreport {year}-{month_num:02d} exportiert – Admin: {current_user.username}",
             tenant_id=current_user.tenant_id,
         )
-        db.add(log)
-        db.commit()
+        write_db.add(log)
+        write_db.commit()
 
     # Generate Excel file
+    from app.services import export_service
     excel_file = export_service.generate_monthly_report(db, year, month_num, include_health_data)
 
     # Create filename
@@ -275,7 +284,8 @@ def export_yearly_report(
     request: Request,
     year: int = Query(..., description="Year (e.g., 2026)"),
     include_health_data: bool = Query(False, description="Include sick/health data (Art. 9 DSGVO – logged in audit trail)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
+    write_db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -296,9 +306,10 @@ def export_yearly_report(
             new_note=f"Gesundheitsdaten (Art. 9 DSGVO) im Jahresreport {year} exportiert – Admin: {current_user.username}",
             tenant_id=current_user.tenant_id,
         )
-        db.add(log)
-        db.commit()
+        write_db.add(log)
+        write_db.commit()
 
+    from app.services import export_service
     excel_file = export_service.generate_yearly_report(db, year, include_health_data)
     filename = f"PraxisZeit_Jahresreport_{year}.xlsx"
     return StreamingResponse(
@@ -314,7 +325,8 @@ def export_yearly_report_classic(
     request: Request,
     year: int = Query(..., description="Year (e.g., 2026)"),
     include_health_data: bool = Query(False, description="Include sick/health data (Art. 9 DSGVO – logged in audit trail)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
+    write_db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -332,9 +344,10 @@ def export_yearly_report_classic(
             new_note=f"Gesundheitsdaten (Art. 9 DSGVO) im Jahresreport Classic {year} exportiert – Admin: {current_user.username}",
             tenant_id=current_user.tenant_id,
         )
-        db.add(log)
-        db.commit()
+        write_db.add(log)
+        write_db.commit()
 
+    from app.services import export_service
     excel_file = export_service.generate_yearly_report_classic(db, year, include_health_data)
     filename = f"PraxisZeit_Jahresreport_Classic_{year}.xlsx"
     return StreamingResponse(
@@ -353,7 +366,8 @@ def export_monthly_report_ods(
     request: Request,
     month: str = Query(..., description="Month in YYYY-MM format"),
     include_health_data: bool = Query(False, description="Include sick/health data (Art. 9 DSGVO – logged in audit trail)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
+    write_db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
     """Export monthly report as ODS file (Open Document Spreadsheet).
@@ -373,9 +387,10 @@ def export_monthly_report_ods(
             new_note=f"Gesundheitsdaten (Art. 9 DSGVO) im ODS-Monatsreport {year}-{month_num:02d} exportiert – Admin: {current_user.username}",
             tenant_id=current_user.tenant_id,
         )
-        db.add(log)
-        db.commit()
+        write_db.add(log)
+        write_db.commit()
 
+    from app.services import ods_export_service
     ods_file = ods_export_service.generate_monthly_report(db, year, month_num, include_health_data)
     filename = f"PraxisZeit_Monatsreport_{year}_{month_num:02d}.ods"
     return StreamingResponse(
@@ -391,7 +406,8 @@ def export_monthly_report_pdf(
     request: Request,
     month: str = Query(..., description="Month in YYYY-MM format"),
     include_health_data: bool = Query(False, description="Include sick/health data (Art. 9 DSGVO – logged in audit trail)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
+    write_db: Session = Depends(get_db),
     current_user: User = Depends(require_admin)
 ):
     """Export monthly report as PDF file (landscape A4, one page per employee)."""
@@ -410,9 +426,10 @@ def export_monthly_report_pdf(
             new_note=f"Gesundheitsdaten (Art. 9 DSGVO) im PDF-Monatsreport {year}-{month_num:02d} exportiert – Admin: {current_user.username}",
             tenant_id=current_user.tenant_id,
         )
-        db.add(log)
-        db.commit()
+        write_db.add(log)
+        write_db.commit()
 
+    from app.services import export_service
     pdf_file = export_service.generate_monthly_report_pdf(db, year, month_num, include_health_data)
     filename = f"PraxisZeit_Monatsreport_{year}_{month_num:02d}.pdf"
     return StreamingResponse(
@@ -427,10 +444,11 @@ def export_monthly_report_pdf(
 def export_yearly_report_ods(
     request: Request,
     year: int = Query(..., description="Year (e.g., 2026)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
     current_user: User = Depends(require_admin)
 ):
     """Export yearly detailed report as ODS file."""
+    from app.services import ods_export_service
     ods_file = ods_export_service.generate_yearly_report(db, year)
     filename = f"PraxisZeit_Jahresreport_{year}.ods"
     return StreamingResponse(
@@ -445,10 +463,11 @@ def export_yearly_report_ods(
 def export_yearly_report_classic_ods(
     request: Request,
     year: int = Query(..., description="Year (e.g., 2026)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
     current_user: User = Depends(require_admin)
 ):
     """Export yearly classic report as ODS file."""
+    from app.services import ods_export_service
     ods_file = ods_export_service.generate_yearly_report_classic(db, year)
     filename = f"PraxisZeit_Jahresreport_Classic_{year}.ods"
     return StreamingResponse(
@@ -463,7 +482,7 @@ def get_rest_time_violations(
     year: int = Query(..., description="Year to check"),
     month: int = Query(None, description="Optional month to check"),
     min_rest_hours: float = Query(None, description="Minimum rest hours (default: 11)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -487,7 +506,7 @@ def get_rest_time_violations(
 @router.get("/sunday-summary")
 def get_sunday_summary(
     year: int = Query(..., description="Year to check (e.g., 2026)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -514,7 +533,7 @@ def get_sunday_summary(
             db.query(TimeEntry)
             .filter(
                 TimeEntry.user_id == user.id,
-                extract("year", TimeEntry.date) == year,
+                year_filter(TimeEntry.date, year),
             )
             .all()
         )
@@ -546,7 +565,7 @@ def get_sunday_summary(
 @router.get("/night-work-summary")
 def get_night_work_summary(
     year: int = Query(..., description="Year to check (e.g., 2026)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -563,7 +582,7 @@ def get_night_work_summary(
             db.query(TimeEntry)
             .filter(
                 TimeEntry.user_id == user.id,
-                extract("year", TimeEntry.date) == year,
+                year_filter(TimeEntry.date, year),
                 TimeEntry.end_time.isnot(None),
             )
             .order_by(TimeEntry.date)
@@ -602,7 +621,7 @@ def get_night_work_summary(
 @router.get("/compensatory-rest")
 def get_compensatory_rest(
     year: int = Query(..., description="Year to check (e.g., 2026)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_report_db),
     current_user: User = Depends(require_admin)
 ):
     """
@@ -621,7 +640,7 @@ def get_compensatory_rest(
             db.query(TimeEntry)
             .filter(
                 TimeEntry.user_id == user.id,
-                extract("year", TimeEntry.date) == year,
+                year_filter(TimeEntry.date, year),
                 TimeEntry.end_time.isnot(None),
             )
             .all()
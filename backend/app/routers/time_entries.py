@@ -1,20 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import extract
 from typing import List, Optional
 from datetime import datetime, date, time, timezone
 from app.services.timezone_service import LOCAL_TZ, now_local as _now_local, today_local as _today_local
 from app.database import get_db
 from app.models import User, TimeEntry, UserRole
 from app.middleware.auth import get_current_user
+from app.core.date_filters import month_filter
+from app.core.query_metrics import query_budget
 from app.schemas.time_entry import (
     TimeEntryCreate, TimeEntryUpdate, TimeEntryResponse,
     ClockInRequest, ClockOutRequest, ClockStatusResponse,
 )
 from app.services.holiday_service import is_holiday
-from app.services.break_validation_service import validate_daily_break
+from app.services.entry_validation_service import EntryValidationContext, EntryCheck, MIN_REST_HOURS
 from app.services.arbzg_utils import is_night_work, NIGHT_THRESHOLD_MINUTES
-from uuid import UUID as UUIDType
+from app.services import clock_status_service
 
 router = APIRouter(prefix="/api/time-entries", tags=["time-entries"])
 
@@ -26,66 +29,26 @@ MAX_NIGHT_WORKER_DAILY_WARN = 8.0   # §6 Abs. 2 ArbZG: Tageslimit für Nachtarb
 NIGHT_START = time(23, 0)
 NIGHT_END   = time(6, 0)
 
+CLOCK_STREAM_KEEPALIVE_SECONDS = 25       # SSE comment ping (keeps proxies from timing out)
+CLOCK_STREAM_MAX_SECONDS = 15 * 60        # client reconnects with a fresh access token
 
-def _net_hours(st: time, et: time, brk: int) -> float:
-    """Calculate net working hours from start/end time and break minutes."""
-    mins = (et.hour * 60 + et.minute) - (st.hour * 60 + st.minute)
-    return max(0.0, (mins - brk) / 60.0)
-
-
-def _calculate_daily_net_hours(
-    db: Session,
-    user_id: UUIDType,
-    entry_date: date,
-    start_time: time,
-    end_time: time,
-    break_minutes: int,
-    exclude_entry_id=None,
-) -> float:
-    """Sum up all net hours for a user on a given date, including the new/updated entry."""
-    query = db.query(TimeEntry).filter(
-        TimeEntry.user_id == user_id,
-        TimeEntry.date == entry_date,
-        TimeEntry.end_time.isnot(None),
-    )
-    if exclude_entry_id:
-        query = query.filter(TimeEntry.id != exclude_entry_id)
-    existing = query.all()
-
-    total = sum(_net_hours(e.start_time, e.end_time, e.break_minutes) for e in existing)
-    total += _net_hours(start_time, end_time, break_minutes)
-    return total
 
+def _raise_for_hard_limits(check: EntryCheck) -> None:
+    """Reject writes violating §4 (breaks) or the §3 daily maximum of 10h."""
+    if check.break_error:
+        raise HTTPException(status_code=400, detail=check.break_error)
+    if check.daily_hours > MAX_DAILY_HOURS_HARD:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Tagesarbeitszeit würde {check.daily_hours:.1f}h betragen und überschreitet die gesetzliche Höchstgrenze von {MAX_DAILY_HOURS_HARD:.0f}h (§3 ArbZG).",
+        )
 
-def _calculate_weekly_net_hours(
-    db: Session,
-    user_id: UUIDType,
-    entry_date: date,
-    start_time: time,
-    end_time: time,
-    break_minutes: int,
-    exclude_entry_id=None,
-) -> float:
-    """Sum all net hours for the ISO calendar week containing entry_date, including the new/updated entry."""
-    from datetime import timedelta
-    # Monday of that ISO week
-    monday = entry_date - timedelta(days=entry_date.weekday())
-    sunday = monday + timedelta(days=6)
 
-    query = db.query(TimeEntry).filter(
-        TimeEntry.user_id == user_id,
-        TimeEntry.date >= monday,
-        TimeEntry.date <= sunday,
-        TimeEntry.end_time.isnot(None),
+def _night_worker_warning(daily_hours: float) -> str:
+    return (
+        f"§6 ArbZG: Nachtarbeitnehmer – Tageslimit 8h überschritten ({daily_hours:.1f}h). "
+        "Verlängerung auf 10h nur mit 1-Monats-Ausgleich zulässig."
     )
-    if exclude_entry_id:
-        query = query.filter(TimeEntry.id != exclude_entry_id)
-    existing = query.all()
-
-    total = sum(_net_hours(e.start_time, e.end_time, e.break_minutes) for e in existing)
-    total += _net_hours(start_time, end_time, break_minutes)
-    return total
-
 
 
 def _enrich_response(
@@ -126,18 +89,25 @@ def _get_open_entry(db: Session, user_id, with_lock: bool = False) -> Optional[T
     return query.first()
 
 
-def _close_stale_entry(db: Session, entry: TimeEntry) -> None:
-    """Close a stale open entry at 23:59 of its date."""
+def _mark_auto_closed(entry: TimeEntry) -> None:
+    """End a stale open entry at 23:59 of its date and flag it in the note (caller commits)."""
     entry.end_time = time(23, 59)
     entry.note = (entry.note or '') + ' [auto-closed]'
     if entry.note.startswith(' '):
         entry.note = entry.note.strip()
+
+
+def _close_stale_entry(db: Session, entry: TimeEntry) -> None:
+    """Close a stale open entry at 23:59 of its date."""
+    _mark_auto_closed(entry)
     db.commit()
+    clock_status_service.publish_entry(entry.user_id, None)
 
 
 # --- Clock endpoints (must be BEFORE /{entry_id} to avoid route conflicts) ---
 
 @router.get("/clock-status", response_model=ClockStatusResponse)
+@query_budget(4)
 def get_clock_status(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -146,6 +116,7 @@ def get_clock_status(
     open_entry = _get_open_entry(db, current_user.id)
 
     if not open_entry:
+        clock_status_service.publish_entry(current_user.id, None)
         return ClockStatusResponse(is_clocked_in=False)
 
     # If the open entry is from a previous day, auto-close it
@@ -153,6 +124,8 @@ def get_clock_status(
         _close_stale_entry(db, open_entry)
         return ClockStatusResponse(is_clocked_in=False)
 
+    clock_status_service.publish_entry(current_user.id, open_entry)
+
     # Calculate elapsed minutes in local time
     now = _now_local()
     start_dt = datetime.combine(open_entry.date, open_entry.start_time, tzinfo=LOCAL_TZ)
@@ -168,6 +141,54 @@ def get_clock_status(
     )
 
 
+async def _clock_status_events(request: Request, user_id, initial: "clock_status_service.ClockSnapshot"):
+    """Yield the current snapshot, then one event per change (keepalive comments in between)."""
+    hub = clock_status_service.hub
+    queue = hub.subscribe(user_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + CLOCK_STREAM_MAX_SECONDS
+    try:
+        # Subscribed first, so a change published after this read is not lost
+        yield clock_status_service.format_sse(hub.get_snapshot(user_id) or initial)
+        while loop.time() < deadline:
+            if await request.is_disconnected():
+                break
+            timeout = min(CLOCK_STREAM_KEEPALIVE_SECONDS, max(deadline - loop.time(), 0))
+            try:
+                snapshot = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield clock_status_service.format_sse(snapshot)
+    finally:
+        hub.unsubscribe(user_id, queue)
+
+
+@router.get("/clock-status/stream")
+def stream_clock_status(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Server-sent events with the clock-in/out state of the authenticated user.
+
+    The first event is served from the in-memory snapshot (one DB lookup only
+    if the user has none yet); afterwards the stream only emits when clock_in /
+    clock_out publish a change. The DB session is released before streaming.
+    """
+    snapshot = clock_status_service.hub.get_snapshot(current_user.id)
+    if snapshot is None:
+        snapshot = clock_status_service.ClockSnapshot.from_entry(_get_open_entry(db, current_user.id))
+        clock_status_service.hub.publish(current_user.id, snapshot)
+
+    return StreamingResponse(
+        _clock_status_events(request, current_user.id, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/clock-in", response_model=TimeEntryResponse, status_code=status.HTTP_201_CREATED)
 def clock_in(
     body: ClockInRequest,
@@ -208,23 +229,15 @@ def clock_in(
     # §5 ArbZG: Ruhezeit-Warnung (11h seit letztem Arbeitsende)
     clock_in_warnings: list[str] = []
     if not current_user.exempt_from_arbzg:
-        last_entry = db.query(TimeEntry).filter(
-            TimeEntry.user_id == current_user.id,
-            TimeEntry.end_time.isnot(None),
-            TimeEntry.date <= now.date(),
-        ).order_by(TimeEntry.date.desc(), TimeEntry.end_time.desc()).first()
-
-        if last_entry:
-            from datetime import timedelta
-            last_end = datetime.combine(last_entry.date, last_entry.end_time)
-            current_start = datetime.combine(now.date(), entry.start_time)
-            rest_hours = (current_start - last_end).total_seconds() / 3600
-            if rest_hours < 11:
-                clock_in_warnings.append(f"REST_TIME_WARNING: Nur {rest_hours:.1f}h Ruhezeit seit letztem Arbeitsende (Minimum: 11h, §5 ArbZG)")
+        context = EntryValidationContext.for_date(db, current_user.id, now.date())
+        rest_hours = context.rest_hours_at(now.date(), entry.start_time)
+        if rest_hours is not None and rest_hours < MIN_REST_HOURS:
+            clock_in_warnings.append(f"REST_TIME_WARNING: Nur {rest_hours:.1f}h Ruhezeit seit letztem Arbeitsende (Minimum: 11h, §5 ArbZG)")
 
     db.add(entry)
     db.commit()
     db.refresh(entry)
+    clock_status_service.publish_entry(current_user.id, entry)
 
     response = TimeEntryResponse.model_validate(entry)
     response.is_editable = True
@@ -260,15 +273,12 @@ def clock_out(
     exempt = current_user.exempt_from_arbzg
 
     # §3 ArbZG: check daily hours before committing – skipped for exempt users
-    daily_hours = _calculate_daily_net_hours(
-        db=db,
-        user_id=current_user.id,
-        entry_date=open_entry.date,
-        start_time=open_entry.start_time,
-        end_time=new_end_time,
-        break_minutes=body.break_minutes,
+    context = EntryValidationContext.for_date(db, current_user.id, open_entry.date)
+    check = context.check(
+        open_entry.date, open_entry.start_time, new_end_time, body.break_minutes,
         exclude_entry_id=open_entry.id,
     )
+    daily_hours = check.daily_hours
     if not exempt and daily_hours > MAX_DAILY_HOURS_HARD:
         raise HTTPException(
             status_code=422,
@@ -282,34 +292,16 @@ def clock_out(
 
     db.commit()
     db.refresh(open_entry)
+    clock_status_service.publish_entry(current_user.id, None)
 
     clock_out_warnings: list[str] = []
     if not exempt:
         # ArbZG §4: break validation (warning only, don't block clock-out)
-        break_error = validate_daily_break(
-            db=db,
-            user_id=current_user.id,
-            entry_date=open_entry.date,
-            start_time=open_entry.start_time,
-            end_time=new_end_time,
-            break_minutes=body.break_minutes,
-            exclude_entry_id=open_entry.id,
-        )
-        if break_error:
-            clock_out_warnings.append(f"BREAK_WARNING: {break_error}")
-    if not exempt:
+        if check.break_error:
+            clock_out_warnings.append(f"BREAK_WARNING: {check.break_error}")
         if daily_hours > MAX_DAILY_HOURS_WARN:
             clock_out_warnings.append("DAILY_HOURS_WARNING")
-        weekly_hours_out = _calculate_weekly_net_hours(
-            db=db,
-            user_id=current_user.id,
-            entry_date=open_entry.date,
-            start_time=open_entry.start_time,
-            end_time=new_end_time,
-            break_minutes=body.break_minutes,
-            exclude_entry_id=open_entry.id,
-        )
-        if weekly_hours_out > MAX_WEEKLY_HOURS_WARN:
+        if check.weekly_hours > MAX_WEEKLY_HOURS_WARN:
             clock_out_warnings.append("WEEKLY_HOURS_WARNING")
         if open_entry.date.weekday() == 6:
             clock_out_warnings.append("SUNDAY_WORK")
@@ -317,13 +309,10 @@ def clock_out(
             clock_out_warnings.append("HOLIDAY_WORK")
         if (
             current_user.is_night_worker
-            and is_night_work(open_entry.start_time, new_end_time)
+            and check.night_work
             and daily_hours > MAX_NIGHT_WORKER_DAILY_WARN
         ):
-            clock_out_warnings.append(
-                f"§6 ArbZG: Nachtarbeitnehmer – Tageslimit 8h überschritten ({daily_hours:.1f}h). "
-                "Verlängerung auf 10h nur mit 1-Monats-Ausgleich zulässig."
-            )
+            clock_out_warnings.append(_night_worker_warning(daily_hours))
 
     response = TimeEntryResponse.model_validate(open_entry)
     _enrich_response(response, open_entry, current_user, db, warnings=clock_out_warnings)
@@ -333,6 +322,7 @@ def clock_out(
 # --- Standard CRUD endpoints ---
 
 @router.get("/", response_model=List[TimeEntryResponse])
+@query_budget(4)
 def list_time_entries(
     month: Optional[str] = Query(None, description="Filter by month (YYYY-MM)"),
     user_id: Optional[str] = Query(None, description="Filter by user ID (admin only)"),
@@ -360,8 +350,7 @@ def list_time_entries(
         try:
             year, month_num = map(int, month.split('-'))
             query = query.filter(
-                extract('year', TimeEntry.date) == year,
-                extract('month', TimeEntry.date) == month_num
+                month_filter(TimeEntry.date, year, month_num)
             )
         except ValueError:
             raise HTTPException(status_code=400, detail="Ungültiges Monatsformat (YYYY-MM erwartet)")
@@ -419,63 +408,32 @@ def create_time_entry(
     if current_user.last_work_day and entry_data.date > current_user.last_work_day:
         raise HTTPException(status_code=400, detail="Datum liegt nach dem letzten Arbeitstag")
 
-    # Check for overlapping entries on the same date
-    existing = db.query(TimeEntry).filter(
-        TimeEntry.user_id == current_user.id,
-        TimeEntry.date == entry_data.date,
-        TimeEntry.start_time == entry_data.start_time
-    ).first()
+    # One snapshot of the user's week for all checks below
+    context = EntryValidationContext.for_date(db, current_user.id, entry_data.date)
 
-    if existing:
+    # Check for overlapping entries on the same date
+    if context.has_start_time(entry_data.date, entry_data.start_time):
         raise HTTPException(
             status_code=400,
             detail="Es existiert bereits ein Eintrag mit dieser Startzeit an diesem Datum"
         )
 
     exempt = current_user.exempt_from_arbzg
+    check = context.check(
+        entry_data.date, entry_data.start_time, entry_data.end_time, entry_data.break_minutes,
+    )
+    daily_hours = check.daily_hours
 
-    # Break validation (ArbZG §4) – skipped for exempt users
+    # Break validation (ArbZG §4) and §3 daily hours check – skipped for exempt users
     if not exempt:
-        break_error = validate_daily_break(
-            db=db,
-            user_id=current_user.id,
-            entry_date=entry_data.date,
-            start_time=entry_data.start_time,
-            end_time=entry_data.end_time,
-            break_minutes=entry_data.break_minutes,
-        )
-        if break_error:
-            raise HTTPException(status_code=400, detail=break_error)
-
-    # §3 ArbZG: daily hours check – skipped for exempt users
-    daily_hours = _calculate_daily_net_hours(
-        db=db,
-        user_id=current_user.id,
-        entry_date=entry_data.date,
-        start_time=entry_data.start_time,
-        end_time=entry_data.end_time,
-        break_minutes=entry_data.break_minutes,
-    )
-    if not exempt and daily_hours > MAX_DAILY_HOURS_HARD:
-        raise HTTPException(
-            status_code=422,
-            detail=f"Tagesarbeitszeit würde {daily_hours:.1f}h betragen und überschreitet die gesetzliche Höchstgrenze von {MAX_DAILY_HOURS_HARD:.0f}h (§3 ArbZG)."
-        )
+        _raise_for_hard_limits(check)
 
     # Collect warnings (also skipped for exempt users)
     warnings: list[str] = []
     if not exempt:
         if daily_hours > MAX_DAILY_HOURS_WARN:
             warnings.append("DAILY_HOURS_WARNING")
-        weekly_hours = _calculate_weekly_net_hours(
-            db=db,
-            user_id=current_user.id,
-            entry_date=entry_data.date,
-            start_time=entry_data.start_time,
-            end_time=entry_data.end_time,
-            break_minutes=entry_data.break_minutes,
-        )
-        if weekly_hours > MAX_WEEKLY_HOURS_WARN:
+        if check.weekly_hours > MAX_WEEKLY_HOURS_WARN:
             warnings.append("WEEKLY_HOURS_WARNING")
         weekday = entry_data.date.weekday()
         is_sunday = weekday == 6
@@ -486,13 +444,10 @@ def create_time_entry(
             warnings.append("HOLIDAY_WORK")
         if (
             current_user.is_night_worker
-            and is_night_work(entry_data.start_time, entry_data.end_time)
+            and check.night_work
             and daily_hours > MAX_NIGHT_WORKER_DAILY_WARN
         ):
-            warnings.append(
-                f"§6 ArbZG: Nachtarbeitnehmer – Tageslimit 8h überschritten ({daily_hours:.1f}h). "
-                "Verlängerung auf 10h nur mit 1-Monats-Ausgleich zulässig."
-            )
+            warnings.append(_night_worker_warning(daily_hours))
 
     # Create entry
     entry = TimeEntry(
@@ -539,6 +494,8 @@ def update_time_entry(
             detail="Einträge vergangener Tage können nur per Änderungsantrag geändert werden"
         )
 
+    was_open = entry.end_time is None
+
     # Update fields
     update_data = entry_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
@@ -550,64 +507,27 @@ def update_time_entry(
 
     exempt = current_user.exempt_from_arbzg
 
-    # Break validation (ArbZG §4) – skipped for exempt users
-    if not exempt and entry.end_time is not None:
-        break_error = validate_daily_break(
-            db=db,
-            user_id=entry.user_id,
-            entry_date=entry.date,
-            start_time=entry.start_time,
-            end_time=entry.end_time,
-            break_minutes=entry.break_minutes,
+    # Break validation (ArbZG §4) and §3 daily hours check – skipped for exempt users
+    check = None
+    if entry.end_time is not None:
+        context = EntryValidationContext.for_date(db, entry.user_id, entry.date)
+        check = context.check(
+            entry.date, entry.start_time, entry.end_time, entry.break_minutes,
             exclude_entry_id=entry.id,
         )
-        if break_error:
-            raise HTTPException(status_code=400, detail=break_error)
-
-    # §3 ArbZG: daily hours check – skipped for exempt users
-    if not exempt and entry.end_time is not None:
-        daily_hours = _calculate_daily_net_hours(
-            db=db,
-            user_id=entry.user_id,
-            entry_date=entry.date,
-            start_time=entry.start_time,
-            end_time=entry.end_time,
-            break_minutes=entry.break_minutes,
-            exclude_entry_id=entry.id,
-        )
-        if daily_hours > MAX_DAILY_HOURS_HARD:
-            raise HTTPException(
-                status_code=422,
-                detail=f"Tagesarbeitszeit würde {daily_hours:.1f}h betragen und überschreitet die gesetzliche Höchstgrenze von {MAX_DAILY_HOURS_HARD:.0f}h (§3 ArbZG)."
-            )
+        if not exempt:
+            _raise_for_hard_limits(check)
 
     db.commit()
     db.refresh(entry)
+    if was_open or entry.end_time is None:
+        clock_status_service.publish_entry(entry.user_id, _get_open_entry(db, entry.user_id))
 
     update_warnings: list[str] = []
-    saved_hours = 0.0  # defined here so the night-worker check below can always reference it
-    if not exempt and entry.end_time is not None:
-        saved_hours = _calculate_daily_net_hours(
-            db=db,
-            user_id=entry.user_id,
-            entry_date=entry.date,
-            start_time=entry.start_time,
-            end_time=entry.end_time,
-            break_minutes=entry.break_minutes,
-            exclude_entry_id=None,
-        )
-        if saved_hours > MAX_DAILY_HOURS_WARN:
+    if not exempt and check is not None:
+        if check.daily_hours > MAX_DAILY_HOURS_WARN:
             update_warnings.append("DAILY_HOURS_WARNING")
-        weekly = _calculate_weekly_net_hours(
-            db=db,
-            user_id=entry.user_id,
-            entry_date=entry.date,
-            start_time=entry.start_time,
-            end_time=entry.end_time,
-            break_minutes=entry.break_minutes,
-            exclude_entry_id=None,
-        )
-        if weekly > MAX_WEEKLY_HOURS_WARN:
+        if check.weekly_hours > MAX_WEEKLY_HOURS_WARN:
             update_warnings.append("WEEKLY_HOURS_WARNING")
 
     if not exempt:
@@ -618,15 +538,12 @@ def update_time_entry(
         if entry_is_holiday:
             update_warnings.append("HOLIDAY_WORK")
         if (
-            entry.end_time is not None
+            check is not None
             and current_user.is_night_worker
-            and is_night_work(entry.start_time, entry.end_time)
-            and saved_hours > MAX_NIGHT_WORKER_DAILY_WARN
+            and check.night_work
+            and check.daily_hours > MAX_NIGHT_WORKER_DAILY_WARN
         ):
-            update_warnings.append(
-                f"§6 ArbZG: Nachtarbeitnehmer – Tageslimit 8h überschritten ({saved_hours:.1f}h). "
-                "Verlängerung auf 10h nur mit 1-Monats-Ausgleich zulässig."
-            )
+            update_warnings.append(_night_worker_warning(check.daily_hours))
 
     response = TimeEntryResponse.model_validate(entry)
     _enrich_response(response, entry, current_user, db, warnings=update_warnings)
@@ -656,7 +573,11 @@ def delete_time_entry(
             detail="Einträge vergangener Tage können nur per Änderungsantrag gelöscht werden"
         )
 
+    was_open = entry.end_time is None
+    user_id = entry.user_id
     db.delete(entry)
     db.commit()
+    if was_open:
+        clock_status_service.publish_entry(user_id, None)
 
     return None
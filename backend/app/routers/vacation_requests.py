@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta, date
@@ -9,7 +9,9 @@ from app.models.vacation_request import VacationRequest, VacationRequestStatus
 from app.models.system_setting import SystemSetting
 from app.middleware.auth import get_current_user
 from app.schemas.vacation_request import VacationRequestCreate, VacationRequestResponse
-from app.services.calculation_service import count_workdays
+from app.core.pagination import keyset_page, set_next_cursor
+from app.core.query_metrics import query_budget
+from app.routers.admin_helpers import _enrich_vr_response, _enrich_vr_responses
 
 router = APIRouter(prefix="/api/vacation-requests", tags=["vacation-requests"])
 
@@ -23,23 +25,6 @@ def get_setting(db: Session, key: str, tenant_id, default: str = "") -> str:
     return s.value if s else default
 
 
-def _enrich(vr: VacationRequest, db: Session) -> VacationRequestResponse:
-    resp = VacationRequestResponse.model_validate(vr)
-    user = db.query(User).filter(User.id == vr.user_id).first()
-    if user:
-        resp.user_first_name = user.first_name
-        resp.user_last_name = user.last_name
-    if vr.reviewed_by:
-        reviewer = db.query(User).filter(User.id == vr.reviewed_by).first()
-        if reviewer:
-            resp.reviewer_first_name = reviewer.first_name
-            resp.reviewer_last_name = reviewer.last_name
-    # Compute workdays
-    end = vr.end_date if vr.end_date else vr.date
-    resp.days = count_workdays(db, vr.date, end)
-    return resp
-
-
 @router.post("/", response_model=VacationRequestResponse, status_code=status.HTTP_201_CREATED)
 def create_vacation_request(
     data: VacationRequestCreate,
@@ -69,25 +54,30 @@ def create_vacation_request(
     db.add(vr)
     db.commit()
     db.refresh(vr)
-    return _enrich(vr, db)
+    return _enrich_vr_response(vr, db)
 
 
 @router.get("/", response_model=List[VacationRequestResponse])
+@query_budget(4)
 def list_my_vacation_requests(
+    response: Response,
     year: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (keyset pagination)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """List the current user's vacation requests."""
+    """List the current user's vacation requests, newest first."""
     query = db.query(VacationRequest).filter(VacationRequest.user_id == current_user.id)
     if year:
         from sqlalchemy import extract
         query = query.filter(extract('year', VacationRequest.date) == year)
     if status:
         query = query.filter(VacationRequest.status == status)
-    requests = query.order_by(VacationRequest.created_at.desc()).all()
-    return [_enrich(vr, db) for vr in requests]
+    requests, next_cursor = keyset_page(query, VacationRequest, limit, cursor)
+    set_next_cursor(response, next_cursor)
+    return _enrich_vr_responses(requests, db)
 
 
 @router.delete("/{request_id}", status_code=status.HTTP_204_NO_CONTENT)
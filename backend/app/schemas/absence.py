@@ -46,6 +46,17 @@ class AbsenceCalendarEntry(BaseModel):
     hours: float
 
 
+class AbsenceCalendarRange(BaseModel):
+    """Consecutive absence days of one employee with the same type and hours."""
+    start_date: date
+    end_date: date
+    user_first_name: str
+    user_last_name: str
+    user_color: str
+    type: str  # str statt AbsenceType: DSGVO Art. 9 — "sick" wird ggf. zu "absent" maskiert
+    hours: float
+
+
 class TeamAbsenceEntry(BaseModel):
     """Entry for team absence overview with date range support."""
     model_config = ConfigDict(from_attributes=True)
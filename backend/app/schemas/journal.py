@@ -42,10 +42,21 @@ class JournalUser(BaseModel):
     last_name: str
 
 
-class JournalResponse(BaseModel):
-    user: JournalUser
+class JournalMonth(BaseModel):
     year: int
     month: int
     days: List[JournalDay]
     monthly_summary: JournalMonthlySummary
     yearly_overtime: float
+
+
+class JournalResponse(JournalMonth):
+    user: JournalUser
+
+
+class JournalRangeResponse(BaseModel):
+    user: JournalUser
+    from_month: str
+    to_month: str
+    months: List[JournalMonth]
+    summary: JournalMonthlySummary
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, ConfigDict, field_serializer
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, field_serializer, field_validator, model_validator
+from typing import List, Optional
 from datetime import date, time, datetime
 from uuid import UUID
 
+from app.services import audit_service
+
 
 class AuditLogResponse(BaseModel):
     id: UUID
@@ -25,6 +27,8 @@ class AuditLogResponse(BaseModel):
 
     source: str
     change_request_id: Optional[UUID] = None
+    # Set on compact rows: only these fields changed, the others keep their old value
+    changed_fields: Optional[List[str]] = None
 
     # Joined fields for display
     user_first_name: Optional[str] = None
@@ -34,6 +38,20 @@ class AuditLogResponse(BaseModel):
 
     created_at: datetime
 
+    @field_validator('changed_fields', mode='before')
+    @classmethod
+    def split_changed_fields(cls, value):
+        if isinstance(value, str):
+            return [f for f in value.split(',') if f]
+        return value
+
+    @model_validator(mode='after')
+    def expand_compact_diff(self):
+        """Fill the unchanged new_* values of compact rows from old_*."""
+        for name, value in audit_service.expanded_values(self).items():
+            setattr(self, name, value)
+        return self
+
     @field_serializer('id', 'time_entry_id', 'user_id', 'changed_by', 'change_request_id')
     def serialize_uuid(self, value):
         return str(value) if value else None
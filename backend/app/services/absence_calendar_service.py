@@ -0,0 +1,249 @@
+"""
+Team absence calendar per (tenant, month), precomputed and cached.
+
+The calendar, the range view and the team's upcoming absences used to join
+``Absence`` with ``User`` on every request of every employee and turn each
+absence day into a response object. Here one month of a tenant is reduced to a
+compact ``MonthCalendar``:
+
+- ``users``: the active, visible employees with absences in the month,
+- ``masks``: one ``DayMask`` per (user, absence type) – a bitmap of the days
+  (bit ``day - 1``) plus the hours of the set days.
+
+Calendars are kept in a process-local LRU cache keyed by (tenant, year, month)
+and tagged with the month's data version (see data_version_service): every
+absence or user write bumps it, so a cached calendar is only used while the
+version it was built at is still current – across workers, without explicit
+invalidation. Masking of sick leave depends on the viewer and is applied when
+the calendar is expanded (``days``/``ranges``), never stored.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from prometheus_client import Counter
+from sqlalchemy.orm import Session
+
+from app.models import Absence, AbsenceType, User, UserRole
+from app.services import data_version_service
+
+# Type codes: index into TYPES
+TYPES: Tuple[AbsenceType, ...] = tuple(AbsenceType)
+
+# Cached (tenant, month) calendars per process
+CACHE_SIZE = 512
+
+ABSENCE_CALENDAR_CACHE = Counter(
+    "absence_calendar_cache_total",
+    "Team absence calendar lookups by the month cache (hit = no absence query)",
+    ["result"],
+)
+
+
+class CalendarUser(NamedTuple):
+    user_id: uuid.UUID
+    first_name: str
+    last_name: str
+    color: str
+
+
+class DayMask(NamedTuple):
+    """Days of one month on which a user has an absence of one type."""
+    user: int                  # index into MonthCalendar.users
+    type: int                  # index into TYPES
+    days: int                  # bit (day - 1) set = absent on that day
+    hours: Tuple[float, ...]   # hours of the set days, in day order
+
+
+class MonthCalendar(NamedTuple):
+    year: int
+    month: int
+    version: Optional[int]
+    users: Tuple[CalendarUser, ...]
+    masks: Tuple[DayMask, ...]
+
+
+class CalendarDay(NamedTuple):
+    date: date
+    user: CalendarUser
+    type: AbsenceType
+    hours: float
+
+
+class CalendarRange(NamedTuple):
+    start: date
+    end: date
+    user: CalendarUser
+    type: AbsenceType
+    hours: float
+
+
+_cache: "OrderedDict[Tuple, MonthCalendar]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def _load(db: Session, tenant_id, start: date, end: date) -> Dict[Tuple[int, int], list]:
+    """Absence rows of active, visible employees in [start, end] per (year, month), one column query."""
+    query = db.query(
+        Absence.user_id, Absence.date, Absence.type, Absence.hours,
+        User.first_name, User.last_name, User.calendar_color,
+    ).join(User, User.id == Absence.user_id).filter(
+        User.is_active == True,  # noqa: E712
+        User.is_hidden == False,  # noqa: E712
+        Absence.date >= start,
+        Absence.date <= end,
+    )
+    if tenant_id is not None:
+        query = query.filter(Absence.tenant_id == tenant_id)
+    rows: Dict[Tuple[int, int], list] = {}
+    for row in query:
+        rows.setdefault((row.date.year, row.date.month), []).append(row)
+    return rows
+
+
+def _assemble(year: int, month: int, version: Optional[int], rows) -> MonthCalendar:
+    users: Dict[uuid.UUID, int] = {}
+    user_list: List[CalendarUser] = []
+    days: Dict[Tuple[int, int], Dict[int, float]] = {}
+    for user_id, day, absence_type, hours, first_name, last_name, color in rows:
+        index = users.get(user_id)
+        if index is None:
+            index = users[user_id] = len(user_list)
+            user_list.append(CalendarUser(user_id, first_name, last_name, color))
+        days.setdefault((index, TYPES.index(absence_type)), {})[day.day] = float(hours)
+
+    masks = []
+    for (user, type_code), hours_by_day in sorted(days.items()):
+        bits = 0
+        for day in hours_by_day:
+            bits |= 1 << (day - 1)
+        masks.append(DayMask(user, type_code, bits, tuple(hours_by_day[d] for d in sorted(hours_by_day))))
+    return MonthCalendar(year, month, version, tuple(user_list), tuple(masks))
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+
+
+def month_versions(db: Session, tenant_id, start: date, end: date) -> Dict[Tuple[int, int], int]:
+    """Tenant data version per month between ``start`` and ``end`` (one query; empty without tenant)."""
+    if tenant_id is None:
+        return {}
+    return data_version_service.get_month_versions(db, tenant_id, None, start, end)
+
+
+def month_calendars(
+    db: Session, tenant_id, start: date, end: date, versions: Optional[Dict[Tuple[int, int], int]] = None,
+) -> List[MonthCalendar]:
+    """
+    Calendars of all months between ``start`` and ``end``, from the cache while
+    their data version is current; all other months are built from one query.
+
+    ``versions`` are the months' tenant data versions if the caller already has
+    them (e.g. for the ETag); otherwise they are read with one query. Without a
+    tenant nothing is cached.
+    """
+    if versions is None:
+        versions = month_versions(db, tenant_id, start, end)
+    months = []
+    y, m = start.year, start.month
+    while (y, m) <= (end.year, end.month):
+        months.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+    found: Dict[Tuple[int, int], MonthCalendar] = {}
+    if tenant_id is not None:
+        with _lock:
+            for y, m in months:
+                cached = _cache.get((tenant_id, y, m))
+                if cached is not None and cached.version == versions.get((y, m)):
+                    _cache.move_to_end((tenant_id, y, m))
+                    found[(y, m)] = cached
+        if found:
+            ABSENCE_CALENDAR_CACHE.labels(result="hit").inc(len(found))
+
+    missing = [ym for ym in months if ym not in found]
+    if missing:
+        ABSENCE_CALENDAR_CACHE.labels(result="miss").inc(len(missing))
+        # Loaded after the versions were read, so the data is at least that new; a
+        # write in between only causes one more rebuild on the next request.
+        rows = _load(db, tenant_id, date(*missing[0], 1), _month_end(*missing[-1]))
+        built = {ym: _assemble(*ym, versions.get(ym), rows.get(ym, ())) for ym in missing}
+        found.update(built)
+        if tenant_id is not None:
+            with _lock:
+                for (y, m), cal in built.items():
+                    _cache[(tenant_id, y, m)] = cal
+                    _cache.move_to_end((tenant_id, y, m))
+                while len(_cache) > CACHE_SIZE:
+                    _cache.popitem(last=False)
+    return [found[ym] for ym in months]
+
+
+def month_calendar(db: Session, tenant_id, year: int, month: int, version: Optional[int] = None) -> MonthCalendar:
+    """Calendar of one tenant month (see ``month_calendars``)."""
+    first = date(year, month, 1)
+    versions = {(year, month): version} if version is not None else None
+    return month_calendars(db, tenant_id, first, first, versions)[0]
+
+
+def _set_days(bits: int) -> Iterator[int]:
+    while bits:
+        low = bits & -bits
+        yield low.bit_length()
+        bits ^= low
+
+
+def days(cal: MonthCalendar) -> List[CalendarDay]:
+    """One entry per absence day, ordered by date, then name."""
+    result = [
+        CalendarDay(date(cal.year, cal.month, day), cal.users[mask.user], TYPES[mask.type], hours)
+        for mask in cal.masks
+        for day, hours in zip(_set_days(mask.days), mask.hours)
+    ]
+    result.sort(key=lambda d: (d.date, d.user.last_name, d.user.first_name, d.type.value))
+    return result
+
+
+def ranges(cal: MonthCalendar) -> List[CalendarRange]:
+    """Runs of consecutive days with the same user, type and hours, ordered by start."""
+    result = []
+    for mask in cal.masks:
+        run_start = previous = run_hours = None
+        for day, hours in zip(_set_days(mask.days), mask.hours):
+            if run_start is not None and day == previous + 1 and hours == run_hours:
+                previous = day
+                continue
+            if run_start is not None:
+                result.append(_range(cal, mask, run_start, previous, run_hours))
+            run_start = previous = day
+            run_hours = hours
+        if run_start is not None:
+            result.append(_range(cal, mask, run_start, previous, run_hours))
+    result.sort(key=lambda r: (r.start, r.user.last_name, r.user.first_name, r.type.value))
+    return result
+
+
+def _range(cal: MonthCalendar, mask: DayMask, first: int, last: int, hours: float) -> CalendarRange:
+    return CalendarRange(
+        date(cal.year, cal.month, first), date(cal.year, cal.month, last),
+        cal.users[mask.user], TYPES[mask.type], hours,
+    )
+
+
+def display_type(absence_type: AbsenceType, user_id, viewer) -> str:
+    """
+    DSGVO Art. 9: Krankheitsdaten sind besonders schützenswert.
+    Nicht-Admins sehen fremde Krankmeldungen nur als "absent".
+    """
+    if absence_type == AbsenceType.SICK and viewer.role != UserRole.ADMIN and user_id != viewer.id:
+        return "absent"
+    return absence_type.value
+
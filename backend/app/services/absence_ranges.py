@@ -0,0 +1,167 @@
+"""
+Absences as date ranges and interval arithmetic on workdays.
+
+Absences are stored one row per workday: the per-day hours (daily schedules,
+§3 EntgFG sick leave), the (user, date, type) uniqueness, partial refunds and
+change requests all work on single days. Creating an absence is expanding a
+range into those days (``workdays``); calculations go the other way and
+collapse the day rows into ``AbsenceRange``s – runs of consecutive workdays
+with the same user, type and hours – so targets and credited hours are counted
+per range with weekday arithmetic (``weekday_counts``) instead of walking every
+calendar day and summing every row.
+
+A run continues across weekends and public holidays: those days are never
+booked, so a range only claims the workdays between its ends that are not
+holidays. ``excluded_intervals`` merges ranges and holidays into disjoint
+intervals for the target calculation.
+"""
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Absence, AbsenceType
+
+WORKDAYS = 5  # Mon-Fri
+
+
+class AbsenceRange(NamedTuple):
+    """Consecutive absence days of one user, type and hours (hundredths of an hour per day)."""
+    user_id: uuid.UUID
+    type: AbsenceType
+    start: date
+    end: date
+    hundredths: int
+    days: int
+
+    @property
+    def total_hundredths(self) -> int:
+        return self.hundredths * self.days
+
+    def days_within(self, start: date, end: date, holidays) -> int:
+        """Booked days of the range between ``start`` and ``end`` (see ``collapse``)."""
+        first = 1 if start <= self.start <= end else 0
+        lo, hi = max(start, self.start + timedelta(days=1)), min(end, self.end)
+        return first + (count_workdays(lo, hi, holidays) if lo <= hi else 0)
+
+
+def weekday_counts(start: date, end: date) -> List[int]:
+    """Number of Mondays … Sundays between ``start`` and ``end`` (inclusive), without iterating."""
+    span = (end - start).days + 1
+    if span <= 0:
+        return [0] * 7
+    weeks, rest = divmod(span, 7)
+    counts = [weeks] * 7
+    first = start.weekday()
+    for offset in range(rest):
+        counts[(first + offset) % 7] += 1
+    return counts
+
+
+def count_workdays(start: date, end: date, holidays: Iterable[date] = ()) -> int:
+    """Weekdays (Mon-Fri) between ``start`` and ``end`` that are not public holidays."""
+    if not isinstance(holidays, (set, frozenset)):
+        holidays = set(holidays)
+    workdays = sum(weekday_counts(start, end)[:WORKDAYS])
+    return workdays - sum(1 for h in holidays if start <= h <= end and h.weekday() < WORKDAYS)
+
+
+def workdays(start: date, end: date, holidays: Iterable[date] = ()) -> List[date]:
+    """Expand a range into its workdays (Mon-Fri, excluding public holidays)."""
+    holidays = set(holidays)
+    days = []
+    current = start
+    while current <= end:
+        if current.weekday() < WORKDAYS and current not in holidays:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+def _next_workday(day: date, holidays) -> date:
+    day += timedelta(days=1)
+    while day.weekday() >= WORKDAYS or day in holidays:
+        day += timedelta(days=1)
+    return day
+
+
+def collapse(rows: Iterable[Tuple], holidays: Iterable[date] = ()) -> List[AbsenceRange]:
+    """
+    Collapse (user_id, type, date, hundredths) day rows into ranges.
+
+    Rows of one user and type are joined while each day is the workday after
+    the previous one (skipping weekends and ``holidays``) and the hours match.
+    So every day after a range's start up to its end that is a workday and not
+    a holiday is booked; the start itself may be any day.
+    """
+    holidays = set(holidays)
+    result: List[AbsenceRange] = []
+    current = None
+    for user_id, absence_type, day, hundredths in sorted(rows, key=lambda r: (str(r[0]), r[1].value, r[2])):
+        if (
+            current is not None
+            and current.user_id == user_id
+            and current.type == absence_type
+            and current.hundredths == hundredths
+            and _next_workday(current.end, holidays) == day
+        ):
+            current = current._replace(end=day, days=current.days + 1)
+            continue
+        if current is not None:
+            result.append(current)
+        current = AbsenceRange(user_id, absence_type, day, day, hundredths, 1)
+    if current is not None:
+        result.append(current)
+    return result
+
+
+def load_ranges(db: Session, holidays: Iterable[date], *criteria) -> List[AbsenceRange]:
+    """Absences matching ``criteria`` as ranges (one column query)."""
+    rows = db.query(Absence.user_id, Absence.type, Absence.date, Absence.hours).filter(*criteria)
+    return collapse(
+        (
+            (user_id, absence_type, day, int((Decimal(str(hours)) * 100).to_integral_value()))
+            for user_id, absence_type, day, hours in rows
+        ),
+        holidays,
+    )
+
+
+def hundredths_by_month(ranges: Sequence[AbsenceRange], holidays: Iterable[date] = ()) -> Dict[Tuple[int, int], int]:
+    """Absence hours per (year, month) in hundredths, ranges split at month boundaries."""
+    holidays = set(holidays)
+    result: Dict[Tuple[int, int], int] = {}
+    for r in ranges:
+        if (r.start.year, r.start.month) == (r.end.year, r.end.month):
+            key = (r.start.year, r.start.month)
+            result[key] = result.get(key, 0) + r.total_hundredths
+            continue
+        first = r.start.replace(day=1)
+        while first <= r.end:
+            following = (first + timedelta(days=32)).replace(day=1)
+            days = r.days_within(first, following - timedelta(days=1), holidays)
+            if days:
+                key = (first.year, first.month)
+                result[key] = result.get(key, 0) + r.hundredths * days
+            first = following
+    return result
+
+
+def excluded_intervals(
+    intervals: Iterable[Tuple[date, date]], holidays: Iterable[date] = (),
+) -> List[Tuple[date, date]]:
+    """
+    Disjoint, sorted (start, end) intervals covering the given intervals (e.g.
+    absence ranges) and public holidays – the days that do not count towards
+    the target. Intervals separated only by a weekend are merged.
+    """
+    merged: List[Tuple[date, date]] = []
+    for start, end in sorted(list(intervals) + [(h, h) for h in holidays]):
+        if merged and start <= _next_workday(merged[-1][1], ()):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
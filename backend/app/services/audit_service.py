@@ -0,0 +1,176 @@
+"""
+Time entry audit trail: batched writes and keyset-paginated history.
+
+Callers used to add one ``TimeEntryAuditLog`` ORM object per changed entry,
+which the unit of work flushes row by row inside already long transactions
+(company closures, vacation approvals, imports). Here a change becomes a
+plain row dict (``entry_change``) and ``write`` inserts any number of them
+with a single multi-row INSERT.
+
+Compact diff (``AUDIT_COMPACT_DIFF``): for updates only the new values of the
+fields that actually changed are stored, their names in ``changed_fields``.
+The old values stay complete, so the full new state can be restored on read;
+``AuditLogResponse`` does this transparently.
+
+Readers go through ``expanded_values`` (``AuditLogResponse``, DSGVO export).
+
+``history`` reads the trail newest first with keyset pagination
+(app.core.pagination) instead of OFFSET.
+
+Deleted entries: ``time_entry_id`` of audit rows and change requests is
+declared ON DELETE SET NULL, but the constraints are dropped while
+time_entries is partitioned (app.core.partitioning). ``detach_time_entries``
+then nulls the references itself; an after_flush hook calls it for every
+entry deleted through the ORM, bulk deletes call it explicitly. With the
+constraints in place it does nothing.
+"""
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import partitioning
+from app.core.pagination import keyset_page
+from app.models import ChangeRequest, TimeEntry, TimeEntryAuditLog
+
+FIELDS = ("date", "start_time", "end_time", "break_minutes", "note")
+
+_COLUMNS = (
+    "id", "tenant_id", "time_entry_id", "user_id", "changed_by", "action", "source",
+    "change_request_id", "changed_fields",
+    *(f"old_{f}" for f in FIELDS), *(f"new_{f}" for f in FIELDS),
+)
+
+
+def _get_field(entry, field: str):
+    """Get a field from either an ORM object or a dict."""
+    return entry.get(field) if isinstance(entry, dict) else getattr(entry, field, None)
+
+
+def entry_change(
+    time_entry_id,
+    user_id,
+    changed_by,
+    action: str,
+    old_entry=None,
+    new_entry=None,
+    source: str = "manual",
+    change_request_id=None,
+    tenant_id=None,
+    compact: Optional[bool] = None,
+    **values,
+) -> Dict:
+    """
+    Audit row for one time entry change, ready for ``write``.
+
+    ``old_entry``/``new_entry`` are ORM objects or dicts with the entry fields;
+    ``values`` sets columns directly (e.g. ``new_note`` for summary rows).
+    ``compact`` defaults to the ``AUDIT_COMPACT_DIFF`` setting.
+    """
+    row = dict.fromkeys(_COLUMNS)
+    row.update(
+        id=uuid.uuid4(), tenant_id=tenant_id, time_entry_id=time_entry_id, user_id=user_id,
+        changed_by=changed_by, action=action, source=source, change_request_id=change_request_id,
+    )
+    if old_entry is not None:
+        row.update({f"old_{f}": _get_field(old_entry, f) for f in FIELDS})
+    if new_entry is not None:
+        row.update({f"new_{f}": _get_field(new_entry, f) for f in FIELDS})
+    row.update(values)
+
+    if compact is None:
+        compact = settings.AUDIT_COMPACT_DIFF
+    if compact and old_entry is not None and new_entry is not None:
+        changed = [f for f in FIELDS if row[f"new_{f}"] != row[f"old_{f}"]]
+        for f in FIELDS:
+            if f not in changed:
+                row[f"new_{f}"] = None
+        row["changed_fields"] = ",".join(changed)
+    return row
+
+
+def expanded_values(row) -> Dict:
+    """
+    The new_* values of a compact row (ORM object or dict) with the unchanged
+    fields filled from old_*; empty for full rows. ``changed_fields`` may be
+    the stored comma-separated string or a list.
+    """
+    changed = _get_field(row, "changed_fields")
+    if changed is None:
+        return {}
+    if isinstance(changed, str):
+        changed = changed.split(",")
+    return {f"new_{f}": _get_field(row, f"old_{f}") for f in FIELDS if f not in changed}
+
+
+def write(db: Session, rows: Sequence[Dict]) -> int:
+    """Insert audit rows with one multi-row INSERT. Does not commit."""
+    if rows:
+        db.execute(insert(TimeEntryAuditLog), list(rows))
+    return len(rows)
+
+
+def history(
+    db: Session,
+    user_id=None,
+    time_entry_id=None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[TimeEntryAuditLog], Optional[str]]:
+    """
+    Audit log rows newest first, filtered by affected user, entry and
+    ``since <= created_at < until``; returns the page and the next cursor.
+    """
+    query = db.query(TimeEntryAuditLog)
+    if user_id is not None:
+        query = query.filter(TimeEntryAuditLog.user_id == user_id)
+    if time_entry_id is not None:
+        query = query.filter(TimeEntryAuditLog.time_entry_id == time_entry_id)
+    if since is not None:
+        query = query.filter(TimeEntryAuditLog.created_at >= since)
+    if until is not None:
+        query = query.filter(TimeEntryAuditLog.created_at < until)
+    return keyset_page(query, TimeEntryAuditLog, limit, cursor)
+
+
+# Engine URL -> time_entries partitioned; only a migration changes it
+_partitioned: Dict[str, bool] = {}
+
+
+def _references_unconstrained(db: Session) -> bool:
+    """True while time_entries is partitioned, i.e. nothing references it by FK."""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+    key = str(bind.url)
+    if key not in _partitioned:
+        _partitioned[key] = partitioning.is_partitioned(db.connection(), partitioning.TIME_ENTRIES)
+    return _partitioned[key]
+
+
+def detach_time_entries(db: Session, entry_ids) -> None:
+    """
+    SET NULL the references to the given time entries (ids or a subquery of
+    ids) from audit rows and change requests while the FKs are missing.
+    Does not commit.
+    """
+    if not _references_unconstrained(db):
+        return
+    for model in (TimeEntryAuditLog, ChangeRequest):
+        db.execute(
+            update(model).where(model.time_entry_id.in_(entry_ids)).values(time_entry_id=None),
+            execution_options={"synchronize_session": False},
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _detach_deleted_entries(session, flush_context):
+    """Emulate ON DELETE SET NULL for entries deleted in this flush."""
+    ids = [obj.id for obj in session.deleted if isinstance(obj, TimeEntry)]
+    if ids:
+        detach_time_entries(session, ids)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Iterable, Optional
 from datetime import date, time
 from uuid import UUID
 from app.models import TimeEntry
@@ -34,7 +34,19 @@ def validate_daily_break(
         query = query.filter(TimeEntry.id != exclude_entry_id)
 
     existing_entries = query.order_by(TimeEntry.start_time).all()
+    return check_daily_break(existing_entries, start_time, end_time, break_minutes)
 
+
+def check_daily_break(
+    existing_entries: Iterable[TimeEntry],
+    start_time: time,
+    end_time: time,
+    break_minutes: int,
+) -> Optional[str]:
+    """
+    §4 check of validate_daily_break against already loaded entries of the day
+    (without the entry being created/updated). Open entries are ignored.
+    """
     # Build list of all time blocks (existing + the new/updated one)
     # Skip entries without end_time (open clock-in entries)
     blocks = []
@@ -1,11 +1,18 @@
+from bisect import bisect_left, bisect_right
 from datetime import date, datetime, timedelta
 from app.services.timezone_service import today_local
 from decimal import Decimal
 from calendar import monthrange
-from typing import Dict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from app.core.date_filters import month_filter
 from app.models import User, TimeEntry, Absence, PublicHoliday, AbsenceType, WorkingHoursChange, YearCarryover
+from app.services import absence_ranges, entry_records, vacation_ledger_service
+
+# Absence types that do not reduce the target (see get_monthly_target)
+TARGET_KEEPING_TYPES = (AbsenceType.TRAINING, AbsenceType.SICK, AbsenceType.OVERTIME)
+# Absence types credited as worked hours (see get_monthly_actual)
+CREDITED_TYPES = (AbsenceType.TRAINING, AbsenceType.SICK)
 
 
 def get_weekly_hours_for_date(db: Session, user: User, target_date: date) -> Decimal:
@@ -34,6 +41,47 @@ def get_weekly_hours_for_date(db: Session, user: User, target_date: date) -> Dec
     return Decimal(str(user.weekly_hours))
 
 
+class WeeklyHoursTimeline:
+    """
+    Weekly hours of one user as a step function of the date.
+
+    Built from the user's WorkingHoursChange rows once; ``at(d)`` is a bisect
+    instead of the query per day that get_weekly_hours_for_date() costs.
+    """
+    __slots__ = ("_starts", "_hours", "_default")
+
+    def __init__(self, user: User, changes: Iterable[WorkingHoursChange]):
+        ordered = sorted(changes, key=lambda c: c.effective_from)
+        self._starts = [c.effective_from for c in ordered]
+        self._hours = [Decimal(str(c.weekly_hours)) for c in ordered]
+        self._default = Decimal(str(user.weekly_hours))
+
+    def at(self, target_date: date) -> Decimal:
+        """Weekly hours valid on target_date (same rule as get_weekly_hours_for_date)."""
+        i = bisect_right(self._starts, target_date)
+        return self._hours[i - 1] if i else self._default
+
+    def segments(self, start: date, end: date):
+        """(first, last, weekly_hours) for each stretch of [start, end] with constant weekly hours."""
+        i = bisect_right(self._starts, start)
+        first = start
+        while first <= end:
+            hours = self._hours[i - 1] if i else self._default
+            if i < len(self._starts) and self._starts[i] <= end:
+                last = self._starts[i] - timedelta(days=1)
+            else:
+                last = end
+            yield first, last, hours
+            first = last + timedelta(days=1)
+            i += 1
+
+
+def load_weekly_hours_timeline(db: Session, user: User) -> WeeklyHoursTimeline:
+    """Load all working hours changes of a user with one query."""
+    changes = db.query(WorkingHoursChange).filter(WorkingHoursChange.user_id == user.id).all()
+    return WeeklyHoursTimeline(user, changes)
+
+
 def get_daily_target(user: User, weekly_hours: Decimal = None) -> Decimal:
     """
     Calculate daily target hours based on weekly hours and work days.
@@ -136,6 +184,52 @@ def get_working_days_in_month(db: Session, year: int, month: int) -> int:
     return working_days
 
 
+def target_between(
+    user: User,
+    timeline: WeeklyHoursTimeline,
+    start: date,
+    end: date,
+    excluded: List[Tuple[date, date]],
+) -> Decimal:
+    """
+    Target hours from ``start`` to ``end`` (inclusive): the daily targets of
+    all weekdays outside the ``excluded`` intervals (public holidays and
+    target-reducing absences, see absence_ranges.excluded_intervals).
+
+    Daily targets only depend on weekly hours and weekday, so each stretch of
+    constant weekly hours is counted per weekday with interval arithmetic
+    instead of visiting every day. ``excluded`` must be sorted and disjoint.
+    """
+    total = Decimal('0')
+    first_excluded = bisect_left(excluded, start, key=lambda interval: interval[1])
+    for first, last, weekly_hours in timeline.segments(start, end):
+        counts = absence_ranges.weekday_counts(first, last)
+        for ex_start, ex_end in excluded[first_excluded:]:
+            if ex_start > last:
+                break
+            lo, hi = max(ex_start, first), min(ex_end, last)
+            if lo <= hi:
+                for weekday, n in enumerate(absence_ranges.weekday_counts(lo, hi)):
+                    counts[weekday] -= n
+        for weekday in range(absence_ranges.WORKDAYS):
+            if counts[weekday]:
+                d = first + timedelta(days=(weekday - first.weekday()) % 7)
+                total += get_daily_target_for_date(user, d, weekly_hours) * counts[weekday]
+    return total
+
+
+def _target_absences(db: Session, user: User, holidays: set, *criteria) -> List[absence_ranges.AbsenceRange]:
+    return absence_ranges.load_ranges(
+        db, holidays, Absence.user_id == user.id, Absence.type.notin_(TARGET_KEEPING_TYPES), *criteria,
+    )
+
+
+def _credited_absences(db: Session, user: User, holidays: set, *criteria) -> List[absence_ranges.AbsenceRange]:
+    return absence_ranges.load_ranges(
+        db, holidays, Absence.user_id == user.id, Absence.type.in_(CREDITED_TYPES), *criteria,
+    )
+
+
 # NOTE: §3 ArbZG allows extending daily work to 10h if compensated to 8h average
 # within 6 calendar months / 24 weeks. This averaging period is not tracked
 # automatically — it requires manual monitoring by the employer.
@@ -170,45 +264,21 @@ def get_monthly_target(db: Session, user: User, year: int, month: int) -> Decima
         return Decimal('0')
 
     # Get holidays and absences for the month
-    holidays = db.query(PublicHoliday).filter(
-        extract('year', PublicHoliday.date) == year,
-        extract('month', PublicHoliday.date) == month
-    ).all()
-    holiday_dates = {h.date for h in holidays}
+    holiday_dates = {d for (d,) in db.query(PublicHoliday.date).filter(month_filter(PublicHoliday.date, year, month))}
 
     # Exclude TRAINING, SICK, and OVERTIME from target reduction:
     # - TRAINING counts as worked time (außer Haus)
     # - SICK: §3 EntgFG - employee must be credited as if they worked the planned hours
     # - OVERTIME: Überstundenausgleich – Soll bleibt bestehen, Tag zählt als 0h Ist,
     #   dadurch reduziert sich das Überstundenkonto um die geplanten Stunden
-    absences = db.query(Absence).filter(
-        Absence.user_id == user.id,
-        extract('year', Absence.date) == year,
-        extract('month', Absence.date) == month,
-        Absence.type.notin_([AbsenceType.TRAINING, AbsenceType.SICK, AbsenceType.OVERTIME])
-    ).all()
-    absence_dates = {a.date for a in absences}
-
-    # Calculate target by iterating through each day
-    _, last_day = monthrange(year, month)
-    monthly_target = Decimal('0')
-
-    for day in range(1, last_day + 1):
-        d = date(year, month, day)
-
-        # Skip weekends
-        if d.weekday() >= 5:  # Saturday or Sunday
-            continue
+    absences = _target_absences(db, user, holiday_dates, month_filter(Absence.date, year, month))
 
-        # Skip holidays and absences
-        if d in holiday_dates or d in absence_dates:
-            continue
-
-        # Get weekly hours valid for this specific date
-        weekly_hours = get_weekly_hours_for_date(db, user, d)
-        daily_target = get_daily_target_for_date(user, d, weekly_hours)
-
-        monthly_target += daily_target
+    # Weekdays of the month minus holidays and absence ranges
+    _, last_day = monthrange(year, month)
+    excluded = absence_ranges.excluded_intervals(((a.start, a.end) for a in absences), holiday_dates)
+    monthly_target = target_between(
+        user, load_weekly_hours_timeline(db, user), date(year, month, 1), date(year, month, last_day), excluded,
+    )
 
     return monthly_target.quantize(Decimal('0.01'))
 
@@ -231,26 +301,19 @@ def get_monthly_actual(db: Session, user: User, year: int, month: int) -> Decima
     Returns:
         Actual hours worked as Decimal
     """
-    entries = db.query(TimeEntry).filter(
+    entries = entry_records.load_entries(
+        db,
         TimeEntry.user_id == user.id,
-        extract('year', TimeEntry.date) == year,
-        extract('month', TimeEntry.date) == month
-    ).all()
-
-    total = sum(entry.net_hours for entry in entries)
+        month_filter(TimeEntry.date, year, month),
+    )
 
     # Training and sick hours count as actual worked hours:
     # - TRAINING: außer Haus, credited as worked
     # - SICK: §3 EntgFG - credited as if the planned hours were worked
-    credited_absences = db.query(Absence).filter(
-        Absence.user_id == user.id,
-        Absence.type.in_([AbsenceType.TRAINING, AbsenceType.SICK]),
-        extract('year', Absence.date) == year,
-        extract('month', Absence.date) == month,
-    ).all()
-    credited_hours = sum((Decimal(str(a.hours)) for a in credited_absences), Decimal('0'))
+    credited_absences = _credited_absences(db, user, set(), month_filter(Absence.date, year, month))
 
-    return (Decimal(str(total)) + credited_hours).quantize(Decimal('0.01'))
+    total = sum(e.net_hundredths for e in entries) + sum(a.total_hundredths for a in credited_absences)
+    return Decimal(total).scaleb(-2).quantize(Decimal('0.01'))
 
 
 def get_monthly_balance(db: Session, user: User, year: int, month: int) -> Decimal:
@@ -274,6 +337,16 @@ def get_monthly_balance(db: Session, user: User, year: int, month: int) -> Decim
     return balance.quantize(Decimal('0.01'))
 
 
+class OvertimeInputs(NamedTuple):
+    """Everything get_overtime_account reads from the database (see load_overtime_inputs)."""
+    start_year: int
+    start_month: int
+    initial_balance: Decimal
+    actual_by_month: Dict[tuple, int]        # actual hours per (year, month) in hundredths
+    excluded: List[Tuple[date, date]]        # holidays and target-reducing absences
+    timeline: WeeklyHoursTimeline
+
+
 def get_overtime_account(db: Session, user: User, up_to_year: int, up_to_month: int) -> Decimal:
     """
     Calculate cumulative overtime account up to specified month.
@@ -291,8 +364,14 @@ def get_overtime_account(db: Session, user: User, up_to_year: int, up_to_month:
     Returns:
         Cumulative overtime as Decimal
     """
+    inputs = load_overtime_inputs(db, user, up_to_year, up_to_month)
+    return overtime_from_inputs(user, inputs, up_to_year, up_to_month)
+
+
+def load_overtime_inputs(db: Session, user: User, up_to_year: int, up_to_month: int) -> Optional[OvertimeInputs]:
+    """The queries of get_overtime_account; None if there is nothing to count."""
     if not user.track_hours:
-        return Decimal('0.00')
+        return None
 
     up_to_date = date(up_to_year, up_to_month, monthrange(up_to_year, up_to_month)[1])
 
@@ -316,7 +395,7 @@ def get_overtime_account(db: Session, user: User, up_to_year: int, up_to_month:
         ).order_by(TimeEntry.date).first()
 
         if not first_entry:
-            return Decimal('0.00')
+            return None
 
         start_year = first_entry.date.year
         start_month = first_entry.date.month
@@ -325,79 +404,61 @@ def get_overtime_account(db: Session, user: User, up_to_year: int, up_to_month:
 
     # --- single-pass bulk fetches ---
     # All time entries in range (group by month in memory)
-    entries = db.query(TimeEntry).filter(
+    # Actual hours per month in integer hundredths
+    entries = entry_records.load_entries(
+        db,
         TimeEntry.user_id == user.id,
         TimeEntry.date >= start_date,
         TimeEntry.date <= up_to_date,
-    ).all()
-    actual_by_month: Dict[tuple, Decimal] = {}
+        order_by=(),
+    )
+    actual_by_month: Dict[tuple, int] = {}
     for e in entries:
         key = (e.date.year, e.date.month)
-        actual_by_month[key] = actual_by_month.get(key, Decimal('0')) + Decimal(str(e.net_hours))
-
-    # Training and sick hours count as actual worked hours (§3 EntgFG)
-    credited_absences = db.query(Absence).filter(
-        Absence.user_id == user.id,
-        Absence.date >= start_date,
-        Absence.date <= up_to_date,
-        Absence.type.in_([AbsenceType.TRAINING, AbsenceType.SICK]),
-    ).all()
-    for ca in credited_absences:
-        key = (ca.date.year, ca.date.month)
-        actual_by_month[key] = actual_by_month.get(key, Decimal('0')) + Decimal(str(ca.hours))
-
-    # All absences in range (exclude TRAINING, SICK, OVERTIME — same rule as get_monthly_target)
-    absences = db.query(Absence).filter(
-        Absence.user_id == user.id,
-        Absence.date >= start_date,
-        Absence.date <= up_to_date,
-        Absence.type.notin_([AbsenceType.TRAINING, AbsenceType.SICK, AbsenceType.OVERTIME]),
-    ).all()
-    absence_dates: set[date] = {a.date for a in absences}
+        actual_by_month[key] = actual_by_month.get(key, 0) + e.net_hundredths
 
     # All public holidays in range
-    holidays = db.query(PublicHoliday).filter(
+    holiday_dates: set[date] = {d for (d,) in db.query(PublicHoliday.date).filter(
         PublicHoliday.date >= start_date,
         PublicHoliday.date <= up_to_date,
-    ).all()
-    holiday_dates: set[date] = {h.date for h in holidays}
+    )}
+
+    # Training and sick hours count as actual worked hours (§3 EntgFG)
+    in_range = (Absence.date >= start_date, Absence.date <= up_to_date)
+    credited = absence_ranges.hundredths_by_month(_credited_absences(db, user, holiday_dates, *in_range), holiday_dates)
+    for key, hundredths in credited.items():
+        actual_by_month[key] = actual_by_month.get(key, 0) + hundredths
+
+    # All absences in range (exclude TRAINING, SICK, OVERTIME — same rule as get_monthly_target)
+    absences = _target_absences(db, user, holiday_dates, *in_range)
+    excluded = absence_ranges.excluded_intervals(((a.start, a.end) for a in absences), holiday_dates)
 
     # All working-hours changes for this user
-    wh_changes = db.query(WorkingHoursChange).filter(
-        WorkingHoursChange.user_id == user.id,
-    ).order_by(WorkingHoursChange.effective_from).all()
-
-    def _weekly_hours_for_date(d: date) -> Decimal:
-        """Return the weekly hours effective on date d (no DB query)."""
-        result = Decimal(str(user.weekly_hours))
-        for change in wh_changes:
-            if change.effective_from <= d:
-                result = Decimal(str(change.weekly_hours))
-            else:
-                break
-        return result
+    timeline = load_weekly_hours_timeline(db, user)
+
+    return OvertimeInputs(start_year, start_month, initial_balance, actual_by_month, excluded, timeline)
+
+
+def overtime_from_inputs(user: User, inputs: Optional[OvertimeInputs], up_to_year: int, up_to_month: int) -> Decimal:
+    """The month loop of get_overtime_account, without database access."""
+    if inputs is None:
+        return Decimal('0.00')
 
     # --- iterate months and compute balance in memory ---
-    total_balance = initial_balance
-    current_year, current_month = start_year, start_month
+    total_balance = inputs.initial_balance
+    current_year, current_month = inputs.start_year, inputs.start_month
 
     while (current_year < up_to_year) or (current_year == up_to_year and current_month <= up_to_month):
         key = (current_year, current_month)
 
         # Monthly target (mirrors get_monthly_target logic)
         _, last_day = monthrange(current_year, current_month)
-        monthly_target = Decimal('0')
-        for day in range(1, last_day + 1):
-            d = date(current_year, current_month, day)
-            if d.weekday() >= 5:
-                continue
-            if d in holiday_dates or d in absence_dates:
-                continue
-            weekly_hours = _weekly_hours_for_date(d)
-            daily_target = get_daily_target_for_date(user, d, weekly_hours)
-            monthly_target += daily_target
-
-        monthly_actual = actual_by_month.get(key, Decimal('0'))
+        monthly_target = target_between(
+            user, inputs.timeline, date(current_year, current_month, 1),
+            date(current_year, current_month, last_day), inputs.excluded,
+        )
+
+        monthly_actual = Decimal(inputs.actual_by_month.get(key, 0)).scaleb(-2)
         total_balance += (monthly_actual - monthly_target)
 
         if current_month == 12:
@@ -439,60 +500,31 @@ def get_ytd_summary(db: Session, user: User, year: int = None) -> Dict:
         return {"target_hours": 0.0, "actual_hours": 0.0, "overtime": 0.0}
 
     # Fetch holidays in range
-    holidays = db.query(PublicHoliday).filter(
+    holiday_dates: set = {d for (d,) in db.query(PublicHoliday.date).filter(
         PublicHoliday.date >= start,
         PublicHoliday.date <= end,
-    ).all()
-    holiday_dates: set = {h.date for h in holidays}
+    )}
 
     # Fetch absences in range (exclude TRAINING, SICK, OVERTIME - same as get_monthly_target)
-    absences = db.query(Absence).filter(
-        Absence.user_id == user.id,
-        Absence.date >= start,
-        Absence.date <= end,
-        Absence.type.notin_([AbsenceType.TRAINING, AbsenceType.SICK, AbsenceType.OVERTIME]),
-    ).all()
-    absence_dates: set = {a.date for a in absences}
-
-    # Fetch working hours changes
-    wh_changes = db.query(WorkingHoursChange).filter(
-        WorkingHoursChange.user_id == user.id,
-    ).order_by(WorkingHoursChange.effective_from).all()
-
-    def _weekly_hours_for_date(d: date) -> Decimal:
-        result = Decimal(str(user.weekly_hours))
-        for change in wh_changes:
-            if change.effective_from <= d:
-                result = Decimal(str(change.weekly_hours))
-            else:
-                break
-        return result
+    in_range = (Absence.date >= start, Absence.date <= end)
+    absences = _target_absences(db, user, holiday_dates, *in_range)
 
     # Sum daily targets
-    total_target = Decimal('0')
-    current = start
-    while current <= end:
-        if current.weekday() < 5 and current not in holiday_dates and current not in absence_dates:
-            weekly_hours = _weekly_hours_for_date(current)
-            daily_target = get_daily_target_for_date(user, current, weekly_hours)
-            total_target += daily_target
-        current += timedelta(days=1)
+    excluded = absence_ranges.excluded_intervals(((a.start, a.end) for a in absences), holiday_dates)
+    total_target = target_between(user, load_weekly_hours_timeline(db, user), start, end, excluded)
 
     # Sum actual hours (time entries + credited absence hours: training + sick)
-    entries = db.query(TimeEntry).filter(
+    entries = entry_records.load_entries(
+        db,
         TimeEntry.user_id == user.id,
         TimeEntry.date >= start,
         TimeEntry.date <= end,
-    ).all()
-    total_actual = sum((Decimal(str(e.net_hours)) for e in entries), start=Decimal('0'))
-
-    credited_absences = db.query(Absence).filter(
-        Absence.user_id == user.id,
-        Absence.date >= start,
-        Absence.date <= end,
-        Absence.type.in_([AbsenceType.TRAINING, AbsenceType.SICK]),
-    ).all()
-    total_actual += sum((Decimal(str(a.hours)) for a in credited_absences), start=Decimal('0'))
+        order_by=(),
+    )
+    credited_absences = _credited_absences(db, user, holiday_dates, *in_range)
+    total_actual = Decimal(
+        sum(e.net_hundredths for e in entries) + sum(a.total_hundredths for a in credited_absences)
+    ).scaleb(-2)
 
     # Include overtime carryover for this year
     carryover = db.query(YearCarryover).filter(
@@ -511,33 +543,8 @@ def get_ytd_summary(db: Session, user: User, year: int = None) -> Dict:
     }
 
 
-def get_vacation_account(db: Session, user: User, year: int) -> Dict:
-    """
-    Calculate vacation account for a given year.
-
-    Returns:
-        budget_hours: Total vacation budget in hours (vacation_days × daily_target)
-        budget_days: Total vacation days from user config
-        used_hours: Hours of vacation taken
-        used_days: Days of vacation taken (used_hours / daily_target)
-        remaining_hours: Remaining vacation hours
-        remaining_days: Remaining vacation days
-
-    NOTE: Uses CURRENT weekly hours for conversion between days and hours.
-    This ensures consistent display even if hours changed during the year.
-
-    Args:
-        db: Database session
-        user: User object
-        year: Year to calculate for
-
-    Returns:
-        Dict with vacation account details
-    """
-    # Use current weekly hours for conversion
-    daily_target = get_daily_target(user)
-
-    # Calculate budget in hours, pro-rated for first/last work day
+def _vacation_budget_days(user: User, year: int) -> Decimal:
+    """Yearly vacation days of the user, pro-rated for first/last work day in that year."""
     budget_days = Decimal(str(user.vacation_days))
     if user.first_work_day and user.first_work_day.year == year:
         fwd = user.first_work_day
@@ -554,24 +561,18 @@ def get_vacation_account(db: Session, user: User, year: int) -> Dict:
         months_worked = Decimal(str(lwd.month - 1)) + Decimal(str(days_worked)) / Decimal(str(days_in_month))
         budget_days_last = (Decimal(str(user.vacation_days)) * months_worked / Decimal('12')).quantize(Decimal('0.1'))
         budget_days = min(budget_days, budget_days_last)
-    # Add carryover vacation days from previous year
-    carryover = db.query(YearCarryover).filter(
-        YearCarryover.user_id == user.id,
-        YearCarryover.year == year,
-    ).first()
-    carryover_days = Decimal(str(carryover.vacation_days)) if carryover else Decimal('0')
-    budget_days += carryover_days
+    return budget_days
 
-    budget_hours = budget_days * daily_target
 
-    # Calculate used vacation hours
-    vacation_absences = db.query(Absence).filter(
-        Absence.user_id == user.id,
-        Absence.type == AbsenceType.VACATION,
-        extract('year', Absence.date) == year
-    ).all()
+def _vacation_account(user: User, year: int, ledger: vacation_ledger_service.VacationLedger) -> Dict:
+    # Use current weekly hours for conversion
+    daily_target = get_daily_target(user)
+
+    # Budget: pro-rated yearly days plus carryover vacation days from previous year
+    budget_days = _vacation_budget_days(user, year) + ledger.carryover_days
+    budget_hours = budget_days * daily_target
 
-    used_hours = sum((Decimal(str(a.hours)) for a in vacation_absences), start=Decimal('0'))
+    used_hours = ledger.used_hours
     used_days = used_hours / daily_target if daily_target > 0 else Decimal('0')
 
     # Calculate remaining
@@ -588,26 +589,70 @@ def get_vacation_account(db: Session, user: User, year: int) -> Dict:
     }
 
 
-def count_workdays(db: Session, start: date, end: date) -> int:
-    """Count weekdays (Mon-Fri) excluding public holidays between start and end (inclusive)."""
-    years: set = set()
-    cur = start
-    while cur <= end:
-        years.add(cur.year)
-        cur += timedelta(days=1)
+def get_vacation_account(db: Session, user: User, year: int) -> Dict:
+    """
+    Calculate vacation account for a given year.
+
+    Returns:
+        budget_hours: Total vacation budget in hours (vacation_days × daily_target)
+        budget_days: Total vacation days from user config
+        used_hours: Hours of vacation taken
+        used_days: Days of vacation taken (used_hours / daily_target)
+        remaining_hours: Remaining vacation hours
+        remaining_days: Remaining vacation days
+
+    NOTE: Uses CURRENT weekly hours for conversion between days and hours.
+    This ensures consistent display even if hours changed during the year.
 
-    holidays: set = set()
-    for year in years:
-        year_holidays = db.query(PublicHoliday).filter(PublicHoliday.year == year).all()
-        holidays.update(h.date for h in year_holidays)
+    Carryover and used hours come from the session's vacation ledger, so
+    repeated calls for the same user and year within one transaction do not
+    query again (see vacation_ledger_service).
 
-    count = 0
-    cur = start
-    while cur <= end:
-        if cur.weekday() < 5 and cur not in holidays:
-            count += 1
-        cur += timedelta(days=1)
-    return count
+    Args:
+        db: Database session
+        user: User object
+        year: Year to calculate for
+
+    Returns:
+        Dict with vacation account details
+    """
+    return _vacation_account(user, year, vacation_ledger_service.get(db, user.id, year, user.tenant_id))
+
+
+def get_vacation_accounts(db: Session, users: list, year: int) -> Dict:
+    """
+    Vacation accounts of many users for one year, keyed by user id.
+
+    Same values as get_vacation_account() per user, but carryovers and used
+    vacation hours are loaded with two grouped queries for all users (after
+    one version query for the ledger cache, see vacation_ledger_service).
+    """
+    ledgers = {}
+    for tenant_id in {u.tenant_id for u in users}:
+        ledgers.update(vacation_ledger_service.load_many(
+            db, [u.id for u in users if u.tenant_id == tenant_id], year, tenant_id,
+        ))
+    return {u.id: _vacation_account(u, year, ledgers[u.id]) for u in users}
+
+
+def load_holiday_dates(db: Session, years: Iterable[int]) -> set:
+    """Public holiday dates of the given years (one query)."""
+    years = set(years)
+    if not years:
+        return set()
+    return {d for (d,) in db.query(PublicHoliday.date).filter(PublicHoliday.year.in_(years))}
+
+
+def count_workdays(db: Session, start: date, end: date, holidays: Optional[set] = None) -> int:
+    """
+    Count weekdays (Mon-Fri) excluding public holidays between start and end (inclusive).
+
+    Pass ``holidays`` (see load_holiday_dates) when counting many ranges to
+    avoid the holiday query per call.
+    """
+    if holidays is None:
+        holidays = load_holiday_dates(db, range(start.year, end.year + 1))
+    return absence_ranges.count_workdays(start, end, holidays)
 
 
 def create_year_closing(db: Session, year: int, users: list) -> list:
@@ -616,7 +661,8 @@ def create_year_closing(db: Session, year: int, users: list) -> list:
 
     For each user, calculates the cumulative overtime balance at Dec 31
     and the remaining vacation days, then creates/updates a YearCarryover
-    record for year+1.
+    record for year+1. Delegates to year_closing_service.close_year(), which
+    loads the inputs of all users in bulk, and commits.
 
     Args:
         db: Database session
@@ -626,43 +672,9 @@ def create_year_closing(db: Session, year: int, users: list) -> list:
     Returns:
         List of dicts with user info and carryover values
     """
-    next_year = year + 1
-    results = []
-
-    for user in users:
-        # Calculate overtime balance at end of year
-        overtime_balance = get_overtime_account(db, user, year, 12)
-
-        # Calculate remaining vacation days
-        vacation_account = get_vacation_account(db, user, year)
-        remaining_vacation = Decimal(str(vacation_account['remaining_days']))
-
-        # Create or update carryover for next year
-        carryover = db.query(YearCarryover).filter(
-            YearCarryover.user_id == user.id,
-            YearCarryover.year == next_year,
-        ).first()
-
-        if carryover:
-            carryover.overtime_hours = overtime_balance
-            carryover.vacation_days = remaining_vacation
-        else:
-            carryover = YearCarryover(
-                user_id=user.id,
-                tenant_id=user.tenant_id,
-                year=next_year,
-                overtime_hours=overtime_balance,
-                vacation_days=remaining_vacation,
-            )
-            db.add(carryover)
-
-        results.append({
-            "user_id": str(user.id),
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "overtime_hours": float(overtime_balance),
-            "vacation_days": float(remaining_vacation.quantize(Decimal('0.1'))),
-        })
+    # Local import: year_closing_service builds on this module
+    from app.services import year_closing_service
 
+    report = year_closing_service.close_year(db, year, users)
     db.commit()
-    return results
+    return report["employees"]
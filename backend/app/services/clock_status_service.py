@@ -0,0 +1,257 @@
+"""
+Clock-in/clock-out status push channel.
+
+Keeps a tiny per-user snapshot of the open (clocked-in) entry and fans state
+changes out to server-sent-event subscribers. Writers (clock_in, clock_out and
+other paths that open/close entries) call ``publish``; the SSE endpoint serves
+the cached snapshot on connect and then only wakes up when something changes,
+so idle browser tabs cost no database queries.
+
+Snapshots expire after ``SNAPSHOT_TTL_SECONDS``; an expired one reads as a
+miss and the stream endpoint looks the open entry up again. That bounds how
+long a change made without ``publish`` (or lost between workers) is served.
+
+The hub itself is process-local. With several server workers a
+``ClockStatusRelay`` forwards changes through Postgres LISTEN/NOTIFY so a
+clock-in handled by one worker reaches SSE subscribers on all others.
+"""
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time as timer
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.services.timezone_service import LOCAL_TZ, now_local
+
+logger = logging.getLogger(__name__)
+
+# A cached snapshot is trusted this long; afterwards the next read goes to the DB
+SNAPSHOT_TTL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class ClockSnapshot:
+    """Minimal clock state of one user (no open entry → all fields None)."""
+    entry_id: Optional[UUID] = None
+    entry_date: Optional[date] = None
+    start_time: Optional[time] = None
+    note: Optional[str] = None
+
+    @classmethod
+    def from_entry(cls, entry) -> "ClockSnapshot":
+        if entry is None:
+            return cls()
+        return cls(entry_id=entry.id, entry_date=entry.date, start_time=entry.start_time, note=entry.note)
+
+    def to_payload(self, now: Optional[datetime] = None) -> dict:
+        """Serialize like ClockStatusResponse; stale entries from earlier days count as clocked out."""
+        now = now or now_local()
+        if self.entry_id is None or self.entry_date != now.date():
+            return {"is_clocked_in": False, "current_entry": None, "elapsed_minutes": None}
+        start_dt = datetime.combine(self.entry_date, self.start_time, tzinfo=LOCAL_TZ)
+        return {
+            "is_clocked_in": True,
+            "current_entry": {
+                "id": str(self.entry_id),
+                "date": self.entry_date.isoformat(),
+                "start_time": self.start_time.strftime("%H:%M:%S"),
+                "end_time": None,
+                "note": self.note,
+            },
+            "elapsed_minutes": int((now - start_dt).total_seconds() / 60),
+        }
+
+
+_Subscriber = Tuple[asyncio.AbstractEventLoop, "asyncio.Queue[ClockSnapshot]"]
+
+
+class ClockStatusHub:
+    """Thread-safe snapshot cache plus asyncio fan-out per user."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: Dict[UUID, Tuple[ClockSnapshot, float]] = {}  # user → (snapshot, stored at)
+        self._subscribers: Dict[UUID, Set[_Subscriber]] = {}
+
+    def get_snapshot(self, user_id: UUID) -> Optional[ClockSnapshot]:
+        """Cached state of the user, None if unknown or older than SNAPSHOT_TTL_SECONDS."""
+        with self._lock:
+            cached = self._snapshots.get(user_id)
+        if cached is None or timer.monotonic() - cached[1] > SNAPSHOT_TTL_SECONDS:
+            return None
+        return cached[0]
+
+    def publish(self, user_id: UUID, snapshot: ClockSnapshot) -> bool:
+        """Store the new state and wake all subscribers of the user (callable from any thread).
+
+        Returns False if the state was already current.
+        """
+        with self._lock:
+            previous, _ = self._snapshots.get(user_id, (None, None))
+            self._snapshots[user_id] = (snapshot, timer.monotonic())
+            subscribers = list(self._subscribers.get(user_id, ()))
+        if previous == snapshot:
+            return False
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, snapshot)
+            except RuntimeError:
+                pass  # loop already closed; the subscriber is going away
+        return True
+
+    def subscribe(self, user_id: UUID) -> "asyncio.Queue[ClockSnapshot]":
+        """Register a subscriber for the running event loop."""
+        queue: "asyncio.Queue[ClockSnapshot]" = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id: UUID, queue: "asyncio.Queue[ClockSnapshot]") -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if not subscribers:
+                return
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def subscriber_count(self, user_id: UUID) -> int:
+        with self._lock:
+            return len(self._subscribers.get(user_id, ()))
+
+    def subscribed_users(self) -> Set[UUID]:
+        with self._lock:
+            return set(self._subscribers)
+
+    def retain_snapshots(self, user_ids: Set[UUID]) -> None:
+        """Drop the cached snapshots of all other users (they are reloaded from the DB on demand)."""
+        with self._lock:
+            self._snapshots = {uid: s for uid, s in self._snapshots.items() if uid in user_ids}
+
+    def forget(self, user_ids) -> None:
+        """Drop the cached snapshots of the given users (e.g. after their entries were deleted)."""
+        with self._lock:
+            for uid in user_ids:
+                self._snapshots.pop(uid, None)
+
+
+hub = ClockStatusHub()
+
+
+class ClockStatusRelay:
+    """
+    Cross-worker fan-out via Postgres LISTEN/NOTIFY.
+
+    The notification only carries the user id (NOTIFY payloads are limited to
+    8000 bytes, notes are unbounded); receiving workers reload the open entry
+    with one query and publish it to their local hub.
+    """
+
+    CHANNEL = "clock_status"
+
+    def __init__(self, engine, load_open_entry):
+        self._engine = engine
+        self._load_open_entry = load_open_entry
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def notify(self, user_id: UUID) -> None:
+        try:
+            with self._engine.begin() as conn:
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": self.CHANNEL, "payload": f"{os.getpid()}:{user_id}"},
+                )
+        except Exception:
+            logger.warning("Clock status notify failed", exc_info=True)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._listen, name="clock-status-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def handle(self, payload: str) -> None:
+        """Apply one notification from another worker to the local hub."""
+        pid, _, user_id = payload.partition(":")
+        if pid == str(os.getpid()):
+            return  # own change, already published locally
+        uid = UUID(user_id)
+        hub.publish(uid, ClockSnapshot.from_entry(self._load_open_entry(uid)))
+
+    def resync(self) -> None:
+        """
+        Bring the hub up to date after (re)connecting: notifications sent while
+        the LISTEN connection was down are lost. Snapshots of users without a
+        subscriber are dropped, those of subscribed users reloaded (and pushed
+        to their streams if they changed).
+        """
+        users = hub.subscribed_users()
+        hub.retain_snapshots(users)
+        for uid in users:
+            hub.publish(uid, ClockSnapshot.from_entry(self._load_open_entry(uid)))
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            raw = None
+            try:
+                # Dedicated connection outside the pool, kept for the worker's lifetime
+                raw = self._engine.raw_connection()
+                raw.detach()
+                conn = raw.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.CHANNEL}")
+                # Listening again before the reload, so no change falls in between
+                self.resync()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.handle(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.warning("Clock status relay disconnected, retrying", exc_info=True)
+                self._stop.wait(5)
+            finally:
+                if raw is not None:
+                    raw.close()
+
+
+_relay: Optional[ClockStatusRelay] = None
+
+
+def start_relay(engine, load_open_entry) -> None:
+    """Enable cross-worker relaying (called from the lifespan with WEB_CONCURRENCY > 1)."""
+    global _relay
+    _relay = ClockStatusRelay(engine, load_open_entry)
+    _relay.start()
+
+
+def stop_relay() -> None:
+    global _relay
+    if _relay is not None:
+        _relay.stop()
+        _relay = None
+
+
+def publish_entry(user_id: UUID, open_entry) -> None:
+    """Publish the user's current open entry (or None after clock-out)."""
+    if hub.publish(user_id, ClockSnapshot.from_entry(open_entry)) and _relay is not None:
+        _relay.notify(user_id)
+
+
+def format_sse(snapshot: ClockSnapshot) -> str:
+    """Render one server-sent event."""
+    return f"event: clock-status\ndata: {json.dumps(snapshot.to_payload())}\n\n"
@@ -0,0 +1,234 @@
+"""
+DSGVO Art. 20 data export of one user, streamed.
+
+The export used to load every time entry and absence as ORM objects and build
+one dict for a single JSONResponse – for long-tenured staff tens of thousands
+of rows held in memory at once. The generators here select only the exported
+columns, page through each section with ``yield_per`` (a server-side cursor on
+PostgreSQL) and emit the document in chunks, so memory stays bounded by one
+batch regardless of the history length.
+
+Formats:
+    json    one JSON document (same top-level layout as before, plus sections)
+    ndjson  one JSON object per line: header line, then one line per record
+    csv     ZIP archive with one CSV file per section (written on the fly)
+"""
+import csv
+import enum
+import io
+import json
+import uuid
+import zipfile
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.models import Absence, ChangeRequest, TimeEntry, TimeEntryAuditLog, User, VacationRequest
+from app.services import audit_service
+
+FORMATS = ("json", "ndjson", "csv")
+
+MEDIA_TYPES = {
+    "json": "application/json; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "application/zip",
+}
+
+FILE_EXTENSIONS = {"json": "json", "ndjson": "ndjson", "csv": "zip"}
+
+# Rows fetched per round trip; also the flush interval of the ZIP writer
+BATCH_SIZE = 1000
+
+
+class Section(NamedTuple):
+    """One exported table: rows of ``model`` belonging to the user."""
+    name: str
+    model: type
+    columns: Sequence[str]
+    order_by: Sequence[str]
+    # Values to override per row (given the row as a dict), e.g. expanded compact diffs
+    expand: Optional[Callable[[dict], dict]] = None
+
+
+SECTIONS: List[Section] = [
+    Section("zeiteintraege", TimeEntry, (
+        "date", "start_time", "end_time", "break_minutes", "note",
+        "sunday_exception_reason", "created_at",
+    ), ("date", "start_time")),
+    Section("abwesenheiten", Absence, (
+        "date", "end_date", "type", "hours", "start_time", "end_time", "note", "created_at",
+    ), ("date",)),
+    Section("urlaubsantraege", VacationRequest, (
+        "date", "end_date", "hours", "absence_type", "note", "status",
+        "rejection_reason", "reviewed_at", "created_at",
+    ), ("created_at",)),
+    Section("aenderungsantraege", ChangeRequest, (
+        "request_type", "entry_kind", "status", "reason",
+        "proposed_date", "proposed_start_time", "proposed_end_time", "proposed_break_minutes", "proposed_note",
+        "proposed_absence_type", "proposed_absence_hours",
+        "original_date", "original_start_time", "original_end_time", "original_break_minutes", "original_note",
+        "original_absence_type", "original_absence_hours",
+        "rejection_reason", "reviewed_at", "created_at",
+    ), ("created_at",)),
+    # changed_by is left out: it identifies the admin, not the data subject
+    Section("aenderungsprotokoll", TimeEntryAuditLog, (
+        "action", "source",
+        "old_date", "old_start_time", "old_end_time", "old_break_minutes", "old_note",
+        "new_date", "new_start_time", "new_end_time", "new_break_minutes", "new_note",
+        "changed_fields", "created_at",
+    ), ("created_at",), audit_service.expanded_values),
+]
+
+
+def _plain(value):
+    """JSON/CSV representation of a column value."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _header(user: User) -> dict:
+    return {
+        "export_info": {
+            "basis": "Art. 20 DSGVO – Recht auf Datenübertragbarkeit",
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "user_id": str(user.id),
+        },
+        "stammdaten": {
+            "username": user.username,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "email": user.email,
+            "role": user.role.value,
+            "weekly_hours": float(user.weekly_hours),
+            "vacation_days": user.vacation_days,
+            "is_active": user.is_active,
+            "created_at": user.created_at.isoformat() if user.created_at else None,
+        },
+    }
+
+
+def iter_rows(db: Session, section: Section, user_id, batch_size: int = BATCH_SIZE) -> Iterator[tuple]:
+    """Plain value tuples of one section, fetched ``batch_size`` rows at a time."""
+    model = section.model
+    query = (
+        db.query(*(getattr(model, c) for c in section.columns))
+        .filter(model.user_id == user_id)
+        .order_by(*(getattr(model, c) for c in section.order_by), model.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in query:
+        if section.expand is not None:
+            values = dict(zip(section.columns, row))
+            values.update(section.expand(values))
+            row = (values[c] for c in section.columns)
+        yield tuple(_plain(v) for v in row)
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def iter_json(db: Session, user_id, header: dict, batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """The export as one JSON document, one chunk per batch of rows."""
+    yield _dumps(header)[:-1].encode()  # keep the object open for the sections
+    for section in SECTIONS:
+        yield f', "{section.name}": ['.encode()
+        chunk: List[str] = []
+        first = True
+        for row in iter_rows(db, section, user_id, batch_size):
+            chunk.append(("" if first else ", ") + _dumps(dict(zip(section.columns, row))))
+            first = False
+            if len(chunk) >= batch_size:
+                yield "".join(chunk).encode()
+                chunk = []
+        chunk.append("]")
+        yield "".join(chunk).encode()
+    yield b"}\n"
+
+
+def iter_ndjson(db: Session, user_id, header: dict, batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """Header line, then one ``{"section": …, "data": {…}}`` line per record."""
+    yield (_dumps(header) + "\n").encode()
+    for section in SECTIONS:
+        chunk: List[str] = []
+        for row in iter_rows(db, section, user_id, batch_size):
+            chunk.append(_dumps({"section": section.name, "data": dict(zip(section.columns, row))}) + "\n")
+            if len(chunk) >= batch_size:
+                yield "".join(chunk).encode()
+                chunk = []
+        if chunk:
+            yield "".join(chunk).encode()
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object collecting ZIP output between yields."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        """Yield what has been written since the last drain (nothing if empty)."""
+        if self._parts:
+            data = b"".join(self._parts)
+            self._parts.clear()
+            yield data
+
+
+def iter_csv_zip(db: Session, user_id, header: dict, batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """
+    ZIP archive with ``stammdaten.csv`` and one CSV per section.
+
+    zipfile writes data descriptors when the target is not seekable, so the
+    archive is produced front to back and drained after every batch.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open("stammdaten.csv", "w") as raw:
+            with io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+                writer = csv.writer(text, delimiter=";")
+                info = {**header["export_info"], **header["stammdaten"]}
+                writer.writerow(info.keys())
+                writer.writerow(info.values())
+        yield from sink.drain()
+
+        for section in SECTIONS:
+            with archive.open(f"{section.name}.csv", "w") as raw:
+                with io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+                    writer = csv.writer(text, delimiter=";")
+                    writer.writerow(section.columns)
+                    for count, row in enumerate(iter_rows(db, section, user_id, batch_size), 1):
+                        writer.writerow(row)
+                        if count % batch_size == 0:
+                            text.flush()
+                            yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+_WRITERS = {"json": iter_json, "ndjson": iter_ndjson, "csv": iter_csv_zip}
+
+
+def stream_export(db: Session, user: User, fmt: str = "json", batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Chunks of the export in ``fmt`` (one of ``FORMATS``).
+
+    The master data is read right away; the sections are queried lazily while
+    the returned iterator is consumed.
+    """
+    return _WRITERS[fmt](db, user.id, _header(user), batch_size)
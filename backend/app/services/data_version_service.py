@@ -0,0 +1,251 @@
+"""
+Data-change version counters for cache invalidation.
+
+Every flush that touches calculation inputs (time entries, absences, working
+hours changes, holidays, carryovers, relevant user columns) bumps a counter in
+``data_versions`` for the affected (tenant, user, year, month). Readers fetch the
+counters for a range in a single query and compare them against the value they
+stored alongside a cached result.
+
+Scopes:
+- (tenant, user, year, month): month-local changes (time entries, absences)
+- (tenant, user, ALL_MONTHS):  changes that affect every month of one user
+                               (weekly hours history, carryovers, user settings)
+- (tenant, TENANT_SCOPE, year, month): tenant-wide month changes (holidays)
+- (tenant, TENANT_SCOPE, ALL_MONTHS):  tenant-wide changes (year closing, …)
+
+The effective version of a month is the sum of all four counters. Counters only
+grow, so the sum changes whenever any of them is bumped.
+"""
+import uuid
+from datetime import date, datetime
+from typing import Dict, Iterable, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event, func, or_, and_, true
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.data_version import DataVersion, TENANT_SCOPE, ALL_MONTHS
+from app.models import TimeEntry, Absence, WorkingHoursChange, PublicHoliday, YearCarryover, User
+
+
+# User columns that influence targets, balances, vacation or displayed names
+_USER_TRACKED_COLUMNS = (
+    "weekly_hours", "work_days_per_week", "track_hours", "vacation_days",
+    "use_daily_schedule", "hours_monday", "hours_tuesday", "hours_wednesday",
+    "hours_thursday", "hours_friday", "first_work_day", "last_work_day",
+    "vacation_carryover_deadline", "exempt_from_arbzg", "is_night_worker",
+    "is_active", "is_hidden", "first_name", "last_name", "calendar_color",
+)
+
+ScopeKey = Tuple[uuid.UUID, uuid.UUID, int, int]
+
+# Session.info flag: counters were bumped in the open transaction
+_BUMPED_KEY = "data_versions_bumped"
+
+
+class VersionStamp(NamedTuple):
+    """Combined version for a range plus the newest change timestamp."""
+    version: int
+    updated_at: Optional[datetime]
+
+
+def _as_uuid(value) -> Optional[uuid.UUID]:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    return uuid.UUID(str(value))
+
+
+def _month_keys(tenant_id, user_id, dates: Iterable[Optional[date]]) -> Set[ScopeKey]:
+    tid, uid = _as_uuid(tenant_id), _as_uuid(user_id)
+    if tid is None or uid is None:
+        return set()
+    return {(tid, uid, d.year, d.month) for d in dates if d is not None}
+
+
+def _all_months_key(tenant_id, user_id) -> Set[ScopeKey]:
+    tid, uid = _as_uuid(tenant_id), _as_uuid(user_id)
+    if tid is None or uid is None:
+        return set()
+    return {(tid, uid, ALL_MONTHS, ALL_MONTHS)}
+
+
+def _date_history(obj, attr: str) -> list:
+    """Current and previous value of a date attribute (previous only if changed)."""
+    hist = sa_inspect(obj).attrs[attr].history
+    return [getattr(obj, attr)] + list(hist.deleted or ())
+
+
+def _keys_for_object(obj, state: str) -> Set[ScopeKey]:
+    """Return the version scopes touched by a new/dirty/deleted object."""
+    if isinstance(obj, (TimeEntry, Absence)):
+        return _month_keys(obj.tenant_id, obj.user_id, _date_history(obj, "date"))
+    if isinstance(obj, PublicHoliday):
+        return _month_keys(obj.tenant_id, TENANT_SCOPE, _date_history(obj, "date"))
+    if isinstance(obj, (WorkingHoursChange, YearCarryover)):
+        return _all_months_key(obj.tenant_id, obj.user_id)
+    if isinstance(obj, User):
+        if state == "dirty":
+            attrs = sa_inspect(obj).attrs
+            if not any(attrs[c].history.has_changes() for c in _USER_TRACKED_COLUMNS):
+                return set()
+        return _all_months_key(obj.tenant_id, obj.id)
+    return set()
+
+
+def _upsert_statement(dialect_name: str, keys: Set[ScopeKey]):
+    rows = [
+        {"id": uuid.uuid4(), "tenant_id": t, "user_id": u, "year": y, "month": m, "version": 1}
+        for t, u, y, m in sorted(keys)
+    ]
+    if dialect_name == "postgresql":
+        insert = postgresql.insert
+    elif dialect_name == "sqlite":
+        insert = sqlite.insert
+    else:
+        return None
+    stmt = insert(DataVersion).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "user_id", "year", "month"],
+        set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+    )
+
+
+def bump(db: Session, keys: Set[ScopeKey]) -> None:
+    """Increment the counters for the given scopes (single multi-row upsert)."""
+    if not keys:
+        return
+    conn = db.connection()
+    stmt = _upsert_statement(conn.dialect.name, keys)
+    if stmt is not None:
+        conn.execute(stmt)
+        db.info[_BUMPED_KEY] = True
+
+
+def bumped_in_transaction(db: Session) -> bool:
+    """
+    True if the session bumped counters in its open transaction. Versions it
+    reads then include uncommitted bumps (undone by a rollback), so process-wide
+    caches must neither store nor trust results keyed by them.
+    """
+    return db.info.get(_BUMPED_KEY, False)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_bumped_flag(session):
+    session.info.pop(_BUMPED_KEY, None)
+
+
+def bump_user(db: Session, tenant_id, user_id) -> None:
+    """Invalidate every month of one user (for bulk updates/deletes bypassing the ORM)."""
+    bump(db, _all_months_key(tenant_id, user_id))
+
+
+def bump_tenant(db: Session, tenant_id, dates: Optional[Iterable[date]] = None) -> None:
+    """Invalidate tenant-wide data, either for the months of ``dates`` or for all months."""
+    if dates is None:
+        bump(db, _all_months_key(tenant_id, TENANT_SCOPE))
+    else:
+        bump(db, _month_keys(tenant_id, TENANT_SCOPE, dates))
+
+
+def _load_previous_date(target, value, oldvalue, initiator):
+    """No-op set listener; active_history makes the old date available on flush."""
+    return value
+
+
+# Moving an entry to another month must invalidate the old month too, so the
+# previous date has to be loaded even if the attribute was expired by a commit.
+for _model in (TimeEntry, Absence, PublicHoliday):
+    event.listen(_model.date, "set", _load_previous_date, retval=True, active_history=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_after_flush(session, flush_context):
+    """Collect touched scopes from the unit of work and bump them in one statement."""
+    keys: Set[ScopeKey] = set()
+    for obj in session.new:
+        keys |= _keys_for_object(obj, "new")
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            keys |= _keys_for_object(obj, "dirty")
+    for obj in session.deleted:
+        keys |= _keys_for_object(obj, "deleted")
+    bump(session, keys)
+
+
+def _range_filter(tenant_id, user_id, start: date, end: date):
+    """Rows of one tenant within [start, end]; user_id=None selects all users."""
+    start_key = start.year * 100 + start.month
+    end_key = end.year * 100 + end.month
+    user_filter = (
+        DataVersion.user_id.in_([_as_uuid(user_id), TENANT_SCOPE])
+        if user_id is not None else true()
+    )
+    return and_(
+        DataVersion.tenant_id == _as_uuid(tenant_id),
+        user_filter,
+        or_(
+            DataVersion.year == ALL_MONTHS,
+            and_(
+                DataVersion.year * 100 + DataVersion.month >= start_key,
+                DataVersion.year * 100 + DataVersion.month <= end_key,
+            ),
+        ),
+    )
+
+
+def get_month_versions(db: Session, tenant_id, user_id, start: date, end: date) -> Dict[Tuple[int, int], int]:
+    """
+    Effective version per (year, month) between start and end (inclusive) in one query.
+
+    Months without any recorded change get the version of the all-months scopes
+    (0 if nothing was ever recorded).
+    """
+    rows = db.query(DataVersion.year, DataVersion.month, DataVersion.version).filter(
+        _range_filter(tenant_id, user_id, start, end)
+    ).all()
+
+    base = sum(v for y, m, v in rows if y == ALL_MONTHS)
+    per_month: Dict[Tuple[int, int], int] = {}
+    for y, m, v in rows:
+        if y != ALL_MONTHS:
+            per_month[(y, m)] = per_month.get((y, m), 0) + v
+
+    result: Dict[Tuple[int, int], int] = {}
+    y, m = start.year, start.month
+    while (y, m) <= (end.year, end.month):
+        result[(y, m)] = base + per_month.get((y, m), 0)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return result
+
+
+def get_user_versions(db: Session, tenant_id, user_ids: Iterable, start: date, end: date) -> Dict[uuid.UUID, int]:
+    """Combined version of [start, end] per user (own and tenant-wide scopes), one grouped query."""
+    ids = {_as_uuid(u) for u in user_ids}
+    rows = db.query(DataVersion.user_id, func.sum(DataVersion.version)).filter(
+        _range_filter(tenant_id, None, start, end),
+        DataVersion.user_id.in_(ids | {TENANT_SCOPE}),
+    ).group_by(DataVersion.user_id).all()
+    versions = {_as_uuid(user_id): int(version) for user_id, version in rows}
+    tenant_wide = versions.pop(TENANT_SCOPE, 0)
+    return {uid: versions.get(uid, 0) + tenant_wide for uid in ids}
+
+
+def get_range_stamp(db: Session, tenant_id, user_id, start: date, end: date) -> VersionStamp:
+    """Combined version and newest change time for a user's range — one aggregate query.
+
+    ``user_id=None`` aggregates over every user of the tenant.
+    """
+    version, updated_at = db.query(
+        func.coalesce(func.sum(DataVersion.version), 0),
+        func.max(DataVersion.updated_at),
+    ).filter(_range_filter(tenant_id, user_id, start, end)).one()
+    return VersionStamp(int(version), updated_at)
+
+
+def get_tenant_range_stamp(db: Session, tenant_id, start: date, end: date) -> VersionStamp:
+    """Like get_range_stamp, but over all users of a tenant (team views such as the calendar)."""
+    return get_range_stamp(db, tenant_id, None, start, end)
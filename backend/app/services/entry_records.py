@@ -0,0 +1,81 @@
+"""
+Compact read-only records of time entries and absences.
+
+Calculation, journal and export paths only read bookings. Loading them as ORM
+entities costs an identity-map entry, instrumentation state and an attribute
+dict per row, and ``TimeEntry.net_hours`` redoes the float → ``Decimal(str())``
+conversion on every access. The loaders here select plain columns into
+NamedTuples and compute the net time once per row as integer hundredths of an
+hour — the resolution of ``net_hours``, so sums stay exact and identical.
+
+Records are snapshots: they are not tracked by the session and must not be
+used to modify bookings.
+"""
+from datetime import date, time
+from decimal import Decimal
+from typing import List, NamedTuple, Optional
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.models import TimeEntry, Absence, AbsenceType
+from app.models.time_entry import net_hundredths
+
+
+class EntryRecord(NamedTuple):
+    """One time entry with its net time precomputed."""
+    id: uuid.UUID
+    user_id: uuid.UUID
+    date: date
+    start_time: time
+    end_time: Optional[time]
+    break_minutes: int
+    note: Optional[str]
+    sunday_exception_reason: Optional[str]
+    net_hundredths: int
+
+    @property
+    def net_hours(self) -> Decimal:
+        """Same value as TimeEntry.net_hours."""
+        return Decimal(self.net_hundredths).scaleb(-2)
+
+
+class AbsenceRecord(NamedTuple):
+    """One absence day with its hours as integer hundredths."""
+    id: uuid.UUID
+    user_id: uuid.UUID
+    date: date
+    type: AbsenceType
+    hours: Decimal
+    start_time: Optional[time]
+    end_time: Optional[time]
+    note: Optional[str]
+    hundredths: int
+
+
+_ENTRY_COLUMNS = (
+    TimeEntry.id, TimeEntry.user_id, TimeEntry.date, TimeEntry.start_time, TimeEntry.end_time,
+    TimeEntry.break_minutes, TimeEntry.note, TimeEntry.sunday_exception_reason,
+)
+_ABSENCE_COLUMNS = (
+    Absence.id, Absence.user_id, Absence.date, Absence.type, Absence.hours,
+    Absence.start_time, Absence.end_time, Absence.note,
+)
+
+
+def load_entries(db: Session, *criteria, order_by=(TimeEntry.date, TimeEntry.start_time)) -> List[EntryRecord]:
+    """Time entries matching ``criteria`` as EntryRecords (one query, no ORM entities)."""
+    rows = db.query(*_ENTRY_COLUMNS).filter(*criteria).order_by(*order_by)
+    return [
+        EntryRecord(*row, net_hundredths(row[3], row[4], row[5] or 0))
+        for row in rows.tuples()
+    ]
+
+
+def load_absences(db: Session, *criteria, order_by=(Absence.date, Absence.type)) -> List[AbsenceRecord]:
+    """Absences matching ``criteria`` as AbsenceRecords (one query, no ORM entities)."""
+    rows = db.query(*_ABSENCE_COLUMNS).filter(*criteria).order_by(*order_by)
+    return [
+        AbsenceRecord(*row, int((Decimal(str(row[4])) * 100).to_integral_value()))
+        for row in rows.tuples()
+    ]
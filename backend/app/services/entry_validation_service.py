@@ -0,0 +1,135 @@
+"""
+Unified ArbZG validation for time entry writes.
+
+``EntryValidationContext`` loads one user's entries for the ISO week of the
+target date plus the day before it (for the §5 rest period) in a single query.
+All checks then run against that in-memory snapshot:
+
+- §3 daily and weekly net hours
+- §4 breaks (same rules as break_validation_service)
+- §5 rest time since the last entry of an earlier day
+- §6 night work
+
+Used by the employee, admin and change-request write paths and by the XLS
+importer (conflicts and §5 start point of a file).
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models import TimeEntry
+from app.services.arbzg_utils import is_night_work
+from app.services.break_validation_service import check_daily_break
+
+MIN_REST_HOURS = 11.0   # §5 ArbZG
+
+
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def _net_hours(start_time: time, end_time: time, break_minutes: int) -> float:
+    return max(0.0, (_minutes(end_time) - _minutes(start_time) - break_minutes) / 60.0)
+
+
+class EntryCheck(NamedTuple):
+    """Result of checking one new/updated entry against the snapshot."""
+    daily_hours: float           # §3: net hours of the day incl. the entry
+    weekly_hours: float          # §3/§14: net hours of the ISO week incl. the entry
+    break_error: Optional[str]   # §4: error message or None
+    rest_hours: Optional[float]  # §5: hours since the last earlier work day (None = unknown)
+    night_work: bool             # §6: >2h within 23:00–06:00
+
+
+class EntryValidationContext:
+    """Snapshot of one user's time entries for a date window."""
+
+    def __init__(self, user_id: UUID, start: date, end: date, entries: Iterable[TimeEntry]):
+        self.user_id = user_id
+        self.start = start
+        self.end = end
+        self.entries: List[TimeEntry] = sorted(entries, key=lambda e: (e.date, e.start_time))
+
+    @classmethod
+    def load_range(cls, db: Session, user_id: UUID, start: date, end: date) -> "EntryValidationContext":
+        """Load all entries of the user in [start, end] with one query."""
+        entries = db.query(TimeEntry).filter(
+            TimeEntry.user_id == user_id,
+            TimeEntry.date >= start,
+            TimeEntry.date <= end,
+        ).all()
+        return cls(user_id, start, end, entries)
+
+    @classmethod
+    def for_date(cls, db: Session, user_id: UUID, entry_date: date) -> "EntryValidationContext":
+        """Snapshot for the ISO week of ``entry_date`` plus the day before it."""
+        monday = entry_date - timedelta(days=entry_date.weekday())
+        return cls.load_range(db, user_id, min(monday, entry_date - timedelta(days=1)), monday + timedelta(days=6))
+
+    def _covers(self, entry_date: date) -> bool:
+        return self.start <= entry_date <= self.end
+
+    def _others(self, exclude_entry_id) -> Iterable[TimeEntry]:
+        if exclude_entry_id is None:
+            return self.entries
+        return (e for e in self.entries if e.id != exclude_entry_id)
+
+    def entries_on(self, entry_date: date, exclude_entry_id=None) -> List[TimeEntry]:
+        """Entries of one day (open entries included), ordered by start time."""
+        return [e for e in self._others(exclude_entry_id) if e.date == entry_date]
+
+    def has_start_time(self, entry_date: date, start_time: time, exclude_entry_id=None) -> bool:
+        """True if another entry already starts at the same time (unique constraint)."""
+        return any(e.start_time == start_time for e in self.entries_on(entry_date, exclude_entry_id))
+
+    def last_end_before(self, entry_date: date, exclude_entry_id=None) -> Optional[datetime]:
+        """End of the latest closed entry on a day before ``entry_date`` within the snapshot."""
+        ends = [
+            datetime.combine(e.date, e.end_time)
+            for e in self._others(exclude_entry_id)
+            if e.date < entry_date and e.end_time is not None
+        ]
+        return max(ends) if ends else None
+
+    def check(
+        self,
+        entry_date: date,
+        start_time: time,
+        end_time: time,
+        break_minutes: int,
+        exclude_entry_id=None,
+    ) -> EntryCheck:
+        """Evaluate §3/§4/§5/§6 for a closed entry (``exclude_entry_id`` = the entry being updated)."""
+        if not self._covers(entry_date):
+            raise ValueError(f"{entry_date} liegt außerhalb des geladenen Zeitraums")
+
+        monday = entry_date - timedelta(days=entry_date.weekday())
+        sunday = monday + timedelta(days=6)
+        own_hours = _net_hours(start_time, end_time, break_minutes)
+        daily = weekly = own_hours
+        day_entries = []
+        for e in self._others(exclude_entry_id):
+            if e.end_time is None or not (monday <= e.date <= sunday):
+                continue
+            hours = _net_hours(e.start_time, e.end_time, e.break_minutes)
+            weekly += hours
+            if e.date == entry_date:
+                daily += hours
+                day_entries.append(e)
+
+        return EntryCheck(
+            daily_hours=daily,
+            weekly_hours=weekly,
+            break_error=check_daily_break(day_entries, start_time, end_time, break_minutes),
+            rest_hours=self.rest_hours_at(entry_date, start_time, exclude_entry_id),
+            night_work=is_night_work(start_time, end_time),
+        )
+
+    def rest_hours_at(self, entry_date: date, start_time: time, exclude_entry_id=None) -> Optional[float]:
+        """§5 rest before starting work at ``start_time`` (e.g. clock-in); None if unknown."""
+        last_end = self.last_end_before(entry_date, exclude_entry_id)
+        if last_end is None:
+            return None
+        return (datetime.combine(entry_date, start_time) - last_end).total_seconds() / 3600
@@ -125,7 +125,7 @@ def delete_error(db: Session, error_id: str) -> bool:
     return True
 
 
-def cleanup_old_errors(db: Session, max_age_days: int = 90) -> int:
+def cleanup_old_errors(db: Session, max_age_days: int = 90, commit: bool = True) -> int:
     """DSGVO F-007: Delete resolved/ignored error logs older than max_age_days."""
     cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
     deleted = (
@@ -136,7 +136,8 @@ def cleanup_old_errors(db: Session, max_age_days: int = 90) -> int:
         )
         .delete(synchronize_session=False)
     )
-    db.commit()
+    if commit:
+        db.commit()
     return deleted
 
 
@@ -8,10 +8,11 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 from app.models import User, TimeEntry, Absence, PublicHoliday, AbsenceType
-from app.services import calculation_service
+from app.services import calculation_service, entry_records
 from app.services.arbzg_utils import is_night_work
 from app.config import settings
 from sqlalchemy import extract
+from app.core.date_filters import month_filter, year_filter
 
 
 def generate_monthly_report(db: Session, year: int, month: int, include_health_data: bool = False) -> BytesIO:
@@ -95,21 +96,24 @@ def _create_employee_sheet(wb: Workbook, db: Session, user: User, year: int, mon
     _, last_day = monthrange(year, month)
 
     # Get all time entries for the month (list-based: multiple entries per day)
-    time_entries = db.query(TimeEntry).filter(
+    time_entries = entry_records.load_entries(
+        db,
         TimeEntry.user_id == user.id,
-        extract('year', TimeEntry.date) == year,
-        extract('month', TimeEntry.date) == month
-    ).order_by(TimeEntry.start_time).all()
+        month_filter(TimeEntry.date, year, month),
+        order_by=(TimeEntry.start_time,),
+    )
     entries_by_date: dict = {}
     for entry in time_entries:
         entries_by_date.setdefault(entry.date, []).append(entry)
 
     # Get all absences for the month
-    absences = db.query(Absence).filter(
+    absences = entry_records.load_absences(
+        db,
         Absence.user_id == user.id,
         extract('year', Absence.date) == year,
-        extract('month', Absence.date) == month
-    ).all()
+        extract('month', Absence.date) == month,
+        order_by=(),
+    )
     absences_by_date = {absence.date: absence for absence in absences}
 
     # Get public holidays
@@ -387,6 +391,7 @@ def _create_yearly_overview_sheet(wb: Workbook, db: Session, users: List[User],
 
     # Data rows
     row = 4
+    vacation_accounts = calculation_service.get_vacation_accounts(db, users, year)
     for user in users:
         # Calculate yearly totals
         yearly_target = Decimal('0')
@@ -402,7 +407,7 @@ def _create_yearly_overview_sheet(wb: Workbook, db: Session, users: List[User],
         overtime = calculation_service.get_overtime_account(db, user, year, 12)
 
         # Vacation account
-        vacation_account = calculation_service.get_vacation_account(db, user, year)
+        vacation_account = vacation_accounts[user.id]
 
         # Sick days (uses current daily target for hours-to-days conversion — approximate)
         daily_target = calculation_service.get_daily_target(user)
@@ -592,19 +597,23 @@ def _create_employee_yearly_sheet(wb: Workbook, db: Session, user: User, year: i
         cell.alignment = Alignment(horizontal="center")
 
     # Get all time entries for the year (list-based: multiple entries per day)
-    time_entries = db.query(TimeEntry).filter(
+    time_entries = entry_records.load_entries(
+        db,
         TimeEntry.user_id == user.id,
-        extract('year', TimeEntry.date) == year
-    ).order_by(TimeEntry.start_time).all()
+        year_filter(TimeEntry.date, year),
+        order_by=(TimeEntry.start_time,),
+    )
     entries_by_date: dict = {}
     for entry in time_entries:
         entries_by_date.setdefault(entry.date, []).append(entry)
 
     # Get all absences for the year
-    absences = db.query(Absence).filter(
+    absences = entry_records.load_absences(
+        db,
         Absence.user_id == user.id,
-        extract('year', Absence.date) == year
-    ).all()
+        extract('year', Absence.date) == year,
+        order_by=(),
+    )
     absences_by_date = {absence.date: absence for absence in absences}
 
     # Get public holidays for the year
@@ -1030,13 +1039,12 @@ def _create_employee_classic_sheet(wb: Workbook, db: Session, user: User, year:
         sheet.cell(row=15, column=col).alignment = right_align
 
         # Row 16: Night work days per month (§6 ArbZG)
-        month_entries = db.query(TimeEntry).filter(
+        month_entries = db.query(TimeEntry.date, TimeEntry.start_time, TimeEntry.end_time).filter(
             TimeEntry.user_id == user.id,
-            extract('year', TimeEntry.date) == year,
-            extract('month', TimeEntry.date) == month,
+            month_filter(TimeEntry.date, year, month),
             TimeEntry.end_time.isnot(None),
         ).all()
-        night_days = len({e.date for e in month_entries if is_night_work(e.start_time, e.end_time)})
+        night_days = len({d for d, start, end in month_entries if is_night_work(start, end)})
         sheet.cell(row=16, column=col).value = night_days
         sheet.cell(row=16, column=col).alignment = center_align
 
@@ -1144,20 +1152,23 @@ def generate_monthly_report_pdf(db: Session, year: int, month: int, include_heal
         # ── Fetch data ──
         _, last_day = monthrange(year, month)
 
-        time_entries = db.query(TimeEntry).filter(
+        time_entries = entry_records.load_entries(
+            db,
             TimeEntry.user_id == user.id,
-            extract('year', TimeEntry.date) == year,
-            extract('month', TimeEntry.date) == month,
-        ).order_by(TimeEntry.start_time).all()
+            month_filter(TimeEntry.date, year, month),
+            order_by=(TimeEntry.start_time,),
+        )
         entries_by_date: dict = {}
         for te in time_entries:
             entries_by_date.setdefault(te.date, []).append(te)
 
-        absences = db.query(Absence).filter(
+        absences = entry_records.load_absences(
+            db,
             Absence.user_id == user.id,
             extract('year', Absence.date) == year,
             extract('month', Absence.date) == month,
-        ).all()
+            order_by=(),
+        )
         absences_by_date = {a.date: a for a in absences}
 
         holidays = db.query(PublicHoliday).filter(
@@ -5,6 +5,7 @@ from app.models.public_holiday import PublicHoliday
 from app.models.system_setting import SystemSetting
 from app.config import settings
 from app.services.timezone_service import today_local
+from app.services import data_version_service
 
 
 # German translations for holiday names returned by workalendar
@@ -145,15 +146,19 @@ def delete_all_holidays(db: Session, tenant_id=None) -> int:
         query = query.filter(PublicHoliday.tenant_id == tenant_id)
     count = query.count()
     query.delete()
+    if tenant_id is not None:
+        # Bulk delete bypasses the flush hook — invalidate tenant-wide versions
+        data_version_service.bump_tenant(db, tenant_id)
     # No commit – let the caller manage the transaction
     return count
 
 
-def sync_current_and_next_year(db: Session, state: Optional[str] = None, tenant_id=None) -> dict:
+def sync_current_and_next_year(db: Session, state: Optional[str] = None, tenant_id=None, commit: bool = True) -> dict:
     """
     Sync holidays for current and next year.
     Called during application startup and when Bundesland changes.
-    Performs a single commit at the end.
+    Performs a single commit at the end (none with commit=False: startup
+    commits all of its work at once).
     """
     if state is None:
         state = get_holiday_state(db, tenant_id=tenant_id)
@@ -171,7 +176,8 @@ def sync_current_and_next_year(db: Session, state: Optional[str] = None, tenant_
     current_count = sync_holidays(db, current_year, state, tenant_id=tenant_id)
     next_count = sync_holidays(db, next_year, state, tenant_id=tenant_id)
 
-    db.commit()  # Single commit for the entire operation
+    if commit:
+        db.commit()  # Single commit for the entire operation
 
     return {
         "current_year": current_year,
@@ -1,13 +1,25 @@
-"""Monatsjournal-Service: Tagesgenaue Übersicht über Zeit- und Abwesenheitseinträge."""
+"""Monatsjournal-Service: Tagesgenaue Übersicht über Zeit- und Abwesenheitseinträge.
+
+Entries, absences, holidays and working hours changes of the requested months
+are loaded with one query each (bookings as ``entry_records`` tuples, not ORM
+entities); weekly hours come from a preloaded ``WeeklyHoursTimeline``. All per-day sums are integer hundredths of an hour
+(stored values have two decimals), converted to float only for the response.
+
+Loading (``load_journal_inputs``) and building (``build_journal_range``) are
+separate steps, so the async read path can await the queries and hand only
+the calculation to the threadpool.
+"""
 from datetime import date
 from calendar import monthrange
 from decimal import Decimal
-from typing import Dict, List, Any
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from sqlalchemy import extract
 
-from app.models import User, TimeEntry, Absence, PublicHoliday, AbsenceType
-from app.services import calculation_service
+from app.models import User, TimeEntry, Absence, PublicHoliday, AbsenceType, YearCarryover
+from app.services import calculation_service, entry_records
+from app.services.entry_records import AbsenceRecord, EntryRecord
 
 
 _ABSENCE_TYPE_MAP = {
@@ -18,41 +30,63 @@ _ABSENCE_TYPE_MAP = {
     AbsenceType.OTHER: "other",
 }
 
+# TRAINING and SICK count as worked time (§3 EntgFG)
+_CREDITED_TYPES = (AbsenceType.TRAINING, AbsenceType.SICK)
+# Absences that do not reduce the monthly target (same rule as get_monthly_target)
+_TARGET_KEEPING_TYPES = (AbsenceType.TRAINING, AbsenceType.SICK, AbsenceType.OVERTIME)
 
-def get_journal(db: Session, user: User, year: int, month: int) -> Dict[str, Any]:
-    _, last_day = monthrange(year, month)
+# Longest range served by get_journal_range
+MAX_RANGE_MONTHS = 12
 
-    entries = db.query(TimeEntry).filter(
-        TimeEntry.user_id == user.id,
-        extract("year", TimeEntry.date) == year,
-        extract("month", TimeEntry.date) == month,
-    ).order_by(TimeEntry.date, TimeEntry.start_time).all()
 
-    entries_by_date: Dict[date, List[TimeEntry]] = {}
-    for e in entries:
-        entries_by_date.setdefault(e.date, []).append(e)
+def _hundredths(hours) -> int:
+    """Hours with at most two decimals as integer hundredths."""
+    return int((Decimal(str(hours)) * 100).to_integral_value())
 
-    absences = db.query(Absence).filter(
-        Absence.user_id == user.id,
-        extract("year", Absence.date) == year,
-        extract("month", Absence.date) == month,
-    ).order_by(Absence.date, Absence.type).all()
 
-    absences_by_date: Dict[date, List[Absence]] = {}
-    for a in absences:
-        absences_by_date.setdefault(a.date, []).append(a)
+def _hours(hundredths: int) -> float:
+    return hundredths / 100
+
+
+def _months(from_year: int, from_month: int, to_year: int, to_month: int) -> List[Tuple[int, int]]:
+    months = []
+    year, month = from_year, from_month
+    while (year, month) <= (to_year, to_month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+class _DailyTargets:
+    """Daily target in hundredths per date, memoized per (weekly hours, weekday)."""
+
+    def __init__(self, user: User, timeline: calculation_service.WeeklyHoursTimeline):
+        self.user = user
+        self.timeline = timeline
+        self._cache: Dict[Tuple[Decimal, int], int] = {}
+
+    def __call__(self, d: date) -> int:
+        weekly_hours = self.timeline.at(d)
+        key = (weekly_hours, d.weekday())
+        target = self._cache.get(key)
+        if target is None:
+            target = _hundredths(calculation_service.get_daily_target_for_date(self.user, d, weekly_hours))
+            self._cache[key] = target
+        return target
 
-    holidays = db.query(PublicHoliday).filter(
-        extract("year", PublicHoliday.date) == year,
-        extract("month", PublicHoliday.date) == month,
-    ).all()
-    holiday_map: Dict[date, str] = {h.date: h.name for h in holidays}
 
+def _build_month(user: User, year: int, month: int, entries_by_date: Dict[date, List[EntryRecord]],
+                 absences_by_date: Dict[date, List[AbsenceRecord]], holiday_map: Dict[date, str],
+                 daily_target: _DailyTargets) -> Tuple[Dict[str, Any], int, int]:
+    """One journal month plus its actual and target hours in hundredths."""
+    _, last_day = monthrange(year, month)
     days = []
+    monthly_actual = 0
+    monthly_target = 0
+
     for day_num in range(1, last_day + 1):
         d = date(year, month, day_num)
-        weekday = d.weekday()
-        is_weekend = weekday >= 5
+        is_weekend = d.weekday() >= 5
         is_holiday_day = d in holiday_map
 
         day_entries = entries_by_date.get(d, [])
@@ -71,51 +105,42 @@ def get_journal(db: Session, user: User, year: int, month: int) -> Dict[str, Any
         else:
             day_type = "empty"
 
-        time_hours = Decimal(str(sum(e.net_hours for e in day_entries)))
-        absence_sum = Decimal(str(sum(float(a.hours) for a in day_absences))) if day_absences else Decimal("0")
-
-        # Credited absence hours (TRAINING, SICK count as worked)
-        credited_sum = Decimal(str(sum(
-            float(a.hours) for a in day_absences
-            if a.type in (AbsenceType.TRAINING, AbsenceType.SICK)
-        )))
+        entry_hours = [e.net_hundredths for e in day_entries]
+        absence_hours = [a.hundredths for a in day_absences]
+        time_hours = sum(entry_hours)
+        absence_sum = sum(absence_hours)
+        credited_sum = sum(h for a, h in zip(day_absences, absence_hours) if a.type in _CREDITED_TYPES)
 
         if is_weekend or is_holiday_day:
             actual_hours = time_hours
-            target_hours = Decimal("0")
+            target_hours = 0
         elif day_absences and not day_entries:
-            weekly_hours = calculation_service.get_weekly_hours_for_date(db, user, d)
-            daily_target = calculation_service.get_daily_target_for_date(user, d, weekly_hours)
-            if day_absences[0].type == AbsenceType.TRAINING:
-                actual_hours = absence_sum
-                target_hours = daily_target
-            elif day_absences[0].type == AbsenceType.SICK:
+            first_type = day_absences[0].type
+            if first_type in _CREDITED_TYPES:
                 actual_hours = absence_sum
-                target_hours = daily_target
-            elif day_absences[0].type == AbsenceType.OVERTIME:
-                actual_hours = Decimal("0")
-                target_hours = daily_target
+                target_hours = daily_target(d)
+            elif first_type == AbsenceType.OVERTIME:
+                actual_hours = 0
+                target_hours = daily_target(d)
             else:
                 # Vacation / other: balance = 0
                 actual_hours = absence_sum
                 target_hours = absence_sum
         elif day_entries and day_absences:
             # Mixed day: time entries + absences (e.g. half-day work + half-day sick/training)
-            weekly_hours = calculation_service.get_weekly_hours_for_date(db, user, d)
-            daily_target = calculation_service.get_daily_target_for_date(user, d, weekly_hours)
             actual_hours = time_hours + credited_sum
             # VACATION/OTHER/OVERTIME reduce target on mixed days
-            target_reducing_sum = Decimal(str(sum(
-                float(a.hours) for a in day_absences
-                if a.type not in (AbsenceType.TRAINING, AbsenceType.SICK)
-            )))
-            target_hours = daily_target - target_reducing_sum
+            target_hours = daily_target(d) - (absence_sum - credited_sum)
         else:
             actual_hours = time_hours
-            weekly_hours = calculation_service.get_weekly_hours_for_date(db, user, d)
-            target_hours = calculation_service.get_daily_target_for_date(user, d, weekly_hours)
+            target_hours = daily_target(d)
 
-        balance = actual_hours - target_hours
+        # Monthly summary mirrors get_monthly_actual / get_monthly_target
+        monthly_actual += time_hours + credited_sum
+        if not is_weekend and not is_holiday_day and not any(
+            a.type not in _TARGET_KEEPING_TYPES for a in day_absences
+        ):
+            monthly_target += daily_target(d)
 
         days.append({
             "date": d.isoformat(),
@@ -129,44 +154,191 @@ def get_journal(db: Session, user: User, year: int, month: int) -> Dict[str, Any
                     "start_time": e.start_time.strftime("%H:%M") if e.start_time else None,
                     "end_time": e.end_time.strftime("%H:%M") if e.end_time else None,
                     "break_minutes": e.break_minutes,
-                    "net_hours": float(Decimal(str(e.net_hours)).quantize(Decimal("0.01"))),
+                    "net_hours": _hours(h),
                 }
-                for e in day_entries
+                for e, h in zip(day_entries, entry_hours)
             ],
             "absences": [
                 {
                     "id": str(a.id),
                     "type": a.type.value,
-                    "hours": float(Decimal(str(a.hours)).quantize(Decimal("0.01"))),
+                    "hours": _hours(h),
                     "start_time": a.start_time.strftime("%H:%M") if a.start_time else None,
                     "end_time": a.end_time.strftime("%H:%M") if a.end_time else None,
                 }
-                for a in day_absences
+                for a, h in zip(day_absences, absence_hours)
             ],
-            "actual_hours": float(actual_hours.quantize(Decimal("0.01"))),
-            "target_hours": float(target_hours.quantize(Decimal("0.01"))),
-            "balance": float(balance.quantize(Decimal("0.01"))),
+            "actual_hours": _hours(actual_hours),
+            "target_hours": _hours(target_hours),
+            "balance": _hours(actual_hours - target_hours),
         })
 
-    monthly_actual = calculation_service.get_monthly_actual(db, user, year, month)
-    monthly_target = calculation_service.get_monthly_target(db, user, year, month)
-    monthly_balance = monthly_actual - monthly_target
+    journal_month = {
+        "year": year,
+        "month": month,
+        "days": days,
+        "monthly_summary": {
+            "actual_hours": _hours(monthly_actual),
+            "target_hours": _hours(monthly_target),
+            "balance": _hours(monthly_actual - monthly_target),
+        },
+    }
+    return journal_month, monthly_actual, monthly_target
+
+
+class JournalInputs(NamedTuple):
+    """Everything a journal range reads from the database (see load_journal_inputs)."""
+    months: List[Tuple[int, int]]
+    entries_by_date: Dict[date, List[EntryRecord]]
+    absences_by_date: Dict[date, List[AbsenceRecord]]
+    holiday_map: Dict[date, str]
+    timeline: calculation_service.WeeklyHoursTimeline
+    overtime: Optional[calculation_service.OvertimeInputs]  # account up to the first month
+    carryovers: Dict[int, int]      # YearCarryover per year in hundredths (ranges only)
+    first_entry: Optional[date]     # first time entry, needed without an earlier carryover
 
-    yearly_overtime = calculation_service.get_overtime_account(db, user, year, month)
 
+def _load_overtime(db: Session, user: User, months: List[Tuple[int, int]]):
+    """Inputs of _overtime_accounts: (first month's account inputs, carryovers, first entry date)."""
+    if not user.track_hours:
+        return None, {}, None
+    first_year, first_month = months[0]
+    overtime = calculation_service.load_overtime_inputs(db, user, first_year, first_month)
+    if len(months) == 1:
+        return overtime, {}, None
+
+    carryovers = {
+        year: _hundredths(hours)
+        for year, hours in db.query(YearCarryover.year, YearCarryover.overtime_hours).filter(
+            YearCarryover.user_id == user.id,
+            YearCarryover.year <= months[-1][0],
+        )
+    }
+    first_entry = None
+    if not any(year <= first_year for year in carryovers):
+        first_entry = db.query(func.min(TimeEntry.date)).filter(TimeEntry.user_id == user.id).scalar()
+    return overtime, carryovers, first_entry
+
+
+def _overtime_accounts(user: User, inputs: JournalInputs, balances: List[int]) -> List[int]:
+    """
+    Overtime account after each month in hundredths.
+
+    Same result as get_overtime_account() per month: the first month is
+    computed by it, later months add their balance, restarting from the
+    YearCarryover of a year that has one. Without any carryover the account
+    only starts with the month of the user's first time entry.
+    """
+    months = inputs.months
+    if not user.track_hours:
+        return [0] * len(months)
+    first_year, first_month = months[0]
+    account = _hundredths(calculation_service.overtime_from_inputs(user, inputs.overtime, first_year, first_month))
+    accounts = [account]
+    if len(months) == 1:
+        return accounts
+
+    carryovers, first_entry = inputs.carryovers, inputs.first_entry
+    counting = any(year <= first_year for year in carryovers)
+    for (year, month), balance in zip(months[1:], balances[1:]):
+        if month == 1 and year in carryovers:
+            account = carryovers[year]
+            counting = True
+        if counting or (first_entry is not None and (year, month) >= (first_entry.year, first_entry.month)):
+            account += balance
+        accounts.append(account)
+    return accounts
+
+
+def load_journal_inputs(db: Session, user: User, from_year: int, from_month: int,
+                        to_year: int, to_month: int) -> JournalInputs:
+    """The queries of a journal range, one per kind of data (see build_journal_range)."""
+    months = _months(from_year, from_month, to_year, to_month)
+    if not months:
+        raise ValueError("Range end lies before its start")
+    start = date(from_year, from_month, 1)
+    end = date(to_year, to_month, monthrange(to_year, to_month)[1])
+
+    entries_by_date: Dict[date, List[EntryRecord]] = {}
+    for e in entry_records.load_entries(
+        db,
+        TimeEntry.user_id == user.id,
+        TimeEntry.date >= start,
+        TimeEntry.date <= end,
+    ):
+        entries_by_date.setdefault(e.date, []).append(e)
+
+    absences_by_date: Dict[date, List[AbsenceRecord]] = {}
+    for a in entry_records.load_absences(
+        db,
+        Absence.user_id == user.id,
+        Absence.date >= start,
+        Absence.date <= end,
+    ):
+        absences_by_date.setdefault(a.date, []).append(a)
+
+    holiday_map: Dict[date, str] = {
+        d: name
+        for d, name in db.query(PublicHoliday.date, PublicHoliday.name).filter(
+            PublicHoliday.date >= start, PublicHoliday.date <= end,
+        )
+    }
+    timeline = calculation_service.load_weekly_hours_timeline(db, user)
+    overtime, carryovers, first_entry = _load_overtime(db, user, months)
+    return JournalInputs(
+        months, entries_by_date, absences_by_date, holiday_map, timeline, overtime, carryovers, first_entry,
+    )
+
+
+def build_journal_range(user: User, inputs: JournalInputs) -> Dict[str, Any]:
+    """Journal range from its loaded inputs; no database access."""
+    months = inputs.months
+    daily_target = _DailyTargets(user, inputs.timeline)
+
+    result_months = []
+    balances = []
+    total_actual = 0
+    total_target = 0
+    for year, month in months:
+        journal_month, actual, target = _build_month(
+            user, year, month, inputs.entries_by_date, inputs.absences_by_date, inputs.holiday_map, daily_target,
+        )
+        total_actual += actual
+        total_target += target
+        balances.append(actual - target)
+        result_months.append(journal_month)
+
+    for journal_month, overtime in zip(result_months, _overtime_accounts(user, inputs, balances)):
+        journal_month["yearly_overtime"] = _hours(overtime)
+
+    (from_year, from_month), (to_year, to_month) = months[0], months[-1]
     return {
         "user": {
             "id": str(user.id),
             "first_name": user.first_name,
             "last_name": user.last_name,
         },
-        "year": year,
-        "month": month,
-        "days": days,
-        "monthly_summary": {
-            "actual_hours": float(monthly_actual.quantize(Decimal("0.01"))),
-            "target_hours": float(monthly_target.quantize(Decimal("0.01"))),
-            "balance": float(monthly_balance.quantize(Decimal("0.01"))),
+        "from_month": f"{from_year:04d}-{from_month:02d}",
+        "to_month": f"{to_year:04d}-{to_month:02d}",
+        "months": result_months,
+        "summary": {
+            "actual_hours": _hours(total_actual),
+            "target_hours": _hours(total_target),
+            "balance": _hours(total_actual - total_target),
         },
-        "yearly_overtime": float(yearly_overtime.quantize(Decimal("0.01"))),
     }
+
+
+def get_journal_range(db: Session, user: User, from_year: int, from_month: int,
+                      to_year: int, to_month: int) -> Dict[str, Any]:
+    """Journal for every month from (from_year, from_month) to (to_year, to_month) inclusive."""
+    return build_journal_range(user, load_journal_inputs(db, user, from_year, from_month, to_year, to_month))
+
+
+def single_month(journal: Dict[str, Any]) -> Dict[str, Any]:
+    """Response layout of a one-month journal from its range."""
+    return {"user": journal["user"], **journal["months"][0]}
+
+
+def get_journal(db: Session, user: User, year: int, month: int) -> Dict[str, Any]:
+    return single_month(get_journal_range(db, user, year, month, year, month))
@@ -0,0 +1,85 @@
+"""
+Account lockout after repeated failed logins.
+
+Attempts are stored in ``failed_logins`` so every server worker sees the same
+counter (an in-process dict would allow WEB_CONCURRENCY × 5 attempts). Each
+login does at most one count query; writes only happen on failures.
+
+Expired rows are dropped on the write path: the attempted user's with every
+failure, all users' at most once per PURGE_INTERVAL and worker, so spraying
+many distinct usernames cannot grow the table beyond one lockout window.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.failed_login import FailedLogin
+
+
+LOCKOUT_ATTEMPTS = 5
+LOCKOUT_WINDOW = timedelta(minutes=15)
+
+_MAX_USERNAME_LENGTH = 100
+
+# Global purge of expired attempts on the write path, at most this often per process
+PURGE_INTERVAL = timedelta(minutes=1)
+
+_last_purge: Optional[datetime] = None
+
+
+def _key(username: str) -> str:
+    return username.lower()[:_MAX_USERNAME_LENGTH]
+
+
+def is_locked(db: Session, username: str, now: Optional[datetime] = None) -> bool:
+    """True if the username has reached LOCKOUT_ATTEMPTS within LOCKOUT_WINDOW."""
+    now = now or datetime.now(timezone.utc)
+    attempts = db.query(func.count(FailedLogin.id)).filter(
+        FailedLogin.username == _key(username),
+        FailedLogin.attempted_at > now - LOCKOUT_WINDOW,
+    ).scalar()
+    return attempts >= LOCKOUT_ATTEMPTS
+
+
+def _purge_due(now: datetime) -> bool:
+    # A clock set back (or tests with fixed times) must not postpone the purge
+    return _last_purge is None or not (_last_purge <= now < _last_purge + PURGE_INTERVAL)
+
+
+def record_failure(db: Session, username: str, now: Optional[datetime] = None) -> None:
+    """Store a failed attempt and drop expired ones: the user's, periodically everyone's (commits)."""
+    now = now or datetime.now(timezone.utc)
+    key = _key(username)
+    if _purge_due(now):
+        purge_expired(db, now=now, commit=False)
+    else:
+        db.query(FailedLogin).filter(
+            FailedLogin.username == key,
+            FailedLogin.attempted_at <= now - LOCKOUT_WINDOW,
+        ).delete(synchronize_session=False)
+    db.add(FailedLogin(username=key, attempted_at=now))
+    db.commit()
+
+
+def clear(db: Session, username: str) -> None:
+    """Reset the counter after a successful login (commits)."""
+    deleted = db.query(FailedLogin).filter(FailedLogin.username == _key(username)).delete(
+        synchronize_session=False
+    )
+    if deleted:
+        db.commit()
+
+
+def purge_expired(db: Session, now: Optional[datetime] = None, commit: bool = True) -> int:
+    """Delete all attempts outside the lockout window (startup and write-path housekeeping)."""
+    global _last_purge
+    now = now or datetime.now(timezone.utc)
+    _last_purge = now
+    deleted = db.query(FailedLogin).filter(
+        FailedLogin.attempted_at <= now - LOCKOUT_WINDOW,
+    ).delete(synchronize_session=False)
+    if commit:
+        db.commit()
+    return deleted
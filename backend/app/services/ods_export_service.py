@@ -11,13 +11,14 @@ from typing import List
 
 from sqlalchemy.orm import Session
 from sqlalchemy import extract
+from app.core.date_filters import month_filter, year_filter
 from odf.opendocument import OpenDocumentSpreadsheet
 from odf.style import Style, TextProperties, TableColumnProperties, TableCellProperties
 from odf.text import P
 from odf.table import Table, TableColumn, TableRow, TableCell
 
 from app.models import User, TimeEntry, Absence, PublicHoliday, AbsenceType
-from app.services import calculation_service
+from app.services import calculation_service, entry_records
 from app.services.arbzg_utils import is_night_work
 
 
@@ -150,19 +151,22 @@ def _monthly_sheet(doc, db, user, year, month, bold, normal, include_health_data
     _, last_day = monthrange(year, month)
 
     entries_by_date: dict = {}
-    for e in db.query(TimeEntry).filter(
+    for e in entry_records.load_entries(
+        db,
         TimeEntry.user_id == user.id,
-        extract("year", TimeEntry.date) == year,
-        extract("month", TimeEntry.date) == month,
-    ).order_by(TimeEntry.start_time).all():
+        month_filter(TimeEntry.date, year, month),
+        order_by=(TimeEntry.start_time,),
+    ):
         entries_by_date.setdefault(e.date, []).append(e)
     absences_by_date = {
         a.date: a
-        for a in db.query(Absence).filter(
+        for a in entry_records.load_absences(
+            db,
             Absence.user_id == user.id,
             extract("year", Absence.date) == year,
             extract("month", Absence.date) == month,
-        ).all()
+            order_by=(),
+        )
     }
     holidays_by_date = {
         h.date: h
@@ -393,6 +397,7 @@ def _absences_overview_sheet(doc, db, users, year, bold):
         "Gesamt (Tage)", "Resturlaub (Tage)",
     ]
     table.addElement(_header_row(headers, bold))
+    vacation_accounts = calculation_service.get_vacation_accounts(db, users, year)
 
     for user in users:
         # Uses current daily target for hours-to-days conversion — approximate for display
@@ -414,7 +419,7 @@ def _absences_overview_sheet(doc, db, users, year, bold):
         overtime_comp = days(AbsenceType.OVERTIME)
         other = days(AbsenceType.OTHER)
 
-        vac_acc = calculation_service.get_vacation_account(db, user, year)
+        vac_acc = vacation_accounts[user.id]
         remaining = float(vac_acc["remaining_days"])
 
         tr = TableRow()
@@ -451,17 +456,21 @@ def _yearly_employee_sheet(doc, db, user, year, bold):
     table.addElement(_header_row(headers, bold))
 
     entries_by_date: dict = {}
-    for e in db.query(TimeEntry).filter(
+    for e in entry_records.load_entries(
+        db,
         TimeEntry.user_id == user.id,
-        extract("year", TimeEntry.date) == year,
-    ).order_by(TimeEntry.start_time).all():
+        year_filter(TimeEntry.date, year),
+        order_by=(TimeEntry.start_time,),
+    ):
         entries_by_date.setdefault(e.date, []).append(e)
     absences_by_date = {
         a.date: a
-        for a in db.query(Absence).filter(
+        for a in entry_records.load_absences(
+            db,
             Absence.user_id == user.id,
             extract("year", Absence.date) == year,
-        ).all()
+            order_by=(),
+        )
     }
     holidays_by_date = {
         h.date: h
@@ -645,13 +654,12 @@ def _classic_sheet(doc, db, user, year, bold):
         total_other += other
 
         # Night work days for this month (§6 ArbZG)
-        month_entries = db.query(TimeEntry).filter(
+        month_entries = db.query(TimeEntry.date, TimeEntry.start_time, TimeEntry.end_time).filter(
             TimeEntry.user_id == user.id,
-            extract("year", TimeEntry.date) == year,
-            extract("month", TimeEntry.date) == m,
+            month_filter(TimeEntry.date, year, m),
             TimeEntry.end_time.isnot(None),
         ).all()
-        night_days = len({e.date for e in month_entries if is_night_work(e.start_time, e.end_time)})
+        night_days = len({d for d, start, end in month_entries if is_night_work(start, end)})
 
         tr = TableRow()
         tr.addElement(_str_cell(MONTH_NAMES[m - 1]))
@@ -667,12 +675,12 @@ def _classic_sheet(doc, db, user, year, bold):
 
     # Total row (night work total counted over all months)
     total_night = len({
-        e.date for e in db.query(TimeEntry).filter(
+        d for d, start, end in db.query(TimeEntry.date, TimeEntry.start_time, TimeEntry.end_time).filter(
             TimeEntry.user_id == user.id,
-            extract("year", TimeEntry.date) == year,
+            year_filter(TimeEntry.date, year),
             TimeEntry.end_time.isnot(None),
-        ).all()
-        if is_night_work(e.start_time, e.end_time)
+        )
+        if is_night_work(start, end)
     })
     tr = TableRow()
     tr.addElement(_str_cell("Gesamt", style=bold))
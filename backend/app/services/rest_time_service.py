@@ -8,6 +8,7 @@ from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 from app.models import User, TimeEntry
 from app.config import settings
+from app.core.date_filters import month_filter, year_filter
 
 
 DEFAULT_MIN_REST_HOURS = 11  # German law default
@@ -52,10 +53,10 @@ def check_rest_time_violations(
         TimeEntry.end_time.isnot(None)
     )
 
-    from sqlalchemy import extract
-    query = query.filter(extract('year', TimeEntry.date) == year)
     if month:
-        query = query.filter(extract('month', TimeEntry.date) == month)
+        query = query.filter(month_filter(TimeEntry.date, year, month))
+    else:
+        query = query.filter(year_filter(TimeEntry.date, year))
 
     entries = query.order_by(TimeEntry.date, TimeEntry.start_time).all()
 
@@ -0,0 +1,275 @@
+"""
+DSGVO Art. 17 retention engine: eligibility, anonymization and purge in bulk.
+
+Eligibility of all inactive users is computed with one grouped query (latest
+time entry per user) instead of one "last entry" lookup per user. Anonymize
+and purge work on lists of users with one set-based statement per table, so
+the single-user admin endpoints and the batch sweep share the same code.
+
+Rules:
+- anonymize: inactive, not yet anonymized, 14-day grace period after
+  deactivation is over. Time entries are kept (ArbZG §16), absences deleted.
+- purge:     inactive and no time entry within the 730-day retention window
+  of ArbZG §16. Deletes the user and every row referencing them.
+
+``sweep`` applies one action to every eligible user in chunked transactions
+(see retention_sweep.py for the CLI) and reports the affected users plus
+per-phase timings; with ``dry_run`` it stops after selecting them.
+"""
+import logging
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import (
+    User, TimeEntry, Absence, WorkingHoursChange, ChangeRequest, TimeEntryAuditLog,
+    VacationRequest, YearCarryover,
+)
+from app.services import audit_service, clock_status_service, data_version_service, vacation_ledger_service
+from app.services.timezone_service import today_local
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = 730  # ArbZG §16 Abs. 2: two years
+GRACE_PERIOD_DAYS = 14
+ACTIONS = ("anonymize", "purge")
+
+# Users per transaction in sweep()
+DEFAULT_CHUNK_SIZE = 200
+
+RETENTION_USERS = Counter(
+    "dsgvo_retention_users_total",
+    "Users anonymized or purged by the DSGVO retention engine",
+    ["action"],
+)
+RETENTION_SWEEP_SECONDS = Histogram(
+    "dsgvo_retention_sweep_seconds",
+    "Duration of DSGVO retention sweeps",
+    ["action", "dry_run"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+
+
+class Candidate(NamedTuple):
+    """Retention state of one inactive user."""
+    user_id: uuid.UUID
+    tenant_id: Optional[uuid.UUID]
+    first_name: str
+    last_name: str
+    username: str
+    deactivated_at: Optional[datetime]
+    last_entry_date: Optional[date]
+    days_since_last_entry: Optional[int]
+    is_anonymized: bool
+    grace_period_ends: Optional[date]
+    grace_period_remaining_days: Optional[int]
+
+    @property
+    def in_grace_period(self) -> bool:
+        return self.grace_period_remaining_days is not None
+
+    @property
+    def can_anonymize(self) -> bool:
+        return not self.is_anonymized and not self.in_grace_period
+
+    @property
+    def can_purge(self) -> bool:
+        return self.last_entry_date is None or self.days_since_last_entry >= RETENTION_DAYS
+
+    def as_dict(self) -> dict:
+        return {
+            "user_id": str(self.user_id),
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "username": self.username,
+            "is_anonymized": self.is_anonymized,
+            "deactivated_at": self.deactivated_at.isoformat() if self.deactivated_at else None,
+            "grace_period_ends": self.grace_period_ends.isoformat() if self.grace_period_ends else None,
+            "grace_period_remaining_days": self.grace_period_remaining_days,
+            "in_grace_period": self.in_grace_period,
+            "last_entry_date": self.last_entry_date.isoformat() if self.last_entry_date else None,
+            "days_since_last_entry": self.days_since_last_entry,
+            "can_anonymize": self.can_anonymize,
+            "can_purge": self.can_purge,
+        }
+
+
+def is_anonymized(username: str) -> bool:
+    return username.startswith("deleted_")
+
+
+def anonymized_username(user_id) -> str:
+    return f"deleted_{str(user_id)[:8]}"
+
+
+def load_candidates(db: Session, today: Optional[date] = None, user_ids: Optional[Sequence] = None) -> List[Candidate]:
+    """Retention state of all inactive users (or the given ones), one query."""
+    today = today or today_local()
+    query = (
+        db.query(
+            User.id, User.tenant_id, User.first_name, User.last_name, User.username,
+            User.deactivated_at, func.max(TimeEntry.date),
+        )
+        .outerjoin(TimeEntry, TimeEntry.user_id == User.id)
+        .filter(User.is_active == False)  # noqa: E712
+        .group_by(User.id)
+        .order_by(User.last_name, User.first_name)
+    )
+    if user_ids is not None:
+        query = query.filter(User.id.in_(list(user_ids)))
+
+    candidates = []
+    for uid, tenant_id, first, last, username, deactivated_at, last_entry in query:
+        grace_ends = remaining = None
+        if deactivated_at is not None:
+            days_deactivated = (today - deactivated_at.date()).days
+            if days_deactivated < GRACE_PERIOD_DAYS:
+                remaining = GRACE_PERIOD_DAYS - days_deactivated
+                grace_ends = (deactivated_at + timedelta(days=GRACE_PERIOD_DAYS)).date()
+        candidates.append(Candidate(
+            user_id=uid, tenant_id=tenant_id, first_name=first, last_name=last, username=username,
+            deactivated_at=deactivated_at, last_entry_date=last_entry,
+            days_since_last_entry=(today - last_entry).days if last_entry else None,
+            is_anonymized=is_anonymized(username),
+            grace_period_ends=grace_ends, grace_period_remaining_days=remaining,
+        ))
+    return candidates
+
+
+def _audit_row(tenant_id, user_id, changed_by, action: str, **notes) -> dict:
+    return {
+        "id": uuid.uuid4(), "tenant_id": tenant_id, "time_entry_id": None,
+        "user_id": user_id, "changed_by": changed_by, "action": action, "source": "dsgvo", **notes,
+    }
+
+
+def _bump_tenants(db: Session, candidates: Sequence[Candidate]) -> None:
+    for tenant_id in {c.tenant_id for c in candidates if c.tenant_id}:
+        data_version_service.bump_tenant(db, tenant_id)
+    vacation_ledger_service.invalidate(db)
+
+
+def anonymize(db: Session, candidates: Sequence[Candidate], actor: User, by: str) -> int:
+    """
+    Anonymize the given users in place; ``by`` completes the audit note
+    ("DSGVO-Anonymisierung durch …"). Does not commit.
+    """
+    if not candidates:
+        return 0
+    ids = [c.user_id for c in candidates]
+    db.execute(update(User), [
+        {
+            "id": c.user_id, "first_name": "Gelöschter", "last_name": "Benutzer",
+            "username": anonymized_username(c.user_id), "email": None, "calendar_color": "#9CA3AF",
+        }
+        for c in candidates
+    ])
+    # Absences have no statutory retention requirement
+    db.query(Absence).filter(Absence.user_id.in_(ids)).delete(synchronize_session=False)
+    db.execute(insert(TimeEntryAuditLog), [
+        _audit_row(c.tenant_id, c.user_id, actor.id, "dsgvo_anonymize", new_note=f"DSGVO-Anonymisierung durch {by}")
+        for c in candidates
+    ])
+    _bump_tenants(db, candidates)
+    RETENTION_USERS.labels(action="anonymize").inc(len(candidates))
+    return len(candidates)
+
+
+def purge(db: Session, candidates: Sequence[Candidate], actor: User, by: str) -> int:
+    """
+    Permanently delete the given users and all their data; ``by`` completes
+    the audit note ("Endgültige Löschung … durch …"). Does not commit.
+    """
+    if not candidates:
+        return 0
+    ids = [c.user_id for c in candidates]
+
+    # changed_by references: SET NULL to preserve other users' audit trails.
+    db.query(TimeEntryAuditLog).filter(TimeEntryAuditLog.changed_by.in_(ids)).update(
+        {TimeEntryAuditLog.changed_by: None}, synchronize_session=False
+    )
+    # The purged users' own audit log entries go; the purge itself is logged for the actor.
+    db.query(TimeEntryAuditLog).filter(TimeEntryAuditLog.user_id.in_(ids)).delete(synchronize_session=False)
+    db.execute(insert(TimeEntryAuditLog), [
+        _audit_row(
+            c.tenant_id, actor.id, actor.id, "dsgvo_purge",
+            old_note=f"Endgültige Löschung von User-ID {c.user_id} ({c.first_name} {c.last_name}) durch {by}",
+        )
+        for c in candidates
+    ])
+    for model in (VacationRequest, ChangeRequest):
+        db.query(model).filter(model.reviewed_by.in_(ids)).update({"reviewed_by": None}, synchronize_session=False)
+    # Other rows may still point at their entries (no FK while partitioned)
+    audit_service.detach_time_entries(db, select(TimeEntry.id).where(TimeEntry.user_id.in_(ids)))
+    for model in (VacationRequest, WorkingHoursChange, ChangeRequest, TimeEntry, Absence, YearCarryover):
+        db.query(model).filter(model.user_id.in_(ids)).delete(synchronize_session=False)
+    db.query(User).filter(User.id.in_(ids)).delete(synchronize_session=False)
+    # Their entries are gone; a cached open entry must not be served any more
+    clock_status_service.hub.forget(ids)
+
+    _bump_tenants(db, candidates)
+    RETENTION_USERS.labels(action="purge").inc(len(candidates))
+    return len(candidates)
+
+
+def _eligible(candidate: Candidate, action: str) -> bool:
+    """Batch rule: past the grace period and the ArbZG §16 retention window."""
+    if candidate.in_grace_period or not candidate.can_purge:
+        return False
+    return action == "purge" or not candidate.is_anonymized
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def sweep(
+    db: Session,
+    action: str,
+    actor: Optional[User],
+    dry_run: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    today: Optional[date] = None,
+) -> Dict:
+    """
+    Anonymize or purge every inactive user past the retention window.
+
+    Each chunk of ``chunk_size`` users is written and committed in its own
+    transaction, so a failure keeps the chunks already done and locks are
+    held briefly. ``actor`` (recorded in the audit log) is only needed when
+    not a dry run. Returns the affected users and timings (ms).
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unbekannte Aktion: {action}")
+    started = time.perf_counter()
+
+    selected = [c for c in load_candidates(db, today) if _eligible(c, action)]
+    timings = {"select": _elapsed_ms(started)}
+
+    processed = 0
+    if not dry_run:
+        write_started = time.perf_counter()
+        apply = anonymize if action == "anonymize" else purge
+        by = f"Aufbewahrungs-Sweep (ausgelöst von {actor.username})"
+        for offset in range(0, len(selected), chunk_size):
+            chunk = selected[offset:offset + chunk_size]
+            processed += apply(db, chunk, actor, by)
+            db.commit()
+            logger.info("Retention sweep %s: %d/%d users", action, processed, len(selected))
+        timings["write"] = _elapsed_ms(write_started)
+    timings["total"] = _elapsed_ms(started)
+
+    RETENTION_SWEEP_SECONDS.labels(action=action, dry_run=str(dry_run).lower()).observe(timings["total"] / 1000)
+    return {
+        "action": action,
+        "dry_run": dry_run,
+        "eligible": len(selected),
+        "processed": processed,
+        "users": [c.as_dict() for c in selected],
+        "timings_ms": timings,
+    }
@@ -0,0 +1,47 @@
+"""
+Batched resolution of user names for listings.
+
+Change requests, vacation requests and audit log entries reference users by id
+(owner, reviewer, changed_by). Looking each id up separately costs one query
+per reference; ``resolve`` collects all ids of a result page and loads only
+id, first and last name with a single ``IN`` query.
+"""
+import uuid
+from typing import Dict, Iterable, NamedTuple, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import User
+
+
+class UserName(NamedTuple):
+    first_name: str
+    last_name: str
+
+
+def resolve(db: Session, user_ids: Iterable) -> Dict[uuid.UUID, UserName]:
+    """Names of the given users (None entries are ignored), one query."""
+    ids = {uid for uid in user_ids if uid is not None}
+    if not ids:
+        return {}
+    return {
+        uid: UserName(first, last)
+        for uid, first, last in db.query(User.id, User.first_name, User.last_name).filter(User.id.in_(ids))
+    }
+
+
+def fill_names(db: Session, pairs: Sequence[Tuple[object, object]], fields: Dict[str, Tuple[str, str]]) -> None:
+    """
+    Set name fields on response objects from their source rows.
+
+    ``pairs`` are (source row, response) tuples; ``fields`` maps an id
+    attribute of the source row to the (first name, last name) attributes
+    of the response, e.g. ``{"reviewed_by": ("reviewer_first_name", "reviewer_last_name")}``.
+    """
+    names = resolve(db, (getattr(src, attr) for src, _ in pairs for attr in fields))
+    for src, response in pairs:
+        for attr, (first_field, last_field) in fields.items():
+            name = names.get(getattr(src, attr))
+            if name:
+                setattr(response, first_field, name.first_name)
+                setattr(response, last_field, name.last_name)
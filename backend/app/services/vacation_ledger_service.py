@@ -0,0 +1,202 @@
+"""
+Vacation ledger: the database inputs of a vacation account per (user, year).
+
+A vacation account combines user settings (vacation days, first/last work day,
+weekly hours) with two stored values: the carried-over vacation days of the
+year and the vacation hours taken in it. Only the stored values are memoized
+— user settings are always read from the current ``User`` object, so changes
+to them never produce stale accounts.
+
+Two levels:
+- ``Session.info`` memo for the open transaction. Every flush that touches an
+  ``Absence`` or ``YearCarryover`` drops the affected (user, year) entries
+  (``after_flush`` listener), bulk statements call ``invalidate``, commit and
+  rollback clear it.
+- a process-local LRU cache keyed by (tenant, user, year) and tagged with the
+  user's data version of the year (see data_version_service), like the absence
+  calendar. It serves later requests (dashboard, vacation approval) with one
+  version query instead of two ledger queries, and is neither read nor filled
+  by a session that bumped versions in its open transaction.
+
+``load_many`` fills the ledger for many users with two grouped queries.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from prometheus_client import Counter
+from sqlalchemy import event, func
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.models import Absence, AbsenceType, YearCarryover
+from app.services import data_version_service
+
+_INFO_KEY = "vacation_ledger"
+
+# Cached (tenant, user, year) ledgers per process
+CACHE_SIZE = 4096
+
+VACATION_LEDGER_CACHE = Counter(
+    "vacation_ledger_cache_total",
+    "Vacation ledger lookups by the process cache (hit = no ledger query)",
+    ["result"],
+)
+
+LedgerKey = Tuple[uuid.UUID, int]
+
+
+class VacationLedger(NamedTuple):
+    """Stored vacation inputs of one user and year."""
+    carryover_days: Decimal
+    used_hours: Decimal
+
+
+_EMPTY = VacationLedger(Decimal("0"), Decimal("0"))
+
+
+def _as_uuid(value) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+_cache: "OrderedDict[Tuple, Tuple[int, VacationLedger]]" = OrderedDict()  # key → (version, ledger)
+_lock = threading.Lock()
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def _memo(db: Session) -> Dict[LedgerKey, VacationLedger]:
+    return db.info.setdefault(_INFO_KEY, {})
+
+
+def _year_range(year: int):
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def _hours(value) -> Decimal:
+    # SUM over Numeric(4, 2) is exact on Postgres; quantize guards float sums (SQLite)
+    return Decimal(str(value)).quantize(Decimal("0.01")) if value is not None else Decimal("0")
+
+
+def get(db: Session, user_id, year: int, tenant_id=None) -> VacationLedger:
+    """Ledger of one user and year (memo, then process cache, then two queries)."""
+    key = (_as_uuid(user_id), year)
+    memo = _memo(db)
+    ledger = memo.get(key)
+    if ledger is None:
+        ledger = load_many(db, [user_id], year, tenant_id)[user_id]
+    return ledger
+
+
+def load_many(db: Session, user_ids: Iterable, year: int, tenant_id=None) -> Dict:
+    """
+    Ledgers of the given users for one year, keyed like ``user_ids``.
+
+    Memo misses are looked up in the process cache (one version query, only
+    with ``tenant_id``); the rest is loaded with two grouped queries.
+    """
+    memo = _memo(db)
+    ids = {u: _as_uuid(u) for u in user_ids}
+    missing = [u for u in set(ids.values()) if (u, year) not in memo]
+    start, end = _year_range(year)
+    versions: Dict[uuid.UUID, int] = {}
+    shared = tenant_id is not None and not data_version_service.bumped_in_transaction(db)
+    if missing and shared:
+        versions = data_version_service.get_user_versions(db, tenant_id, missing, start, end)
+        missing = _from_cache(memo, _as_uuid(tenant_id), missing, year, versions)
+    if missing:
+        carryovers = dict(db.query(YearCarryover.user_id, YearCarryover.vacation_days).filter(
+            YearCarryover.user_id.in_(missing),
+            YearCarryover.year == year,
+        ).all())
+        used = dict(db.query(Absence.user_id, func.sum(Absence.hours)).filter(
+            Absence.user_id.in_(missing),
+            Absence.type == AbsenceType.VACATION,
+            Absence.date >= start,
+            Absence.date <= end,
+        ).group_by(Absence.user_id).all())
+        for user_id in missing:
+            carryover = carryovers.get(user_id)
+            memo[(user_id, year)] = VacationLedger(
+                Decimal(str(carryover)) if carryover is not None else Decimal("0"),
+                _hours(used.get(user_id)),
+            )
+        if shared:
+            # Loaded after the versions were read, so the data is at least that new
+            _store(_as_uuid(tenant_id), year, {u: (versions[u], memo[(u, year)]) for u in missing})
+    return {orig: memo.get((uid, year), _EMPTY) for orig, uid in ids.items()}
+
+
+def _from_cache(memo, tenant_id, user_ids: List[uuid.UUID], year: int, versions) -> List[uuid.UUID]:
+    """Copy current cached ledgers into the memo; return the users still missing."""
+    missing = []
+    with _lock:
+        for user_id in user_ids:
+            cached = _cache.get((tenant_id, user_id, year))
+            if cached is not None and cached[0] == versions[user_id]:
+                _cache.move_to_end((tenant_id, user_id, year))
+                memo[(user_id, year)] = cached[1]
+            else:
+                missing.append(user_id)
+    if len(missing) < len(user_ids):
+        VACATION_LEDGER_CACHE.labels(result="hit").inc(len(user_ids) - len(missing))
+    if missing:
+        VACATION_LEDGER_CACHE.labels(result="miss").inc(len(missing))
+    return missing
+
+
+def _store(tenant_id, year: int, entries: Dict[uuid.UUID, Tuple[int, VacationLedger]]) -> None:
+    with _lock:
+        for user_id, entry in entries.items():
+            _cache[(tenant_id, user_id, year)] = entry
+            _cache.move_to_end((tenant_id, user_id, year))
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def invalidate(db: Session, user_id=None, year: Optional[int] = None) -> None:
+    """Drop memoized ledgers (all, one user's, or one user-year) after bulk statements."""
+    memo = db.info.get(_INFO_KEY)
+    if not memo:
+        return
+    if user_id is None:
+        memo.clear()
+        return
+    uid = _as_uuid(user_id)
+    for key in [k for k in memo if k[0] == uid and (year is None or k[1] == year)]:
+        del memo[key]
+
+
+def _touched_keys(obj) -> set:
+    if isinstance(obj, Absence) and obj.user_id is not None:
+        # Old date too: moving a vacation day to another year changes both years
+        hist = sa_inspect(obj).attrs["date"].history
+        dates = [obj.date] + list(hist.deleted or ())
+        return {(_as_uuid(obj.user_id), d.year) for d in dates if d is not None}
+    if isinstance(obj, YearCarryover) and obj.user_id is not None and obj.year is not None:
+        return {(_as_uuid(obj.user_id), obj.year)}
+    return set()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_after_flush(session, flush_context):
+    memo = session.info.get(_INFO_KEY)
+    if not memo:
+        return
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        for key in _touched_keys(obj):
+            memo.pop(key, None)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_after_transaction(session):
+    memo = session.info.get(_INFO_KEY)
+    if memo:
+        memo.clear()
@@ -3,19 +3,26 @@ Service für den Import historischer Zeiterfassungsdaten aus TimeRec-XLS-Dateien
 Dateiformat: Sheet "Zeiterfassung", Spalten: Datum, Tag, Total, Ein, Aus, Tagesnotiz
 """
 import uuid
-import xlrd
 from datetime import datetime, timedelta, date, time
 from typing import Optional
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
-from app.models import TimeEntry, TimeEntryAuditLog, User
+from app.models import TimeEntry, User
+from app.services import audit_service
 from app.services.arbzg_utils import is_night_work
+from app.services.entry_validation_service import EntryValidationContext
 
 EXCEL_EPOCH = datetime(1899, 12, 30)
+_EXCEL_EPOCH_ORDINAL = EXCEL_EPOCH.toordinal()
+_US_PER_DAY = 86_400_000_000
+_US_PER_MINUTE = 60_000_000
 MAX_DAILY_NET_HOURS = 10.0   # §3 ArbZG
 MIN_REST_HOURS = 11.0        # §5 ArbZG
 MAX_FILE_SIZE_BYTES = 5 * 1024 * 1024  # 5 MB
+IMPORT_BATCH_SIZE = 500      # Einträge pro Flush beim Bulk-Insert
+
+ConflictKey = tuple[date, time]
 
 
 class ImportedEntry(BaseModel):
@@ -35,11 +42,43 @@ class ImportResult(BaseModel):
     warnings: list[str]
 
 
+class ImportJobItem(BaseModel):
+    """Eine Datei bzw. ein Benutzer innerhalb eines Sammel-Imports."""
+    user_id: uuid.UUID
+    entries: list[ImportedEntry]
+    filename: str = "import.xls"
+
+
+class ImportJobResult(BaseModel):
+    imported: int
+    skipped: int
+    overwritten: int
+    warnings: list[str]
+    items: list[ImportResult]
+
+
 def _excel_serial_to_datetime(serial: float) -> datetime:
     """Konvertiert Excel-Serial-Datetime zu Python-datetime. Basis: 1899-12-30."""
     return EXCEL_EPOCH + timedelta(days=serial)
 
 
+def _serials_to_date_and_minute(serials: list[float]) -> tuple[list[date], list[int]]:
+    """
+    Batch-Konvertierung von Excel-Serials zu (Datum, Minute des Tages).
+
+    Integer-Arithmetik auf Mikrosekunden (gleiche Rundung wie timedelta), Sekunden
+    werden abgeschnitten — identisch zu ``_excel_serial_to_datetime(...).replace(second=0)``.
+    """
+    dates: list[date] = []
+    minutes: list[int] = []
+    fromordinal = date.fromordinal
+    for serial in serials:
+        days, us = divmod(round(serial * _US_PER_DAY), _US_PER_DAY)
+        dates.append(fromordinal(_EXCEL_EPOCH_ORDINAL + days))
+        minutes.append(us // _US_PER_MINUTE)
+    return dates, minutes
+
+
 def _calc_break_minutes(start: time, end: time) -> int:
     """ArbZG §4: Pausen automatisch nach Brutto-Arbeitszeit berechnen."""
     # Note: assumes end > start (no overnight shifts). TimeRec format does not produce overnight entries.
@@ -103,6 +142,109 @@ def _check_arbzg(
     return warnings
 
 
+def _check_arbzg_sequence(
+    rows: list[tuple[date, time, time, int]],
+    prev_end_dt: Optional[datetime],
+    exempt: bool = False,
+    is_night_worker: bool = False,
+) -> list[list[str]]:
+    """
+    ArbZG-Warnungen für alle Zeilen in einem Durchlauf über die chronologisch
+    sortierte Folge — gleiche Regeln und Texte wie ``_check_arbzg``, aber auf
+    Minuten-Integern; Texte werden nur für tatsächliche Warnungen erzeugt.
+    ``prev_end_dt`` ist das Ende des letzten DB-Eintrags vor dem Importzeitraum
+    (§5). Ergebnis in der Reihenfolge von ``rows``.
+    """
+    result: list[list[str]] = [[] for _ in rows]
+    if exempt:
+        return result
+
+    limit_minutes = (NIGHT_WORKER_MAX_NET_HOURS if is_night_worker else MAX_DAILY_NET_HOURS) * 60
+    min_rest_minutes = MIN_REST_HOURS * 60
+    prev_end_abs: Optional[int] = None  # Minuten seit 01.01.0001
+    if prev_end_dt is not None:
+        prev_end_abs = prev_end_dt.toordinal() * 1440 + prev_end_dt.hour * 60 + prev_end_dt.minute
+
+    for idx in sorted(range(len(rows)), key=lambda i: (rows[i][0], rows[i][1])):
+        entry_date, start, end, break_min = rows[idx]
+        start_m = start.hour * 60 + start.minute
+        end_m = end.hour * 60 + end.minute
+        net_minutes = end_m - start_m - break_min
+        day_abs = entry_date.toordinal() * 1440
+
+        warnings = result[idx]
+        if net_minutes > limit_minutes:
+            net_hours = net_minutes / 60.0
+            if is_night_worker:
+                warnings.append(
+                    f"§6 Abs. 2 ArbZG: Nachtarbeitnehmer — Netto-Arbeitszeit {net_hours:.1f}h überschreitet 8h-Limit"
+                )
+            else:
+                warnings.append(
+                    f"§3 ArbZG: Netto-Arbeitszeit {net_hours:.1f}h überschreitet das 10h-Tageslimit"
+                )
+
+        # Tagdienste (06:00–23:00) können keine Nachtarbeit sein
+        if (start_m < 360 or end_m > 1380 or end_m <= start_m) and is_night_work(start, end):
+            warnings.append("§6 ArbZG: Nachtarbeit (>2h in der Nachtzeit 23:00–06:00)")
+
+        if prev_end_abs is not None:
+            rest_minutes = day_abs + start_m - prev_end_abs
+            if rest_minutes < min_rest_minutes:
+                prev_end = datetime.fromordinal(prev_end_abs // 1440) + timedelta(minutes=prev_end_abs % 1440)
+                warnings.append(
+                    f"§5 ArbZG: Ruhezeit {rest_minutes / 60.0:.1f}h unterschreitet das 11h-Minimum "
+                    f"(vorheriger Eintrag endete {prev_end.strftime('%d.%m.%Y %H:%M')})"
+                )
+        prev_end_abs = day_abs + end_m
+    return result
+
+
+def _load_existing_entries(
+    db: Session, user_id: uuid.UUID, keys: set[ConflictKey]
+) -> dict[ConflictKey, TimeEntry]:
+    """Bestehende Einträge zu allen (date, start_time)-Schlüsseln mit einer Abfrage laden."""
+    if not keys:
+        return {}
+    dates = {d for d, _ in keys}
+    rows = (
+        db.query(TimeEntry)
+        .filter(TimeEntry.user_id == user_id, TimeEntry.date.in_(dates))
+        .all()
+    )
+    return {(e.date, e.start_time): e for e in rows if (e.date, e.start_time) in keys}
+
+
+def _read_rows(ws) -> list[tuple[date, time, time, int, Optional[str]]]:
+    """
+    Datenzeilen spaltenweise aus dem Sheet lesen: (Datum, Ein, Aus, Pause, Notiz).
+
+    Datenzeilen sind am numerischen ctype (3 = XL_CELL_DATE) in der Ein-Spalte (D)
+    erkennbar. Es werden nur ganze Spalten-Slices gelesen, keine Einzelzellen.
+    """
+    if ws.ncols < 5:
+        return []
+    data_idx = [i for i, ctype in enumerate(ws.col_types(3)) if ctype == 3]
+    if not data_idx:
+        return []
+
+    ein_col = ws.col_values(3)
+    aus_col = ws.col_values(4)
+    note_col = ws.col_values(5) if ws.ncols > 5 else [""] * ws.nrows
+
+    dates, start_minutes = _serials_to_date_and_minute([ein_col[i] for i in data_idx])
+    _, end_minutes = _serials_to_date_and_minute([aus_col[i] for i in data_idx])
+
+    # Uhrzeiten nur einmal pro Minute des Tages erzeugen
+    times = [time(m // 60, m % 60) for m in range(24 * 60)]
+    rows = []
+    for row_idx, entry_date, start_m, end_m in zip(data_idx, dates, start_minutes, end_minutes):
+        start_t, end_t = times[start_m], times[end_m]
+        notiz = str(note_col[row_idx]).strip()
+        rows.append((entry_date, start_t, end_t, _calc_break_minutes(start_t, end_t), notiz or None))
+    return rows
+
+
 def parse_xls(file_bytes: bytes, user_id: uuid.UUID, db: Session) -> list[ImportedEntry]:
     """
     Parst eine TimeRec-XLS-Datei und gibt ImportedEntry-Liste zurück.
@@ -113,6 +255,8 @@ def parse_xls(file_bytes: bytes, user_id: uuid.UUID, db: Session) -> list[Import
     if len(file_bytes) > MAX_FILE_SIZE_BYTES:
         raise ValueError("Datei zu groß (max. 5 MB)")
 
+    import xlrd  # loaded on the first import, not at application startup
+
     try:
         wb = xlrd.open_workbook(file_contents=file_bytes)
     except xlrd.XLRDError as e:
@@ -130,142 +274,96 @@ def parse_xls(file_bytes: bytes, user_id: uuid.UUID, db: Session) -> list[Import
     is_night_worker = getattr(user, "is_night_worker", False) or False
 
     ws = wb.sheet_by_name("Zeiterfassung")
-    entries: list[ImportedEntry] = []
-    prev_end_dt: Optional[datetime] = None
-    first_import_date: Optional[date] = None
-
-    for row_idx in range(ws.nrows):
-        # Datenzeile erkennbar durch numerischen ctype (3) in Ein-Spalte (D)
-        if ws.cell(row_idx, 3).ctype != 3:
-            continue
-
-        ein_serial = ws.cell_value(row_idx, 3)
-        aus_serial = ws.cell_value(row_idx, 4)
-        notiz_raw = ws.cell_value(row_idx, 5)
-
-        ein_dt = _excel_serial_to_datetime(ein_serial)
-        aus_dt = _excel_serial_to_datetime(aus_serial)
-        note = str(notiz_raw).strip() if notiz_raw is not None and str(notiz_raw).strip() else None
-
-        entry_date = ein_dt.date()
-        # Sekunden auf 0 setzen (XLS hat keine Sekunden)
-        start_t = ein_dt.time().replace(second=0, microsecond=0)
-        end_t = aus_dt.time().replace(second=0, microsecond=0)
-        break_min = _calc_break_minutes(start_t, end_t)
-
-        # §5-Check: Für den ersten Eintrag im Import letzten DB-Eintrag vor Import-Zeitraum holen
-        check_prev = prev_end_dt
-        if first_import_date is None:
-            first_import_date = entry_date
-            last_db_entry = (
-                db.query(TimeEntry)
-                .filter(TimeEntry.user_id == user_id, TimeEntry.date < entry_date)
-                .order_by(TimeEntry.date.desc(), TimeEntry.start_time.desc())
-                .first()
-            )
-            if last_db_entry and last_db_entry.end_time:
-                check_prev = datetime.combine(last_db_entry.date, last_db_entry.end_time)
+    rows = _read_rows(ws)
+    if not rows:
+        raise ValueError("Keine Datenzeilen im Sheet 'Zeiterfassung' gefunden")
 
-        arbzg_warnings = _check_arbzg(
-            entry_date, start_t, end_t, break_min, check_prev,
-            exempt=exempt, is_night_worker=is_night_worker,
-        )
+    # Ein Snapshot (Vortag bis letzter Importtag) liefert Konflikte und den §5-Startpunkt
+    first_import_date = min(r[0] for r in rows)
+    context = EntryValidationContext.load_range(
+        db, user_id, first_import_date - timedelta(days=1), max(r[0] for r in rows),
+    )
+    prev_end_dt = context.last_end_before(first_import_date)
 
-        # Konflikt-Check nach UniqueConstraint (user_id + date + start_time)
-        existing = (
-            db.query(TimeEntry)
-            .filter(
-                TimeEntry.user_id == user_id,
-                TimeEntry.date == entry_date,
-                TimeEntry.start_time == start_t,
-            )
-            .first()
-        )
+    warnings_per_row = _check_arbzg_sequence(
+        [r[:4] for r in rows], prev_end_dt, exempt=exempt, is_night_worker=is_night_worker,
+    )
 
-        entries.append(ImportedEntry(
+    # Konflikt-Check nach UniqueConstraint (user_id + date + start_time)
+    existing = {(e.date, e.start_time) for e in context.entries}
+
+    return [
+        ImportedEntry(
             date=entry_date,
             start_time=start_t,
             end_time=end_t,
             break_minutes=break_min,
             note=note,
-            has_conflict=existing is not None,
+            has_conflict=(entry_date, start_t) in existing,
             arbzg_warnings=arbzg_warnings,
-        ))
-
-        prev_end_dt = datetime.combine(entry_date, end_t)
+        )
+        for (entry_date, start_t, end_t, break_min, note), arbzg_warnings in zip(rows, warnings_per_row)
+    ]
 
-    if not entries:
-        raise ValueError("Keine Datenzeilen im Sheet 'Zeiterfassung' gefunden")
 
-    return entries
+def _flush_batch(db: Session, entries: list, audit_rows: list[dict]) -> None:
+    """Insert a batch of new entries, then their audit rows (one multi-row insert; FK order)."""
+    db.add_all(entries)
+    db.flush()
+    audit_service.write(db, audit_rows)
 
 
-def execute_import(
+def _import_entries(
     user_id: uuid.UUID,
     entries: list[ImportedEntry],
     overwrite: bool,
     db: Session,
     changed_by_id: uuid.UUID,
     filename: str,
-    tenant_id: uuid.UUID | None = None,
+    tenant_id: uuid.UUID | None,
+    username: str,
 ) -> ImportResult:
     """
-    Führt den Import durch. Bei overwrite=True werden Konflikte überschrieben,
-    sonst übersprungen. Schreibt Audit-Log-Einträge.
+    Importiert die Einträge eines Benutzers ohne Commit.
+
+    Konflikte werden mit einer Abfrage für alle Schlüssel ermittelt; neue
+    Einträge und Audit-Logs werden gesammelt und in Batches geflusht.
     """
     imported = 0
     skipped = 0
     overwritten = 0
     all_warnings: list[str] = []
 
+    # Re-query conflicts: has_conflict on ImportedEntry reflects preview state.
+    # A new entry may have been created between preview and confirm, so we
+    # re-check here rather than trusting the frontend's has_conflict flag.
+    existing = _load_existing_entries(db, user_id, {(e.date, e.start_time) for e in entries})
+
+    pending: list = []
+    audit_rows: list[dict] = []
     for entry in entries:
         for w in entry.arbzg_warnings:
             all_warnings.append(f"{entry.date.strftime('%d.%m.%Y')}: {w}")
 
-        # Re-query conflict: has_conflict on ImportedEntry reflects preview state.
-        # A new entry may have been created between preview and confirm, so we
-        # re-check here rather than trusting the frontend's has_conflict flag.
-        existing = (
-            db.query(TimeEntry)
-            .filter(
-                TimeEntry.user_id == user_id,
-                TimeEntry.date == entry.date,
-                TimeEntry.start_time == entry.start_time,
-            )
-            .first()
-        )
-
-        if existing:
+        current = existing.get((entry.date, entry.start_time))
+        if current is not None:
             if not overwrite:
                 skipped += 1
                 continue
 
             # Audit-Log: alter Zustand
-            log = TimeEntryAuditLog(
-                time_entry_id=existing.id,
-                user_id=user_id,
-                changed_by=changed_by_id,
-                action="update",
-                source="import",
-                old_date=existing.date,
-                old_start_time=existing.start_time,
-                old_end_time=existing.end_time,
-                old_break_minutes=existing.break_minutes,
-                old_note=existing.note,
-                new_date=entry.date,
-                new_start_time=entry.start_time,
-                new_end_time=entry.end_time,
-                new_break_minutes=entry.break_minutes,
-                new_note=entry.note,
-                tenant_id=tenant_id,
-            )
-            existing.end_time = entry.end_time
-            existing.break_minutes = entry.break_minutes
-            existing.note = entry.note
-            db.add(log)
+            audit_rows.append(audit_service.entry_change(
+                current.id, user_id, changed_by_id, "update",
+                old_entry=current, new_entry=entry, source="import", tenant_id=tenant_id,
+            ))
+            current.end_time = entry.end_time
+            current.break_minutes = entry.break_minutes
+            current.note = entry.note
             overwritten += 1
         else:
+            # ID vorab vergeben, damit der Audit-Log ohne Flush pro Zeile referenzieren kann
             new_entry = TimeEntry(
+                id=uuid.uuid4(),
                 user_id=user_id,
                 tenant_id=tenant_id,
                 date=entry.date,
@@ -274,43 +372,28 @@ def execute_import(
                 break_minutes=entry.break_minutes,
                 note=entry.note,
             )
-            db.add(new_entry)
-            db.flush()  # ID für Audit-Log
-
-            log = TimeEntryAuditLog(
-                time_entry_id=new_entry.id,
-                user_id=user_id,
-                changed_by=changed_by_id,
-                action="create",
-                source="import",
-                new_date=entry.date,
-                new_start_time=entry.start_time,
-                new_end_time=entry.end_time,
-                new_break_minutes=entry.break_minutes,
-                new_note=entry.note,
-                tenant_id=tenant_id,
-            )
-            db.add(log)
+            # Doppelte Zeilen innerhalb der Datei treffen auf diesen Eintrag
+            existing[(entry.date, entry.start_time)] = new_entry
+            pending.append(new_entry)
+            audit_rows.append(audit_service.entry_change(
+                new_entry.id, user_id, changed_by_id, "create",
+                new_entry=entry, source="import", tenant_id=tenant_id,
+            ))
             imported += 1
 
+        if len(pending) + len(audit_rows) >= IMPORT_BATCH_SIZE:
+            _flush_batch(db, pending, audit_rows)
+            pending, audit_rows = [], []
+
     # Zusammenfassungs-Eintrag im Audit-Log (action="import", time_entry_id=None)
-    target_user = db.query(User).filter(User.id == user_id).first()
-    username = f"{target_user.first_name} {target_user.last_name}" if target_user else str(user_id)
     summary = (
         f"XLS-Import: {imported} neu, {overwritten} überschrieben, {skipped} übersprungen "
         f"| Benutzer: {username} | Datei: {filename}"
     )
-    summary_log = TimeEntryAuditLog(
-        time_entry_id=None,
-        user_id=user_id,
-        changed_by=changed_by_id,
-        action="import",
-        source="import",
-        new_note=summary,
-        tenant_id=tenant_id,
-    )
-    db.add(summary_log)
-    db.commit()
+    audit_rows.append(audit_service.entry_change(
+        None, user_id, changed_by_id, "import", source="import", tenant_id=tenant_id, new_note=summary,
+    ))
+    _flush_batch(db, pending, audit_rows)
 
     return ImportResult(
         imported=imported,
@@ -318,3 +401,59 @@ def execute_import(
         overwritten=overwritten,
         warnings=all_warnings,
     )
+
+
+def _usernames(db: Session, user_ids) -> dict[uuid.UUID, str]:
+    users = db.query(User.id, User.first_name, User.last_name).filter(User.id.in_(set(user_ids))).all()
+    return {u.id: f"{u.first_name} {u.last_name}" for u in users}
+
+
+def execute_import(
+    user_id: uuid.UUID,
+    entries: list[ImportedEntry],
+    overwrite: bool,
+    db: Session,
+    changed_by_id: uuid.UUID,
+    filename: str,
+    tenant_id: uuid.UUID | None = None,
+) -> ImportResult:
+    """
+    Führt den Import durch. Bei overwrite=True werden Konflikte überschrieben,
+    sonst übersprungen. Schreibt Audit-Log-Einträge.
+    """
+    username = _usernames(db, [user_id]).get(user_id, str(user_id))
+    result = _import_entries(
+        user_id, entries, overwrite, db, changed_by_id, filename, tenant_id, username,
+    )
+    db.commit()
+    return result
+
+
+def execute_import_job(
+    items: list[ImportJobItem],
+    overwrite: bool,
+    db: Session,
+    changed_by_id: uuid.UUID,
+    tenant_id: uuid.UUID | None = None,
+) -> ImportJobResult:
+    """
+    Sammel-Import mehrerer Dateien/Benutzer in einer Transaktion.
+    Schlägt ein Teil fehl, wird der gesamte Job zurückgerollt.
+    """
+    usernames = _usernames(db, [item.user_id for item in items])
+    results = [
+        _import_entries(
+            item.user_id, item.entries, overwrite, db, changed_by_id, item.filename,
+            tenant_id, usernames.get(item.user_id, str(item.user_id)),
+        )
+        for item in items
+    ]
+    db.commit()
+
+    return ImportJobResult(
+        imported=sum(r.imported for r in results),
+        skipped=sum(r.skipped for r in results),
+        overwritten=sum(r.overwritten for r in results),
+        warnings=[f"{item.filename}: {w}" for item, r in zip(items, results) for w in r.warnings],
+        items=results,
+    )
@@ -0,0 +1,277 @@
+"""
+Year-end closing (Jahresabschluss) as a set-based batch job.
+
+Instead of replaying every user's history with get_overtime_account() and
+probing for an existing carryover per user, all inputs of all users are
+bulk-loaded with a fixed number of queries:
+
+- carryovers up to year+1 (starting balances and the rows to overwrite),
+- the first time entry per user (start for users without carryover),
+- time entries, absences and holidays from the earliest start date on,
+- working hours changes (one ``WeeklyHoursTimeline`` per user),
+- vacation accounts (``get_vacation_accounts``).
+
+Balances are computed in memory with the same rules as
+get_overtime_account() and written back with one multi-row upsert. A dry run
+stops before the write and returns the same report, including the previous
+carryover values, so an admin can preview the closing.
+"""
+import logging
+import time
+import uuid
+from calendar import monthrange
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import User, TimeEntry, Absence, PublicHoliday, WorkingHoursChange, YearCarryover
+from app.models.time_entry import net_hundredths
+from app.services import absence_ranges, calculation_service, data_version_service, vacation_ledger_service
+
+logger = logging.getLogger(__name__)
+
+# Same absence rules as get_overtime_account / get_monthly_target
+_CREDITED_TYPES = calculation_service.CREDITED_TYPES
+_TARGET_KEEPING_TYPES = calculation_service.TARGET_KEEPING_TYPES
+
+
+class _UserInputs:
+    """Bulk-loaded calculation inputs of one user."""
+    __slots__ = ("start", "initial_balance", "actual_by_month", "absence_dates", "changes")
+
+    def __init__(self):
+        self.start: Optional[date] = None
+        self.initial_balance = Decimal("0.00")
+        self.actual_by_month: Dict[Tuple[int, int], int] = {}  # hundredths of an hour
+        self.absence_dates: set = set()
+        self.changes: List[WorkingHoursChange] = []
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _load_inputs(db: Session, year: int, users: List[User]) -> Tuple[Dict, Dict, Dict]:
+    """Load every input of the closing; returns (inputs per user, existing next-year carryovers, holidays per tenant)."""
+    user_ids = [u.id for u in users]
+    end = date(year, 12, 31)
+    inputs = {uid: _UserInputs() for uid in user_ids}
+
+    # Latest carryover <= year is the starting balance, year+1 rows get overwritten
+    existing: Dict = {}
+    latest: Dict = {}
+    for user_id, co_year, overtime, vacation in db.query(
+        YearCarryover.user_id, YearCarryover.year, YearCarryover.overtime_hours, YearCarryover.vacation_days,
+    ).filter(
+        YearCarryover.user_id.in_(user_ids),
+        YearCarryover.year <= year + 1,
+    ):
+        if co_year == year + 1:
+            existing[user_id] = (Decimal(str(overtime)), Decimal(str(vacation)))
+        elif user_id not in latest or co_year > latest[user_id][0]:
+            latest[user_id] = (co_year, Decimal(str(overtime)))
+
+    missing = [uid for uid in user_ids if uid not in latest]
+    first_entries = dict(db.query(TimeEntry.user_id, func.min(TimeEntry.date)).filter(
+        TimeEntry.user_id.in_(missing),
+    ).group_by(TimeEntry.user_id).all()) if missing else {}
+
+    for uid, user_inputs in inputs.items():
+        if uid in latest:
+            co_year, overtime = latest[uid]
+            user_inputs.start = date(co_year, 1, 1)
+            user_inputs.initial_balance = overtime
+        elif first_entries.get(uid) is not None:
+            first = first_entries[uid]
+            user_inputs.start = date(first.year, first.month, 1)
+
+    starts = [i.start for i in inputs.values() if i.start is not None and i.start <= end]
+    holidays: Dict = {}
+    if not starts:
+        return inputs, existing, holidays
+    range_start = min(starts)
+
+    for user_id, d, start_time, end_time, break_minutes in db.query(
+        TimeEntry.user_id, TimeEntry.date, TimeEntry.start_time, TimeEntry.end_time, TimeEntry.break_minutes,
+    ).filter(
+        TimeEntry.user_id.in_(user_ids),
+        TimeEntry.date >= range_start,
+        TimeEntry.date <= end,
+    ):
+        user_inputs = inputs[user_id]
+        if user_inputs.start is None or d < user_inputs.start:
+            continue
+        key = (d.year, d.month)
+        user_inputs.actual_by_month[key] = (
+            user_inputs.actual_by_month.get(key, 0) + net_hundredths(start_time, end_time, break_minutes)
+        )
+
+    for user_id, d, absence_type, hours in db.query(
+        Absence.user_id, Absence.date, Absence.type, Absence.hours,
+    ).filter(
+        Absence.user_id.in_(user_ids),
+        Absence.date >= range_start,
+        Absence.date <= end,
+    ):
+        user_inputs = inputs[user_id]
+        if user_inputs.start is None or d < user_inputs.start:
+            continue
+        if absence_type in _CREDITED_TYPES:
+            key = (d.year, d.month)
+            user_inputs.actual_by_month[key] = (
+                user_inputs.actual_by_month.get(key, 0) + int((Decimal(str(hours)) * 100).to_integral_value())
+            )
+        if absence_type not in _TARGET_KEEPING_TYPES:
+            user_inputs.absence_dates.add(d)
+
+    for tenant_id, d in db.query(PublicHoliday.tenant_id, PublicHoliday.date).filter(
+        PublicHoliday.date >= range_start,
+        PublicHoliday.date <= end,
+    ):
+        holidays.setdefault(tenant_id, set()).add(d)
+
+    for change in db.query(WorkingHoursChange).filter(WorkingHoursChange.user_id.in_(user_ids)):
+        inputs[change.user_id].changes.append(change)
+
+    return inputs, existing, holidays
+
+
+def _overtime_balance(user: User, year: int, user_inputs: _UserInputs, holiday_dates: set) -> Decimal:
+    """Overtime account at Dec 31 of ``year`` (same result as get_overtime_account(user, year, 12))."""
+    if not user.track_hours or user_inputs.start is None:
+        return Decimal("0.00")
+
+    timeline = calculation_service.WeeklyHoursTimeline(user, user_inputs.changes)
+    excluded = absence_ranges.excluded_intervals(((d, d) for d in user_inputs.absence_dates), holiday_dates)
+    total = user_inputs.initial_balance
+    current_year, current_month = user_inputs.start.year, user_inputs.start.month
+
+    while (current_year, current_month) <= (year, 12):
+        _, last_day = monthrange(current_year, current_month)
+        monthly_target = calculation_service.target_between(
+            user, timeline, date(current_year, current_month, 1), date(current_year, current_month, last_day), excluded,
+        )
+
+        actual = Decimal(user_inputs.actual_by_month.get((current_year, current_month), 0)).scaleb(-2)
+        total += actual - monthly_target
+        current_year, current_month = (current_year + 1, 1) if current_month == 12 else (current_year, current_month + 1)
+
+    return total.quantize(Decimal("0.01"))
+
+
+def _upsert_statement(dialect_name: str, rows: List[Dict]):
+    if dialect_name == "postgresql":
+        insert = postgresql.insert
+    elif dialect_name == "sqlite":
+        insert = sqlite.insert
+    else:
+        return None
+    stmt = insert(YearCarryover).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "user_id", "year"],
+        set_={
+            "overtime_hours": stmt.excluded.overtime_hours,
+            "vacation_days": stmt.excluded.vacation_days,
+            "updated_at": func.now(),
+        },
+    )
+
+
+def _write(db: Session, rows: List[Dict], existing: Dict) -> None:
+    conn = db.connection()
+    stmt = _upsert_statement(conn.dialect.name, rows)
+    if stmt is not None:
+        conn.execute(stmt)
+    else:
+        # Unknown dialect: plain bulk insert/update, existing rows are known from the load phase
+        db.bulk_insert_mappings(YearCarryover, [r for r in rows if r["user_id"] not in existing])
+        for row in rows:
+            if row["user_id"] in existing:
+                db.query(YearCarryover).filter(
+                    YearCarryover.user_id == row["user_id"],
+                    YearCarryover.year == row["year"],
+                ).update({
+                    "overtime_hours": row["overtime_hours"],
+                    "vacation_days": row["vacation_days"],
+                }, synchronize_session=False)
+
+    # The upsert bypasses the unit of work, so its hooks do not see the new carryovers
+    for tenant_id in {row["tenant_id"] for row in rows}:
+        data_version_service.bump_tenant(db, tenant_id)
+    vacation_ledger_service.invalidate(db)
+
+
+def close_year(db: Session, year: int, users: List[User], dry_run: bool = False) -> Dict:
+    """
+    Compute the year-end closing of ``users`` and upsert their carryovers for year+1.
+
+    Does not commit. With ``dry_run`` nothing is written. The report lists per
+    employee the new values, whether the carryover is created or updated and
+    the previous values, plus the duration of the load, compute and write
+    phases in milliseconds.
+    """
+    started = time.perf_counter()
+    next_year = year + 1
+    logger.info("Year closing %s: loading inputs for %d users", year, len(users))
+
+    phase = time.perf_counter()
+    inputs, existing, holidays = _load_inputs(db, year, users)
+    vacation_accounts = calculation_service.get_vacation_accounts(db, users, year)
+    load_ms = _elapsed_ms(phase)
+
+    phase = time.perf_counter()
+    employees = []
+    rows = []
+    for user in users:
+        overtime = _overtime_balance(user, year, inputs[user.id], holidays.get(user.tenant_id, set()))
+        vacation = Decimal(str(vacation_accounts[user.id]["remaining_days"]))
+        previous = existing.get(user.id)
+        rows.append({
+            "id": uuid.uuid4(),
+            "tenant_id": user.tenant_id,
+            "user_id": user.id,
+            "year": next_year,
+            "overtime_hours": overtime,
+            "vacation_days": vacation.quantize(Decimal("0.1")),
+        })
+        employees.append({
+            "user_id": str(user.id),
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "overtime_hours": float(overtime),
+            "vacation_days": float(vacation.quantize(Decimal("0.1"))),
+            "action": "update" if previous else "create",
+            "previous_overtime_hours": float(previous[0]) if previous else None,
+            "previous_vacation_days": float(previous[1]) if previous else None,
+        })
+    compute_ms = _elapsed_ms(phase)
+    logger.info("Year closing %s: computed %d balances in %.1f ms", year, len(rows), compute_ms)
+
+    phase = time.perf_counter()
+    if rows and not dry_run:
+        _write(db, rows, existing)
+    write_ms = _elapsed_ms(phase)
+
+    report = {
+        "year": year,
+        "next_year": next_year,
+        "dry_run": dry_run,
+        "employees": employees,
+        "created": sum(1 for e in employees if e["action"] == "create"),
+        "updated": sum(1 for e in employees if e["action"] == "update"),
+        "timings_ms": {
+            "load": load_ms,
+            "compute": compute_ms,
+            "write": write_ms,
+            "total": _elapsed_ms(started),
+        },
+    }
+    logger.info(
+        "Year closing %s%s: %d created, %d updated in %.1f ms",
+        year, " (dry run)" if dry_run else "", report["created"], report["updated"], report["timings_ms"]["total"],
+    )
+    return report
@@ -0,0 +1,145 @@
+"""
+Benchmark: Jahres-Partitionierung von time_entries (app.core.partitioning).
+
+Erzeugt (oder verwendet mit ``--reuse``) einen synthetischen Datensatz mit
+standardmäßig 5 Tenants × 100 Mitarbeitenden × 10 Jahren, misst typische
+Lesezugriffe auf ungeteilten Tabellen, wandelt time_entries und
+time_entry_audit_logs mit ``partitioning.enable`` in Jahrespartitionen um und
+misst dieselben Zugriffe erneut:
+
+- Jahresexport: alle Zeiteinträge eines Tenants für ein Jahr (``year_filter``),
+- Monats-Ist: ``get_monthly_actual`` für alle Mitarbeitenden eines Tenants,
+- Überstundenkonto: ``get_overtime_account`` für eine Stichprobe.
+
+Zusätzlich wird per EXPLAIN gezählt, wie viele Partitionen der Jahresexport
+liest (Partition Pruning). Abgefragt wird wie in der App im Tenant-Kontext.
+Ohne ``--keep`` werden die Tabellen danach wieder zurückgewandelt.
+
+Braucht eine PostgreSQL-Scratch-Datenbank, auf der der Benutzer DDL
+ausführen darf:
+    python -m benchmarks.bench_partitioning --url postgresql://…/praxiszeit_bench \\
+        [--tenants 5] [--employees 100] [--years 10] [--reuse] [--keep] [--rounds 5]
+"""
+import argparse
+import random
+import re
+from datetime import date
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.core import partitioning
+from app.core.date_filters import year_filter
+from app.database import set_superadmin_context, set_tenant_context
+from app.models import TimeEntry, User, UserRole
+from app.services import calculation_service, entry_records
+from benchmarks.datagen import GeneratorConfig, generate, open_session
+from benchmarks.harness import Suite
+
+_SAMPLE_USERS = 20
+
+
+def _ensure_rls(db) -> None:
+    """create_all() schemas have no RLS; add it so both variants pay the same policy cost."""
+    conn = db.connection()
+    for table in partitioning.TABLES:
+        has_policy = conn.execute(text(
+            "SELECT 1 FROM pg_policies WHERE tablename = :t AND policyname = 'tenant_isolation'"
+        ), {"t": table.name}).first()
+        if not has_policy:
+            partitioning.enable_rls(conn, table.name)
+    db.commit()
+
+
+def _explain_partitions(db, tenant_id, year: int) -> int:
+    """Number of time_entries partitions the yearly export scans."""
+    query = db.query(TimeEntry.id).filter(TimeEntry.tenant_id == tenant_id, year_filter(TimeEntry.date, year))
+    compiled = query.statement.compile(db.bind, compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN {compiled}")).scalars().all()
+    # Heap/seq/index scans name the table ("… on time_entries_y2025 …"); bitmap index scans name an index
+    return len({
+        match.group(1) for line in plan if "Bitmap Index Scan" not in line
+        for match in [re.search(r" on (time_entries\w*)", line)] if match
+    })
+
+
+def run_queries(suite: Suite, db, label: str, tenant_id, year: int, rounds: int) -> None:
+    set_tenant_context(db, tenant_id)
+    users = db.query(User).filter(User.role == UserRole.EMPLOYEE).all()
+    sample = random.Random(7).sample(users, min(_SAMPLE_USERS, len(users)))
+    today = date.today()
+
+    suite.run(
+        f"{label}: Jahresexport {year}",
+        lambda: entry_records.load_entries(db, TimeEntry.tenant_id == tenant_id, year_filter(TimeEntry.date, year)),
+        rounds=rounds,
+        partitions=_explain_partitions(db, tenant_id, year),
+    )
+    suite.run(
+        f"{label}: Monats-Ist {year}-06 ({len(users)} MA)",
+        lambda: [calculation_service.get_monthly_actual(db, u, year, 6) for u in users],
+        rounds=rounds,
+    )
+    suite.run(
+        f"{label}: Überstundenkonto ({len(sample)} MA)",
+        lambda: [calculation_service.get_overtime_account(db, u, today.year, today.month) for u in sample],
+        rounds=rounds,
+    )
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument("--tenants", type=int, default=5)
+    parser.add_argument("--employees", type=int, default=100)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--reuse", action="store_true", help="vorhandene Daten verwenden")
+    parser.add_argument("--keep", action="store_true", help="Partitionierung danach nicht zurückbauen")
+    args = parser.parse_args()
+
+    db = open_session(args.url, create_schema=True)
+    if db.bind.dialect.name != "postgresql":
+        raise SystemExit("Benchmark braucht PostgreSQL (native Partitionierung)")
+    try:
+        set_superadmin_context(db)
+        last_year = date.today().year - 1
+        if not (args.reuse and db.query(TimeEntry.id).first()):
+            cfg = GeneratorConfig(args.tenants, args.employees, args.years, last_year, seed=2026)
+            data = generate(db, cfg)
+            print(", ".join(f"{t}: {n}" for t, n in sorted(data.row_counts.items())))
+        tenant_id = db.execute(text("SELECT tenant_id FROM time_entries LIMIT 1")).scalar()
+        _ensure_rls(db)
+
+        suite = Suite("partitioning", dialect="postgresql", employees=args.tenants * args.employees, years=args.years)
+        conn = db.connection()
+        for table in partitioning.TABLES:
+            if partitioning.is_partitioned(conn, table):
+                raise SystemExit(f"{table.name} ist bereits partitioniert – erst zurückbauen")
+
+        run_queries(suite, db, "ungeteilt", tenant_id, last_year, args.rounds)
+
+        set_superadmin_context(db)
+        partitioning.enable(db.connection())
+        db.commit()
+        run_queries(suite, db, "partitioniert", tenant_id, last_year, args.rounds)
+
+        if not args.keep:
+            set_superadmin_context(db)
+            partitioning.disable(db.connection())
+            db.commit()
+    finally:
+        db.close()
+
+    before = {b["name"].split(": ", 1)[1]: b["stats"]["median"] for b in suite.benchmarks if b["name"].startswith("ungeteilt")}
+    print(f"\n{'Abfrage':40} {'ungeteilt':>11} {'partitioniert':>14} {'Faktor':>7}")
+    for bench in suite.benchmarks:
+        label, name = bench["name"].split(": ", 1)
+        if label == "partitioniert":
+            now = bench["stats"]["median"]
+            print(f"{name:40} {before[name] * 1000:9.1f}ms {now * 1000:12.1f}ms {before[name] / now:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
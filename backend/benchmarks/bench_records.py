@@ -0,0 +1,107 @@
+"""
+Benchmark: Zeiteinträge als ORM-Entitäten vs. kompakte Records (``entry_records``).
+
+Lädt alle Zeiteinträge eines synthetischen Tenants (``benchmarks.datagen``)
+einmal als ``TimeEntry``-Entitäten mit ``net_hours`` pro Zeile und einmal als
+``EntryRecord``-Tupel mit vorberechneten Hundertstelstunden, und summiert die
+Nettozeit. Gemessen werden Laufzeit, per tracemalloc gezählte Allokationen
+(Blöcke und Bytes, die das Ergebnis belegt) und neu vom GC verfolgte Objekte –
+jeweils umgerechnet auf 10.000 Einträge.
+
+Ohne ``--url`` läuft der Benchmark gegen eine SQLite-In-Memory-Datenbank.
+
+Aufruf (im backend-Verzeichnis):
+    python -m benchmarks.bench_records [--entries 10000] [--rounds 5] [--url postgresql://…]
+"""
+import argparse
+import gc
+import math
+import statistics
+import time as timer
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+
+from app.database import set_superadmin_context
+from app.models import TimeEntry
+from app.services import entry_records
+from benchmarks.datagen import GeneratorConfig, generate, open_session
+
+# Roughly the bookings of one employee per generated year
+_ENTRIES_PER_EMPLOYEE_YEAR = 220
+
+
+def load_orm(db, tenant_id):
+    entries = db.query(TimeEntry).filter(TimeEntry.tenant_id == tenant_id).all()
+    total = sum((Decimal(str(e.net_hours)) for e in entries), Decimal("0"))
+    return entries, total
+
+
+def load_records(db, tenant_id):
+    entries = entry_records.load_entries(db, TimeEntry.tenant_id == tenant_id, order_by=())
+    total = Decimal(sum(e.net_hundredths for e in entries)).scaleb(-2)
+    return entries, total
+
+
+def measure(db, fn, tenant_id, rounds: int) -> dict:
+    times = []
+    for _ in range(rounds):
+        db.expunge_all()  # no identity-map hits between rounds
+        start = timer.perf_counter()
+        fn(db, tenant_id)
+        times.append(timer.perf_counter() - start)
+
+    db.expunge_all()
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    tracemalloc.start()
+    result, total = fn(db, tenant_id)
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    objects = len(gc.get_objects()) - objects_before
+    stats = snapshot.statistics("filename")
+    return {
+        "rows": len(result),
+        "total": total,
+        "median_ms": statistics.median(times) * 1000,
+        "blocks": sum(s.count for s in stats),
+        "bytes": sum(s.size for s in stats),
+        "gc_objects": objects,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    db = open_session(args.url, create_schema=args.url.startswith("sqlite"))
+    try:
+        if db.bind.dialect.name == "postgresql":
+            set_superadmin_context(db)
+        employees = max(1, math.ceil(args.entries / _ENTRIES_PER_EMPLOYEE_YEAR))
+        last_year = date.today().year - 1
+        data = generate(db, GeneratorConfig(tenants=1, employees=employees, years=1, last_year=last_year, seed=4711))
+        tenant_id = data.tenant_ids[0]
+
+        results = {
+            "ORM TimeEntry": measure(db, load_orm, tenant_id, args.rounds),
+            "EntryRecord": measure(db, load_records, tenant_id, args.rounds),
+        }
+    finally:
+        db.close()
+
+    rows = next(iter(results.values()))["rows"]
+    assert len({r["total"] for r in results.values()}) == 1, "Summen weichen voneinander ab"
+    scale = 10_000 / rows
+    print(f"{rows} Zeiteinträge ({db.bind.dialect.name}), Werte je 10.000 Einträge")
+    print(f"{'Variante':16} {'Median ms':>10} {'Blöcke':>10} {'KiB':>10} {'GC-Objekte':>11}")
+    for name, r in results.items():
+        print(f"{name:16} {r['median_ms'] * scale:10.1f} {r['blocks'] * scale:10.0f} "
+              f"{r['bytes'] * scale / 1024:10.0f} {r['gc_objects'] * scale:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Micro-Benchmarks der Berechnungs-, Journal-, Export-, Ruhezeit- und Jahresabschluss-Services.
+
+Läuft gegen eine lokale PostgreSQL-Datenbank mit synthetischen Daten
+(``benchmarks.datagen``) und misst pro Service Median/Min über mehrere Runden
+sowie die Anzahl der SQL-Statements pro Aufruf. Ergebnisse werden als
+Baseline-JSON gespeichert und können mit einer früheren Baseline verglichen
+werden (Exit-Code 1 bei Regression).
+
+Hinweis: Mit ``--create-schema`` (create_all, ohne RLS-Policies) sehen die
+Export-Benchmarks alle Tenants; mit ``alembic upgrade head`` nur den ersten.
+
+Aufruf (im backend-Verzeichnis, gegen eine Scratch-Datenbank!):
+    python -m benchmarks.bench_services --url postgresql://…/praxiszeit_bench \\
+        --generate --create-schema [--tenants 3 --employees 20 --years 3]
+    python -m benchmarks.bench_services --url … --save            # Baseline schreiben
+    python -m benchmarks.bench_services --url … --compare benchmarks/baselines/services.json
+"""
+import argparse
+import sys
+from datetime import date
+
+from app.config import settings
+from app.core.query_metrics import collect_queries
+from app.database import set_superadmin_context, set_tenant_context
+from app.models import Tenant, User, UserRole
+from app.services import (
+    calculation_service, export_service, journal_service, ods_export_service, rest_time_service,
+    year_closing_service,
+)
+from benchmarks import harness
+from benchmarks.datagen import GeneratorConfig, generate, open_session
+
+
+def _queries(fn) -> int:
+    with collect_queries() as stats:
+        fn()
+    return stats.count
+
+
+def run_suite(db, rounds: int) -> harness.Suite:
+    set_superadmin_context(db)
+    tenant = db.query(Tenant).filter(Tenant.slug.like("bench-%")).order_by(Tenant.slug).first()
+    if tenant is None:
+        raise SystemExit("Keine Benchmark-Daten gefunden – zuerst mit --generate erzeugen")
+    set_tenant_context(db, str(tenant.id))
+
+    employees = db.query(User).filter(
+        User.tenant_id == tenant.id, User.role == UserRole.EMPLOYEE,
+    ).order_by(User.username).all()
+    user = employees[0]
+    today = date.today()
+    year = today.year if today.month > 1 else today.year - 1
+    month = today.month - 1 or 12
+
+    suite = harness.Suite(
+        "services",
+        dialect=db.bind.dialect.name,
+        employees_per_tenant=len(employees),
+    )
+    cases = {
+        "calculation.monthly_target": lambda: calculation_service.get_monthly_target(db, user, year, month),
+        "calculation.monthly_actual": lambda: calculation_service.get_monthly_actual(db, user, year, month),
+        "calculation.overtime_account": lambda: calculation_service.get_overtime_account(db, user, year, month),
+        "calculation.ytd_summary": lambda: calculation_service.get_ytd_summary(db, user, year),
+        "calculation.vacation_account": lambda: calculation_service.get_vacation_account(db, user, year),
+        "journal.get_journal": lambda: journal_service.get_journal(db, user, year, month),
+        "rest_time.user_year": lambda: rest_time_service.check_rest_time_violations(db, user, year),
+        "rest_time.all_users_month": lambda: rest_time_service.check_all_users_violations(db, year, month),
+        "export.monthly_report_xlsx": lambda: export_service.generate_monthly_report(db, year, month),
+        "export.yearly_report_xlsx": lambda: export_service.generate_yearly_report(db, year),
+        "export.monthly_report_ods": lambda: ods_export_service.generate_monthly_report(db, year, month),
+        # Dry run: same load and compute work, the data stays unchanged between rounds
+        "year_closing.tenant_dry_run": lambda: year_closing_service.close_year(db, year - 1, employees, dry_run=True),
+    }
+    for name, fn in cases.items():
+        heavy = name.startswith(("export.", "year_closing.")) or name.endswith("all_users_month")
+        suite.run(name, fn, rounds=max(1, rounds // 3) if heavy else rounds, queries=_queries(fn))
+    return suite
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument("--generate", action="store_true", help="synthetische Daten erzeugen")
+    parser.add_argument("--create-schema", action="store_true")
+    parser.add_argument("--tenants", type=int, default=3)
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=9)
+    parser.add_argument("--save", nargs="?", const="", default=None, metavar="PFAD",
+                        help="Baseline speichern (Standard: benchmarks/baselines/services.json)")
+    parser.add_argument("--compare", metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=harness.DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    db = open_session(args.url, args.create_schema)
+    try:
+        if db.bind.dialect.name != "postgresql":
+            raise SystemExit("Benchmarks laufen gegen PostgreSQL (RLS, Datentypen)")
+        if args.generate:
+            set_superadmin_context(db)
+            data = generate(db, GeneratorConfig(args.tenants, args.employees, args.years), until=date.today())
+            print("Erzeugt: " + ", ".join(f"{t}={n}" for t, n in sorted(data.row_counts.items())))
+        suite = run_suite(db, args.rounds)
+    finally:
+        db.close()
+
+    if args.save is not None:
+        print(f"\nBaseline gespeichert: {suite.save(args.save or None)}")
+    if args.compare:
+        regressions = harness.compare(harness.load(args.compare), suite.to_dict(), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} Regression(en): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
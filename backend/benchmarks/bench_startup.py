@@ -0,0 +1,108 @@
+"""
+Benchmark: Kaltstart des Backends (``import app.main``) per ``python -X importtime``.
+
+Startet pro Runde einen frischen Interpreter, der nur ``app.main`` importiert,
+und misst die Wanduhrzeit (das, was ein Container-Neustart oder ein Testlauf
+vor dem ersten Request bezahlt) sowie die von ``-X importtime`` gemeldete
+kumulierte Importzeit. Ausgegeben werden die teuersten Top-Level-Pakete; die
+Export-/Import-Bibliotheken (openpyxl, odfpy, reportlab, xlrd, workalendar)
+werden erst bei der ersten Nutzung geladen und dürfen beim Start nicht
+auftauchen – sonst endet der Lauf mit Exit-Code 1. Keine Datenbank nötig.
+
+Aufruf (im backend-Verzeichnis):
+    python -m benchmarks.bench_startup [--rounds 5] [--top 15]
+    python -m benchmarks.bench_startup --save           # Baseline schreiben
+    python -m benchmarks.bench_startup --compare benchmarks/baselines/startup.json
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks import harness
+from benchmarks.harness import Suite
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Loaded lazily on first use (exports, XLS import, holiday sync)
+LAZY_MODULES = ("openpyxl", "odf", "reportlab", "xlrd", "workalendar")
+
+
+def import_profile(module: str = "app.main") -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+    """
+    Import ``module`` in a fresh interpreter with ``-X importtime``.
+
+    Returns {module: (self µs, cumulative µs)} and the lazily loaded modules
+    that were imported anyway.
+    """
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return timings, loaded
+
+
+def by_package(timings: Dict[str, Tuple[int, int]]) -> Dict[str, int]:
+    """Self time in µs summed per top-level package."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, (self_us, _) in timings.items():
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--save", nargs="?", const="", default=None, metavar="PFAD",
+                        help="Baseline speichern (Standard: benchmarks/baselines/startup.json)")
+    parser.add_argument("--compare", metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=harness.DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    profiles = []
+    suite = Suite("startup", module=args.module)
+    suite.run(f"import {args.module}", lambda: profiles.append(import_profile(args.module)), rounds=args.rounds)
+
+    cumulative = [timings[args.module][1] for timings, _ in profiles[1:]]  # without the warm-up round
+    print(f"{'-X importtime (kumuliert)':45} median {statistics.median(cumulative) / 1000:9.2f} ms")
+
+    timings, loaded = profiles[-1]
+    print(f"\n{'Paket':30} {'self':>10}")
+    for package, self_us in sorted(by_package(timings).items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:30} {self_us / 1000:8.1f}ms")
+
+    if args.save is not None:
+        print(f"\nBaseline gespeichert: {suite.save(args.save or None)}")
+    failed = False
+    if args.compare:
+        regressions = harness.compare(harness.load(args.compare), suite.to_dict(), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} Regression(en): {', '.join(regressions)}")
+            failed = True
+    if loaded:
+        print(f"\nBeim Start geladen, sollte lazy sein: {', '.join(loaded)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Micro-Benchmark: RLS-Tenant-Kontext pro Request (Statements und Latenz).
+
+Simuliert den Auth-Ablauf eines Requests (Superadmin-Kontext → User-Lookup →
+Tenant-Kontext → Fachabfrage) einmal mit der früheren Statement-Folge
+(``SET LOCAL`` je Einstellung plus Wiederholung im ``after_begin``-Hook) und
+einmal mit ``set_tenant_context``/``set_superadmin_context`` aus app.database
+(ein ``set_config``-Statement pro Kontextwechsel, doppelte werden übersprungen).
+Braucht eine PostgreSQL-Datenbank (Round-Trips sind das, was gemessen wird).
+
+Aufruf (im backend-Verzeichnis):
+    python -m benchmarks.bench_tenant_context [--url postgresql://…] [--requests 2000]
+"""
+import argparse
+import statistics
+import time as timer
+import uuid
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import _restore_tenant_context, set_superadmin_context, set_tenant_context
+
+
+TENANT_ID = str(uuid.UUID(int=1))
+_QUERY = text("SELECT 1")
+
+
+def _legacy_after_begin(session, transaction, connection):
+    if getattr(session, "_tenant_id", None):
+        connection.execute(text("SET LOCAL app.tenant_id = :tid"), {"tid": session._tenant_id})
+    if getattr(session, "_is_superadmin", False):
+        connection.execute(text("SET LOCAL app.is_superadmin = 'true'"))
+
+
+def legacy_request(db: Session) -> None:
+    db._is_superadmin, db._tenant_id = True, None
+    db.execute(text("SET LOCAL app.is_superadmin = 'true'"))
+    db.execute(text("SET LOCAL app.tenant_id = ''"))
+    db.execute(_QUERY)  # user lookup
+    db._is_superadmin, db._tenant_id = False, TENANT_ID
+    db.execute(text("SET LOCAL app.tenant_id = :tid"), {"tid": TENANT_ID})
+    db.execute(text("SET LOCAL app.is_superadmin = ''"))
+    db.execute(_QUERY)  # endpoint query
+
+
+def current_request(db: Session) -> None:
+    set_superadmin_context(db)
+    db.execute(_QUERY)
+    set_tenant_context(db, TENANT_ID)
+    db.execute(_QUERY)
+
+
+def measure(engine, listener, request, n: int):
+    factory = sessionmaker(bind=engine, autoflush=False)
+    event.listen(factory, "after_begin", listener)
+    statements = [0]
+
+    def count(conn, cursor, statement, *args):
+        if "app." in statement:
+            statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    durations = []
+    try:
+        for _ in range(n):
+            db = factory()
+            start = timer.perf_counter()
+            request(db)
+            db.close()
+            durations.append(timer.perf_counter() - start)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return statements[0] / n, durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url, pool_size=1)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Benchmark braucht PostgreSQL (set_config/SET LOCAL)")
+
+    # Warm-up: pool connection and statement caches
+    measure(engine, _restore_tenant_context, current_request, 50)
+
+    for label, listener, request in (
+        ("SET LOCAL (vorher)", _legacy_after_begin, legacy_request),
+        ("set_config (jetzt)", _restore_tenant_context, current_request),
+    ):
+        per_request, durations = measure(engine, listener, request, args.requests)
+        print(
+            f"{label:20} {per_request:4.1f} Kontext-Statements/Request  "
+            f"median {statistics.median(durations) * 1000:6.3f} ms  "
+            f"p95 {sorted(durations)[int(len(durations) * 0.95)] * 1000:6.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: TimeRec-XLS-Parsing mit 10.000 synthetischen Datenzeilen.
+
+Vergleicht die zellweise Extraktion (ws.cell / cell_value + timedelta pro Zeile)
+mit der spaltenweisen Extraktion aus xls_import_service und misst die
+ArbZG-Prüfung über die gesamte Folge. Keine Datenbank nötig.
+
+Aufruf (im backend-Verzeichnis):
+    python -m benchmarks.bench_xls_parse [--rows 10000] [--repeat 5]
+"""
+import argparse
+import io
+import statistics
+import time as timer
+from datetime import datetime, timedelta
+
+import xlrd
+import xlwt
+
+from app.services.xls_import_service import (
+    _calc_break_minutes,
+    _check_arbzg_sequence,
+    _excel_serial_to_datetime,
+    _read_rows,
+)
+
+
+def make_timerec_xls(rows: int, start: datetime = datetime(2000, 1, 3)) -> bytes:
+    """Synthetische TimeRec-Datei: zwei Blöcke pro Tag, Wochen-Kopfzeilen dazwischen."""
+    wb = xlwt.Workbook()
+    ws = wb.add_sheet("Zeiterfassung")
+    style = xlwt.easyxf(num_format_str="DD.MM.YYYY HH:MM")
+    for col, title in enumerate(["Datum", "Tag", "Total", "Ein", "Aus", "Tagesnotiz"]):
+        ws.write(0, col, title)
+
+    row_idx, written, day = 1, 0, start
+    while written < rows:
+        if day.weekday() == 0:
+            ws.write(row_idx, 0, f"W{day.isocalendar()[1]:02d}")
+            row_idx += 1
+        for begin, end in (((7, 15), (12, 30)), ((13, 0), (16, 45))):
+            if written >= rows:
+                break
+            ws.write(row_idx, 0, day.strftime("%d.%m"))
+            ws.write(row_idx, 3, day.replace(hour=begin[0], minute=begin[1]), style)
+            ws.write(row_idx, 4, day.replace(hour=end[0], minute=end[1]), style)
+            ws.write(row_idx, 5, "Fortbildung" if written % 97 == 0 else "")
+            row_idx += 1
+            written += 1
+        day += timedelta(days=1)
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def read_rows_cellwise(ws) -> list:
+    """Referenz: bisherige zellweise Extraktion."""
+    rows = []
+    for row_idx in range(ws.nrows):
+        if ws.cell(row_idx, 3).ctype != 3:
+            continue
+        ein_dt = _excel_serial_to_datetime(ws.cell_value(row_idx, 3))
+        aus_dt = _excel_serial_to_datetime(ws.cell_value(row_idx, 4))
+        notiz = str(ws.cell_value(row_idx, 5)).strip()
+        start_t = ein_dt.time().replace(second=0, microsecond=0)
+        end_t = aus_dt.time().replace(second=0, microsecond=0)
+        rows.append((ein_dt.date(), start_t, end_t, _calc_break_minutes(start_t, end_t), notiz or None))
+    return rows
+
+
+def _measure(fn, repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        t0 = timer.perf_counter()
+        fn()
+        durations.append(timer.perf_counter() - t0)
+    return statistics.median(durations) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = make_timerec_xls(args.rows)
+    ws = xlrd.open_workbook(file_contents=content).sheet_by_name("Zeiterfassung")
+
+    cellwise = read_rows_cellwise(ws)
+    columnwise = _read_rows(ws)
+    assert cellwise == columnwise, "Spaltenweise Extraktion weicht von der Referenz ab"
+
+    sequence = [r[:4] for r in columnwise]
+    print(f"Datei: {len(content) / 1024:.0f} KiB, {len(columnwise)} Datenzeilen")
+    print(f"  zellweise Extraktion     {_measure(lambda: read_rows_cellwise(ws), args.repeat):8.1f} ms")
+    print(f"  spaltenweise Extraktion  {_measure(lambda: _read_rows(ws), args.repeat):8.1f} ms")
+    print(f"  ArbZG-Prüfung (Folge)    {_measure(lambda: _check_arbzg_sequence(sequence, None), args.repeat):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
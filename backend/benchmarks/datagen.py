@@ -0,0 +1,239 @@
+"""
+Synthetischer Datengenerator: N Tenants × M Mitarbeitende × Y Jahre.
+
+Erzeugt realistische Stammdaten und Buchungen für Benchmarks und Lasttests:
+Zeiteinträge an Werktagen (teilweise geteilte Dienste), Urlaub, Krankheit und
+Fortbildung, Stundenänderungen, Jahresüberträge und Feiertage. Gleicher Seed
+→ gleiche Daten, damit Baselines vergleichbar bleiben.
+
+Die Zeilen werden per Core-``insert`` in Batches geschrieben (kein ORM-Flush),
+daher bleiben ``data_versions`` leer – für eine frische Benchmark-DB korrekt.
+
+Aufruf (im backend-Verzeichnis, gegen eine Scratch-Datenbank!):
+    python -m benchmarks.datagen --url postgresql://…/praxiszeit_bench \\
+        [--tenants 3] [--employees 20] [--years 3] [--create-schema]
+"""
+import argparse
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import Base, _restore_tenant_context, set_superadmin_context
+from app.models import (
+    Absence, AbsenceType, PublicHoliday, Tenant, TimeEntry, User, UserRole,
+    WorkingHoursChange, YearCarryover,
+)
+from app.services import auth_service, holiday_service
+
+BATCH_SIZE = 5000
+
+# One shared hash: bcrypt per generated user would dominate generation time
+BENCH_PASSWORD = "Bench-Passwort-2026!"
+
+_WEEKLY_HOURS = (Decimal("40.0"), Decimal("38.5"), Decimal("30.0"), Decimal("20.0"), Decimal("10.0"))
+_FIRST_NAMES = ("Anna", "Ben", "Clara", "David", "Eva", "Felix", "Greta", "Hannah", "Jonas", "Lena", "Mia", "Paul")
+_LAST_NAMES = ("Müller", "Schmidt", "Weber", "Wagner", "Becker", "Hoffmann", "Koch", "Richter", "Wolf", "Neumann")
+
+
+@dataclass
+class GeneratorConfig:
+    tenants: int = 3
+    employees: int = 20
+    years: int = 3
+    last_year: int = date.today().year
+    seed: int = 42
+
+
+@dataclass
+class GeneratedData:
+    tenant_ids: List[uuid.UUID] = field(default_factory=list)
+    admin_ids: List[uuid.UUID] = field(default_factory=list)
+    employee_ids: Dict[uuid.UUID, List[uuid.UUID]] = field(default_factory=dict)
+    row_counts: Dict[str, int] = field(default_factory=dict)
+
+
+class _BatchWriter:
+    """Collects rows per table and writes them with executemany inserts."""
+
+    def __init__(self, db: Session, counts: Dict[str, int]):
+        self.db = db
+        self.counts = counts
+        self.rows: Dict[type, list] = {}
+
+    def add(self, model, **row) -> None:
+        rows = self.rows.setdefault(model, [])
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            self.flush(model)
+
+    def flush(self, model=None) -> None:
+        for m in ([model] if model else list(self.rows)):
+            rows = self.rows.pop(m, [])
+            if rows:
+                self.db.execute(insert(m), rows)
+                self.counts[m.__tablename__] = self.counts.get(m.__tablename__, 0) + len(rows)
+
+
+def _workdays(start: date, end: date, holidays: set):
+    d = start
+    while d <= end:
+        if d.weekday() < 5 and d not in holidays:
+            yield d
+        d += timedelta(days=1)
+
+
+def _generate_employee(writer: _BatchWriter, rng: random.Random, tenant_id, user_id,
+                       first_year: int, last_year: int, until: date, holidays: set, weekly: Decimal) -> None:
+    # Hours change once in the middle of the period for a third of the staff
+    if rng.random() < 0.33:
+        writer.add(
+            WorkingHoursChange, id=uuid.uuid4(), tenant_id=tenant_id, user_id=user_id,
+            effective_from=date(first_year, 1, 1), weekly_hours=weekly, note="Start",
+        )
+        writer.add(
+            WorkingHoursChange, id=uuid.uuid4(), tenant_id=tenant_id, user_id=user_id,
+            effective_from=date(first_year + (last_year - first_year) // 2, 7, 1),
+            weekly_hours=rng.choice(_WEEKLY_HOURS), note="Stundenänderung",
+        )
+
+    for year in range(first_year + 1, last_year + 1):
+        writer.add(
+            YearCarryover, id=uuid.uuid4(), tenant_id=tenant_id, user_id=user_id, year=year,
+            overtime_hours=Decimal(rng.randint(-2000, 4000)) / 100,
+            vacation_days=Decimal(rng.randint(0, 10)),
+        )
+
+    daily_minutes = int(weekly * 60 / 5)
+    for year in range(first_year, last_year + 1):
+        # ~25 vacation days in 2-3 blocks, a few sick days, one training day
+        absent: Dict[date, AbsenceType] = {}
+        days = list(_workdays(date(year, 1, 1), min(date(year, 12, 31), until), holidays))
+        if not days:
+            continue
+        for _ in range(rng.randint(2, 3)):
+            start = rng.randrange(len(days))
+            for d in days[start:start + rng.randint(5, 10)]:
+                absent[d] = AbsenceType.VACATION
+        for _ in range(rng.randint(0, 6)):
+            absent.setdefault(rng.choice(days), AbsenceType.SICK)
+        absent.setdefault(rng.choice(days), AbsenceType.TRAINING)
+
+        for d, absence_type in absent.items():
+            writer.add(
+                Absence, id=uuid.uuid4(), tenant_id=tenant_id, user_id=user_id, date=d, end_date=None,
+                type=absence_type, hours=Decimal(daily_minutes) / 60,
+            )
+
+        for d in days:
+            if d in absent:
+                continue
+            start_min = rng.randint(7 * 60, 9 * 60) // 5 * 5
+            worked = daily_minutes + rng.randint(-30, 45)
+            if worked > 6 * 60 and rng.random() < 0.2:
+                # Split shift: morning and afternoon block
+                first = worked // 2
+                writer.add(TimeEntry, id=uuid.uuid4(), tenant_id=tenant_id, user_id=user_id, date=d,
+                           start_time=_t(start_min), end_time=_t(start_min + first), break_minutes=0)
+                second_start = start_min + first + 60
+                writer.add(TimeEntry, id=uuid.uuid4(), tenant_id=tenant_id, user_id=user_id, date=d,
+                           start_time=_t(second_start), end_time=_t(second_start + worked - first), break_minutes=0)
+            else:
+                brk = 30 if worked > 6 * 60 else 0
+                writer.add(TimeEntry, id=uuid.uuid4(), tenant_id=tenant_id, user_id=user_id, date=d,
+                           start_time=_t(start_min), end_time=_t(start_min + worked + brk), break_minutes=brk)
+
+
+def _t(minutes: int) -> time:
+    minutes = min(minutes, 23 * 60 + 59)
+    return time(minutes // 60, minutes % 60)
+
+
+def generate(db: Session, cfg: GeneratorConfig, until: date = None) -> GeneratedData:
+    """Insert the synthetic data set and commit. ``db`` needs superadmin context on Postgres."""
+    rng = random.Random(cfg.seed)
+    until = until or date(cfg.last_year, 12, 31)
+    first_year = cfg.last_year - cfg.years + 1
+    password_hash = auth_service.hash_password(BENCH_PASSWORD)
+    result = GeneratedData()
+    writer = _BatchWriter(db, result.row_counts)
+
+    for t in range(cfg.tenants):
+        tenant_id = uuid.UUID(int=rng.getrandbits(128))
+        result.tenant_ids.append(tenant_id)
+        writer.add(Tenant, id=tenant_id, name=f"Bench-Praxis {t + 1}", slug=f"bench-{cfg.seed}-{t + 1}",
+                   is_active=True, mode="multi")
+        writer.flush(Tenant)
+
+        for year in range(first_year, cfg.last_year + 1):
+            holiday_service.sync_holidays(db, year, tenant_id=tenant_id)
+        db.flush()
+        holidays = {d for (d,) in db.query(PublicHoliday.date).filter(PublicHoliday.tenant_id == tenant_id)}
+
+        admin_id = uuid.UUID(int=rng.getrandbits(128))
+        result.admin_ids.append(admin_id)
+        writer.add(User, id=admin_id, tenant_id=tenant_id, username=f"bench{t + 1}.admin",
+                   email=None, password_hash=password_hash, first_name="Admin", last_name=f"Praxis {t + 1}",
+                   role=UserRole.ADMIN, weekly_hours=Decimal("40.0"), vacation_days=30, work_days_per_week=5,
+                   track_hours=False, is_active=True, token_version=0, first_work_day=None)
+
+        result.employee_ids[tenant_id] = []
+        for e in range(cfg.employees):
+            user_id = uuid.UUID(int=rng.getrandbits(128))
+            weekly = rng.choice(_WEEKLY_HOURS)
+            result.employee_ids[tenant_id].append(user_id)
+            writer.add(User, id=user_id, tenant_id=tenant_id, username=f"bench{t + 1}.ma{e + 1:03d}",
+                       email=None, password_hash=password_hash,
+                       first_name=rng.choice(_FIRST_NAMES), last_name=rng.choice(_LAST_NAMES),
+                       role=UserRole.EMPLOYEE, weekly_hours=weekly, vacation_days=30, work_days_per_week=5,
+                       track_hours=True, is_active=True, token_version=0,
+                       first_work_day=date(first_year, 1, 1))
+            writer.flush(User)
+            _generate_employee(writer, rng, tenant_id, user_id, first_year, cfg.last_year, until, holidays, weekly)
+        writer.flush()
+
+    writer.flush()
+    db.commit()
+    return result
+
+
+def open_session(url: str, create_schema: bool = False) -> Session:
+    """Session on ``url`` with the RLS context listener (like SessionLocal)."""
+    engine = create_engine(url)
+    if create_schema:
+        Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    event.listen(factory, "after_begin", _restore_tenant_context)
+    return factory()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument("--tenants", type=int, default=3)
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--last-year", type=int, default=date.today().year)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--create-schema", action="store_true", help="Tabellen per create_all anlegen (ohne RLS)")
+    args = parser.parse_args()
+
+    db = open_session(args.url, args.create_schema)
+    try:
+        set_superadmin_context(db)
+        cfg = GeneratorConfig(args.tenants, args.employees, args.years, args.last_year, args.seed)
+        data = generate(db, cfg, until=min(date.today(), date(args.last_year, 12, 31)))
+    finally:
+        db.close()
+    for table, count in sorted(data.row_counts.items()):
+        print(f"{table:25} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
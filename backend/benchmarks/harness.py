@@ -0,0 +1,100 @@
+"""
+Minimal benchmark harness (pytest-benchmark-artiges Format, ohne Plugin).
+
+``Suite.run`` misst eine Funktion über mehrere Runden (nach Warm-up) und hält
+min/median/mean/stddev/max in Sekunden fest. Ergebnisse werden als JSON mit
+Metadaten (Commit, Python, DB-Dialekt, Datensatzgröße) gespeichert;
+``compare`` vergleicht zwei solche Dateien anhand des Medians.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time as timer
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Median slower than baseline by more than this factor counts as regression
+DEFAULT_THRESHOLD = 1.2
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Suite:
+    def __init__(self, name: str, **machine_info):
+        self.name = name
+        self.machine_info = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "commit": _git_commit(),
+            **machine_info,
+        }
+        self.benchmarks: List[Dict] = []
+
+    def run(self, name: str, fn: Callable[[], object], rounds: int = 5, warmup: int = 1, **extra) -> Dict:
+        for _ in range(warmup):
+            fn()
+        times = []
+        for _ in range(rounds):
+            start = timer.perf_counter()
+            fn()
+            times.append(timer.perf_counter() - start)
+        stats = {
+            "min": min(times),
+            "max": max(times),
+            "mean": statistics.fmean(times),
+            "median": statistics.median(times),
+            "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+            "rounds": rounds,
+        }
+        result = {"name": name, "stats": stats, **extra}
+        self.benchmarks.append(result)
+        print(f"{name:45} median {stats['median'] * 1000:9.2f} ms  min {stats['min'] * 1000:9.2f} ms"
+              + "".join(f"  {k}={v}" for k, v in extra.items()))
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            "suite": self.name,
+            "datetime": datetime.now(timezone.utc).isoformat(),
+            "machine_info": self.machine_info,
+            "benchmarks": self.benchmarks,
+        }
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        path = Path(path) if path else BASELINE_DIR / f"{self.name}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=str) + "\n")
+        return path
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Print median ratios per benchmark; return the names that regressed."""
+    before = {b["name"]: b["stats"]["median"] for b in baseline["benchmarks"]}
+    regressions = []
+    print(f"\n{'Benchmark':45} {'Baseline':>11} {'Aktuell':>11} {'Faktor':>7}")
+    for bench in current["benchmarks"]:
+        name, now = bench["name"], bench["stats"]["median"]
+        if name not in before:
+            print(f"{name:45} {'-':>11} {now * 1000:9.2f}ms {'neu':>7}")
+            continue
+        ratio = now / before[name] if before[name] else float("inf")
+        flag = "  ← langsamer" if ratio > threshold else ""
+        print(f"{name:45} {before[name] * 1000:9.2f}ms {now * 1000:9.2f}ms {ratio:7.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def load(path) -> Dict:
+    return json.loads(Path(path).read_text())
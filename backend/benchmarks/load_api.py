@@ -0,0 +1,159 @@
+"""
+Lasttest: realistischer Mix aus Mitarbeitenden- und Admin-Anfragen.
+
+Jeder virtuelle Nutzer meldet sich als eigener synthetischer Mitarbeitender an
+(``benchmarks.datagen``, Benutzernamen ``bench<T>.ma<NNN>``) und ruft die
+Endpunkte gewichtet nach typischer Nutzung auf: Stempelstatus und Dashboard
+sehr häufig, Journal und Kalender gelegentlich. Ein Admin-Client pro Tenant
+ruft zusätzlich Berichte und Ruhezeitprüfungen ab.
+
+Das Ergebnis (p50/p95/p99 je Endpunkt) wird im Format von
+``benchmarks.harness`` gespeichert, ``--compare`` vergleicht die Mediane mit
+einer früheren Baseline (Exit-Code 1 bei Regression).
+
+Alle Clients kommen von derselben IP: den Server für den Lauf mit erhöhtem
+LOGIN_RATE_LIMIT starten (z. B. ``LOGIN_RATE_LIMIT=1000/minute``).
+
+Aufruf (im backend-Verzeichnis, Server läuft gegen die Benchmark-DB):
+    python -m benchmarks.load_api --base-url http://localhost:8000 \\
+        [--tenants 3 --employees 20] [--duration 60] [--save] [--compare PFAD]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time as timer
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List
+
+import httpx
+
+from benchmarks import harness
+from benchmarks.datagen import BENCH_PASSWORD
+from benchmarks.load_async_reads import _percentile, login
+
+# (path, weight) – relative frequency per employee session
+EMPLOYEE_MIX = [
+    ("/api/time-entries/clock-status", 30),
+    ("/api/dashboard/", 20),
+    ("/api/time-entries/?month={year}-{month:02d}", 15),
+    ("/api/dashboard/ytd-overtime", 8),
+    ("/api/dashboard/vacation", 8),
+    ("/api/dashboard/missing-bookings", 6),
+    ("/api/journal/me?year={year}&month={month}", 6),
+    ("/api/absences/calendar?month={year}-{month:02d}", 7),
+]
+ADMIN_MIX = [
+    ("/api/admin/users", 20),
+    ("/api/dashboard/missing-bookings/team", 20),
+    ("/api/admin/reports/rest-time-violations?year={year}&month={month}", 10),
+    # Export is rate limited to 20/minute per IP
+    ("/api/admin/reports/export?month={year}-{month:02d}", 2),
+]
+
+
+async def session(client: httpx.AsyncClient, mix, deadline: float, rng: random.Random,
+                  latencies: Dict[str, List[float]], errors: Dict[str, int], think: float) -> None:
+    paths, weights = zip(*mix)
+    while timer.perf_counter() < deadline:
+        template = rng.choices(paths, weights)[0]
+        start = timer.perf_counter()
+        try:
+            resp = await client.get(template.format(year=date.today().year, month=date.today().month))
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies[template].append(timer.perf_counter() - start)
+        else:
+            errors[template] += 1
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+
+
+async def _client(args, username: str) -> httpx.AsyncClient:
+    client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    token = await login(client, username, BENCH_PASSWORD)
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client
+
+
+async def run(args) -> harness.Suite:
+    rng = random.Random(args.seed)
+    usernames = [
+        f"bench{t}.ma{e:03d}" for t in range(1, args.tenants + 1) for e in range(1, args.employees + 1)
+    ]
+    admins = [f"bench{t}.admin" for t in range(1, args.tenants + 1)]
+    # Sequential logins: bcrypt makes a burst slow on the server anyway
+    clients = [await _client(args, u) for u in usernames]
+    admin_clients = [await _client(args, u) for u in admins]
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    started = timer.perf_counter()
+    deadline = started + args.duration
+    try:
+        await asyncio.gather(
+            *(session(c, EMPLOYEE_MIX, deadline, random.Random(rng.random()), latencies, errors, args.think)
+              for c in clients),
+            *(session(c, ADMIN_MIX, deadline, random.Random(rng.random()), latencies, errors, args.think)
+              for c in admin_clients),
+        )
+    finally:
+        for c in clients + admin_clients:
+            await c.aclose()
+    elapsed = timer.perf_counter() - started
+
+    suite = harness.Suite("api", base_url=args.base_url, users=len(clients), admins=len(admin_clients),
+                          duration=args.duration)
+    print(f"{len(clients)} Mitarbeitende + {len(admin_clients)} Admins, {elapsed:.1f} s")
+    print(f"{'Endpunkt':60} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Fehler':>7}")
+    for template, _ in EMPLOYEE_MIX + ADMIN_MIX:
+        values = latencies[template]
+        if not values:
+            print(f"{template:60} {'-':>8} {'-':>8} {'-':>8} {'-':>8} {errors[template]:>7}")
+            continue
+        p95, p99 = _percentile(values, 0.95), _percentile(values, 0.99)
+        print(f"{template:60} {len(values) / elapsed:8.1f} {statistics.median(values) * 1000:8.1f} "
+              f"{p95 * 1000:8.1f} {p99 * 1000:8.1f} {errors[template]:>7}")
+        suite.benchmarks.append({
+            "name": template,
+            "stats": {
+                "min": min(values), "max": max(values), "mean": statistics.fmean(values),
+                "median": statistics.median(values), "p95": p95, "p99": p99,
+                "rounds": len(values),
+            },
+            "rps": len(values) / elapsed,
+            "errors": errors[template],
+        })
+    return suite
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--tenants", type=int, default=3)
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--think", type=float, default=0.5, help="mittlere Denkzeit je Anfrage in Sekunden")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", nargs="?", const="", default=None, metavar="PFAD",
+                        help="Baseline speichern (Standard: benchmarks/baselines/api.json)")
+    parser.add_argument("--compare", metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=harness.DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    suite = asyncio.run(run(args))
+    if args.save is not None:
+        print(f"\nBaseline gespeichert: {suite.save(args.save or None)}")
+    if args.compare:
+        regressions = harness.compare(harness.load(args.compare), suite.to_dict(), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} Regression(en): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Lasttest: heiße Lese-Endpunkte, threaded vs. asyncio (ASYNC_DB_ENABLED).
+
+Schickt für eine feste Dauer gleichzeitige GET-Anfragen an einen laufenden
+Server und gibt pro Endpunkt Durchsatz sowie p50/p95/p99-Latenz aus. Zum
+Vergleich denselben Lauf gegen einen Server mit ASYNC_DB_ENABLED=false und
+einen mit ASYNC_DB_ENABLED=true ausführen (gleiche Datenbank, gleiche Worker).
+Async sind Stempelstatus, Abwesenheitskalender und eigenes Journal (Einzelmonat
+und Zeitraum); das Dashboard läuft in beiden Fällen im Threadpool und dient
+als Parallellast.
+
+Aufruf (im backend-Verzeichnis):
+    python -m benchmarks.load_async_reads --base-url http://localhost:8000 \\
+        --username admin --password ... [--concurrency 50] [--duration 30]
+"""
+import argparse
+import asyncio
+import statistics
+import time as timer
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+
+ENDPOINTS = [
+    "/api/time-entries/clock-status",
+    "/api/dashboard/",
+    "/api/dashboard/ytd-overtime",
+    "/api/dashboard/vacation",
+    "/api/journal/me",
+    "/api/journal/me?from={year}-01&to={month}",
+    "/api/absences/calendar?month={month}",
+]
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    resp = await client.post("/api/auth/login", json={"username": username, "password": password})
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def worker(client: httpx.AsyncClient, paths: List[str], deadline: float,
+                 latencies: Dict[str, List[float]], errors: Dict[str, int], offset: int) -> None:
+    i = offset
+    while timer.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = timer.perf_counter()
+        try:
+            resp = await client.get(path)
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies[path].append(timer.perf_counter() - start)
+        else:
+            errors[path] += 1
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run(args) -> None:
+    month = timer.strftime("%Y-%m")
+    paths = [p.format(month=month, year=month[:4]) for p in ENDPOINTS]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        token = await login(client, args.username, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        started = timer.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            worker(client, paths, deadline, latencies, errors, i) for i in range(args.concurrency)
+        ))
+        elapsed = timer.perf_counter() - started
+
+    print(f"{args.concurrency} parallele Clients, {elapsed:.1f} s ({month})")
+    print(f"{'Endpunkt':45} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Fehler':>7}")
+    total = 0
+    for path in paths:
+        values = latencies[path]
+        total += len(values)
+        if not values:
+            print(f"{path:45} {'-':>8} {'-':>8} {'-':>8} {'-':>8} {errors[path]:>7}")
+            continue
+        print(
+            f"{path:45} {len(values) / elapsed:8.1f} "
+            f"{statistics.median(values) * 1000:8.1f} "
+            f"{_percentile(values, 0.95) * 1000:8.1f} "
+            f"{_percentile(values, 0.99) * 1000:8.1f} {errors[path]:>7}"
+        )
+    print(f"{'Gesamt':45} {total / elapsed:8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration for production (multi-worker mode).
+
+Worker count comes from WEB_CONCURRENCY (default 1). Each worker is a full
+uvicorn event loop with its own DB pool (pool_size + max_overflow per worker –
+keep workers × 30 below Postgres max_connections). One-time startup duties run
+once in the master before the workers are forked (``on_starting``, see
+app/core/leader_lock.py), so workers – also recycled ones – skip them.
+"""
+import os
+
+bind = "0.0.0.0:8000"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Trust X-Forwarded-* only from the Docker/private networks (nginx frontend)
+forwarded_allow_ips = "172.16.0.0/12,10.0.0.0/8,192.168.0.0/16"
+
+# Worker boot includes the lifespan (DB check, SSE relay)
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    from app.main import run_startup_duties_in_master
+    run_startup_duties_in_master()
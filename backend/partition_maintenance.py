@@ -0,0 +1,34 @@
+"""
+Create upcoming year partitions for time_entries / time_entry_audit_logs.
+
+Only relevant when migration 034 was applied with time_partitioning enabled
+(see app/core/partitioning.py). Creates the partitions up to three years
+ahead; rows that already landed in the default partition are moved into
+their new year partition. Needs the migration role (DDL), run e.g. yearly
+via cron. Does nothing for unpartitioned tables.
+
+Usage:
+    docker-compose exec backend python partition_maintenance.py
+"""
+
+import os
+
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.core import partitioning
+
+
+def main():
+    engine = create_engine(os.environ.get("DATABASE_URL_MIGRATIONS", settings.DATABASE_URL))
+    with engine.begin() as conn:
+        created = partitioning.ensure_upcoming_partitions(conn)
+
+    if not created:
+        print("Keine partitionierten Tabellen gefunden.")
+    for table, years in created.items():
+        print(f"{table}: " + (", ".join(str(y) for y in years) if years else "alle Partitionen vorhanden"))
+
+
+if __name__ == "__main__":
+    main()
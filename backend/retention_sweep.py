@@ -0,0 +1,71 @@
+"""
+DSGVO retention sweep: anonymize or purge all inactive users whose last time
+entry is older than the ArbZG §16 retention window (730 days).
+
+Runs across all tenants (superadmin context) in chunked transactions, see
+app/services/retention_service.py. Dry-run by default: prints the users that
+would be affected; pass --apply to write. --actor names the admin recorded
+in the audit log (required with --apply). Suitable for a cron job.
+
+Usage:
+    docker-compose exec backend python retention_sweep.py purge                        # Dry run
+    docker-compose exec backend python retention_sweep.py anonymize --apply --actor admin
+    docker-compose exec backend python retention_sweep.py purge --apply --actor admin --chunk-size 100
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+from app.database import ReportingSessionLocal, set_superadmin_context
+from app.models import User, UserRole
+from app.services import retention_service
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="DSGVO retention sweep (anonymize/purge)")
+    parser.add_argument("action", choices=retention_service.ACTIONS)
+    parser.add_argument("--apply", action="store_true", help="write changes (default: dry run)")
+    parser.add_argument("--actor", help="username of the admin recorded in the audit log")
+    parser.add_argument("--chunk-size", type=int, default=retention_service.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Batch job: reporting pool and statement timeout
+    db = ReportingSessionLocal()
+    try:
+        set_superadmin_context(db)
+        actor = None
+        if args.actor:
+            actor = db.query(User).filter(User.username == args.actor, User.role == UserRole.ADMIN).first()
+            if actor is None:
+                print(f"Admin '{args.actor}' nicht gefunden.", file=sys.stderr)
+                return 2
+        elif args.apply:
+            print("--apply erfordert --actor (Admin für das Audit-Log).", file=sys.stderr)
+            return 2
+
+        report = retention_service.sweep(
+            db, args.action, actor, dry_run=not args.apply, chunk_size=args.chunk_size,
+        )
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
+    mode = "DRY RUN" if report["dry_run"] else "APPLY"
+    print(f"\n=== DSGVO Retention Sweep: {report['action']} ({mode}) ===\n")
+    for user in report["users"]:
+        print(f"  {user['last_name']}, {user['first_name']} ({user['username']}) – "
+              f"letzter Eintrag: {user['last_entry_date'] or '–'}")
+    print(f"\n{report['eligible']} Benutzer betroffen, {report['processed']} verarbeitet")
+    print("Zeiten (ms): " + ", ".join(f"{k}={v}" for k, v in report["timings_ms"].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy import types as sa_types
 from app.database import Base
 from app.models import User, UserRole
-from app.services import auth_service
+from app.services import absence_calendar_service, auth_service, vacation_ledger_service
 
 DEFAULT_TENANT_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 
@@ -59,6 +59,12 @@ engine = create_engine(
 from sqlalchemy.dialects import sqlite as sqlite_dialect
 
 
+# Statement counting for query budgets (see app.core.query_metrics)
+from app.core.query_metrics import instrument_engine
+
+instrument_engine(engine)
+
+
 @event.listens_for(engine, "connect")
 def _sqlite_compat(dbapi_conn, _record):
     dbapi_conn.execute("PRAGMA journal_mode=WAL")
@@ -124,6 +130,13 @@ PG_UUID.bind_processor = _patched_bind_processor
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def _clear_absence_calendar_cache():
+    """Month calendars and vacation ledgers are cached by data version, which restarts with every fresh test database."""
+    absence_calendar_service.clear_cache()
+    vacation_ledger_service.clear_cache()
+
+
 @pytest.fixture(scope="function")
 def db():
     """Create a fresh database for each test."""
@@ -0,0 +1,62 @@
+"""
+Tests for the cached team absence calendar (app.services.absence_calendar_service).
+"""
+from datetime import date
+
+from app.core.query_metrics import collect_queries
+from app.models import Absence, AbsenceType
+from app.services import absence_calendar_service as cal_service
+from tests.conftest import DEFAULT_TENANT_ID
+
+
+def _absence(db, user, d, absence_type=AbsenceType.VACATION, hours=8.0):
+    db.add(Absence(user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=d, type=absence_type, hours=hours))
+    db.commit()
+
+
+def test_month_is_one_bitmap_per_user_and_type(db, test_user):
+    for day in (1, 2, 31):
+        _absence(db, test_user, date(2025, 3, day))
+    _absence(db, test_user, date(2025, 3, 2), AbsenceType.TRAINING, hours=4.0)
+
+    cal = cal_service.month_calendar(db, DEFAULT_TENANT_ID, 2025, 3)
+    assert [u.user_id for u in cal.users] == [test_user.id]
+    vacation, training = sorted(cal.masks, key=lambda m: m.type)
+    assert cal_service.TYPES[vacation.type] == AbsenceType.VACATION
+    assert vacation.days == 0b11 | 1 << 30
+    assert training.days == 0b10 and training.hours == (4.0,)
+
+
+def test_ranges_split_on_gaps_and_hour_changes(db, test_user):
+    for day, hours in ((2, 8.0), (3, 8.0), (4, 4.0), (6, 8.0)):
+        _absence(db, test_user, date(2025, 3, day), hours=hours)
+
+    cal = cal_service.month_calendar(db, DEFAULT_TENANT_ID, 2025, 3)
+    assert [(r.start.day, r.end.day, r.hours) for r in cal_service.ranges(cal)] == [
+        (2, 3, 8.0), (4, 4, 4.0), (6, 6, 8.0),
+    ]
+
+
+def test_cached_month_needs_no_absence_query(db, test_user):
+    _absence(db, test_user, date(2025, 3, 3))
+    first = cal_service.month_calendar(db, DEFAULT_TENANT_ID, 2025, 3)
+
+    with collect_queries() as stats:
+        again = cal_service.month_calendar(db, DEFAULT_TENANT_ID, 2025, 3, version=first.version)
+    assert again is first
+    assert stats.count == 0
+
+    _absence(db, test_user, date(2025, 3, 4))
+    rebuilt = cal_service.month_calendar(db, DEFAULT_TENANT_ID, 2025, 3)
+    assert rebuilt.version > first.version
+    assert len(cal_service.days(rebuilt)) == 2
+
+
+def test_missing_months_are_loaded_with_one_query(db, test_user):
+    _absence(db, test_user, date(2025, 1, 10))
+    _absence(db, test_user, date(2025, 3, 10))
+
+    with collect_queries() as stats:
+        cals = cal_service.month_calendars(db, DEFAULT_TENANT_ID, date(2025, 1, 1), date(2025, 3, 1))
+    assert stats.count == 2  # versions + absences
+    assert [len(cal_service.days(c)) for c in cals] == [1, 0, 1]
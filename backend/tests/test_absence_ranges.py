@@ -0,0 +1,81 @@
+"""
+Tests for absence ranges and workday interval arithmetic (app.services.absence_ranges).
+"""
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.models import AbsenceType
+from app.services import absence_ranges, calculation_service
+
+
+def _naive_workdays(start, end, holidays):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)
+            if (start + timedelta(days=i)).weekday() < 5 and start + timedelta(days=i) not in holidays]
+
+
+def test_weekday_counts_and_workdays_match_day_by_day():
+    rng = random.Random(47)
+    holidays = {date(2025, 1, 1), date(2025, 5, 1), date(2025, 12, 25), date(2025, 12, 27)}
+    for _ in range(200):
+        start = date(2024, 12, 1) + timedelta(days=rng.randrange(400))
+        end = start + timedelta(days=rng.randrange(60))
+        expected = _naive_workdays(start, end, holidays)
+        assert absence_ranges.workdays(start, end, holidays) == expected
+        assert absence_ranges.count_workdays(start, end, holidays) == len(expected)
+    assert absence_ranges.weekday_counts(date(2025, 3, 5), date(2025, 3, 4)) == [0] * 7
+
+
+def test_collapse_joins_runs_across_weekends_and_holidays():
+    user = uuid.uuid4()
+    holidays = {date(2025, 4, 18), date(2025, 4, 21)}  # Good Friday, Easter Monday
+    days = absence_ranges.workdays(date(2025, 4, 14), date(2025, 4, 25), holidays)
+    rows = [(user, AbsenceType.VACATION, d, 800) for d in days]
+    rows.append((user, AbsenceType.VACATION, date(2025, 4, 29), 800))  # gap on the 28th
+    rows.append((user, AbsenceType.SICK, date(2025, 4, 30), 600))
+
+    ranges = absence_ranges.collapse(rows, holidays)
+    assert [(r.type, r.start, r.end, r.days) for r in ranges] == [
+        (AbsenceType.SICK, date(2025, 4, 30), date(2025, 4, 30), 1),
+        (AbsenceType.VACATION, date(2025, 4, 14), date(2025, 4, 25), 8),
+        (AbsenceType.VACATION, date(2025, 4, 29), date(2025, 4, 29), 1),
+    ]
+    assert ranges[1].total_hundredths == 6400
+    assert ranges[1].days_within(date(2025, 4, 22), date(2025, 4, 30), holidays) == 4
+
+
+def test_hundredths_by_month_splits_ranges():
+    user = uuid.uuid4()
+    days = absence_ranges.workdays(date(2025, 1, 27), date(2025, 2, 4))
+    ranges = absence_ranges.collapse([(user, AbsenceType.SICK, d, 750) for d in days])
+    assert len(ranges) == 1
+    assert absence_ranges.hundredths_by_month(ranges) == {(2025, 1): 5 * 750, (2025, 2): 2 * 750}
+
+
+def test_target_between_matches_day_by_day_sum():
+    rng = random.Random(2025)
+    user = SimpleNamespace(
+        id=uuid.uuid4(), track_hours=True, weekly_hours=40, work_days_per_week=5, use_daily_schedule=False,
+    )
+    changes = [SimpleNamespace(effective_from=date(2025, 3, 12), weekly_hours=30),
+               SimpleNamespace(effective_from=date(2025, 9, 1), weekly_hours=20)]
+    timeline = calculation_service.WeeklyHoursTimeline(user, changes)
+    holidays = {date(2025, 1, 6), date(2025, 4, 21), date(2025, 10, 3)}
+    absent = {d for d in absence_ranges.workdays(date(2025, 1, 1), date(2025, 12, 31), holidays) if rng.random() < 0.2}
+    excluded = absence_ranges.excluded_intervals(((d, d) for d in absent), holidays)
+
+    for daily_schedule in (False, True):
+        user.use_daily_schedule = daily_schedule
+        user.hours_monday, user.hours_tuesday, user.hours_wednesday = 8, 6.5, None
+        user.hours_thursday, user.hours_friday = 4, 7
+        for month in range(1, 13):
+            start = date(2025, month, 1)
+            end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            expected = sum(
+                (calculation_service.get_daily_target_for_date(user, d, timeline.at(d))
+                 for d in _naive_workdays(start, end, holidays) if d not in absent),
+                Decimal("0"),
+            )
+            assert calculation_service.target_between(user, timeline, start, end, excluded) == expected
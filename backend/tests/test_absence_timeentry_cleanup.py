@@ -271,6 +271,22 @@ class TestF2_ClosureDeletesTimeEntries:
             Absence.type == AbsenceType.VACATION,
         ).count() == 1
 
+    def test_closure_clears_clock_snapshot_of_deleted_open_entry(self, db, employee, admin, admin_client):
+        """Ein gelöschter offener Eintrag beendet den gecachten Stempelstatus."""
+        from app.services.clock_status_service import ClockSnapshot, hub
+        entry = _create_time_entry(db, employee, date(2025, 3, 12))
+        entry.end_time = None
+        db.commit()
+        hub.publish(employee.id, ClockSnapshot.from_entry(entry))
+
+        resp = admin_client.post("/api/company-closures/", json={
+            "name": "Brückentag",
+            "start_date": "2025-03-12",
+            "end_date": "2025-03-12",
+        })
+        assert resp.status_code == 201
+        assert hub.get_snapshot(employee.id) == ClockSnapshot()
+
     def test_closure_audit_log(self, db, employee, admin, admin_client):
         """Closure-Löschungen erzeugen Audit-Log mit source=company_closure."""
         entry = _create_time_entry(db, employee, date(2025, 3, 12))
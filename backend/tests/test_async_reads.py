@@ -0,0 +1,144 @@
+"""
+Tests for the opt-in async read path (app.routers.async_reads).
+
+The async endpoints (clock status, absence calendar, own journal) run against
+the SQLite test database through aiosqlite and must return exactly what the
+threaded endpoints return. The dashboard stays threaded.
+"""
+from datetime import date, time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database_async import AsyncBackedSession, get_async_db, to_async_url
+from app.middleware.auth import get_current_user_async
+from app.models import Absence, AbsenceType, TimeEntry
+from app.routers import async_reads
+from app.services.timezone_service import today_local
+from tests.conftest import DEFAULT_TENANT_ID, TEST_DATABASE_URL
+from tests.test_endpoints import (  # noqa: F401 (fixtures)
+    _db_session, tenant, employee_user, admin_user, employee_client,
+)
+
+
+class TestAsyncUrl:
+
+    @pytest.mark.parametrize("url,expected", [
+        ("postgresql://u:p@db:5432/praxiszeit", "postgresql+asyncpg://u:p@db:5432/praxiszeit"),
+        ("postgresql+psycopg2://u:p@db/praxiszeit", "postgresql+asyncpg://u:p@db/praxiszeit"),
+        ("postgres://u:p@db/praxiszeit", "postgresql+asyncpg://u:p@db/praxiszeit"),
+        ("sqlite:///./test.db", "sqlite+aiosqlite:///./test.db"),
+        ("postgresql+asyncpg://u:p@db/praxiszeit", "postgresql+asyncpg://u:p@db/praxiszeit"),
+    ])
+    def test_driver_mapping(self, url, expected):
+        assert to_async_url(url) == expected
+
+
+@pytest.fixture
+def async_client(_db_session, employee_user):
+    app = FastAPI()
+    app.include_router(async_reads.router)
+    async_engine = create_async_engine(to_async_url(TEST_DATABASE_URL), poolclass=NullPool)
+    sessions = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, sync_session_class=AsyncBackedSession,
+        expire_on_commit=False,
+    )
+
+    async def _override_db():
+        async with sessions() as session:
+            yield session
+
+    async def _override_current_user():
+        return employee_user
+
+    app.dependency_overrides[get_async_db] = _override_db
+    app.dependency_overrides[get_current_user_async] = _override_current_user
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def booked_month(_db_session, employee_user):
+    for day in (3, 4, 5):
+        _db_session.add(TimeEntry(
+            user_id=employee_user.id, tenant_id=DEFAULT_TENANT_ID,
+            date=date(2025, 3, day), start_time=time(8, 0), end_time=time(16, 30), break_minutes=30,
+        ))
+    _db_session.commit()
+
+
+@pytest.fixture
+def absent_day(_db_session, employee_user):
+    _db_session.add(Absence(
+        user_id=employee_user.id, tenant_id=DEFAULT_TENANT_ID,
+        date=date(2025, 3, 6), type=AbsenceType.VACATION, hours=8,
+    ))
+    _db_session.commit()
+
+
+class TestAsyncReadEndpoints:
+
+    def test_clock_status_matches_threaded_endpoint(self, booked_month, async_client, employee_client):
+        path = "/api/time-entries/clock-status"
+        sync_resp = employee_client.get(path)
+        async_resp = async_client.get(path)
+        assert sync_resp.status_code == 200
+        assert async_resp.status_code == 200
+        assert async_resp.json() == sync_resp.json() == {
+            "is_clocked_in": False, "current_entry": None, "elapsed_minutes": None,
+        }
+
+    def test_clocked_in_status_matches_threaded_endpoint(self, _db_session, employee_user, async_client, employee_client):
+        _db_session.add(TimeEntry(
+            user_id=employee_user.id, tenant_id=DEFAULT_TENANT_ID,
+            date=today_local(), start_time=time(0, 0), break_minutes=0,
+        ))
+        _db_session.commit()
+        sync_body = employee_client.get("/api/time-entries/clock-status").json()
+        async_body = async_client.get("/api/time-entries/clock-status").json()
+        assert async_body["is_clocked_in"] is True
+        assert async_body["current_entry"] == sync_body["current_entry"]
+        assert abs(async_body["elapsed_minutes"] - sync_body["elapsed_minutes"]) <= 1
+
+    def test_stale_open_entry_is_auto_closed(self, _db_session, employee_user, async_client):
+        entry = TimeEntry(
+            user_id=employee_user.id, tenant_id=DEFAULT_TENANT_ID,
+            date=date(2025, 3, 3), start_time=time(8, 0), break_minutes=0,
+        )
+        _db_session.add(entry)
+        _db_session.commit()
+        assert async_client.get("/api/time-entries/clock-status").json()["is_clocked_in"] is False
+        _db_session.refresh(entry)
+        assert entry.end_time == time(23, 59)
+        assert entry.note == "[auto-closed]"
+
+    @pytest.mark.parametrize("path", [
+        "/api/journal/me?year=2025&month=3",
+        "/api/journal/me?from=2025-01&to=2025-04",
+    ])
+    def test_journal_matches_threaded_endpoint(self, booked_month, absent_day, async_client, employee_client, path):
+        sync_resp = employee_client.get(path)
+        async_resp = async_client.get(path)
+        assert sync_resp.status_code == async_resp.status_code == 200
+        assert async_resp.json() == sync_resp.json()
+        assert async_resp.headers["etag"] == sync_resp.headers["etag"]
+
+        revalidated = async_client.get(path, headers={"If-None-Match": async_resp.headers["etag"]})
+        assert revalidated.status_code == 304
+
+    def test_calendar_matches_threaded_endpoint(self, absent_day, async_client, employee_client):
+        path = "/api/absences/calendar?month=2025-03"
+        sync_resp = employee_client.get(path)
+        async_resp = async_client.get(path)
+        assert sync_resp.status_code == async_resp.status_code == 200
+        assert async_resp.json() == sync_resp.json()
+        assert len(async_resp.json()) == 1
+        assert async_client.get("/api/absences/calendar?month=2025-13").status_code == 400
+
+    def test_dashboard_stays_threaded(self):
+        """Nur Stempelstatus, Kalender und eigenes Journal haben eine async Variante."""
+        paths = {route.path for route in async_reads.router.routes}
+        assert paths == {"/api/time-entries/clock-status", "/api/absences/calendar", "/api/journal/me"}
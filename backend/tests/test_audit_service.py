@@ -0,0 +1,91 @@
+"""
+Tests for the batched audit writer and history (app.services.audit_service).
+"""
+from datetime import date, datetime, time
+
+from app.core.query_metrics import collect_queries
+from app.models import ChangeRequest, ChangeRequestStatus, TimeEntry, TimeEntryAuditLog
+from app.schemas.time_entry_audit_log import AuditLogResponse
+from app.services import audit_service
+from tests.conftest import DEFAULT_TENANT_ID
+
+_OLD = {"date": date(2025, 3, 3), "start_time": time(8, 0), "end_time": time(16, 0), "break_minutes": 30, "note": "Praxis"}
+
+
+def _rows(user, admin, count):
+    return [
+        audit_service.entry_change(
+            None, user.id, admin.id, "delete", old_entry=_OLD, source="company_closure",
+            tenant_id=DEFAULT_TENANT_ID,
+        )
+        for _ in range(count)
+    ]
+
+
+def test_write_uses_one_statement(db, test_user, test_admin):
+    rows = _rows(test_user, test_admin, 25)
+    with collect_queries() as stats:
+        assert audit_service.write(db, rows) == 25
+    assert stats.count == 1
+    db.commit()
+    logs = db.query(TimeEntryAuditLog).filter(TimeEntryAuditLog.source == "company_closure").all()
+    assert len(logs) == 25
+    assert all(log.old_note == "Praxis" and log.changed_fields is None for log in logs)
+
+
+def test_compact_update_stores_changed_fields_and_expands_on_read(db, test_user, test_admin):
+    new = {**_OLD, "end_time": time(17, 0)}
+    row = audit_service.entry_change(
+        None, test_user.id, test_admin.id, "update", old_entry=_OLD, new_entry=new,
+        tenant_id=DEFAULT_TENANT_ID, compact=True,
+    )
+    assert row["changed_fields"] == "end_time"
+    assert row["new_note"] is None and row["new_date"] is None
+
+    audit_service.write(db, [row])
+    db.commit()
+    log = db.query(TimeEntryAuditLog).filter(TimeEntryAuditLog.id == row["id"]).one()
+    response = AuditLogResponse.model_validate(log)
+    assert response.changed_fields == ["end_time"]
+    assert (response.new_date, response.new_end_time, response.new_note) == (_OLD["date"], time(17, 0), "Praxis")
+
+
+def test_history_pages_with_cursor(db, test_user, test_admin):
+    # Rows of one multi-row insert share created_at; the id breaks ties
+    rows = _rows(test_user, test_admin, 5)
+    for i, row in enumerate(rows):
+        row["created_at"] = datetime(2025, 3, 3, 12, 0, i // 2)
+    audit_service.write(db, rows)
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = audit_service.history(db, user_id=test_user.id, limit=2, cursor=cursor)
+        seen.extend(log.id for log in page)
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 5
+
+
+def test_deleting_an_entry_nulls_its_references(db, test_user, test_admin, monkeypatch):
+    # Without the FKs (partitioned time_entries) the flush hook emulates ON DELETE SET NULL
+    monkeypatch.setattr(audit_service, "_references_unconstrained", lambda session: True)
+    entry = TimeEntry(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, **{k: _OLD[k] for k in ("date", "start_time", "end_time", "break_minutes")})
+    db.add(entry)
+    db.flush()
+    cr = ChangeRequest(
+        user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, request_type="delete",
+        status=ChangeRequestStatus.PENDING, reason="Test", time_entry_id=entry.id,
+    )
+    db.add(cr)
+    row = audit_service.entry_change(
+        entry.id, test_user.id, test_admin.id, "delete", old_entry=entry, tenant_id=DEFAULT_TENANT_ID,
+    )
+    audit_service.write(db, [row])
+    db.commit()
+
+    db.delete(entry)
+    db.commit()
+    db.expire_all()
+    assert db.query(TimeEntryAuditLog).filter(TimeEntryAuditLog.id == row["id"]).one().time_entry_id is None
+    assert db.query(ChangeRequest).filter(ChangeRequest.id == cr.id).one().time_entry_id is None
@@ -0,0 +1,72 @@
+"""
+Tests for the synthetic benchmark data generator and the benchmark harness.
+"""
+import json
+from datetime import date
+
+from app.models import Absence, TimeEntry, User, UserRole, YearCarryover
+from app.services import auth_service, calculation_service
+from benchmarks import harness
+from benchmarks.datagen import BENCH_PASSWORD, GeneratorConfig, generate
+
+
+class TestGenerator:
+
+    def test_generates_requested_shape(self, db):
+        cfg = GeneratorConfig(tenants=2, employees=3, years=2, last_year=2025)
+        data = generate(db, cfg)
+
+        assert len(data.tenant_ids) == 2
+        assert all(len(ids) == 3 for ids in data.employee_ids.values())
+        assert db.query(User).filter(User.role == UserRole.EMPLOYEE).count() == 6
+        assert db.query(User).filter(User.role == UserRole.ADMIN).count() == 2
+        # Carryovers for every year after the first one
+        assert db.query(YearCarryover).count() == 6
+        assert data.row_counts["time_entries"] == db.query(TimeEntry).count()
+        assert data.row_counts["absences"] == db.query(Absence).count()
+
+    def test_entries_skip_weekends_and_absence_days(self, db):
+        generate(db, GeneratorConfig(tenants=1, employees=2, years=1, last_year=2025))
+        assert all(d.weekday() < 5 for (d,) in db.query(TimeEntry.date))
+        absent = {(a.user_id, a.date) for a in db.query(Absence)}
+        assert not any((e.user_id, e.date) in absent for e in db.query(TimeEntry))
+
+    def test_until_cuts_off_bookings(self, db):
+        generate(db, GeneratorConfig(tenants=1, employees=1, years=1, last_year=2025), until=date(2025, 3, 31))
+        assert max(d for (d,) in db.query(TimeEntry.date)) <= date(2025, 3, 31)
+
+    def test_seed_determines_tenant_ids(self, db):
+        first = generate(db, GeneratorConfig(tenants=1, employees=2, years=1, last_year=2025, seed=7))
+        db.query(TimeEntry).delete()
+        db.query(Absence).delete()
+        db.commit()
+        # Different seed → different tenant ids, so both runs can share the database
+        other = generate(db, GeneratorConfig(tenants=1, employees=2, years=1, last_year=2025, seed=8))
+        assert first.tenant_ids != other.tenant_ids
+        assert first.row_counts["users"] == other.row_counts["users"]
+
+    def test_generated_users_work_with_services(self, db):
+        data = generate(db, GeneratorConfig(tenants=1, employees=1, years=1, last_year=2025))
+        user = db.query(User).filter(User.id == data.employee_ids[data.tenant_ids[0]][0]).one()
+
+        assert auth_service.verify_password(BENCH_PASSWORD, user.password_hash)
+        actual = calculation_service.get_monthly_actual(db, user, 2025, 3)
+        assert actual > 0
+
+
+class TestHarness:
+
+    def test_run_save_and_compare(self, tmp_path):
+        suite = harness.Suite("unit", dialect="none")
+        result = suite.run("noop", lambda: None, rounds=3, queries=0)
+        assert result["stats"]["rounds"] == 3
+        assert result["queries"] == 0
+
+        path = suite.save(tmp_path / "unit.json")
+        baseline = harness.load(path)
+        assert baseline["machine_info"]["dialect"] == "none"
+
+        slower = json.loads(json.dumps(baseline))
+        slower["benchmarks"][0]["stats"]["median"] = baseline["benchmarks"][0]["stats"]["median"] * 2 + 1
+        assert harness.compare(baseline, slower) == ["noop"]
+        assert harness.compare(baseline, baseline) == []
@@ -0,0 +1,150 @@
+"""Tests für clock_status_service (Push-Kanal für den Stempelstatus)."""
+import asyncio
+import os
+import uuid
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+from app.services import clock_status_service
+from app.services.clock_status_service import ClockSnapshot, ClockStatusHub, ClockStatusRelay, format_sse
+from app.services.timezone_service import LOCAL_TZ
+
+
+def _entry(d=date(2026, 3, 2), start=time(8, 0)):
+    return SimpleNamespace(id=uuid.uuid4(), date=d, start_time=start, note="Frühdienst")
+
+
+def test_payload_for_open_entry():
+    entry = _entry()
+    now = datetime(2026, 3, 2, 9, 30, tzinfo=LOCAL_TZ)
+    payload = ClockSnapshot.from_entry(entry).to_payload(now)
+
+    assert payload["is_clocked_in"] is True
+    assert payload["elapsed_minutes"] == 90
+    assert payload["current_entry"]["id"] == str(entry.id)
+    assert payload["current_entry"]["start_time"] == "08:00:00"
+
+
+def test_payload_without_entry_or_from_previous_day():
+    now = datetime(2026, 3, 2, 9, 30, tzinfo=LOCAL_TZ)
+    assert ClockSnapshot().to_payload(now)["is_clocked_in"] is False
+
+    stale = ClockSnapshot.from_entry(_entry(d=date(2026, 3, 1)))
+    assert stale.to_payload(now) == {"is_clocked_in": False, "current_entry": None, "elapsed_minutes": None}
+
+
+def test_format_sse():
+    text = format_sse(ClockSnapshot())
+    assert text.startswith("event: clock-status\ndata: {")
+    assert text.endswith("\n\n")
+
+
+def test_publish_wakes_subscribers_of_same_user_only():
+    hub = ClockStatusHub()
+    user_a, user_b = uuid.uuid4(), uuid.uuid4()
+
+    async def scenario():
+        queue_a = hub.subscribe(user_a)
+        queue_b = hub.subscribe(user_b)
+        snapshot = ClockSnapshot.from_entry(_entry())
+        hub.publish(user_a, snapshot)
+        received = await asyncio.wait_for(queue_a.get(), timeout=1)
+        await asyncio.sleep(0)
+        return received, queue_b.empty()
+
+    received, b_empty = asyncio.run(scenario())
+    assert received.entry_id is not None
+    assert b_empty
+
+
+def test_unchanged_state_is_not_rebroadcast():
+    hub = ClockStatusHub()
+    user = uuid.uuid4()
+
+    async def scenario():
+        queue = hub.subscribe(user)
+        hub.publish(user, ClockSnapshot())
+        hub.publish(user, ClockSnapshot())
+        await asyncio.sleep(0)
+        return queue.qsize()
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_unsubscribe_removes_subscriber():
+    hub = ClockStatusHub()
+    user = uuid.uuid4()
+
+    async def scenario():
+        queue = hub.subscribe(user)
+        assert hub.subscriber_count(user) == 1
+        hub.unsubscribe(user, queue)
+
+    asyncio.run(scenario())
+    assert hub.subscriber_count(user) == 0
+    hub.publish(user, ClockSnapshot())  # no subscribers: must not fail
+    assert hub.get_snapshot(user) == ClockSnapshot()
+
+
+def test_snapshots_expire_and_can_be_forgotten(monkeypatch):
+    hub = ClockStatusHub()
+    user, other = uuid.uuid4(), uuid.uuid4()
+    hub.publish(user, ClockSnapshot.from_entry(_entry()))
+    hub.publish(other, ClockSnapshot())
+
+    hub.forget([other])
+    assert hub.get_snapshot(other) is None
+
+    now = clock_status_service.timer.monotonic()
+    monkeypatch.setattr(clock_status_service.timer, "monotonic",
+                        lambda: now + clock_status_service.SNAPSHOT_TTL_SECONDS + 1)
+    assert hub.get_snapshot(user) is None  # stale: the caller reads the DB again
+
+
+def test_relay_applies_changes_from_other_workers_only():
+    user = uuid.uuid4()
+    entry = _entry()
+    loaded = []
+
+    def load_open_entry(user_id):
+        loaded.append(user_id)
+        return entry
+
+    relay = ClockStatusRelay(engine=None, load_open_entry=load_open_entry)
+    relay.handle(f"{os.getpid()}:{user}")
+    assert loaded == []
+
+    relay.handle(f"{os.getpid() + 1}:{user}")
+    assert loaded == [user]
+    assert clock_status_service.hub.get_snapshot(user) == ClockSnapshot.from_entry(entry)
+
+
+def test_relay_resync_reloads_subscribed_users_and_drops_the_rest(monkeypatch):
+    hub = ClockStatusHub()
+    monkeypatch.setattr(clock_status_service, "hub", hub)
+    watched, idle = uuid.uuid4(), uuid.uuid4()
+    hub.publish(watched, ClockSnapshot.from_entry(_entry()))
+    hub.publish(idle, ClockSnapshot.from_entry(_entry()))
+
+    async def scenario():
+        queue = hub.subscribe(watched)
+        relay.resync()  # clock-out on another worker was missed while disconnected
+        return await asyncio.wait_for(queue.get(), timeout=1)
+
+    relay = ClockStatusRelay(engine=None, load_open_entry=lambda user_id: None)
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot == ClockSnapshot()
+    assert hub.get_snapshot(watched) == ClockSnapshot()
+    assert hub.get_snapshot(idle) is None  # next stream connect reads the DB
+
+
+def test_publish_entry_notifies_relay_on_change_only(monkeypatch):
+    user = uuid.uuid4()
+    notified = []
+    relay = SimpleNamespace(notify=notified.append)
+    monkeypatch.setattr(clock_status_service, "_relay", relay)
+
+    clock_status_service.publish_entry(user, None)
+    clock_status_service.publish_entry(user, None)
+    assert notified == [user]
@@ -0,0 +1,60 @@
+"""
+Tests for the streamed DSGVO export (app.services.data_export_service).
+"""
+import io
+import json
+import zipfile
+from datetime import date, time
+
+from app.models import TimeEntry
+from app.services import audit_service, data_export_service
+from tests.conftest import DEFAULT_TENANT_ID
+
+
+def _entries(db, user, count=5):
+    for day in range(1, count + 1):
+        db.add(TimeEntry(user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=date(2025, 4, day),
+                         start_time=time(8, 0), end_time=None if day == 1 else time(12, 0), break_minutes=0))
+    db.commit()
+
+
+def test_json_is_independent_of_batch_size(db, test_user):
+    _entries(db, test_user)
+    documents = [
+        json.loads(b"".join(data_export_service.stream_export(db, test_user, "json", batch_size=size)))
+        for size in (1, 2, 1000)
+    ]
+    for doc in documents:
+        doc["export_info"].pop("exported_at")
+    assert documents[0] == documents[1] == documents[2]
+    assert len(documents[0]["zeiteintraege"]) == 5
+    assert documents[0]["zeiteintraege"][0]["end_time"] is None
+
+
+def test_small_batches_stream_in_several_chunks(db, test_user):
+    _entries(db, test_user)
+    chunks = list(data_export_service.stream_export(db, test_user, "ndjson", batch_size=2))
+    assert len(chunks) == 1 + 3  # header + 5 entries in batches of two
+    assert all(chunks)
+
+
+def test_csv_zip_with_small_batches_is_valid(db, test_user):
+    _entries(db, test_user)
+    content = b"".join(data_export_service.stream_export(db, test_user, "csv", batch_size=2))
+    archive = zipfile.ZipFile(io.BytesIO(content))
+    assert archive.testzip() is None
+    assert archive.read("zeiteintraege.csv").decode().count("\n") == 6
+    assert {f"{s.name}.csv" for s in data_export_service.SECTIONS} < set(archive.namelist())
+
+
+def test_compact_audit_rows_are_exported_expanded(db, test_user, test_admin):
+    old = {"date": date(2025, 4, 1), "start_time": time(8, 0), "end_time": time(12, 0), "break_minutes": 0, "note": "Praxis"}
+    audit_service.write(db, [audit_service.entry_change(
+        None, test_user.id, test_admin.id, "update", old_entry=old, new_entry={**old, "end_time": time(13, 0)},
+        tenant_id=DEFAULT_TENANT_ID, compact=True,
+    )])
+    db.commit()
+    doc = json.loads(b"".join(data_export_service.stream_export(db, test_user, "json")))
+    (row,) = doc["aenderungsprotokoll"]
+    assert row["changed_fields"] == "end_time"
+    assert (row["new_date"], row["new_end_time"], row["new_note"]) == ("2025-04-01", "13:00:00", "Praxis")
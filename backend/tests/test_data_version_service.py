@@ -0,0 +1,133 @@
+"""Tests für data_version_service (Versionszähler für Cache-Invalidierung)."""
+from datetime import date, time
+
+from app.models import TimeEntry, Absence, AbsenceType, PublicHoliday, WorkingHoursChange, YearCarryover
+from app.services import data_version_service
+from tests.conftest import DEFAULT_TENANT_ID
+
+
+def _versions(db, user, start=date(2026, 1, 1), end=date(2026, 3, 31)):
+    return data_version_service.get_month_versions(db, DEFAULT_TENANT_ID, user.id, start, end)
+
+
+def _add_entry(db, user, d):
+    entry = TimeEntry(
+        user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=d,
+        start_time=time(8, 0), end_time=time(12, 0), break_minutes=0,
+    )
+    db.add(entry)
+    db.commit()
+    return entry
+
+
+def test_time_entry_bumps_only_its_month(db, test_user):
+    before = _versions(db, test_user)
+    _add_entry(db, test_user, date(2026, 2, 10))
+    after = _versions(db, test_user)
+
+    assert after[(2026, 2)] > before[(2026, 2)]
+    assert after[(2026, 1)] == before[(2026, 1)]
+    assert after[(2026, 3)] == before[(2026, 3)]
+
+
+def test_moving_entry_bumps_old_and_new_month(db, test_user):
+    entry = _add_entry(db, test_user, date(2026, 1, 15))
+    before = _versions(db, test_user)
+
+    entry.date = date(2026, 3, 2)
+    db.commit()
+    after = _versions(db, test_user)
+
+    assert after[(2026, 1)] > before[(2026, 1)]
+    assert after[(2026, 3)] > before[(2026, 3)]
+    assert after[(2026, 2)] == before[(2026, 2)]
+
+
+def test_delete_bumps_month(db, test_user):
+    entry = _add_entry(db, test_user, date(2026, 2, 10))
+    before = _versions(db, test_user)
+    db.delete(entry)
+    db.commit()
+    assert _versions(db, test_user)[(2026, 2)] > before[(2026, 2)]
+
+
+def test_absence_bumps_month(db, test_user):
+    before = _versions(db, test_user)
+    db.add(Absence(
+        user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, date=date(2026, 3, 4),
+        type=AbsenceType.VACATION, hours=8,
+    ))
+    db.commit()
+    after = _versions(db, test_user)
+    assert after[(2026, 3)] > before[(2026, 3)]
+    assert after[(2026, 2)] == before[(2026, 2)]
+
+
+def test_public_holiday_bumps_all_users_of_tenant(db, test_user, test_admin):
+    before_user = _versions(db, test_user)
+    before_admin = _versions(db, test_admin)
+    db.add(PublicHoliday(date=date(2026, 1, 6), name="Heilige Drei Könige", year=2026, tenant_id=DEFAULT_TENANT_ID))
+    db.commit()
+
+    assert _versions(db, test_user)[(2026, 1)] > before_user[(2026, 1)]
+    assert _versions(db, test_admin)[(2026, 1)] > before_admin[(2026, 1)]
+
+
+def test_working_hours_change_bumps_every_month(db, test_user):
+    before = _versions(db, test_user)
+    db.add(WorkingHoursChange(
+        user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, weekly_hours=20, effective_from=date(2026, 2, 1),
+    ))
+    db.commit()
+    after = _versions(db, test_user)
+    assert all(after[k] > before[k] for k in before)
+
+
+def test_carryover_bumps_every_month(db, test_user):
+    before = _versions(db, test_user)
+    db.add(YearCarryover(
+        user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, year=2026, overtime_hours=5, vacation_days=2,
+    ))
+    db.commit()
+    after = _versions(db, test_user)
+    assert all(after[k] > before[k] for k in before)
+
+
+def test_user_tracked_column_bumps_but_untracked_does_not(db, test_user):
+    before = _versions(db, test_user)
+    test_user.totp_enabled = True  # irrelevant for calculations
+    db.commit()
+    assert _versions(db, test_user) == before
+
+    test_user.weekly_hours = 30
+    db.commit()
+    after = _versions(db, test_user)
+    assert all(after[k] > before[k] for k in before)
+
+
+def test_other_user_changes_do_not_affect_versions(db, test_user, test_admin):
+    before = _versions(db, test_user)
+    _add_entry(db, test_admin, date(2026, 2, 10))
+    assert _versions(db, test_user) == before
+
+
+def test_range_stamp_changes_on_write(db, test_user):
+    start, end = date(2026, 2, 1), date(2026, 2, 28)
+    stamp_before = data_version_service.get_range_stamp(db, DEFAULT_TENANT_ID, test_user.id, start, end)
+
+    _add_entry(db, test_user, date(2026, 2, 10))
+    stamp_after = data_version_service.get_range_stamp(db, DEFAULT_TENANT_ID, test_user.id, start, end)
+    assert stamp_after.version > stamp_before.version
+    assert stamp_after.updated_at is not None
+
+    # Changes outside the range leave the stamp untouched
+    _add_entry(db, test_user, date(2026, 5, 4))
+    assert data_version_service.get_range_stamp(db, DEFAULT_TENANT_ID, test_user.id, start, end) == stamp_after
+
+
+def test_bump_tenant_for_bulk_operations(db, test_user):
+    before = _versions(db, test_user)
+    data_version_service.bump_tenant(db, DEFAULT_TENANT_ID)
+    db.commit()
+    after = _versions(db, test_user)
+    assert all(after[k] > before[k] for k in before)
@@ -0,0 +1,149 @@
+"""
+Tests für das Lese-Routing auf ein Replikat (app.database_read).
+
+Primär- und Replikat-Datenbank sind zwei getrennte SQLite-Dateien; wie in
+test_tenant_context wird set_config als SQLite-Funktion registriert. Gegen zwei
+lokale PostgreSQL-Instanzen funktioniert dasselbe über DATABASE_URL und
+DATABASE_URL_READONLY.
+"""
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app import database_read
+from app.database import SessionLocal, _restore_tenant_context, reporting_engine, set_tenant_context
+from app.models.data_version import DataVersion
+from app.services import data_version_service
+from app.services.timezone_service import today_local
+
+TENANT_ID = uuid.uuid4()
+
+
+def _request(query: str = "") -> Request:
+    return Request({"type": "http", "query_string": query.encode(), "headers": []})
+
+
+def _factory(path):
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _register(dbapi_conn, _record):
+        dbapi_conn.create_function("set_config", 3, lambda name, value, is_local: value)
+
+    DataVersion.__table__.create(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    event.listen(factory, "after_begin", _restore_tenant_context)
+    return engine, factory
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    primary_engine, primary_factory = _factory(tmp_path / "primary.db")
+    replica_engine, replica_factory = _factory(tmp_path / "replica.db")
+    monkeypatch.setattr(database_read, "get_read_sessionmaker", lambda: replica_factory)
+    primary = primary_factory()
+    set_tenant_context(primary, TENANT_ID)
+    yield primary, replica_factory
+    primary.close()
+    primary_engine.dispose()
+    replica_engine.dispose()
+
+
+def _route(primary, query: str, dependency=database_read.get_read_db):
+    """Session the dependency hands out for a request, plus its generator."""
+    gen = dependency(_request(query), db=primary, current_user=SimpleNamespace(tenant_id=TENANT_ID))
+    return next(gen), gen
+
+
+def test_latest_month_from_query_parameters():
+    today = date(2026, 10, 19)
+    assert database_read.latest_month(_request(""), today) == (2026, 10)
+    assert database_read.latest_month(_request("month=2025-06"), today) == (2025, 6)
+    assert database_read.latest_month(_request("year=2025&month=3"), today) == (2025, 3)
+    assert database_read.latest_month(_request("year=2025"), today) == (2025, 12)
+    assert database_read.latest_month(_request("from=2024-01&to=2024-12"), today) == (2024, 12)
+    assert database_read.latest_month(_request("month=kaputt"), today) == (2026, 10)
+
+
+def test_without_replica_reports_use_the_reporting_pool(monkeypatch):
+    monkeypatch.setattr(database_read, "get_read_sessionmaker", lambda: None)
+    primary = SessionLocal()
+    primary._tenant_id = str(TENANT_ID)  # as left by authentication (no query here: SQLite lacks set_config)
+    session, gen = _route(primary, "year=2020", database_read.get_report_db)
+    assert session.info["workload"] == "reporting"
+    assert session.get_bind() is reporting_engine
+    assert session._tenant_id == str(TENANT_ID)
+    gen.close()
+    primary.close()
+
+    override = SimpleNamespace(info={})  # e.g. a test session from dependency_overrides
+    session, gen = _route(override, "year=2020", database_read.get_report_db)
+    assert session is override
+    gen.close()
+
+
+def test_without_replica_journal_and_dashboard_keep_the_request_session(monkeypatch):
+    """Interaktive Leseseiten belegen keine Verbindung des Reporting-Pools."""
+    monkeypatch.setattr(database_read, "get_read_sessionmaker", lambda: None)
+    primary = SessionLocal()
+    session, gen = _route(primary, "")
+    assert session is primary
+    assert session.info["workload"] == "interactive"
+    gen.close()
+    primary.close()
+
+
+def test_reporting_db_uses_the_reporting_pool_even_with_a_replica(databases):
+    """Der DSGVO-Export liest immer von der Primärdatenbank, aber nicht aus dem interaktiven Pool."""
+    primary = SessionLocal()
+    primary._tenant_id = str(TENANT_ID)
+    gen = database_read.get_reporting_db(db=primary, current_user=SimpleNamespace(tenant_id=TENANT_ID))
+    session = next(gen)
+    assert session.info["workload"] == "reporting"
+    assert session.get_bind() is reporting_engine
+    assert session._tenant_id == str(TENANT_ID)
+    gen.close()
+    assert session._tenant_id is None
+    primary.close()
+
+
+def test_closed_months_are_read_from_the_replica_with_the_tenant_context(databases):
+    primary, _ = databases
+    session, gen = _route(primary, "year=2020")
+    assert session is not primary
+    assert session._tenant_id == str(TENANT_ID)
+    gen.close()
+    assert session._tenant_id is None
+
+
+def test_current_month_needs_the_primarys_data_version(databases):
+    primary, replica_factory = databases
+    today = today_local()
+    data_version_service.bump_tenant(primary, TENANT_ID, [today])
+    primary.commit()
+
+    session, gen = _route(primary, "")
+    assert session is primary  # replica has not seen the write yet
+    gen.close()
+
+    replica = replica_factory()
+    data_version_service.bump_tenant(replica, TENANT_ID, [today])
+    replica.commit()
+    replica.close()
+
+    session, gen = _route(primary, f"year={today.year}&month={today.month}")
+    assert session is not primary
+    gen.close()
+
+
+def test_lagging_replica_falls_back_to_primary(databases, monkeypatch):
+    primary, _ = databases
+    monkeypatch.setattr(database_read, "replica_lag_seconds", lambda db: 3600.0)
+    session, gen = _route(primary, "year=2020")
+    assert session is primary
+    gen.close()
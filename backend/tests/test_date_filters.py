@@ -0,0 +1,26 @@
+"""
+Tests for the sargable year/month predicates (app.core.date_filters).
+"""
+from datetime import date, time
+
+from app.core.date_filters import month_filter, year_filter
+from app.models import TimeEntry
+from tests.conftest import DEFAULT_TENANT_ID
+
+
+def _dates(db, *conditions):
+    return sorted(d for (d,) in db.query(TimeEntry.date).filter(*conditions))
+
+
+def test_year_and_month_boundaries(db, test_user):
+    days = [date(2024, 12, 31), date(2025, 1, 1), date(2025, 11, 30), date(2025, 12, 1),
+            date(2025, 12, 31), date(2026, 1, 1)]
+    for day in days:
+        db.add(TimeEntry(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, date=day,
+                         start_time=time(8, 0), end_time=time(12, 0), break_minutes=0))
+    db.commit()
+
+    assert _dates(db, year_filter(TimeEntry.date, 2025)) == days[1:5]
+    assert _dates(db, month_filter(TimeEntry.date, 2025, 12)) == [date(2025, 12, 1), date(2025, 12, 31)]
+    assert _dates(db, month_filter(TimeEntry.date, 2025, 1)) == [date(2025, 1, 1)]
+    assert _dates(db, month_filter(TimeEntry.date, 2025, 11)) == [date(2025, 11, 30)]
@@ -9,7 +9,7 @@ behavior: status codes, response shapes, and auth checks.
 
 import uuid
 import pytest
-from datetime import date, time, datetime, timezone
+from datetime import date, time, datetime, timedelta, timezone
 from unittest.mock import patch, MagicMock
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -18,7 +18,10 @@ from sqlalchemy.orm import Session
 
 from app.database import Base, get_db
 from app.middleware.auth import get_current_user, require_admin
-from app.models import User, UserRole, TimeEntry
+from app.models import (
+    User, UserRole, TimeEntry, YearCarryover, ChangeRequest, ChangeRequestType, ChangeRequestStatus, Absence, AbsenceType,
+)
+from app.models.vacation_request import VacationRequest
 from app.models.tenant import Tenant
 from app.services import auth_service
 from tests.conftest import (
@@ -52,6 +55,10 @@ def _create_test_app() -> FastAPI:
 
     app = FastAPI(title="PraxisZeit Test")
 
+    # Fail tests whose endpoint exceeds its declared @query_budget
+    from app.core.query_metrics import QueryStatsMiddleware
+    app.add_middleware(QueryStatsMiddleware, enforce_budgets=True)
+
     # Rate limiter (required by login endpoint) — disabled for tests
     from app.core.limiter import limiter
     from slowapi import _rate_limit_exceeded_handler
@@ -304,6 +311,32 @@ class TestAuthLogin:
 
         assert resp.status_code == 401
 
+    def test_login_locked_after_repeated_failures(self, _db_session, employee_user):
+        """Five wrong passwords lock the account (counter lives in the DB, shared by workers)."""
+        def _override_db():
+            yield _db_session
+
+        test_app.dependency_overrides[get_db] = _override_db
+
+        with patch("app.routers.auth.set_superadmin_context"):
+            with TestClient(test_app) as client:
+                statuses = [
+                    client.post("/api/auth/login", json={
+                        "username": "Employee",
+                        "password": "WrongPassword1!",
+                    }).status_code
+                    for _ in range(5)
+                ]
+                locked = client.post("/api/auth/login", json={
+                    "username": "employee",
+                    "password": "Employee2025!",
+                })
+
+        test_app.dependency_overrides.clear()
+
+        assert statuses == [401] * 5
+        assert locked.status_code == 429
+
     def test_login_nonexistent_user(self, _db_session, tenant):
         """Login with unknown username returns 401."""
         def _override_db():
@@ -354,6 +387,60 @@ class TestAuthMe:
         assert resp.status_code in (401, 403)
 
 
+class TestDataExport:
+    """GET /api/auth/me/export (DSGVO Art. 20, streamed)"""
+
+    def _data(self, db, employee):
+        for day in (3, 4):
+            db.add(TimeEntry(user_id=employee.id, tenant_id=DEFAULT_TENANT_ID, date=date(2025, 3, day),
+                             start_time=time(8, 0), end_time=time(16, 0), break_minutes=30, note="Ärztin"))
+        db.add(ChangeRequest(user_id=employee.id, tenant_id=DEFAULT_TENANT_ID,
+                             request_type=ChangeRequestType.CREATE, proposed_date=date(2025, 3, 5),
+                             reason="Vergessen"))
+        db.add(VacationRequest(user_id=employee.id, tenant_id=DEFAULT_TENANT_ID,
+                               date=date(2025, 8, 4), hours=8, status="pending"))
+        db.commit()
+
+    def test_json_contains_all_sections(self, _db_session, employee_user, employee_client):
+        self._data(_db_session, employee_user)
+        resp = employee_client.get("/api/auth/me/export")
+        assert resp.status_code == 200
+        assert "PraxisZeit_Datenauszug_employee.json" in resp.headers["content-disposition"]
+        data = resp.json()
+        assert data["stammdaten"]["last_name"] == "Mustermann"
+        assert [e["date"] for e in data["zeiteintraege"]] == ["2025-03-03", "2025-03-04"]
+        assert data["zeiteintraege"][0]["note"] == "Ärztin"
+        assert data["aenderungsantraege"][0]["reason"] == "Vergessen"
+        assert data["urlaubsantraege"][0]["hours"] == 8.0
+        assert data["abwesenheiten"] == [] and data["aenderungsprotokoll"] == []
+
+    def test_ndjson_has_one_line_per_record(self, _db_session, employee_user, employee_client):
+        import json
+        self._data(_db_session, employee_user)
+        resp = employee_client.get("/api/auth/me/export", params={"format": "ndjson"})
+        assert resp.status_code == 200
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert lines[0]["export_info"]["user_id"] == str(employee_user.id)
+        assert [line["section"] for line in lines[1:]] == ["zeiteintraege", "zeiteintraege", "urlaubsantraege", "aenderungsantraege"]
+
+    def test_csv_zip_has_one_file_per_section(self, _db_session, employee_user, employee_client):
+        import csv
+        import io
+        import zipfile
+        self._data(_db_session, employee_user)
+        resp = employee_client.get("/api/auth/me/export", params={"format": "csv"})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/zip"
+        archive = zipfile.ZipFile(io.BytesIO(resp.content))
+        assert "stammdaten.csv" in archive.namelist()
+        rows = list(csv.reader(io.StringIO(archive.read("zeiteintraege.csv").decode()), delimiter=";"))
+        assert rows[0][:3] == ["date", "start_time", "end_time"]
+        assert len(rows) == 3
+
+    def test_unknown_format_is_rejected(self, employee_client):
+        assert employee_client.get("/api/auth/me/export", params={"format": "xml"}).status_code == 422
+
+
 class TestAuthLogout:
     """POST /api/auth/logout"""
 
@@ -435,6 +522,22 @@ class TestTimeEntryCreate:
         })
         assert resp.status_code == 422
 
+    def test_duplicate_start_time_rejected(self, employee_client):
+        """Second entry with the same start time on the same day returns 400."""
+        body = {"date": date.today().isoformat(), "start_time": "08:00", "end_time": "10:00", "break_minutes": 0}
+        assert employee_client.post("/api/time-entries/", json=body).status_code == 201
+        assert employee_client.post("/api/time-entries/", json=body).status_code == 400
+
+    def test_update_does_not_count_entry_twice(self, employee_client):
+        """Updating a 5h entry must not report it as 10h (DAILY_HOURS_WARNING)."""
+        today = date.today().isoformat()
+        created = employee_client.post("/api/time-entries/", json={
+            "date": today, "start_time": "08:00", "end_time": "12:00", "break_minutes": 0,
+        }).json()
+        resp = employee_client.put(f"/api/time-entries/{created['id']}", json={"end_time": "13:00"})
+        assert resp.status_code == 200
+        assert "DAILY_HOURS_WARNING" not in resp.json()["warnings"]
+
 
 class TestTimeEntryDelete:
     """DELETE /api/time-entries/{entry_id}"""
@@ -504,6 +607,94 @@ class TestAdminUsers:
         assert resp.status_code == 403
 
 
+class TestAdminDeletion:
+    """DSGVO Art. 17: deletion candidates, anonymize, purge (retention_service)"""
+
+    def _deactivate(self, db, user, last_entry=None, days_ago=30):
+        user.is_active = False
+        user.deactivated_at = datetime.now(timezone.utc) - timedelta(days=days_ago)
+        if last_entry:
+            db.add(TimeEntry(user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=last_entry,
+                             start_time=time(8, 0), end_time=time(12, 0), break_minutes=0))
+        db.commit()
+
+    def test_deletion_candidates(self, _db_session, employee_user, admin_client):
+        self._deactivate(_db_session, employee_user, last_entry=date.today() - timedelta(days=10))
+        (candidate,) = admin_client.get("/api/admin/users/deletion-candidates").json()
+        assert candidate["username"] == "employee"
+        assert candidate["days_since_last_entry"] == 10
+        assert candidate["can_anonymize"] and not candidate["can_purge"]
+
+    def test_anonymize_respects_grace_period(self, _db_session, employee_user, admin_client):
+        self._deactivate(_db_session, employee_user, days_ago=2)
+        resp = admin_client.post(f"/api/admin/users/{employee_user.id}/anonymize")
+        assert resp.status_code == 400
+        assert "Sperrfrist läuft noch 12 Tag(e)" in resp.json()["detail"]
+
+    def test_purge_requires_expired_retention(self, _db_session, employee_user, admin_client):
+        self._deactivate(_db_session, employee_user, last_entry=date.today() - timedelta(days=10))
+        assert admin_client.delete(f"/api/admin/users/{employee_user.id}/purge").status_code == 409
+
+    def test_purge_deletes_user(self, _db_session, employee_user, admin_client):
+        self._deactivate(_db_session, employee_user, last_entry=date.today() - timedelta(days=800))
+        user_id = employee_user.id
+        assert admin_client.delete(f"/api/admin/users/{user_id}/purge").status_code == 200
+        assert _db_session.query(User).filter(User.id == user_id).count() == 0
+
+
+class TestRequestListings:
+    """Employee request lists: batched name resolution + keyset pagination."""
+
+    def _requests(self, db, employee, reviewer, count=5):
+        for i in range(count):
+            db.add(ChangeRequest(
+                user_id=employee.id, tenant_id=DEFAULT_TENANT_ID,
+                request_type=ChangeRequestType.CREATE, status=ChangeRequestStatus.REJECTED,
+                proposed_date=date(2025, 3, i + 1), reason=f"Grund {i}",
+                reviewed_by=reviewer.id, created_at=datetime(2025, 3, 10, 8, i, tzinfo=timezone.utc),
+            ))
+            db.add(VacationRequest(
+                user_id=employee.id, tenant_id=DEFAULT_TENANT_ID,
+                date=date(2025, 12, 29), end_date=date(2026, 1, 2), hours=8,
+                status="approved", reviewed_by=reviewer.id,
+                created_at=datetime(2025, 3, 10, 8, 30, tzinfo=timezone.utc),  # same timestamp: id breaks ties
+            ))
+        db.commit()
+
+    def _pages(self, client, url):
+        items, pages, cursor = [], 0, None
+        while True:
+            resp = client.get(url, params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+            assert resp.status_code == 200
+            items += resp.json()
+            pages += 1
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                return items, pages
+
+    @pytest.mark.parametrize("url", ["/api/change-requests/", "/api/vacation-requests/"])
+    def test_keyset_pages_cover_all_rows_once(self, _db_session, employee_user, admin_user, employee_client, url):
+        self._requests(_db_session, employee_user, admin_user)
+
+        items, pages = self._pages(employee_client, url)
+        full = employee_client.get(url).json()
+
+        assert pages == 3
+        assert [i["id"] for i in items] == [i["id"] for i in full]
+        assert len({i["id"] for i in items}) == 5
+        assert all(i["user_last_name"] == "Mustermann" for i in items)
+        assert all(i["reviewer_first_name"] == admin_user.first_name for i in items)
+
+    def test_vacation_request_days_use_preloaded_holidays(self, _db_session, employee_user, admin_user, employee_client):
+        self._requests(_db_session, employee_user, admin_user, count=1)
+        (item,) = employee_client.get("/api/vacation-requests/").json()
+        assert item["days"] == 5  # Mon 29.12. – Fri 2.1., no holidays seeded
+
+    def test_invalid_cursor_is_rejected(self, employee_client):
+        resp = employee_client.get("/api/change-requests/", params={"limit": 2, "cursor": "kaputt"})
+        assert resp.status_code == 400
+
+
 class TestAdminYearClosing:
     """POST / DELETE /api/admin/year-closing/{year}"""
 
@@ -519,6 +710,16 @@ class TestAdminYearClosing:
         assert data["next_year"] == 2026
         assert "employees" in data
 
+    def test_year_closing_dry_run(self, _db_session, admin_user, admin_client):
+        """dry_run=true previews the closing without storing carryovers."""
+        resp = admin_client.post("/api/admin/year-closing/2025?dry_run=true")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["dry_run"] is True
+        assert data["created"] == len(data["employees"])
+        assert "total" in data["timings_ms"]
+        assert _db_session.query(YearCarryover).filter(YearCarryover.year == 2026).count() == 0
+
     def test_delete_year_closing_no_data(self, admin_client):
         """Delete year closing with no carryover data returns 404."""
         resp = admin_client.delete("/api/admin/year-closing/2024")
@@ -601,6 +802,49 @@ class TestClockEndpoints:
         })
         assert resp.status_code == 400
 
+    def test_clock_status_stream_sends_current_state(self, employee_client, monkeypatch):
+        """SSE stream starts with the current snapshot and ends after its max lifetime."""
+        from app.routers import time_entries
+        monkeypatch.setattr(time_entries, "CLOCK_STREAM_MAX_SECONDS", 0.2)
+        monkeypatch.setattr(time_entries, "CLOCK_STREAM_KEEPALIVE_SECONDS", 0.05)
+
+        employee_client.post("/api/time-entries/clock-in", json={})
+        resp = employee_client.get("/api/time-entries/clock-status/stream")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        assert resp.headers["x-accel-buffering"] == "no"
+
+        first_event = resp.text.split("\n\n")[0]
+        assert first_event.startswith("event: clock-status")
+        assert '"is_clocked_in": true' in first_event
+        assert ": keepalive" in resp.text
+
+    def test_clock_out_publishes_to_hub(self, employee_client, employee_user):
+        """clock-out updates the cached snapshot served to new stream subscribers."""
+        from app.services.clock_status_service import hub
+        employee_client.post("/api/time-entries/clock-in", json={})
+        assert hub.get_snapshot(employee_user.id).entry_id is not None
+
+        employee_client.post("/api/time-entries/clock-out", json={"break_minutes": 0})
+        assert hub.get_snapshot(employee_user.id).entry_id is None
+
+    def test_approved_delete_request_clears_clock_snapshot(self, _db_session, employee_user, admin_client):
+        """Ein genehmigter Löschantrag für den offenen Eintrag beendet den gecachten Stempelstatus."""
+        from app.services.clock_status_service import ClockSnapshot, hub
+        entry = TimeEntry(user_id=employee_user.id, tenant_id=DEFAULT_TENANT_ID,
+                          date=date.today(), start_time=time(8, 0), break_minutes=0)
+        _db_session.add(entry)
+        _db_session.flush()
+        cr = ChangeRequest(user_id=employee_user.id, tenant_id=DEFAULT_TENANT_ID,
+                           request_type=ChangeRequestType.DELETE, time_entry_id=entry.id, reason="Falsch gestempelt")
+        _db_session.add(cr)
+        _db_session.commit()
+        hub.publish(employee_user.id, ClockSnapshot.from_entry(entry))
+
+        resp = admin_client.post(f"/api/admin/change-requests/{cr.id}/review", json={"action": "approve"})
+        assert resp.status_code == 200
+        assert hub.get_snapshot(employee_user.id) == ClockSnapshot()
+
 
 # ---------------------------------------------------------------------------
 # Auth: change password
@@ -635,3 +879,149 @@ class TestChangePassword:
             "new_password": "short",
         })
         assert resp.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# Conditional GET (ETag / If-None-Match)
+# ---------------------------------------------------------------------------
+
+
+class TestConditionalGet:
+    """ETag revalidation on dashboard, journal and calendar endpoints."""
+
+    def _add_entry(self, db, user, d):
+        db.add(TimeEntry(
+            user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=d,
+            start_time=time(8, 0), end_time=time(12, 0), break_minutes=0,
+        ))
+        db.commit()
+
+    @pytest.mark.parametrize("url", [
+        "/api/dashboard/?year=2026&month=3",
+        "/api/dashboard/vacation?year=2026",
+        "/api/dashboard/ytd-overtime?year=2026",
+        "/api/journal/me?year=2026&month=3",
+        "/api/journal/me?from=2026-01&to=2026-03",
+        "/api/absences/calendar?month=2026-03",
+        "/api/absences/calendar/ranges?month=2026-03",
+        "/api/absences/team/upcoming",
+    ])
+    def test_unchanged_data_returns_304(self, employee_client, url):
+        first = employee_client.get(url)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+
+        second = employee_client.get(url, headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    def test_write_in_month_invalidates_etag(self, _db_session, employee_user, employee_client):
+        url = "/api/dashboard/?year=2026&month=3"
+        etag = employee_client.get(url).headers["etag"]
+
+        self._add_entry(_db_session, employee_user, date(2026, 3, 10))
+
+        resp = employee_client.get(url, headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+        assert resp.json()["actual_hours"] == pytest.approx(4.0)
+
+    def test_write_in_other_month_keeps_dashboard_etag(self, _db_session, employee_user, employee_client):
+        url = "/api/dashboard/?year=2026&month=3"
+        etag = employee_client.get(url).headers["etag"]
+
+        self._add_entry(_db_session, employee_user, date(2026, 4, 7))
+
+        assert employee_client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    def test_journal_invalidated_by_earlier_month(self, _db_session, employee_user, employee_client):
+        """yearly_overtime depends on all previous months."""
+        url = "/api/journal/me?year=2026&month=3"
+        etag = employee_client.get(url).headers["etag"]
+
+        self._add_entry(_db_session, employee_user, date(2026, 1, 12))
+
+        assert employee_client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_calendar_etag_differs_per_viewer(self, _db_session, employee_user, admin_user, employee_client):
+        """Sick-leave masking depends on the viewer, so the ETag must too."""
+        employee_etag = employee_client.get("/api/absences/calendar?month=2026-03").headers["etag"]
+
+        test_app.dependency_overrides[get_current_user] = lambda: admin_user
+        admin_etag = employee_client.get("/api/absences/calendar?month=2026-03").headers["etag"]
+        assert admin_etag != employee_etag
+
+
+class TestAbsenceCalendar:
+    """GET /api/absences/calendar, /calendar/ranges and /team/upcoming (cached month calendars)."""
+
+    def _add_absence(self, db, user, d, absence_type, hours=8.0):
+        db.add(Absence(user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=d, type=absence_type, hours=hours))
+        db.commit()
+
+    def test_days_ranges_and_sick_masking(self, _db_session, employee_user, admin_user, employee_client):
+        for day in (2, 3, 4, 6):
+            self._add_absence(_db_session, employee_user, date(2026, 3, day), AbsenceType.VACATION)
+        self._add_absence(_db_session, admin_user, date(2026, 3, 3), AbsenceType.SICK)
+
+        days = employee_client.get("/api/absences/calendar?month=2026-03").json()
+        assert [(d["date"], d["user_last_name"], d["type"]) for d in days][:3] == [
+            ("2026-03-02", "Mustermann", "vacation"),
+            ("2026-03-03", "Mustermann", "vacation"),
+            ("2026-03-03", admin_user.last_name, "absent"),
+        ]
+        assert len(days) == 5
+
+        ranges = employee_client.get("/api/absences/calendar/ranges?month=2026-03").json()
+        assert [(r["start_date"], r["end_date"], r["type"]) for r in ranges] == [
+            ("2026-03-02", "2026-03-04", "vacation"),
+            ("2026-03-03", "2026-03-03", "absent"),
+            ("2026-03-06", "2026-03-06", "vacation"),
+        ]
+
+    def test_new_absence_replaces_cached_month(self, _db_session, employee_user, employee_client):
+        self._add_absence(_db_session, employee_user, date(2026, 3, 2), AbsenceType.VACATION)
+        assert len(employee_client.get("/api/absences/calendar?month=2026-03").json()) == 1
+
+        self._add_absence(_db_session, employee_user, date(2026, 3, 3), AbsenceType.TRAINING)
+        assert len(employee_client.get("/api/absences/calendar?month=2026-03").json()) == 2
+
+    def test_upcoming_lists_days_from_today(self, _db_session, employee_user, employee_client):
+        today = date.today()
+        self._add_absence(_db_session, employee_user, today - timedelta(days=1), AbsenceType.VACATION)
+        self._add_absence(_db_session, employee_user, today, AbsenceType.VACATION)
+
+        with patch("app.routers.absences.today_local", return_value=today):
+            entries = employee_client.get("/api/absences/team/upcoming").json()
+        assert [e["date"] for e in entries] == [today.isoformat()]
+        assert entries[0]["user_color"]
+
+
+class TestJournalRange:
+    """GET /api/journal/me?from=YYYY-MM&to=YYYY-MM"""
+
+    def test_quarter_in_one_request(self, employee_client):
+        resp = employee_client.get("/api/journal/me?from=2026-01&to=2026-03")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["from_month"] == "2026-01"
+        assert data["to_month"] == "2026-03"
+        assert [(m["year"], m["month"]) for m in data["months"]] == [(2026, 1), (2026, 2), (2026, 3)]
+        assert sum(len(m["days"]) for m in data["months"]) == 31 + 28 + 31
+
+    def test_month_matches_single_month_response(self, employee_client):
+        ranged = employee_client.get("/api/journal/me?from=2026-02&to=2026-03").json()
+        single = employee_client.get("/api/journal/me?year=2026&month=3").json()
+        single.pop("user")
+        assert ranged["months"][1] == single
+
+    @pytest.mark.parametrize("query", [
+        "from=2026-01",
+        "from=2026-03&to=2026-01",
+        "from=2025-01&to=2026-01",
+        "from=2026-13&to=2026-12",
+        "from=Januar&to=2026-02",
+    ])
+    def test_invalid_range_is_rejected(self, employee_client, query):
+        assert employee_client.get(f"/api/journal/me?{query}").status_code == 400
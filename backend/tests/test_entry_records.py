@@ -0,0 +1,59 @@
+"""
+Tests for the compact booking records (app.services.entry_records).
+"""
+import itertools
+from datetime import date, time
+from decimal import Decimal
+
+from app.models import Absence, AbsenceType, TimeEntry
+from app.models.time_entry import compute_net_hours, net_hundredths
+from app.services import entry_records
+from tests.conftest import DEFAULT_TENANT_ID
+
+
+def test_net_hundredths_matches_compute_net_hours():
+    for sh, sm, ss, eh, em, brk in itertools.product(
+        range(0, 24, 5), (0, 7, 29, 59), (0, 31), range(1, 24, 3), (0, 13, 45), (0, 15, 30, 61),
+    ):
+        start, end = time(sh, sm, ss), time(eh, em)
+        assert net_hundredths(start, end, brk) == compute_net_hours(start, end, brk) * 100
+    assert net_hundredths(time(8, 0), None, 0) == 0
+
+
+def test_records_match_orm_values(db, test_user):
+    db.add_all([
+        TimeEntry(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, date=date(2025, 3, 3),
+                  start_time=time(13, 0), end_time=time(17, 20), break_minutes=0, note="Nachmittag"),
+        TimeEntry(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, date=date(2025, 3, 3),
+                  start_time=time(7, 45), end_time=time(12, 3), break_minutes=10),
+        TimeEntry(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, date=date(2025, 3, 4),
+                  start_time=time(8, 0), end_time=None, break_minutes=0),
+        Absence(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, date=date(2025, 3, 5),
+                type=AbsenceType.SICK, hours=Decimal("7.75")),
+    ])
+    db.commit()
+
+    records = entry_records.load_entries(db, TimeEntry.user_id == test_user.id)
+    entries = db.query(TimeEntry).filter(TimeEntry.user_id == test_user.id).order_by(
+        TimeEntry.date, TimeEntry.start_time,
+    ).all()
+    assert [r.id for r in records] == [e.id for e in entries]
+    assert [r.net_hours for r in records] == [e.net_hours for e in entries]
+    assert records[1].note == "Nachmittag"
+
+    (absence,) = entry_records.load_absences(db, Absence.user_id == test_user.id)
+    assert absence.type == AbsenceType.SICK
+    assert absence.hundredths == 775
+
+
+def test_records_are_not_session_entities(db, test_user):
+    db.add(TimeEntry(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, date=date(2025, 3, 3),
+                     start_time=time(8, 0), end_time=time(16, 0), break_minutes=30))
+    db.commit()
+    user_id = test_user.id
+    db.expunge_all()
+
+    records = entry_records.load_entries(db, TimeEntry.user_id == user_id)
+
+    assert isinstance(records[0], tuple)
+    assert not any(isinstance(obj, TimeEntry) for obj in db.identity_map.values())
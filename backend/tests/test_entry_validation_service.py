@@ -0,0 +1,93 @@
+"""Tests für entry_validation_service (ein Wochen-Snapshot für alle ArbZG-Prüfungen)."""
+from datetime import date, datetime, time
+
+import pytest
+from sqlalchemy import event
+
+from app.models import TimeEntry
+from app.services.entry_validation_service import EntryValidationContext
+from tests.conftest import DEFAULT_TENANT_ID
+
+WEDNESDAY = date(2026, 3, 11)
+
+
+def _add(db, user, d, start, end, brk=0):
+    entry = TimeEntry(user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=d,
+                      start_time=start, end_time=end, break_minutes=brk)
+    db.add(entry)
+    db.commit()
+    return entry
+
+
+def test_snapshot_is_loaded_with_one_query(db, test_user):
+    _add(db, test_user, WEDNESDAY, time(8, 0), time(12, 0))
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        if "time_entries" in statement:
+            statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        context = EntryValidationContext.for_date(db, test_user.id, WEDNESDAY)
+        context.check(WEDNESDAY, time(13, 0), time(17, 0), 0)
+        context.rest_hours_at(WEDNESDAY, time(13, 0))
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+    assert len(statements) == 1
+
+
+def test_daily_and_weekly_hours_include_candidate(db, test_user):
+    _add(db, test_user, date(2026, 3, 9), time(8, 0), time(16, 30), 30)   # Mo 8h
+    _add(db, test_user, WEDNESDAY, time(8, 0), time(12, 0))               # Mi 4h
+    _add(db, test_user, date(2026, 3, 16), time(8, 0), time(12, 0))       # Folgewoche
+
+    check = EntryValidationContext.for_date(db, test_user.id, WEDNESDAY).check(
+        WEDNESDAY, time(13, 0), time(15, 0), 0,
+    )
+    assert check.daily_hours == pytest.approx(6.0)
+    assert check.weekly_hours == pytest.approx(14.0)
+    assert check.break_error is None
+
+
+def test_excluded_entry_is_not_counted_twice(db, test_user):
+    entry = _add(db, test_user, WEDNESDAY, time(8, 0), time(13, 0))
+    context = EntryValidationContext.for_date(db, test_user.id, WEDNESDAY)
+
+    check = context.check(WEDNESDAY, time(8, 0), time(13, 0), 0, exclude_entry_id=entry.id)
+    assert check.daily_hours == pytest.approx(5.0)
+    assert not context.has_start_time(WEDNESDAY, time(8, 0), exclude_entry_id=entry.id)
+    assert context.has_start_time(WEDNESDAY, time(8, 0))
+
+
+def test_break_rule_uses_entries_of_the_day(db, test_user):
+    _add(db, test_user, WEDNESDAY, time(8, 0), time(12, 0))
+    check = EntryValidationContext.for_date(db, test_user.id, WEDNESDAY).check(
+        WEDNESDAY, time(12, 10), time(15, 0), 0,
+    )
+    assert "30 Minuten" in check.break_error
+
+
+def test_rest_hours_from_previous_day_ignore_split_shift(db, test_user):
+    _add(db, test_user, date(2026, 3, 10), time(14, 0), time(22, 0))
+    _add(db, test_user, WEDNESDAY, time(6, 0), time(10, 0))
+    context = EntryValidationContext.for_date(db, test_user.id, WEDNESDAY)
+
+    # Zweiter Block am selben Tag: Ruhezeit zählt ab Vortag, nicht ab 10:00
+    assert context.rest_hours_at(WEDNESDAY, time(14, 0)) == pytest.approx(16.0)
+    assert context.check(WEDNESDAY, time(6, 0), time(10, 0), 0).rest_hours == pytest.approx(8.0)
+
+
+def test_monday_snapshot_includes_previous_sunday(db, test_user):
+    _add(db, test_user, date(2026, 3, 8), time(18, 0), time(23, 0))
+    context = EntryValidationContext.for_date(db, test_user.id, date(2026, 3, 9))
+    assert context.last_end_before(date(2026, 3, 9)) == datetime(2026, 3, 8, 23, 0)
+    # Sonntag zählt zur Vorwoche
+    assert context.check(date(2026, 3, 9), time(8, 0), time(12, 0), 0).weekly_hours == pytest.approx(4.0)
+
+
+def test_check_outside_snapshot_raises(db, test_user):
+    context = EntryValidationContext.for_date(db, test_user.id, WEDNESDAY)
+    with pytest.raises(ValueError):
+        context.check(date(2026, 3, 20), time(8, 0), time(12, 0), 0)
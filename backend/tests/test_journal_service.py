@@ -113,3 +113,77 @@ def test_journal_user_info_included(db, test_user):
     result = journal_service.get_journal(db, test_user, 2026, 3)
     assert result["user"]["first_name"] == test_user.first_name
     assert result["user"]["last_name"] == test_user.last_name
+
+
+def _make_hours_change(db, user, effective_from, weekly_hours):
+    from app.models import WorkingHoursChange
+    db.add(WorkingHoursChange(
+        user_id=user.id, tenant_id=DEFAULT_TENANT_ID,
+        effective_from=effective_from, weekly_hours=weekly_hours,
+    ))
+    db.commit()
+
+
+def test_journal_uses_hours_change_mid_month(db, test_user):
+    """Stundenänderung zum 16.03. → Soll ab dem Stichtag aus den neuen Wochenstunden."""
+    _make_hours_change(db, test_user, date(2026, 3, 16), Decimal("20.0"))
+    result = journal_service.get_journal(db, test_user, 2026, 3)
+    days = {d["date"]: d for d in result["days"]}
+    assert days["2026-03-13"]["target_hours"] == pytest.approx(8.0)
+    assert days["2026-03-16"]["target_hours"] == pytest.approx(4.0)
+
+
+def test_journal_query_count_independent_of_days(db, test_user):
+    """Wochenstunden kommen aus einer Abfrage, nicht aus einer pro Tag."""
+    from app.core.query_metrics import collect_queries
+    _make_hours_change(db, test_user, date(2026, 1, 1), Decimal("30.0"))
+    for day in (9, 10, 11):
+        _make_entry(db, test_user, date(2026, 3, day), 8, 14)
+    _make_absence(db, test_user, date(2026, 3, 12), AbsenceType.SICK)
+
+    with collect_queries() as stats:
+        journal_service.get_journal(db, test_user, 2026, 3)
+    _, _, repeated = stats.most_repeated()
+    assert repeated <= 2
+    assert stats.count <= 12
+
+
+def test_journal_range_months_match_single_months(db, test_user):
+    """Bereichsjournal liefert je Monat dasselbe wie das Monatsjournal."""
+    from app.models import YearCarryover
+    db.add(YearCarryover(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, year=2026,
+                         overtime_hours=Decimal("12.50"), vacation_days=Decimal("0")))
+    db.commit()
+    _make_entry(db, test_user, date(2025, 11, 3), 8, 18, break_min=30)
+    _make_entry(db, test_user, date(2026, 1, 5), 8, 12)
+    _make_absence(db, test_user, date(2025, 12, 1), AbsenceType.VACATION)
+
+    result = journal_service.get_journal_range(db, test_user, 2025, 10, 2026, 2)
+
+    assert [(m["year"], m["month"]) for m in result["months"]] == [
+        (2025, 10), (2025, 11), (2025, 12), (2026, 1), (2026, 2),
+    ]
+    for month in result["months"]:
+        single = journal_service.get_journal(db, test_user, month["year"], month["month"])
+        single.pop("user")
+        assert month == single
+    assert result["summary"]["target_hours"] == pytest.approx(
+        sum(m["monthly_summary"]["target_hours"] for m in result["months"])
+    )
+
+
+def test_journal_range_overtime_matches_overtime_account(db, test_user):
+    """yearly_overtime je Monat = get_overtime_account, auch vor der ersten Buchung und über den Jahreswechsel."""
+    from app.services import calculation_service
+    _make_entry(db, test_user, date(2025, 12, 1), 8, 17, break_min=30)
+    _make_entry(db, test_user, date(2026, 2, 2), 8, 12)
+
+    result = journal_service.get_journal_range(db, test_user, 2025, 9, 2026, 3)
+    for month in result["months"]:
+        expected = calculation_service.get_overtime_account(db, test_user, month["year"], month["month"])
+        assert month["yearly_overtime"] == float(expected)
+
+
+def test_journal_range_rejects_reversed_range(db, test_user):
+    with pytest.raises(ValueError):
+        journal_service.get_journal_range(db, test_user, 2026, 3, 2026, 1)
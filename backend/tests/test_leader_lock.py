@@ -0,0 +1,17 @@
+"""Tests für leader_lock (Startaufgaben bei mehreren Workern)."""
+from app.core.leader_lock import (
+    STARTUP_DUTIES_DONE_ENV, leader_lock, mark_startup_duties_done, startup_duties_done,
+)
+from tests.conftest import engine
+
+
+def test_non_postgres_always_leads():
+    with leader_lock(engine) as is_leader:
+        assert is_leader is True
+
+
+def test_duties_marked_done_for_forked_workers(monkeypatch):
+    monkeypatch.setenv(STARTUP_DUTIES_DONE_ENV, "0")
+    assert not startup_duties_done()
+    mark_startup_duties_done()
+    assert startup_duties_done()
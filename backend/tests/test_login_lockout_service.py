@@ -0,0 +1,53 @@
+"""Tests für login_lockout_service (DB-basierte Kontosperre)."""
+from datetime import datetime, timedelta, timezone
+
+from app.models import FailedLogin
+from app.services import login_lockout_service as lockout
+
+
+NOW = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+
+
+def test_locked_after_max_attempts_case_insensitive(db):
+    for i in range(lockout.LOCKOUT_ATTEMPTS - 1):
+        lockout.record_failure(db, "Anna", now=NOW + timedelta(seconds=i))
+    assert not lockout.is_locked(db, "anna", now=NOW + timedelta(minutes=1))
+
+    lockout.record_failure(db, "ANNA", now=NOW + timedelta(minutes=1))
+    assert lockout.is_locked(db, "anna", now=NOW + timedelta(minutes=1))
+
+
+def test_attempts_expire_after_window(db):
+    for _ in range(lockout.LOCKOUT_ATTEMPTS):
+        lockout.record_failure(db, "anna", now=NOW)
+    assert not lockout.is_locked(db, "anna", now=NOW + lockout.LOCKOUT_WINDOW)
+
+    # A new failure prunes the user's expired rows
+    lockout.record_failure(db, "anna", now=NOW + lockout.LOCKOUT_WINDOW + timedelta(seconds=1))
+    assert db.query(FailedLogin).count() == 1
+
+
+def test_clear_and_purge(db):
+    for _ in range(3):
+        lockout.record_failure(db, "anna", now=NOW)
+        lockout.record_failure(db, "ben", now=NOW + lockout.LOCKOUT_WINDOW)
+
+    lockout.clear(db, "Anna")
+    assert db.query(FailedLogin).filter(FailedLogin.username == "anna").count() == 0
+
+    lockout.record_failure(db, "carl", now=NOW)
+    assert lockout.purge_expired(db, now=NOW + lockout.LOCKOUT_WINDOW) == 1
+    assert {u for (u,) in db.query(FailedLogin.username).distinct()} == {"ben"}
+
+
+def test_failures_periodically_purge_other_users(db):
+    """Viele verschiedene Benutzernamen lassen die Tabelle nicht unbegrenzt wachsen."""
+    for i in range(20):
+        lockout.record_failure(db, f"spray{i}", now=NOW)
+    later = NOW + lockout.LOCKOUT_WINDOW + lockout.PURGE_INTERVAL
+    lockout.record_failure(db, "anna", now=later)
+    assert {u for (u,) in db.query(FailedLogin.username)} == {"anna"}
+
+    # Within the interval only the attempted user's rows are pruned
+    lockout.record_failure(db, "spray0", now=later + timedelta(seconds=1))
+    assert db.query(FailedLogin).count() == 2
@@ -0,0 +1,46 @@
+"""
+Tests für die Pool-Metriken und Workload-Pools (app.core.pool_metrics, app.database).
+"""
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc
+
+from app.core.pool_metrics import InstrumentedQueuePool, register_engine
+from app.database import INTERACTIVE, REPORTING, engine, pool_settings, reporting_engine, statement_timeout_ms
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_checkout_wait_timeouts_and_connection_gauges(tmp_path):
+    test_engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, pool_logging_name="pooltest",
+        pool_size=1, max_overflow=0, pool_timeout=0.01,
+    )
+    register_engine("pooltest", test_engine)
+    waits = _sample("db_pool_checkout_wait_seconds_count", workload="pooltest")
+    timeouts = _sample("db_pool_checkout_timeouts_total", workload="pooltest")
+
+    conn = test_engine.connect()
+    assert _sample("db_pool_connections", workload="pooltest", state="checked_out") == 1
+    with pytest.raises(exc.TimeoutError):
+        test_engine.connect()
+    conn.close()
+
+    assert _sample("db_pool_checkout_wait_seconds_count", workload="pooltest") == waits + 1
+    assert _sample("db_pool_checkout_timeouts_total", workload="pooltest") == timeouts + 1
+    assert _sample("db_pool_connections", workload="pooltest", state="checked_out") == 0
+    assert _sample("db_pool_connections", workload="pooltest", state="idle") == 1
+    test_engine.dispose()
+
+
+def test_workload_classes_have_separate_pools():
+    assert engine.pool is not reporting_engine.pool
+    assert isinstance(reporting_engine.pool, InstrumentedQueuePool)
+    assert engine.pool.size() == pool_settings(INTERACTIVE)["pool_size"]
+    assert reporting_engine.pool.size() == pool_settings(REPORTING)["pool_size"]
+    assert statement_timeout_ms(REPORTING) > statement_timeout_ms(INTERACTIVE)
+    # No ping round trip per checkout; connections are recycled by age instead
+    assert pool_settings(INTERACTIVE)["pool_pre_ping"] is False
+    assert pool_settings(INTERACTIVE)["pool_recycle"] > 0
@@ -0,0 +1,68 @@
+"""Tests für die SQL-Instrumentierung (app.core.query_metrics)."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.query_metrics import (
+    DB_N_PLUS_ONE,
+    N_PLUS_ONE_THRESHOLD,
+    QueryBudgetExceeded,
+    QueryStatsMiddleware,
+    collect_queries,
+    fingerprint,
+    normalize_statement,
+    query_budget,
+)
+from tests.conftest import engine
+
+
+def test_normalize_removes_values_and_collapses_in_lists():
+    a = normalize_statement("SELECT * FROM users WHERE id IN (?, ?, ?) AND name = 'Anna'  AND age > 30")
+    b = normalize_statement("SELECT *\n FROM users WHERE id IN (?, ?) AND name = 'Ben' AND age > 41")
+    assert a == b == "SELECT * FROM users WHERE id IN (…) AND name = ? AND age > ?"
+    assert normalize_statement("SELECT a FROM t WHERE x = %(x_1)s") == "SELECT a FROM t WHERE x = ?"
+    assert fingerprint("SELECT users_1.id FROM users AS users_1") != fingerprint("SELECT 1")
+
+
+def test_collect_queries_counts_statements_and_repeats():
+    with engine.connect() as conn:
+        with collect_queries() as stats:
+            for i in range(3):
+                conn.execute(text("SELECT :v"), {"v": i})
+            conn.execute(text("SELECT 'x'"))
+    fp, sql, times = stats.most_repeated()
+    assert stats.count == 4
+    assert stats.seconds > 0
+    assert (sql, times) == ("SELECT ?", 4)  # literals and params share one fingerprint
+    assert fp == fingerprint("SELECT 1")
+
+
+def _app(queries: int, enforce: bool) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, enforce_budgets=enforce)
+
+    @app.get("/items/{item_id}")
+    @query_budget(3)
+    def read_item(item_id: int):
+        with engine.connect() as conn:
+            for _ in range(queries):
+                conn.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    return app
+
+
+def test_budget_exceeded_raises_when_enforced():
+    with TestClient(_app(queries=4, enforce=True)) as client:
+        with pytest.raises(QueryBudgetExceeded, match=r"/items/\{item_id\} executed 4 SQL statements \(budget 3\)"):
+            client.get("/items/1")
+
+
+def test_budget_only_logged_when_not_enforced(caplog):
+    with TestClient(_app(queries=N_PLUS_ONE_THRESHOLD, enforce=False)) as client:
+        assert client.get("/items/1").status_code == 200
+    assert "budget 3" in caplog.text
+    assert "Possible N+1 on /items/{item_id}" in caplog.text
+    sample = DB_N_PLUS_ONE.labels(route="/items/{item_id}", fingerprint=fingerprint("SELECT 1"))
+    assert sample._value.get() >= 1
@@ -0,0 +1,103 @@
+"""
+Tests for the DSGVO retention engine (app.services.retention_service).
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from app.core.query_metrics import collect_queries
+from app.models import Absence, AbsenceType, TimeEntry, TimeEntryAuditLog, User, UserRole
+from app.services import auth_service, retention_service
+from tests.conftest import DEFAULT_TENANT_ID
+
+TODAY = date(2026, 6, 1)
+_PASSWORD_HASH = auth_service.hash_password("irrelevant-pw-123")
+
+
+def _inactive(db, name, last_entry=None, deactivated_days_ago=60):
+    user = User(
+        username=name, first_name=name.title(), last_name="Ehemalig", password_hash=_PASSWORD_HASH,
+        role=UserRole.EMPLOYEE, weekly_hours=40, vacation_days=30, is_active=False,
+        deactivated_at=datetime.combine(TODAY, time(9, 0), tzinfo=timezone.utc) - timedelta(days=deactivated_days_ago),
+        tenant_id=DEFAULT_TENANT_ID,
+    )
+    db.add(user)
+    db.flush()
+    if last_entry:
+        for day in (last_entry - timedelta(days=1), last_entry):
+            db.add(TimeEntry(user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=day,
+                             start_time=time(8, 0), end_time=time(12, 0), break_minutes=0))
+        db.add(Absence(user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=last_entry + timedelta(days=7),
+                       type=AbsenceType.VACATION, hours=Decimal("8")))
+    db.commit()
+    return user
+
+
+def _setup(db):
+    return {
+        "old": _inactive(db, "alt", last_entry=TODAY - timedelta(days=800)),
+        "recent": _inactive(db, "neu", last_entry=TODAY - timedelta(days=100)),
+        "empty": _inactive(db, "leer"),
+        "grace": _inactive(db, "frisch", deactivated_days_ago=3),
+    }
+
+
+def test_candidates_use_one_query(db, test_user, test_admin):
+    users = _setup(db)
+    with collect_queries() as stats:
+        candidates = {c.username: c for c in retention_service.load_candidates(db, TODAY)}
+    assert stats.count == 1
+
+    assert set(candidates) == {"alt", "neu", "leer", "frisch"}  # active users are not listed
+    assert candidates["alt"].last_entry_date == TODAY - timedelta(days=800)
+    assert candidates["alt"].can_purge and not candidates["neu"].can_purge
+    assert candidates["leer"].last_entry_date is None and candidates["leer"].can_purge
+    assert candidates["frisch"].in_grace_period and not candidates["frisch"].can_anonymize
+    assert candidates["frisch"].grace_period_remaining_days == 11
+    assert candidates["neu"].as_dict()["user_id"] == str(users["recent"].id)
+
+
+def test_dry_run_reports_without_writing(db, test_admin):
+    _setup(db)
+    report = retention_service.sweep(db, "purge", None, dry_run=True, today=TODAY)
+    assert report["dry_run"] and report["processed"] == 0
+    assert sorted(u["username"] for u in report["users"]) == ["alt", "leer"]
+    assert set(report["timings_ms"]) == {"select", "total"}
+    assert db.query(User).filter(User.is_active == False).count() == 4  # noqa: E712
+
+
+def test_purge_sweep_in_chunks(db, test_user, test_admin):
+    users = _setup(db)
+    db.add(TimeEntry(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, date=TODAY,
+                     start_time=time(8, 0), end_time=time(9, 0), break_minutes=0))
+    db.commit()
+    old_id, admin_id = users["old"].id, test_admin.id
+
+    report = retention_service.sweep(db, "purge", test_admin, dry_run=False, chunk_size=1, today=TODAY)
+
+    assert report["processed"] == 2 and "write" in report["timings_ms"]
+    assert {u.username for u in db.query(User)} == {"testuser", "adminuser", "neu", "frisch"}
+    assert db.query(TimeEntry).filter(TimeEntry.user_id == old_id).count() == 0
+    assert db.query(Absence).filter(Absence.user_id == old_id).count() == 0
+    assert db.query(TimeEntry).filter(TimeEntry.user_id == test_user.id).count() == 1
+    logs = db.query(TimeEntryAuditLog).filter(TimeEntryAuditLog.action == "dsgvo_purge").all()
+    assert len(logs) == 2 and all(log.user_id == admin_id for log in logs)
+    assert "Aufbewahrungs-Sweep" in logs[0].old_note
+
+
+def test_anonymize_sweep_keeps_time_entries(db, test_admin):
+    users = _setup(db)
+    old_id = users["old"].id
+
+    report = retention_service.sweep(db, "anonymize", test_admin, dry_run=False, today=TODAY)
+    assert report["processed"] == 2
+
+    db.expire_all()
+    old = db.get(User, old_id)
+    assert old.username == retention_service.anonymized_username(old_id)
+    assert (old.first_name, old.last_name, old.email) == ("Gelöschter", "Benutzer", None)
+    assert db.query(TimeEntry).filter(TimeEntry.user_id == old_id).count() == 2
+    assert db.query(Absence).filter(Absence.user_id == old_id).count() == 0
+    assert db.query(User).filter(User.username == "neu").count() == 1
+
+    # Already anonymized users are not picked up again
+    assert retention_service.sweep(db, "anonymize", test_admin, dry_run=True, today=TODAY)["eligible"] == 0
@@ -0,0 +1,68 @@
+"""
+Tests für den Kaltstart: Lazy Imports und Startaufgaben in einer Transaktion (app.main).
+"""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import main
+from app.core import leader_lock
+from app.database import Base, _restore_tenant_context
+from app.models import PublicHoliday, User
+from app.models.tenant import Tenant
+from benchmarks.bench_startup import import_profile
+
+
+@pytest.fixture
+def startup_db(tmp_path, monkeypatch):
+    """SessionLocal of app.main on its own SQLite file; counts commits."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+
+    @event.listens_for(engine, "connect")
+    def _register(dbapi_conn, _record):
+        dbapi_conn.create_function("set_config", 3, lambda name, value, is_local: value)
+
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    event.listen(factory, "after_begin", _restore_tenant_context)
+    commits = []
+    event.listen(factory, "after_commit", lambda session: commits.append(session))
+    monkeypatch.setattr(main, "SessionLocal", factory)
+    yield factory, commits
+    engine.dispose()
+
+
+def test_import_does_not_load_export_libraries():
+    """openpyxl, odfpy, reportlab, xlrd und workalendar werden erst bei Bedarf geladen."""
+    timings, loaded = import_profile("app.main")
+    assert loaded == []
+    assert "app.routers.reports" in timings
+    assert "app.services.export_service" not in timings
+
+
+def test_startup_duties_use_one_session_and_commit(startup_db):
+    factory, commits = startup_db
+    main._run_startup_duties()
+    assert len(commits) == 1
+
+    db = factory()
+    assert db.query(Tenant).filter(Tenant.slug == "default").count() == 1
+    assert db.query(User).filter(User.username == main.settings.ADMIN_USERNAME).count() == 1
+    assert db.query(PublicHoliday).count() > 0
+    db.close()
+
+    # Idempotent: a restart creates nothing twice and still commits once
+    main._run_startup_duties()
+    assert len(commits) == 2
+    db = factory()
+    assert db.query(User).filter(User.username == main.settings.ADMIN_USERNAME).count() == 1
+    db.close()
+
+
+def test_gunicorn_master_runs_duties_once_for_all_workers(startup_db, monkeypatch):
+    """on_starting im Master: Startaufgaben laufen vor dem Forken, die Worker überspringen sie."""
+    factory, commits = startup_db
+    monkeypatch.setenv(leader_lock.STARTUP_DUTIES_DONE_ENV, "0")
+    main.run_startup_duties_in_master()
+    assert len(commits) == 1
+    assert leader_lock.startup_duties_done()
@@ -0,0 +1,78 @@
+"""
+Tests für den RLS-Tenant-Kontext (app.database).
+
+SQLite kennt kein set_config; für die Tests wird eine gleichnamige Funktion
+registriert, damit die Anzahl der Kontext-Statements gezählt werden kann.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import (
+    _restore_tenant_context,
+    count_tenant_context_statements,
+    set_superadmin_context,
+    set_tenant_context,
+)
+
+TENANT_ID = str(uuid.uuid4())
+
+
+@pytest.fixture
+def ctx():
+    engine = create_engine("sqlite://")
+    statements = []
+
+    @event.listens_for(engine, "connect")
+    def _register(dbapi_conn, _record):
+        dbapi_conn.create_function("set_config", 3, lambda name, value, is_local: value)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if "set_config" in statement:
+            statements.append(parameters)
+
+    factory = sessionmaker(bind=engine, autoflush=False)
+    event.listen(factory, "after_begin", _restore_tenant_context)
+    db = factory()
+    yield db, statements
+    db.close()
+    engine.dispose()
+
+
+def test_request_flow_needs_one_statement_per_switch(ctx):
+    db, statements = ctx
+    set_superadmin_context(db)
+    db.execute(text("SELECT 1"))
+    set_tenant_context(db, TENANT_ID)
+    db.execute(text("SELECT 1"))
+
+    assert len(statements) == 2
+    assert statements[-1] == (TENANT_ID, "")
+
+
+def test_repeated_context_is_skipped_within_transaction(ctx):
+    db, statements = ctx
+    set_tenant_context(db, TENANT_ID)
+    set_tenant_context(db, TENANT_ID)
+    assert len(statements) == 1
+
+
+def test_context_is_restored_once_after_commit(ctx):
+    db, statements = ctx
+    set_tenant_context(db, TENANT_ID)
+    db.commit()
+    db.execute(text("SELECT 1"))
+    set_tenant_context(db, TENANT_ID)
+
+    assert statements == [(TENANT_ID, ""), (TENANT_ID, "")]
+
+
+def test_statements_are_counted_per_request(ctx):
+    db, _ = ctx
+    with count_tenant_context_statements() as counter:
+        set_superadmin_context(db)
+        set_tenant_context(db, TENANT_ID)
+    assert counter[0] == 2
@@ -0,0 +1,42 @@
+"""
+Tests for batched user-name resolution (app.services.user_name_service).
+"""
+import uuid
+from types import SimpleNamespace
+
+from app.core.query_metrics import collect_queries
+from app.services import user_name_service
+
+
+def test_resolve_uses_one_query(db, test_user, test_admin):
+    ids = [test_user.id, test_admin.id, test_user.id, None]
+    with collect_queries() as stats:
+        names = user_name_service.resolve(db, ids)
+    assert stats.count == 1
+    assert names[test_user.id] == (test_user.first_name, test_user.last_name)
+    assert set(names) == {test_user.id, test_admin.id}
+
+
+def test_resolve_without_ids_does_not_query(db):
+    with collect_queries() as stats:
+        assert user_name_service.resolve(db, [None]) == {}
+    assert stats.count == 0
+
+
+def test_fill_names_sets_fields_of_known_users(db, test_user, test_admin):
+    rows = [
+        SimpleNamespace(user_id=test_user.id, reviewed_by=test_admin.id),
+        SimpleNamespace(user_id=test_user.id, reviewed_by=None),
+        SimpleNamespace(user_id=uuid.uuid4(), reviewed_by=None),  # deleted user
+    ]
+    responses = [SimpleNamespace(owner_first=None, owner_last=None, rev_first=None, rev_last=None) for _ in rows]
+
+    user_name_service.fill_names(db, list(zip(rows, responses)), {
+        "user_id": ("owner_first", "owner_last"),
+        "reviewed_by": ("rev_first", "rev_last"),
+    })
+
+    assert responses[0].owner_last == test_user.last_name
+    assert responses[0].rev_first == test_admin.first_name
+    assert responses[1].rev_first is None
+    assert responses[2].owner_first is None
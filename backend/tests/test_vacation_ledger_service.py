@@ -0,0 +1,151 @@
+"""
+Tests for the memoized vacation ledger (app.services.vacation_ledger_service)
+and the batched vacation accounts in calculation_service.
+"""
+from datetime import date
+from decimal import Decimal
+
+from app.core.query_metrics import collect_queries
+from app.models import Absence, AbsenceType, YearCarryover
+from app.services import calculation_service, vacation_ledger_service
+from tests.conftest import DEFAULT_TENANT_ID
+
+
+def _vacation(db, user, d, hours="8.0"):
+    absence = Absence(
+        user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=d,
+        type=AbsenceType.VACATION, hours=Decimal(hours),
+    )
+    db.add(absence)
+    return absence
+
+
+def _count(fn) -> int:
+    with collect_queries() as stats:
+        fn()
+    return stats.count
+
+
+class TestMemo:
+
+    def test_repeated_calls_do_not_query(self, db, test_user):
+        first = calculation_service.get_vacation_account(db, test_user, 2025)
+        assert _count(lambda: calculation_service.get_vacation_account(db, test_user, 2025)) == 0
+        assert calculation_service.get_vacation_account(db, test_user, 2025) == first
+
+    def test_flushed_absence_invalidates_its_year(self, db, test_user):
+        calculation_service.get_vacation_account(db, test_user, 2025)
+        calculation_service.get_vacation_account(db, test_user, 2026)
+        _vacation(db, test_user, date(2025, 6, 2))
+        db.flush()
+
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["used_hours"] == 8.0
+        # Other year stays memoized
+        assert _count(lambda: calculation_service.get_vacation_account(db, test_user, 2026)) == 0
+
+    def test_moving_absence_to_other_year_invalidates_both(self, db, test_user):
+        absence = _vacation(db, test_user, date(2025, 12, 30))
+        db.flush()
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["used_hours"] == 8.0
+        assert calculation_service.get_vacation_account(db, test_user, 2026)["used_hours"] == 0.0
+
+        absence.date = date(2026, 1, 5)
+        db.flush()
+
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["used_hours"] == 0.0
+        assert calculation_service.get_vacation_account(db, test_user, 2026)["used_hours"] == 8.0
+
+    def test_carryover_change_invalidates(self, db, test_user):
+        carryover = YearCarryover(
+            user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, year=2025,
+            overtime_hours=Decimal("0"), vacation_days=Decimal("2.0"),
+        )
+        db.add(carryover)
+        db.flush()
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["budget_days"] == 32.0
+
+        carryover.vacation_days = Decimal("5.0")
+        db.flush()
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["budget_days"] == 35.0
+
+    def test_user_settings_are_read_live(self, db, test_user):
+        calculation_service.get_vacation_account(db, test_user, 2025)
+        test_user.vacation_days = 25
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["budget_days"] == 25.0
+
+    def test_commit_clears_memo(self, db, test_user):
+        calculation_service.get_vacation_account(db, test_user, 2025)
+        db.commit()
+        assert _count(lambda: calculation_service.get_vacation_account(db, test_user, 2025)) > 0
+
+    def test_bulk_delete_needs_explicit_invalidate(self, db, test_user):
+        _vacation(db, test_user, date(2025, 3, 3))
+        db.flush()
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["used_hours"] == 8.0
+
+        db.query(Absence).filter(Absence.user_id == test_user.id).delete(synchronize_session=False)
+        vacation_ledger_service.invalidate(db, test_user.id, 2025)
+
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["used_hours"] == 0.0
+
+
+class TestProcessCache:
+
+    def test_later_requests_only_read_the_version(self, db, test_user):
+        _vacation(db, test_user, date(2025, 5, 5))
+        db.commit()
+        first = calculation_service.get_vacation_account(db, test_user, 2025)
+        db.commit()  # next request: fresh memo
+        db.refresh(test_user)
+
+        assert _count(lambda: calculation_service.get_vacation_account(db, test_user, 2025)) == 1
+        assert calculation_service.get_vacation_account(db, test_user, 2025) == first
+
+    def test_committed_change_bumps_the_version(self, db, test_user):
+        calculation_service.get_vacation_account(db, test_user, 2025)
+        db.commit()
+        _vacation(db, test_user, date(2025, 5, 5))
+        db.commit()
+
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["used_hours"] == 8.0
+
+    def test_uncommitted_versions_are_not_cached(self, db, test_user):
+        """Eine Transaktion mit eigenen Änderungen füllt den Prozess-Cache nicht (Rollback-sicher)."""
+        _vacation(db, test_user, date(2025, 5, 5))
+        db.flush()
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["used_hours"] == 8.0
+        db.rollback()
+
+        assert vacation_ledger_service._cache == {}
+        assert calculation_service.get_vacation_account(db, test_user, 2025)["used_hours"] == 0.0
+
+
+class TestBatched:
+
+    def test_matches_single_accounts_with_three_queries(self, db, test_user, test_admin):
+        _vacation(db, test_user, date(2025, 4, 7))
+        _vacation(db, test_user, date(2025, 4, 8), hours="4.0")
+        _vacation(db, test_admin, date(2025, 8, 1))
+        _vacation(db, test_admin, date(2024, 8, 1))  # other year
+        db.add(YearCarryover(
+            user_id=test_admin.id, tenant_id=DEFAULT_TENANT_ID, year=2025,
+            overtime_hours=Decimal("0"), vacation_days=Decimal("3.5"),
+        ))
+        db.commit()
+        users = [test_user, test_admin]
+        for user in users:
+            db.refresh(user)  # load expired attributes outside the counted block
+
+        with collect_queries() as stats:
+            accounts = calculation_service.get_vacation_accounts(db, users, 2025)
+        assert stats.count == 3  # versions, carryovers, used hours
+        assert accounts[test_user.id]["used_hours"] == 12.0
+        assert accounts[test_admin.id]["budget_days"] == 33.5
+
+        db.commit()  # fresh memo for the single-user reference values
+        for user in users:
+            assert accounts[user.id] == calculation_service.get_vacation_account(db, user, 2025)
+
+    def test_fills_memo_for_single_lookups(self, db, test_user, test_admin):
+        calculation_service.get_vacation_accounts(db, [test_user, test_admin], 2025)
+        assert _count(lambda: calculation_service.get_vacation_account(db, test_admin, 2025)) == 0
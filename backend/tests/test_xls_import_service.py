@@ -4,16 +4,21 @@ import pytest
 from datetime import date, time, datetime
 
 import xlrd
-import xlwt  # xlwt für .xls-Erstellung in Tests (xlrd 1.2 liest, xlwt schreibt)
+import xlwt
+from sqlalchemy import event  # xlwt für .xls-Erstellung in Tests (xlrd 1.2 liest, xlwt schreibt)
 
 from app.models import TimeEntry
 from app.services.xls_import_service import (
     _calc_break_minutes,
     _check_arbzg,
+    _check_arbzg_sequence,
+    _serials_to_date_and_minute,
     _excel_serial_to_datetime,
     parse_xls,
     execute_import,
+    execute_import_job,
     ImportedEntry,
+    ImportJobItem,
     MAX_FILE_SIZE_BYTES,
 )
 from tests.conftest import DEFAULT_TENANT_ID
@@ -374,3 +379,111 @@ def test_execute_import_returns_arbzg_warnings(db, test_user, test_admin):
                             tenant_id=DEFAULT_TENANT_ID)
     assert len(result.warnings) == 1
     assert "§3" in result.warnings[0]
+
+
+# ── Bulk-Verhalten ────────────────────────────────────────────────────────────
+
+def _count_time_entry_selects(db):
+    """Zählt SELECTs auf time_entries, bis die zurückgegebene stop()-Funktion aufgerufen wird."""
+    statements = []
+
+    def _before(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "time_entries" in statement:
+            statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _before)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", _before)
+
+
+def test_parse_xls_resolves_conflicts_with_single_query(db, test_user):
+    for day in (12, 14):
+        db.add(TimeEntry(user_id=test_user.id, tenant_id=DEFAULT_TENANT_ID, date=date(2026, 1, day),
+                         start_time=time(7, 15), end_time=time(12, 45), break_minutes=30))
+    db.commit()
+
+    rows = [["Datum", "Tag", "Total", "Ein", "Aus", "Tagesnotiz"]] + [
+        _make_data_row(_dt(2026, 1, day, 7, 15), _dt(2026, 1, day, 12, 45)) for day in range(12, 31)
+    ]
+    statements, stop = _count_time_entry_selects(db)
+    try:
+        entries = parse_xls(_make_xls_bytes(rows), test_user.id, db)
+    finally:
+        stop()
+
+    assert [e.date.day for e in entries if e.has_conflict] == [12, 14]
+    # Ein Snapshot für Konfliktprüfung und §5-Startpunkt
+    assert len(statements) == 1
+
+
+def test_execute_import_batches_and_handles_duplicate_rows(db, test_user, test_admin, monkeypatch):
+    from app.services import xls_import_service
+    monkeypatch.setattr(xls_import_service, "IMPORT_BATCH_SIZE", 4)
+    entries = _make_entries(7) + _make_entries(1)  # letzte Zeile doppelt (12.01.)
+
+    result = execute_import(test_user.id, entries, overwrite=False, db=db,
+                            changed_by_id=test_admin.id, filename="test.xls",
+                            tenant_id=DEFAULT_TENANT_ID)
+    assert result.imported == 7
+    assert result.skipped == 1
+    assert db.query(TimeEntry).filter(TimeEntry.user_id == test_user.id).count() == 7
+
+
+def test_execute_import_job_multiple_users(db, test_user, test_admin):
+    from app.models import TimeEntryAuditLog
+    result = execute_import_job(
+        [
+            ImportJobItem(user_id=test_user.id, entries=_make_entries(3), filename="mitarbeiter.xls"),
+            ImportJobItem(user_id=test_admin.id, entries=_make_entries(2), filename="admin.xls"),
+        ],
+        overwrite=False, db=db, changed_by_id=test_admin.id, tenant_id=DEFAULT_TENANT_ID,
+    )
+    assert result.imported == 5
+    assert [r.imported for r in result.items] == [3, 2]
+    assert db.query(TimeEntry).filter(TimeEntry.user_id == test_admin.id).count() == 2
+
+    summaries = db.query(TimeEntryAuditLog).filter(TimeEntryAuditLog.action == "import").all()
+    assert sorted(l.new_note.rsplit("Datei: ", 1)[1] for l in summaries) == ["admin.xls", "mitarbeiter.xls"]
+
+
+# ── Spaltenweises Parsing ─────────────────────────────────────────────────────
+
+def test_serial_batch_conversion_matches_timedelta():
+    serials = [46034.30208333333, 46034.53125, 46035.999999, 46036.0, 45000.0416666667, 1.5]
+    dates, minutes = _serials_to_date_and_minute(serials)
+    for serial, d, m in zip(serials, dates, minutes):
+        expected = _excel_serial_to_datetime(serial)
+        assert d == expected.date()
+        assert m == expected.hour * 60 + expected.minute
+
+
+def test_arbzg_sequence_matches_row_checks_on_sorted_order():
+    rows = [
+        (date(2026, 1, 13), time(6, 0), time(18, 0), 45),   # §3 + §5 (Vortag bis 23:00)
+        (date(2026, 1, 12), time(14, 0), time(23, 0), 30),
+        (date(2026, 1, 14), time(22, 0), time(6, 0), 0),    # §6 Nachtarbeit
+        (date(2026, 1, 12), time(7, 0), time(11, 0), 0),
+    ]
+    prev_end = datetime(2026, 1, 11, 22, 0)
+    for night_worker in (False, True):
+        expected: dict = {}
+        prev = prev_end
+        for row in sorted(rows):
+            expected[row] = _check_arbzg(*row, prev, is_night_worker=night_worker)
+            prev = datetime.combine(row[0], row[2])
+        result = _check_arbzg_sequence(rows, prev_end, is_night_worker=night_worker)
+        assert result == [expected[row] for row in rows]
+    assert any("§5" in w for w in result[0])
+    assert _check_arbzg_sequence(rows, prev_end, exempt=True) == [[], [], [], []]
+
+
+def test_parse_xls_unsorted_file_checks_rest_in_date_order(db, test_user):
+    rows = [
+        ["Datum", "Tag", "Total", "Ein", "Aus", "Tagesnotiz"],
+        _make_data_row(_dt(2026, 1, 13, 6, 0), _dt(2026, 1, 13, 12, 0)),
+        _make_data_row(_dt(2026, 1, 12, 14, 0), _dt(2026, 1, 12, 22, 0)),
+    ]
+    entries = parse_xls(_make_xls_bytes(rows), test_user.id, db)
+    assert [e.date.day for e in entries] == [13, 12]  # Reihenfolge der Datei bleibt erhalten
+    assert any("§5" in w for w in entries[0].arbzg_warnings)
+    assert entries[1].arbzg_warnings == []
@@ -2,8 +2,11 @@
 import pytest
 from decimal import Decimal
 from datetime import date, time
-from app.models import User, UserRole, TimeEntry, Absence, AbsenceType, YearCarryover
-from app.services import calculation_service
+from app.core.query_metrics import collect_queries
+from app.models import (
+    User, UserRole, TimeEntry, Absence, AbsenceType, YearCarryover, PublicHoliday, WorkingHoursChange,
+)
+from app.services import calculation_service, year_closing_service
 from tests.conftest import DEFAULT_TENANT_ID
 
 
@@ -122,6 +125,127 @@ def test_create_year_closing_with_overtime(db, default_tenant):
     assert results[0]["overtime_hours"] != 0.0
 
 
+# --- batch closing (year_closing_service) ---
+
+
+def _make_absence(db, user, absence_date, absence_type, hours=8.0):
+    db.add(Absence(
+        user_id=user.id, tenant_id=DEFAULT_TENANT_ID, date=absence_date,
+        type=absence_type, hours=Decimal(str(hours)),
+    ))
+    db.commit()
+
+
+def _mixed_history(db):
+    """Users covering every starting point of the overtime account."""
+    with_carryover = _make_user(db, "hist_carry", weekly_hours=30.0)
+    _make_carryover(db, with_carryover, year=2024, overtime_hours=12.5, vacation_days=3.0)
+    _make_time_entry(db, with_carryover, date(2023, 5, 2), 8, 12)  # before the carryover year
+    _make_time_entry(db, with_carryover, date(2025, 3, 4), 7, 16, break_min=45)
+    _make_absence(db, with_carryover, date(2025, 3, 5), AbsenceType.SICK, 6.0)
+    _make_absence(db, with_carryover, date(2025, 3, 6), AbsenceType.VACATION, 6.0)
+    db.add(WorkingHoursChange(
+        user_id=with_carryover.id, tenant_id=DEFAULT_TENANT_ID,
+        effective_from=date(2025, 7, 1), weekly_hours=Decimal("20.0"),
+    ))
+
+    from_first_entry = _make_user(db, "hist_first")
+    _make_time_entry(db, from_first_entry, date(2025, 10, 14), 8, 17, break_min=30)
+    _make_absence(db, from_first_entry, date(2025, 11, 3), AbsenceType.OVERTIME)
+    _make_absence(db, from_first_entry, date(2025, 11, 4), AbsenceType.TRAINING, 7.5)
+
+    schedule = _make_user(db, "hist_schedule")
+    schedule.use_daily_schedule = True
+    schedule.hours_monday = Decimal("9.0")
+    schedule.hours_friday = Decimal("4.5")
+    _make_time_entry(db, schedule, date(2025, 6, 6), 8, 13)
+
+    _make_user(db, "hist_empty")  # no entries → 0
+    later = _make_user(db, "hist_later")
+    _make_time_entry(db, later, date(2026, 2, 2), 8, 16)  # first entry after the closed year
+
+    db.add(PublicHoliday(tenant_id=DEFAULT_TENANT_ID, date=date(2025, 10, 3), name="Tag der Deutschen Einheit", year=2025))
+    db.commit()
+    return db.query(User).filter(User.username.like("hist_%")).all()
+
+
+def test_batch_closing_matches_single_user_accounts(db, default_tenant):
+    """Batch balances equal get_overtime_account / get_vacation_account per user."""
+    users = _mixed_history(db)
+    expected = {
+        str(u.id): (
+            float(calculation_service.get_overtime_account(db, u, 2025, 12)),
+            float(Decimal(str(calculation_service.get_vacation_account(db, u, 2025)["remaining_days"])).quantize(Decimal("0.1"))),
+        )
+        for u in users
+    }
+    assert any(overtime != 0 for overtime, _ in expected.values())
+
+    report = year_closing_service.close_year(db, 2025, users)
+
+    assert {e["user_id"]: (e["overtime_hours"], e["vacation_days"]) for e in report["employees"]} == expected
+
+
+def test_batch_closing_dry_run_writes_nothing(db, default_tenant):
+    """A dry run reports the values but leaves the carryovers untouched."""
+    user = _make_user(db, "dry")
+    _make_carryover(db, user, year=2026, overtime_hours=99.0, vacation_days=9.0)
+    _make_time_entry(db, user, date(2025, 12, 1), 8, 18)
+
+    report = year_closing_service.close_year(db, 2025, [user], dry_run=True)
+    db.commit()
+
+    assert report["dry_run"] is True
+    assert report["updated"] == 1 and report["created"] == 0
+    employee = report["employees"][0]
+    assert employee["action"] == "update"
+    assert employee["previous_overtime_hours"] == 99.0
+    assert employee["previous_vacation_days"] == 9.0
+    carryover = db.query(YearCarryover).filter(YearCarryover.user_id == user.id, YearCarryover.year == 2026).one()
+    assert float(carryover.overtime_hours) == 99.0
+    assert set(report["timings_ms"]) == {"load", "compute", "write", "total"}
+
+
+def test_batch_closing_upserts_and_invalidates(db, default_tenant):
+    """Existing rows are updated in place, new ones created, memoized accounts refreshed."""
+    existing_user = _make_user(db, "upd")
+    new_user = _make_user(db, "new")
+    _make_carryover(db, existing_user, year=2026, overtime_hours=99.0, vacation_days=9.0)
+    assert calculation_service.get_vacation_account(db, existing_user, 2026)["budget_days"] == 39.0
+
+    report = year_closing_service.close_year(db, 2025, [existing_user, new_user])
+
+    assert (report["created"], report["updated"]) == (1, 1)
+    # Same transaction: the ledger memo must not serve the old carryover
+    assert calculation_service.get_vacation_account(db, existing_user, 2026)["budget_days"] == 60.0
+    db.commit()
+    rows = db.query(YearCarryover).filter(YearCarryover.year == 2026).all()
+    assert len(rows) == 2
+    assert all(float(r.vacation_days) == 30.0 for r in rows)
+
+
+def test_batch_closing_query_count_does_not_grow_with_users(db, default_tenant):
+    """Loading and writing uses a fixed number of statements, not one per user."""
+    def count(users):
+        db.commit()
+        for u in users:
+            db.refresh(u)
+        with collect_queries() as stats:
+            year_closing_service.close_year(db, 2025, users)
+        db.rollback()
+        return stats.count
+
+    few = [_make_user(db, f"qc{i}") for i in range(2)]
+    for u in few:
+        _make_time_entry(db, u, date(2025, 1, 7), 8, 16)
+    small = count(few)
+
+    many = few + [_make_user(db, f"qc_more{i}") for i in range(6)]
+    for u in many[2:]:
+        _make_time_entry(db, u, date(2025, 1, 7), 8, 16)
+    assert count(many) == small
+
+
 # --- delete year closing tests ---
 
 
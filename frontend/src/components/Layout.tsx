@@ -3,6 +3,7 @@ import { Outlet, Link, useLocation, useNavigate } from 'react-router-dom';
 import { useAuthStore } from '../stores/authStore';
 import { useUIStore } from '../stores/uiStore';
 import apiClient from '../api/client';
+import { useClockStatusStream } from '../hooks/useClockStatusStream';
 import {
   LayoutDashboard,
   Clock,
@@ -58,19 +59,11 @@ export default function Layout() {
     return () => clearInterval(interval);
   }, [user?.role]);
 
-  // Clock status for FAB appearance
+  // Clock status for FAB appearance (pushed by the server, no polling)
+  const clockStatus = useClockStatusStream(!!user?.track_hours);
   useEffect(() => {
-    if (!user?.track_hours) return;
-    const checkStatus = async () => {
-      try {
-        const res = await apiClient.get('/time-entries/clock-status');
-        setIsClockedIn(res.data.is_clocked_in);
-      } catch { /* ignore */ }
-    };
-    checkStatus();
-    const interval = setInterval(checkStatus, 60000);
-    return () => clearInterval(interval);
-  }, [user?.track_hours]);
+    if (clockStatus) setIsClockedIn(clockStatus.is_clocked_in);
+  }, [clockStatus]);
 
   const handleStampSuccess = () => {
     apiClient.get('/time-entries/clock-status').then(res => {
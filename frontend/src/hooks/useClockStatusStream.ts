@@ -0,0 +1,103 @@
+import { useEffect, useState } from 'react';
+import apiClient from '../api/client';
+
+export interface ClockStatusEvent {
+  is_clocked_in: boolean;
+  current_entry: {
+    id: string;
+    date: string;
+    start_time: string;
+    end_time: null;
+    note: string | null;
+  } | null;
+  elapsed_minutes: number | null;
+}
+
+const STREAM_URL = '/api/time-entries/clock-status/stream';
+const MAX_RETRY_DELAY_MS = 60000;
+
+/**
+ * Subscribes to the server-sent clock status stream.
+ *
+ * Uses fetch instead of EventSource because the access token travels in the
+ * Authorization header. On 401 the token is refreshed through apiClient's
+ * interceptor before reconnecting; other failures reconnect with backoff.
+ */
+export function useClockStatusStream(enabled: boolean): ClockStatusEvent | null {
+  const [status, setStatus] = useState<ClockStatusEvent | null>(null);
+
+  useEffect(() => {
+    if (!enabled) return;
+    const controller = new AbortController();
+    let retryDelay = 1000;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const handleEvent = (raw: string) => {
+      const data = raw
+        .split('\n')
+        .filter((line) => line.startsWith('data:'))
+        .map((line) => line.slice(5).trim())
+        .join('\n');
+      if (!data) return; // keepalive comment
+      try {
+        setStatus(JSON.parse(data));
+      } catch { /* ignore malformed event */ }
+    };
+
+    const connect = async () => {
+      try {
+        const res = await fetch(STREAM_URL, {
+          headers: {
+            Accept: 'text/event-stream',
+            Authorization: `Bearer ${localStorage.getItem('access_token') ?? ''}`,
+          },
+          credentials: 'include',
+          signal: controller.signal,
+        });
+
+        if (res.status === 401) {
+          // Let the interceptor refresh the token (or redirect to login)
+          await apiClient.get('/time-entries/clock-status');
+          scheduleReconnect(0);
+          return;
+        }
+        if (!res.ok || !res.body) throw new Error(`stream failed: ${res.status}`);
+
+        retryDelay = 1000;
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let boundary = buffer.indexOf('\n\n');
+          while (boundary !== -1) {
+            handleEvent(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf('\n\n');
+          }
+        }
+        // Server closed the stream after its max lifetime – reconnect right away
+        scheduleReconnect(0);
+      } catch {
+        if (controller.signal.aborted) return;
+        scheduleReconnect(retryDelay);
+        retryDelay = Math.min(retryDelay * 2, MAX_RETRY_DELAY_MS);
+      }
+    };
+
+    const scheduleReconnect = (delay: number) => {
+      if (controller.signal.aborted) return;
+      retryTimer = setTimeout(connect, delay);
+    };
+
+    connect();
+    return () => {
+      controller.abort();
+      if (retryTimer) clearTimeout(retryTimer);
+    };
+  }, [enabled]);
+
+  return status;
+}